@@ -4,21 +4,12 @@ Assistente inteligente para criação de layouts e visuais profissionais para Po
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from io import StringIO
 import json
 import os
+import tempfile
 
-# Importa módulos do assistente
-from modules.data_analyzer import DataAnalyzer
-from modules.color_generator import ColorGenerator
-from modules.layout_engine import LayoutEngine
-from modules.ai_assistant import AIAssistant
-from modules.powerbi_exporter import PowerBIExporter
-from modules.powerbi_connector import PowerBIConnector
-from modules.theme_applier import ThemeApplier
+# Os módulos do assistente (e pandas/plotly) são importados sob demanda pelo registro
+from modules.service_registry import ServiceRegistry
 
 
 # Configuração da página
@@ -70,16 +61,178 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# Inicializa módulos
-@st.cache_resource
+# Inicializa módulos (registrados aqui, importados e construídos no primeiro uso)
+# Processo: serviços sem estado e caches somente leitura, compartilhados por todas as sessões
+@st.cache_resource(show_spinner=False)
 def initialize_modules():
-    return {
-        'analyzer': DataAnalyzer(),
-        'color_gen': ColorGenerator(),
-        'layout': LayoutEngine(),
-        'ai': AIAssistant(provider="openai"),  # ou "anthropic"
-        'exporter': PowerBIExporter()
-    }
+    registry = ServiceRegistry()
+    registry.register('color_gen', 'modules.color_generator:ColorGenerator')
+    registry.register('accessibility', 'modules.accessibility:AccessibilityChecker')
+    registry.register('preview', 'modules.layout_preview:LayoutPreview')
+    registry.register('ai', 'modules.ai_assistant:AIAssistant', provider="openai")  # ou "anthropic"
+    registry.register('cache', 'modules.content_cache:default_cache')
+    registry.register('shared', 'modules.shared_store:SharedStore',
+                      max_bytes=int(os.getenv("SHARED_CACHE_MB", "512")) * 1024 * 1024)
+    # Resultados dos jobs ficam em memória; JOB_STORAGE_DIR ativa a persistência em disco
+    registry.register('jobs', 'modules.job_queue:JobQueue', max_workers=int(os.getenv("JOB_WORKERS", "4")),
+                      storage_dir=os.getenv("JOB_STORAGE_DIR") or None)
+    return registry
+
+
+# Sessão: serviços com estado (layout atual, histórico de exportação, conector)
+def session_modules():
+    if 'modules' not in st.session_state:
+        registry = ServiceRegistry(parent=initialize_modules())
+        registry.register('analyzer', 'modules.data_analyzer:DataAnalyzer')
+        registry.register('layout', 'modules.layout_engine:LayoutEngine')
+        registry.register('exporter', 'modules.powerbi_exporter:PowerBIExporter')
+        st.session_state.modules = registry
+        # Libera as referências compartilhadas quando a sessão for descartada
+        st.session_state.shared_session = registry['shared'].open_session()
+    return st.session_state.modules
+
+
+def session_workdir():
+    """Pasta temporária só desta sessão (apagada quando a sessão é descartada)"""
+    if 'workdir' not in st.session_state:
+        st.session_state.workdir = tempfile.TemporaryDirectory(prefix='powerbi_session.')
+    return st.session_state.workdir.name
+
+
+def model_structure(connector, refresh=False):
+    """Estrutura do modelo conectado, compartilhada entre sessões do mesmo modelo"""
+    connection = (connector.active_connection or {}).get('connection_string')
+    if not connection:
+        return connector.get_model_structure()
+    shared = session_modules()['shared']
+    key = ('model', connection)
+    if refresh:
+        invalidate_model(connector)
+    structure = shared.acquire(key, connector.get_model_structure, st.session_state.shared_session)
+    if not structure:
+        invalidate_model(connector)  # falha de leitura não fica em cache
+    return structure
+
+
+def load_dataset(uploaded_file):
+    """
+    DataFrame do upload, lido uma vez por processo e compartilhado por conteúdo
+
+    Sessões que enviam o mesmo arquivo recebem visões do mesmo DataFrame; a
+    sessão libera o dataset anterior quando troca de arquivo.
+    """
+    import hashlib
+    from io import BytesIO
+    data = uploaded_file.getvalue()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    shared, session = session_modules()['shared'], st.session_state.shared_session
+
+    previous = st.session_state.get('dataset_digest')
+    if previous and previous != digest:
+        shared.release(('dataset', previous), session)
+        shared.release(('analysis', previous), session)
+    st.session_state.dataset_digest = digest
+
+    reader = pd.read_csv if uploaded_file.name.endswith('.csv') else pd.read_excel
+    return digest, shared.acquire(('dataset', digest), lambda: reader(BytesIO(data)), session)
+
+
+# Acima deste número de células a análise do upload vai para a fila de jobs
+ANALYSIS_JOB_CELLS = 1_000_000
+
+
+def finished_job(modules, state_key):
+    """
+    Registro do job guardado em st.session_state[state_key] quando ele termina
+
+    Enquanto o job roda, mostra o progresso (atualizado sem bloquear a página)
+    e retorna None; também retorna None se não há job.
+    """
+    from modules.job_queue import FINAL_STATUSES
+    job_id = st.session_state.get(state_key)
+    record = modules['jobs'].status(job_id) if job_id else None
+    if record is None:
+        return None
+    if record['status'] in FINAL_STATUSES:
+        return record
+    render_job_progress(job_id)
+    return None
+
+
+@st.fragment(run_every=1.0)
+def render_job_progress(job_id):
+    """Barra de progresso + cancelamento; recarrega a página quando o job termina"""
+    from modules.job_queue import FINAL_STATUSES
+    jobs = initialize_modules()['jobs']
+    record = jobs.status(job_id)
+    if record is None or record['status'] in FINAL_STATUSES:
+        st.rerun()
+    st.progress(record['progress'], text=f"⏳ {record['name']}: {record['message']}")
+    if st.button("⏹️ Cancelar", key=f"cancel_{job_id}", disabled=record['cancel_requested']):
+        jobs.cancel(job_id)
+
+
+def render_job_failure(record, state_key, retry_label):
+    """Mensagem de job cancelado/com erro e botão para submeter de novo"""
+    if record['status'] == 'cancelled':
+        st.warning(f"⏹️ {record['name']}: {record['message']}")
+    else:
+        st.error(f"❌ {record['name']}: {record['error']}")
+    if st.button(retry_label, key=f"retry_{state_key}"):
+        del st.session_state[state_key]
+        st.rerun()
+
+
+def dataset_analysis(modules, data_key, df):
+    """
+    Análise do upload (compartilhada por conteúdo)
+
+    Arquivos pequenos são analisados na hora; os grandes vão para a fila de
+    jobs e a função retorna None enquanto o job roda.
+    """
+    shared, session = modules['shared'], st.session_state.shared_session
+    key = ('analysis', data_key)
+    if key in shared or df.size < ANALYSIS_JOB_CELLS:
+        with st.spinner("Analisando dados..."):
+            return shared.acquire(key, lambda: modules['analyzer'].analyze_dataframe(df), session)
+    
+    jobs = modules['jobs']
+    job_id = st.session_state.get('analysis_job')
+    if not job_id or (jobs.status(job_id) or {}).get('key') != repr(key):
+        analyzer = modules['analyzer']
+        st.session_state.analysis_job = jobs.submit(
+            f"Análise de {len(df):,} linhas",
+            lambda job: shared.acquire(key, lambda: analyzer.analyze_dataframe(df, progress=job.progress), view=False),
+            owner=session.id, key=key
+        )
+    record = finished_job(modules, 'analysis_job')
+    if record is None:
+        return None
+    if record['status'] != 'done':
+        render_job_failure(record, 'analysis_job', "🔁 Analisar novamente")
+        return None
+    return shared.acquire(key, lambda: jobs.result(record['id']), session)
+
+
+def invalidate_model(connector):
+    """Descarta a estrutura compartilhada após alterações no modelo"""
+    connection = (connector.active_connection or {}).get('connection_string')
+    session_modules()['shared'].invalidate(lambda key: key == ('model', connection))
+
+
+pd = initialize_modules().module('pandas')
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def build_chart(_df, data_key, suggestion, colors, _column_analysis=None):
+    """
+    Figura pré-agregada de uma sugestão, memoizada por (data_key, sugestão, cores)
+
+    O DataFrame não entra no hash (data_key o identifica), então milhões de
+    linhas não são re-hasheadas a cada rerun.
+    """
+    from modules.chart_pipeline import ChartPipeline
+    return ChartPipeline(colors=list(colors) or None).figure(_df, suggestion, _column_analysis)
 
 
 def main():
@@ -89,10 +242,10 @@ def main():
     st.markdown('<h1 class="main-header">📊 Power BI Design Assistant</h1>', unsafe_allow_html=True)
     st.markdown('<p class="subtitle">Crie dashboards profissionais com ajuda de IA</p>', unsafe_allow_html=True)
     
-    # Inicializa módulos
-    modules = initialize_modules()
+    # Inicializa módulos (escopo da sessão, com os compartilhados como pai)
+    modules = session_modules()
     
-    # Adiciona connector ao dicionário modules se existir
+    # Adiciona connector ao registro da sessão se existir
     if 'pbi_connector' in st.session_state:
         modules['connector'] = st.session_state.pbi_connector
     
@@ -117,11 +270,25 @@ def main():
             ai_provider = st.selectbox("Provider", ["OpenAI", "Anthropic", "Desabilitado"])
             if ai_provider != "Desabilitado":
                 st.info("Configure sua API key no arquivo .env")
-                if modules['ai'].is_available():
+                # Verifica chave e biblioteca sem importar o SDK
+                from modules.ai_assistant import AIAssistant
+                if AIAssistant.is_configured(ai_provider.lower()):
                     st.success("✅ IA conectada")
                 else:
                     st.warning("⚠️ API key não configurada")
         
+        with st.expander("⏱️ Inicialização"):
+            st.code(modules.format_report(), language=None)
+        
+        with st.expander("💾 Memória"):
+            render_memory_report(modules)
+        
+        with st.expander("🧵 Jobs"):
+            render_job_list(modules)
+        
+        with st.expander("🔬 Tracing"):
+            render_trace_report()
+        
         st.divider()
         
         # Informações
@@ -159,6 +326,67 @@ def main():
         render_ai_assistant(modules)
 
 
+def render_memory_report(modules):
+    """Memória da sessão (estado próprio + parte dos caches compartilhados) e do processo"""
+    from modules.shared_store import session_memory, format_bytes
+    shared = modules['shared']
+    usage = session_memory(st.session_state.items(), shared, st.session_state.shared_session)
+    stats = shared.stats()
+    
+    st.metric("Esta sessão", format_bytes(usage['total_bytes']),
+              help="Estado da sessão + fração dos valores compartilhados que ela usa")
+    st.caption(f"Privado: {format_bytes(usage['private_bytes'])} · Compartilhado: "
+               f"{format_bytes(usage['attributed_bytes'])} de {format_bytes(usage['shared_bytes'])} "
+               f"({usage['shared_entries']} valor(es))")
+    for key, size in usage['largest']:
+        st.caption(f"`{key}`: {format_bytes(size)}")
+    st.caption(f"Processo: {stats['sessions']} sessão(ões), cache {format_bytes(stats['bytes'])} de "
+               f"{format_bytes(stats['max_bytes'])} ({stats['entries']} entrada(s), {stats['pinned_entries']} em uso, "
+               f"acertos {stats['hit_rate']:.0%})")
+
+
+def render_job_list(modules):
+    """Jobs da sessão (em andamento e concluídos)"""
+    icons = {'pending': '🕒', 'running': '⏳', 'done': '✅', 'failed': '❌', 'cancelled': '⏹️'}
+    records = modules['jobs'].jobs(owner=st.session_state.shared_session.id)
+    if not records:
+        st.caption("Nenhum job nesta sessão")
+    for record in records[:10]:
+        elapsed = f" · {record['elapsed_ms'] / 1000:.1f} s" if record['elapsed_ms'] else ""
+        progress = f" ({record['progress']:.0%})" if record['status'] == 'running' else ""
+        st.caption(f"{icons.get(record['status'], '❓')} {record['name']}{progress}{elapsed}")
+
+
+def render_trace_report():
+    """Liga/desliga o tracing do processo, resumo por span e download dos traces"""
+    import json
+    from modules import tracing
+    enabled = st.toggle("Coletar spans", value=tracing.is_enabled(),
+                        help="Vale para o processo inteiro (todas as sessões); desligado o custo é quase zero")
+    if enabled and not tracing.is_enabled():
+        tracing.enable()
+    elif not enabled and tracing.is_enabled():
+        tracing.disable()
+    
+    rows = tracing.summary()
+    if not rows:
+        st.caption("Nenhum span coletado" if enabled else "Tracing desligado (ou AVI_TRACE=1)")
+        return
+    st.code(tracing.format_summary(top=15), language=None)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button("JSON", json.dumps(tracing.tracer.to_dict(), ensure_ascii=False, default=str),
+                           file_name="trace_spans.json", mime="application/json")
+    with col2:
+        st.download_button("Chrome", json.dumps(tracing.tracer.chrome_trace(), ensure_ascii=False),
+                           file_name="trace_chrome.json", mime="application/json",
+                           help="Abrir em chrome://tracing ou ui.perfetto.dev")
+    with col3:
+        if st.button("Limpar"):
+            tracing.reset()
+            st.rerun()
+
+
 def render_complete_analysis(modules):
     """Renderiza análise completa de dados"""
     st.header("📊 Análise Completa de Dados")
@@ -171,15 +399,18 @@ def render_complete_analysis(modules):
     )
     
     if uploaded_file is not None:
-        # Lê o arquivo
+        # Lê o arquivo (ou reaproveita o DataFrame de outra sessão com o mesmo conteúdo)
         try:
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file)
+            data_key, df = load_dataset(uploaded_file)
             
             st.success(f"✅ Arquivo carregado: {len(df)} linhas, {len(df.columns)} colunas")
             
+            # Arquivos grandes são analisados em segundo plano (sobrevive a reruns)
+            analysis = dataset_analysis(modules, data_key, df)
+            if analysis is None:
+                st.dataframe(df.head(20), use_container_width=True)
+                return
+            
             # Tabs para organizar
             tab1, tab2, tab3, tab4, tab5 = st.tabs([
                 "📈 Preview", "🔍 Análise", "🎨 Cores", "📐 Layout", "💾 Exportar"
@@ -203,9 +434,6 @@ def render_complete_analysis(modules):
             with tab2:
                 st.subheader("🔍 Análise Detalhada")
                 
-                with st.spinner("Analisando dados..."):
-                    analysis = modules['analyzer'].analyze_dataframe(df)
-                
                 # Qualidade dos dados
                 st.markdown("### 📊 Qualidade dos Dados")
                 quality = analysis['data_quality']
@@ -270,6 +498,7 @@ def render_complete_analysis(modules):
                 
                 # Visualizações sugeridas
                 st.markdown("### 💡 Visualizações Sugeridas")
+                chart_colors = tuple((st.session_state.get('current_palette') or {}).get('colors', []))
                 
                 for i, suggestion in enumerate(analysis['suggested_visuals'][:5], 1):
                     priority_colors = {
@@ -296,6 +525,17 @@ def render_complete_analysis(modules):
                                 'low': '🟢 Baixa'
                             }
                             st.metric("Prioridade", priority_label[suggestion['priority']])
+                        
+                        # Prévia pré-agregada no servidor (payload limitado)
+                        try:
+                            fig = build_chart(df, data_key, suggestion, chart_colors, analysis['column_analysis'])
+                        except Exception as e:
+                            fig = None
+                            st.warning(f"⚠️ Prévia indisponível: {e}")
+                        if fig is not None:
+                            st.plotly_chart(fig, use_container_width=True)
+                            from modules.chart_pipeline import payload_points
+                            st.caption(f"{len(df):,} linhas → {payload_points(fig):,} valores enviados ao gráfico")
             
             with tab3:
                 st.subheader("🎨 Paletas de Cores")
@@ -307,7 +547,7 @@ def render_complete_analysis(modules):
                     
                     palette_mode = st.radio(
                         "Modo",
-                        ["Presets", "Gerar da cor base", "Sugestão por contexto"]
+                        ["Presets", "Gerar da cor base", "Sugestão por contexto", "Por cardinalidade"]
                     )
                     
                     if palette_mode == "Presets":
@@ -330,6 +570,27 @@ def render_complete_analysis(modules):
                                 base_color, scheme, color_count
                             )
                     
+                    elif palette_mode == "Por cardinalidade":
+                        category_columns = {
+                            name: info for name, info in analysis['column_analysis'].items()
+                            if info['detected_type'] in ('category', 'low_cardinality_category')
+                        }
+                        if not category_columns:
+                            st.info("Nenhuma coluna categórica detectada nos dados")
+                        else:
+                            column = st.selectbox(
+                                "Coluna",
+                                list(category_columns),
+                                format_func=lambda name: f"{name} ({category_columns[name]['unique_count']} níveis)"
+                            )
+                            if st.button("Gerar Paleta Categórica"):
+                                levels = category_columns[column]['unique_count']
+                                st.session_state.current_palette = modules['color_gen'].generate_categorical(
+                                    min(levels, 100)
+                                )
+                                if levels > 100:
+                                    st.warning(f"⚠️ {levels} níveis: paleta limitada a 100 cores (considere agrupar em 'Outros')")
+                    
                     else:
                         data_type = st.selectbox(
                             "Tipo de dados",
@@ -385,6 +646,49 @@ def render_complete_analysis(modules):
                             st.metric("WCAG AA", "✅" if contrast_check['wcag_aa_normal'] else "❌")
                         with col3:
                             st.metric("Rating", contrast_check['rating'])
+                        
+                        # Auditoria da paleta inteira (contraste com o fundo e daltonismo)
+                        wcag_level = st.radio("Nível WCAG", ["AA", "AAA"], horizontal=True)
+                        audit_inputs = (
+                            palette.get('colors', []),
+                            palette.get('background', '#FFFFFF'),
+                            palette.get('foreground'),
+                            wcag_level
+                        )
+                        audit = modules['cache'].get_or_compute(
+                            'audit',
+                            lambda: modules['accessibility'].audit(*audit_inputs[:3], level=wcag_level),
+                            *audit_inputs
+                        )
+                        if audit['passes']:
+                            st.success(f"✅ Paleta atende WCAG {wcag_level} e é distinguível para daltônicos")
+                        else:
+                            for failing in audit['failing']:
+                                st.warning(
+                                    f"⚠️ {failing['color']}: contraste {failing['contrast']}:1 com o fundo "
+                                    f"(mínimo {failing['required']}:1)"
+                                )
+                            for confusion in audit['confusions'][:5]:
+                                st.warning(
+                                    f"⚠️ {confusion['colors'][0]} e {confusion['colors'][1]} "
+                                    f"se confundem ({confusion['vision']})"
+                                )
+                            
+                            if st.button("♿ Gerar paleta acessível"):
+                                with st.spinner("Buscando a paleta acessível mais próxima..."):
+                                    search = modules['accessibility'].find_accessible_palette(
+                                        palette.get('colors', []),
+                                        palette.get('background', '#FFFFFF'),
+                                        palette.get('foreground'),
+                                        level=wcag_level
+                                    )
+                                st.info(search['message'])
+                                fixed_palette = dict(palette, colors=search['palette'],
+                                                     name=f"{palette.get('name', 'Paleta')} (acessível)")
+                                if search.get('foreground'):
+                                    fixed_palette['foreground'] = search['foreground']
+                                st.session_state.current_palette = fixed_palette
+                                st.rerun()
             
             with tab4:
                 st.subheader("📐 Templates de Layout")
@@ -409,13 +713,20 @@ def render_complete_analysis(modules):
                     visual_count = st.number_input(
                         "Número de visuais",
                         min_value=1,
-                        max_value=20,
+                        max_value=60,
                         value=6
                     )
                     
                     if st.button("Gerar Layout"):
                         layout = modules['layout'].generate_layout(selected_template, visual_count)
                         st.session_state.current_layout = layout
+                    
+                    if analysis['suggested_visuals'] and st.button("🧠 Otimizar para as sugestões"):
+                        with st.spinner("Buscando o melhor arranjo..."):
+                            layout = modules['layout'].optimize_for_suggestions(
+                                analysis['suggested_visuals'], selected_template, seed=42
+                            )
+                        st.session_state.current_layout = layout
                 
                 with col2:
                     if 'current_layout' in st.session_state:
@@ -424,47 +735,35 @@ def render_complete_analysis(modules):
                         st.markdown(f"### Layout: {layout['template']}")
                         st.markdown(f"**Canvas:** {layout['canvas']['width']}x{layout['canvas']['height']}px")
                         
-                        # Visualização do layout
-                        st.markdown("#### Visualização")
+                        if 'quality' in layout:
+                            quality = layout['quality']
+                            st.markdown(f"**Qualidade:** {modules['layout'].quality_summary(quality)}")
+                            if quality.get('unplaced'):
+                                st.warning(f"⚠️ {len(quality['unplaced'])} visual(is) não couberam no canvas")
+                            if quality.get('below_min'):
+                                st.warning(f"⚠️ {len(quality['below_min'])} visual(is) abaixo do tamanho mínimo")
                         
-                        # Cria figura plotly para visualizar layout
-                        fig = go.Figure()
+                        validation = modules['layout'].validate_layout(layout)
+                        if validation['counts']:
+                            resumo = ", ".join(f"{tipo}: {n}" for tipo, n in validation['counts'].items())
+                            st.warning(f"⚠️ Problemas de layout ({resumo})")
+                            if st.button("🧲 Corrigir alinhamento"):
+                                layout = modules['layout'].snap_layout(layout)
+                                st.session_state.current_layout = layout
                         
-                        for visual in layout['visuals']:
-                            pos = visual['position']
-                            
-                            # Adiciona retângulo para cada visual
-                            fig.add_shape(
-                                type="rect",
-                                x0=pos['x'],
-                                y0=pos['y'],
-                                x1=pos['x'] + pos['width'],
-                                y1=pos['y'] + pos['height'],
-                                line=dict(color="blue", width=2),
-                                fillcolor="lightblue",
-                                opacity=0.3
-                            )
-                            
-                            # Adiciona texto
-                            fig.add_annotation(
-                                x=pos['x'] + pos['width']/2,
-                                y=pos['y'] + pos['height']/2,
-                                text=visual['id'],
-                                showarrow=False,
-                                font=dict(size=10)
-                            )
+                        # Visualização do layout
+                        st.markdown("#### Visualização")
                         
-                        fig.update_xaxes(range=[0, layout['canvas']['width']], showgrid=True)
-                        fig.update_yaxes(range=[layout['canvas']['height'], 0], showgrid=True)
-                        fig.update_layout(
-                            height=500,
-                            width=800,
-                            showlegend=False,
-                            title="Preview do Layout"
+                        # Preview em lote (um trace por prioridade), em cache pelo hash do layout
+                        preview = modules['preview']
+                        st.plotly_chart(preview.figure(layout), use_container_width=True)
+                        st.download_button(
+                            "⬇️ Baixar preview (SVG)",
+                            preview.svg(layout),
+                            file_name=f"layout_{layout['template']}.svg",
+                            mime="image/svg+xml"
                         )
                         
-                        st.plotly_chart(fig, use_container_width=True)
-                        
                         # Detalhes dos visuais
                         st.markdown("#### Detalhes dos Visuais")
                         for visual in layout['visuals']:
@@ -485,18 +784,40 @@ def render_complete_analysis(modules):
                     if 'current_palette' in st.session_state:
                         theme_name = st.text_input("Nome do Tema", "MeuTemaCustomizado")
                         
+                        font_family = st.selectbox(
+                            "Fonte", ["Segoe UI", "Arial", "Calibri", "DIN", "Tahoma"]
+                        )
+                        
                         if st.button("Gerar Arquivo de Tema"):
-                            theme_json = modules['exporter'].export_theme(
+                            # Tema compilado em cache pelo conteúdo da paleta: reruns não recompilam
+                            typography = {'font_family': font_family}
+                            if font_family != "Segoe UI":
+                                typography['heading_family'] = font_family
+                            compiled = modules['exporter'].compile_theme(
                                 st.session_state.current_palette,
-                                theme_name
+                                theme_name,
+                                typography
                             )
+                            if compiled['errors']:
+                                st.warning(f"⚠️ {compiled['message']}")
+                                for error in compiled['errors'][:5]:
+                                    st.caption(error)
                             
-                            st.download_button(
-                                label="📥 Download theme.json",
-                                data=theme_json,
-                                file_name=f"{theme_name}.json",
-                                mime="application/json"
-                            )
+                            download_col1, download_col2 = st.columns(2)
+                            with download_col1:
+                                st.download_button(
+                                    label="📥 Download theme.json",
+                                    data=compiled['pretty'],
+                                    file_name=f"{theme_name}.json",
+                                    mime="application/json"
+                                )
+                            with download_col2:
+                                st.download_button(
+                                    label="📥 Download minificado",
+                                    data=compiled['minified'],
+                                    file_name=f"{theme_name}.min.json",
+                                    mime="application/json"
+                                )
                             
                             st.success("✅ Tema gerado!")
                             st.info("Importe no Power BI: View > Themes > Browse for themes")
@@ -529,18 +850,69 @@ def render_complete_analysis(modules):
                 
                 if st.button("Gerar Pacote Completo de Exportação"):
                     if 'current_palette' in st.session_state and 'current_layout' in st.session_state:
-                        with st.spinner("Gerando pacote..."):
-                            files = modules['exporter'].create_theme_bundle(
-                                st.session_state.current_palette,
+                        # Em segundo plano: a exportação continua mesmo se a página recarregar
+                        st.session_state.bundle_job = modules['jobs'].submit(
+                            "Pacote de exportação",
+                            modules['exporter'].create_theme_bundle,
+                            st.session_state.current_palette,
+                            st.session_state.current_layout,
+                            os.path.join(session_workdir(), "powerbi_export"),
+                            zip_path=os.path.join(session_workdir(), "powerbi_export.zip"),
+                            owner=st.session_state.shared_session.id
+                        )
+                    else:
+                        st.error("❌ Configure paleta e layout primeiro")
+                
+                bundle_job = finished_job(modules, 'bundle_job')
+                if bundle_job is not None and bundle_job['status'] == 'done':
+                    files = modules['jobs'].result(bundle_job['id'])
+                    st.success(f"✅ Pacote completo gerado! ({bundle_job['elapsed_ms']:.0f} ms)")
+                    st.json(files)
+                    with open(files['zip'], 'rb') as f:
+                        st.download_button(
+                            label="📥 Download pacote (.zip)",
+                            data=f.read(),
+                            file_name="powerbi_export.zip",
+                            mime="application/zip"
+                        )
+                elif bundle_job is not None:
+                    render_job_failure(bundle_job, 'bundle_job', "🔁 Gerar pacote novamente")
+                
+                st.divider()
+                
+                st.markdown("### 🗂️ Projeto Power BI (.pbip)")
+                st.caption("Relatório PBIR com os visuais do layout ligados às colunas sugeridas e o tema embutido")
+                
+                project_name = st.text_input("Nome do Projeto", "MeuDashboard")
+                if st.button("Gerar Projeto Power BI"):
+                    if 'current_layout' in st.session_state:
+                        with st.spinner("Gerando projeto..."):
+                            project = modules['exporter'].create_pbip_project(
+                                project_name,
+                                analysis,
                                 st.session_state.current_layout,
-                                "powerbi_export"
+                                st.session_state.get('current_palette'),
+                                os.path.join(session_workdir(), "powerbi_project")
                             )
                         
-                        st.success("✅ Pacote completo gerado!")
-                        st.json(files)
-                        st.info("📁 Verifique a pasta 'powerbi_export' no diretório do projeto")
+                        if project['success']:
+                            from modules.pbip_exporter import PBIPExporter
+                            st.success(project['message'])
+                            for warning in project['validation']['warnings'][:5]:
+                                st.warning(f"⚠️ {warning}")
+                            st.download_button(
+                                label="📥 Download projeto (.zip)",
+                                data=PBIPExporter.zip_project(project['project_dir']),
+                                file_name=f"{project_name}.zip",
+                                mime="application/zip"
+                            )
+                            st.info(f"📁 Abra '{project['pbip']}' no Power BI Desktop")
+                        else:
+                            st.error(project['message'])
+                            for error in project.get('validation', {}).get('errors', [])[:5]:
+                                st.caption(error)
                     else:
-                        st.error("❌ Configure paleta e layout primeiro")
+                        st.error("❌ Configure um layout primeiro")
         
         except Exception as e:
             st.error(f"❌ Erro ao processar arquivo: {e}")
@@ -550,15 +922,14 @@ def render_complete_analysis(modules):
         # Instruções
         st.info("👆 Carregue um arquivo de dados para começar a análise")
         
-        # Exemplo
+        # Exemplo (tabela markdown: a página inicial não precisa importar pandas)
         with st.expander("📝 Ver exemplo de dados"):
-            example_df = pd.DataFrame({
-                'Data': pd.date_range('2024-01-01', periods=10),
-                'Vendas': [1000, 1500, 1200, 1800, 2000, 1700, 2200, 2500, 2300, 2800],
-                'Categoria': ['A', 'B', 'A', 'C', 'B', 'A', 'C', 'B', 'A', 'C'],
-                'Região': ['Sul', 'Norte', 'Sul', 'Norte', 'Sul', 'Norte', 'Sul', 'Norte', 'Sul', 'Norte']
-            })
-            st.dataframe(example_df)
+            vendas = [1000, 1500, 1200, 1800, 2000, 1700, 2200, 2500, 2300, 2800]
+            categorias = ['A', 'B', 'A', 'C', 'B', 'A', 'C', 'B', 'A', 'C']
+            regioes = ['Sul', 'Norte'] * 5
+            linhas = [f"| 2024-01-{dia + 1:02d} | {vendas[dia]} | {categorias[dia]} | {regioes[dia]} |"
+                      for dia in range(10)]
+            st.markdown("| Data | Vendas | Categoria | Região |\n|---|---|---|---|\n" + "\n".join(linhas))
 
 
 def render_color_generator(modules):
@@ -623,6 +994,7 @@ def render_powerbi_connection(modules):
     
     # Inicializa connector se não existir
     if 'pbi_connector' not in st.session_state:
+        from modules.powerbi_connector import PowerBIConnector
         st.session_state.pbi_connector = PowerBIConnector()
     
     connector = st.session_state.pbi_connector
@@ -736,7 +1108,7 @@ def render_model_structure(connector):
     
     if st.button("🔄 Atualizar Estrutura"):
         with st.spinner("Carregando estrutura..."):
-            structure = connector.get_model_structure()
+            structure = model_structure(connector, refresh=True)
             st.session_state.pbi_structure = structure
     
     if 'pbi_structure' in st.session_state:
@@ -803,6 +1175,7 @@ def render_visual_analysis(connector, modules):
     if st.button("🔍 Analisar Modelo"):
         with st.spinner("Analisando modelo..."):
             # Usa o data_analyzer com o connector
+            from modules.data_analyzer import DataAnalyzer
             analyzer = DataAnalyzer(powerbi_connector=connector)
             analysis = analyzer.analyze_powerbi_model()
             st.session_state.pbi_analysis = analysis
@@ -850,6 +1223,7 @@ def render_theme_application(connector, modules):
     
     # Inicializa theme applier
     if 'theme_applier' not in st.session_state:
+        from modules.theme_applier import ThemeApplier
         st.session_state.theme_applier = ThemeApplier(connector)
     
     theme_applier = st.session_state.theme_applier
@@ -890,8 +1264,13 @@ def render_theme_application(connector, modules):
                 result = theme_applier.apply_theme(theme_config)
                 
                 if result.get('success'):
-                    st.success("✅ Tema aplicado com sucesso!")
-                    
+                    if result.get('writes'):
+                        st.success("✅ Tema aplicado com sucesso!")
+                    else:
+                        st.info("ℹ️ O modelo já está com este tema - nenhuma alteração enviada")
+                    for warning in result.get('warnings', []):
+                        st.warning(f"⚠️ {warning}")
+
                     with st.expander("📋 Detalhes"):
                         st.json(result)
                 else:
@@ -911,6 +1290,7 @@ def render_powerbi_export(connector, modules):
     
     with col1:
         if st.button("📥 Exportar Tema Atual"):
+            from modules.theme_applier import ThemeApplier
             theme_applier = ThemeApplier(connector)
             current_theme = theme_applier.export_current_theme()
             
@@ -1003,7 +1383,7 @@ ROW(
     col1, col2, col3 = st.columns([2, 1, 1])
     
     with col1:
-        max_rows = st.number_input("Máximo de linhas", min_value=10, max_value=10000, value=100)
+        max_rows = st.number_input("Máximo de linhas", min_value=10, max_value=1_000_000, value=100)
     
     with col2:
         validate_first = st.checkbox("Validar antes", value=True)
@@ -1044,24 +1424,17 @@ ROW(
                         # Limitar histórico a 10 queries
                         st.session_state.dax_history = st.session_state.dax_history[:10]
                     
-                    # Mostrar resultados
-                    rows = result.get('rows', [])
-                    if rows:
-                        st.markdown(f"**📊 Resultado: {len(rows)} linha(s)**")
-                        
-                        # Converter para DataFrame
-                        df = pd.DataFrame(rows)
-                        st.dataframe(df, use_container_width=True)
-                        
-                        # Botão de download
-                        csv = df.to_csv(index=False)
-                        st.download_button(
-                            label="💾 Baixar como CSV",
-                            data=csv,
-                            file_name="query_result.csv",
-                            mime="text/csv"
-                        )
+                    # Resultado fica no servidor; o navegador recebe só a página visível
+                    previous = st.session_state.get('dax_result_store')
+                    if previous is not None:
+                        previous.close()
+                    if result.get('rows'):
+                        from modules.result_store import ResultStore
+                        st.session_state.dax_result_store = ResultStore.from_result(result)
+                        st.session_state.dax_grid_page = 0
+                        st.session_state.dax_grid_download = None
                     else:
+                        st.session_state.dax_result_store = None
                         st.info("Query executada mas não retornou dados")
                 
                 else:
@@ -1070,6 +1443,9 @@ ROW(
             except Exception as e:
                 st.error(f"❌ Exceção ao executar: {str(e)}")
     
+    if st.session_state.get('dax_result_store') is not None:
+        render_result_grid(st.session_state.dax_result_store)
+    
     # Histórico
     if st.session_state.dax_history:
         st.markdown("---")
@@ -1083,6 +1459,104 @@ ROW(
                     st.rerun()
 
 
+def render_result_grid(store):
+    """Grade paginada do resultado DAX (ordenação, filtro e download no servidor)"""
+    from modules.result_store import FILTER_OPERATORS
+    
+    st.markdown(f"**📊 Resultado: {len(store):,} linha(s)**")
+    
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        sort_by = st.selectbox("Ordenar por", ["(original)"] + store.columns, key="dax_grid_sort")
+    with col2:
+        descending = st.checkbox("Decrescente", key="dax_grid_desc")
+    with col3:
+        page_size = st.selectbox("Linhas por página", [50, 100, 500, 1000], index=1, key="dax_grid_size")
+    
+    col1, col2, col3 = st.columns([2, 1, 2])
+    with col1:
+        filter_column = st.selectbox("Filtrar coluna", ["(nenhuma)"] + store.columns, key="dax_grid_filter_col")
+    with col2:
+        filter_op = st.selectbox("Operador", list(FILTER_OPERATORS), index=6, key="dax_grid_filter_op")
+    with col3:
+        filter_value = st.text_input("Valor", key="dax_grid_filter_value",
+                                     help="Para 'in', separe os valores por vírgula")
+    
+    filters = []
+    if filter_column != "(nenhuma)" and filter_value:
+        value = [item.strip() for item in filter_value.split(',')] if filter_op == 'in' else filter_value
+        filters.append({'column': filter_column, 'op': filter_op, 'value': value})
+    view = {
+        'sort_by': None if sort_by == "(original)" else sort_by,
+        'ascending': not descending,
+        'filters': filters
+    }
+    
+    # Nova ordenação/filtro volta para a primeira página
+    view_key = repr(view)
+    if st.session_state.get('dax_grid_view') != view_key:
+        st.session_state.dax_grid_view = view_key
+        st.session_state.dax_grid_page = 0
+    
+    try:
+        page = store.page(st.session_state.get('dax_grid_page', 0), page_size, **view)
+    except (TypeError, ValueError) as e:
+        st.error(f"❌ Filtro inválido: {e}")
+        return
+    
+    st.dataframe(page['rows'], use_container_width=True, hide_index=True)
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("◀️ Anterior", disabled=page['page'] == 0, key="dax_grid_prev"):
+            st.session_state.dax_grid_page = page['page'] - 1
+            st.rerun()
+    with col2:
+        st.caption(f"Página {page['page'] + 1} de {page['page_count']:,} · linhas {page['start'] + 1:,}–"
+                   f"{page['end']:,} de {page['total_rows']:,} (total: {page['source_rows']:,})")
+    with col3:
+        if st.button("Próxima ▶️", disabled=page['page'] >= page['page_count'] - 1, key="dax_grid_next"):
+            st.session_state.dax_grid_page = page['page'] + 1
+            st.rerun()
+    st.session_state.dax_grid_page = page['page']
+    
+    # Download gerado só quando pedido, em blocos, num arquivo temporário
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        export_format = st.selectbox("Formato", ["csv", "parquet"], key="dax_grid_format")
+    with col2:
+        if st.button("📦 Preparar download", key="dax_grid_export"):
+            with st.spinner("Gerando arquivo..."):
+                st.session_state.dax_grid_download = {'view': view_key + export_format,
+                                                      'export': store.export(export_format, **view)}
+    
+    download = st.session_state.get('dax_grid_download')
+    export = download['export'] if download and download['view'] == view_key + export_format else None
+    if export and not export.get('success'):
+        st.error(f"❌ {export.get('error')}")
+    elif export and os.path.exists(export['path']):
+        extension = export['path'].rsplit('.', 1)[-1]
+        # O arquivo é lido a cada rerun enquanto o botão aparece: some depois do download
+        with open(export['path'], 'rb') as handle:
+            st.download_button(
+                label=f"💾 Baixar {extension.upper()} ({export['rows']:,} linhas, {export['size'] / 1024 ** 2:.1f} MB)",
+                data=handle,
+                file_name=f"query_result.{extension}",
+                mime="text/csv" if extension == 'csv' else "application/octet-stream",
+                on_click=lambda: st.session_state.update(dax_grid_download=None)
+            )
+    
+    # Gráfico automático, pré-agregado no servidor (calculado só se pedido)
+    if st.checkbox("📈 Mostrar gráfico", key="dax_grid_chart"):
+        from modules.chart_pipeline import ChartPipeline
+        pipeline = ChartPipeline(colors=(st.session_state.get('current_palette') or {}).get('colors'))
+        suggestion = pipeline.auto_suggestion(store.frame)
+        if suggestion:
+            st.plotly_chart(pipeline.figure(store.frame, suggestion), use_container_width=True)
+        else:
+            st.info("Nenhuma coluna numérica para o gráfico")
+
+
 def render_create_measure(modules):
     """Renderiza interface para criação de medidas"""
     st.header("📏 Criar Nova Medida")
@@ -1103,7 +1577,7 @@ def render_create_measure(modules):
     st.success(f"✅ Conectado: {status.get('dataset', 'Unknown')}")
     
     # Obter estrutura
-    structure = connector.get_model_structure()
+    structure = model_structure(connector)
     tables = structure.get('tables', [])
     
     if not tables:
@@ -1202,22 +1676,16 @@ def render_create_measure(modules):
     
     st.markdown("---")
     
-    # Aviso importante
-    st.warning("""
-    ⚠️ **Nota Importante:**
-    
-    A criação de medidas via API requer **XMLA Write Access** que não está disponível no Power BI Desktop.
+    # Como as medidas chegam ao modelo
+    st.info("""
+    ℹ️ **Como funciona:**
     
-    Esta funcionalidade irá:
-    1. ✅ Validar a expressão DAX
-    2. ✅ Gerar o código TMSL
-    3. ✅ Salvar a definição para uso posterior
-    4. ⚠️ Não criar automaticamente no modelo
+    1. ✅ Valida a expressão DAX no modelo conectado
+    2. ✅ Guarda a definição no histórico desta sessão
+    3. 🚀 Em **Publicar em Lote**, cria todas as medidas do histórico em uma única transação TMSL
     
-    **Para aplicar no modelo:**
-    - Copie a expressão gerada
-    - No Power BI Desktop: Home → New Measure
-    - Cole e execute a expressão
+    A publicação precisa de uma conexão com escrita no modelo (Analysis Services via TOM/XMLA).
+    Sem ela, copie a expressão e crie a medida no Power BI Desktop (Home → New Measure).
     """)
     
     # Botão de criação
@@ -1282,6 +1750,36 @@ def render_create_measure(modules):
                 if measure.get('description'):
                     st.caption(measure['description'])
 
+        # Publicação em lote (uma única transação TMSL)
+        st.markdown("#### 🚀 Publicar em Lote")
+        atomic = st.checkbox(
+            "Tudo ou nada",
+            value=True,
+            help="Se alguma medida falhar, nenhuma é criada no modelo"
+        )
+
+        if st.button(f"🚀 Publicar {len(st.session_state.created_measures)} medida(s) no modelo"):
+            batch = [
+                {**measure, 'format': measure['format'].split(' (')[0] if measure.get('format') else None}
+                for measure in st.session_state.created_measures
+            ]
+
+            with st.spinner("Publicando medidas..."):
+                result = connector.create_measures_batch(batch, atomic=atomic)
+            if result.get('created'):
+                invalidate_model(connector)
+
+            if result.get('success'):
+                st.success(f"✅ {result.get('message')}")
+            else:
+                st.error(f"❌ {result.get('message')}")
+
+            failed = [r for r in result.get('results', []) if not r['success']]
+            if failed:
+                with st.expander(f"⚠️ {len(failed)} medida(s) com erro", expanded=True):
+                    for item in failed:
+                        st.write(f"- **{item['name']}** ({item['table']}): {item['error']}")
+
 
 def render_validate_dax(modules):
     """Renderiza validador de DAX"""
@@ -1651,7 +2149,7 @@ def render_relationships(modules):
         
         # Obter estrutura do modelo
         if connector.is_connected():
-            structure = connector.get_model_structure()
+            structure = model_structure(connector)
             tables = structure.get('tables', [])
             table_names = [t['name'] for t in tables]
             
@@ -1708,6 +2206,7 @@ def render_relationships(modules):
                     )
                     
                     if result.get('success'):
+                        invalidate_model(connector)
                         st.success(f"✅ {result.get('message')}")
                         st.info("💡 Atualize o modelo no Power BI Desktop para ver o novo relacionamento")
                     else:
@@ -1791,7 +2290,7 @@ def render_performance_analysis(modules):
         
         # Obter lista de medidas
         if connector.is_connected():
-            structure = connector.get_model_structure()
+            structure = model_structure(connector)
             tables = structure.get('tables', [])
             
             # Extrair todas as medidas
@@ -1889,7 +2388,45 @@ def render_performance_analysis(modules):
     
     with tab3:
         st.subheader("🏆 Ranking de Performance")
-        st.info("🚧 Em desenvolvimento: Ranking automático de todas as medidas")
+        st.caption("Mede todas as medidas do modelo em segundo plano; a página continua utilizável")
+        
+        structure = model_structure(connector) if connector.is_connected() else {}
+        measure_names = [
+            measure.get('MeasureName') or measure.get('name', 'Unknown')
+            for table in structure.get('tables', [])
+            for measure in table.get('measures', [])
+        ]
+        
+        if not measure_names:
+            st.warning("⚠️ Nenhuma medida encontrada no modelo")
+        else:
+            ranking_iterations = st.slider("Execuções por medida:", 1, 10, 3, key="ranking_iterations")
+            if st.button(f"🏁 Medir {len(measure_names)} medida(s)"):
+                st.session_state.ranking_job = modules['jobs'].submit(
+                    f"Ranking de {len(measure_names)} medida(s)",
+                    lambda job: connector.benchmark_measures(measure_names, ranking_iterations, progress=job.progress),
+                    owner=st.session_state.shared_session.id
+                )
+            
+            ranking_job = finished_job(modules, 'ranking_job')
+            if ranking_job is not None and ranking_job['status'] == 'done':
+                result = modules['jobs'].result(ranking_job['id'])
+                st.success(f"✅ {result['message']}")
+                if result['ranking']:
+                    st.dataframe([
+                        {
+                            'Medida': item['measure'],
+                            'Média (ms)': round(item['avg_time_ms'], 2),
+                            'Mín (ms)': round(item['min_time_ms'], 2),
+                            'Máx (ms)': round(item['max_time_ms'], 2),
+                            'Rating': item['performance_rating']
+                        }
+                        for item in result['ranking']
+                    ], use_container_width=True)
+                for item in result['failed']:
+                    st.caption(f"❌ {item['measure']}: {item['message']}")
+            elif ranking_job is not None:
+                render_job_failure(ranking_job, 'ranking_job', "🔁 Medir novamente")
 
 
 if __name__ == "__main__":
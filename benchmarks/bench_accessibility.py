@@ -0,0 +1,21 @@
+"""
+Benchmarks da auditoria e busca de paletas acessíveis
+"""
+import pytest
+
+from modules.accessibility import AccessibilityChecker
+from modules.color_generator import ColorGenerator
+
+
+def test_audit_palette(perf):
+    preset = ColorGenerator.PRESET_PALETTES['sunset_warm']
+    report = perf(AccessibilityChecker().audit, preset['colors'], preset['background'], preset['foreground'])
+    assert not report['passes']
+
+
+@pytest.mark.parametrize('preset', ['sunset_warm', 'vibrant_gradient'])
+def test_find_accessible_palette(perf, preset):
+    palette = ColorGenerator.PRESET_PALETTES[preset]
+    result = perf(AccessibilityChecker().find_accessible_palette, palette['colors'], palette['background'],
+                  palette['foreground'], timeout_ms=10_000, rounds=5)
+    assert result['success']
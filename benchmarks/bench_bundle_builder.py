@@ -0,0 +1,54 @@
+"""
+Benchmarks do BundleBuilder
+"""
+import os
+import stat
+
+from modules.bundle_builder import BundleBuilder, atomic_write, default_mode, deterministic_zip
+from modules.color_generator import ColorGenerator
+from modules.layout_engine import LayoutEngine
+
+
+def _jobs(root, count=20):
+    generator = ColorGenerator()
+    layout = LayoutEngine().generate_layout('executive_summary')
+    return [
+        {
+            'palette': generator.generate_from_base_color('#%06X' % (index * 99991 % 0xFFFFFF), 'triadic', 6),
+            'layout': layout,
+            'output_dir': str(root / f'cliente_{index}'),
+            'zip_path': str(root / f'cliente_{index}.zip')
+        }
+        for index in range(count)
+    ]
+
+
+def test_build_many_forced(perf, tmp_path):
+    builder = BundleBuilder()
+    jobs = _jobs(tmp_path)
+    results = perf(builder.build_many, jobs, True, rounds=5)
+    assert all(result['success'] for result in results)
+
+
+def test_build_many_unchanged(perf, tmp_path):
+    builder = BundleBuilder()
+    jobs = _jobs(tmp_path)
+    builder.build_many(jobs)
+
+    results = perf(builder.build_many, jobs, rounds=10)
+    assert all(not result['written'] for result in results)
+
+
+def test_deterministic_zip(perf):
+    builder = BundleBuilder()
+    artifacts = builder.render(ColorGenerator().get_preset_palette('corporate_blue'),
+                               LayoutEngine().generate_layout('executive_summary'))
+    data = perf(deterministic_zip, artifacts)
+    assert data == deterministic_zip(artifacts)
+
+
+def test_atomic_write_uses_umask_mode(tmp_path):
+    path = tmp_path / 'theme.json'
+    atomic_write(str(path), b'{}')
+    # mkstemp cria 0600; o arquivo final tem o modo de um open() comum
+    assert stat.S_IMODE(os.stat(path).st_mode) == default_mode()
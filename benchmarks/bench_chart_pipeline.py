@@ -0,0 +1,67 @@
+"""
+Benchmarks do ChartPipeline (pré-agregação com payload limitado)
+"""
+import numpy as np
+import pytest
+
+from modules.chart_pipeline import ChartPipeline, downsample_indices, hexbin, minmax_indices, payload_points
+
+SUGGESTIONS = {
+    'line_chart': {'x': 'OrderDate', 'y': ['Amount', 'Quantity', 'Cost']},
+    'bar_chart': {'category': 'Channel', 'value': 'Amount'},
+    'donut_chart': {'category': 'Status', 'value': 'Amount'},
+    'histogram': {'value': 'Amount'},
+    'scatter_plot': {'x': 'Amount', 'y': 'Cost'},
+    'heatmap': {'metrics': ['Amount', 'Quantity', 'Cost']},
+}
+
+
+@pytest.mark.parametrize('kind', list(SUGGESTIONS))
+def test_figure_1m_rows(perf, synthetic_frame, kind):
+    frame = synthetic_frame(1_000_000)
+    pipeline = ChartPipeline()
+    suggestion = {'type': kind, 'columns': SUGGESTIONS[kind], 'title': kind}
+
+    figure = perf(pipeline.figure, frame, suggestion, rounds=3)
+    # x e y de até max_points pontos (+ texto do hexbin)
+    assert figure is not None and payload_points(figure) <= 2 * pipeline.max_points
+
+
+def test_downsample_10m_points(perf):
+    x = np.arange(10_000_000, dtype=np.float64)
+    y = np.sin(x / 50_000) + np.random.default_rng(7).normal(0, 0.1, x.size)
+
+    indices = perf(downsample_indices, x, y, 2_000, rounds=3)
+    assert len(indices) == 2_000 and indices[0] == 0 and indices[-1] == x.size - 1
+
+
+def test_hexbin_1m_points(perf):
+    rng = np.random.default_rng(7)
+    x, y = rng.normal(size=1_000_000), rng.normal(size=1_000_000)
+
+    centers_x, _, counts = perf(hexbin, x, y, 60, rounds=5)
+    assert counts.sum() == 1_000_000 and len(centers_x) <= 61 * 35 + 60 * 34
+
+
+@pytest.mark.parametrize('n_out', [1, 2, 3, 4, 5, 100, 101])
+def test_minmax_indices_within_n_out(n_out):
+    y = np.random.default_rng(2).normal(size=1_000)
+    indices = minmax_indices(y, n_out)
+    assert len(indices) <= n_out and np.all(np.diff(indices) > 0)
+    if n_out >= 2:
+        assert indices[0] == 0 and indices[-1] == len(y) - 1
+
+
+def test_line_with_text_x():
+    import pandas as pd
+
+    dates = pd.date_range('2020-01-01', periods=8_000, freq='h')
+    frame = pd.DataFrame({'Data': dates.strftime('%Y-%m-%d %H:%M'), 'Rótulo': [f'p{i}' for i in range(8_000)],
+                          'Vendas': np.random.default_rng(3).normal(size=8_000)})
+    pipeline = ChartPipeline()
+
+    # Texto de datas vira datetime (ordem cronológica); texto qualquer é reduzido pelas posições
+    figure = pipeline.line(frame, 'Data', ['Vendas'])
+    assert np.issubdtype(np.asarray(figure.data[0].x).dtype, np.datetime64)
+    figure = pipeline.line(frame, 'Rótulo', ['Vendas'])
+    assert len(figure.data[0].x) <= pipeline.max_points
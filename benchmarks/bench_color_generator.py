@@ -0,0 +1,58 @@
+"""
+Benchmarks do ColorGenerator
+"""
+import numpy as np
+import pytest
+
+from modules import color_engine
+from modules.color_generator import ColorGenerator
+
+SCHEMES = ['analogous', 'complementary', 'triadic', 'tetradic', 'monochromatic', 'split_complementary']
+
+
+@pytest.mark.parametrize('count', [5, 12])
+@pytest.mark.parametrize('scheme', SCHEMES)
+def test_generate_from_base_color(perf, scheme, count):
+    generator = ColorGenerator()
+    palette = perf(generator.generate_from_base_color, '#2E86AB', scheme, count)
+    assert palette['colors']
+
+
+def test_generate_gradient(perf):
+    gradient = perf(ColorGenerator().generate_gradient, '#2E86AB', '#F18F01', 50)
+    assert len(gradient) == 50
+
+
+def test_validate_accessibility(perf):
+    result = perf(ColorGenerator().validate_accessibility, '#2E86AB', '#FFFFFF')
+    assert 'contrast_ratio' in result
+
+
+def test_generate_batch(perf):
+    bases = color_engine.rgb_to_hex(np.random.default_rng(5).integers(0, 256, (2000, 3)))
+    palettes = perf(ColorGenerator().generate_batch, bases, 'triadic', 6)
+    assert len(palettes) == 2000 and len(palettes[0]) == 6
+
+
+@pytest.mark.parametrize('space', ['lab', 'oklch'])
+def test_convert_roundtrip(perf, space):
+    srgb = np.random.default_rng(5).random((10_000, 3))
+
+    def roundtrip():
+        return color_engine.convert(color_engine.convert(srgb, 'srgb', space), space, 'srgb')
+
+    assert np.allclose(perf(roundtrip), srgb)
+
+
+def test_generate_gradient_oklch(perf):
+    gradient = perf(ColorGenerator().generate_gradient, '#2E86AB', '#F18F01', 50, 'oklch')
+    assert len(gradient) == 50
+
+
+@pytest.mark.parametrize('start, end', [('#FFFFFF', '#00FF00'), ('#000000', '#00FF00'), ('#00FF00', '#808080')])
+def test_oklch_gradient_keeps_hue_of_chromatic_end(start, end):
+    gradient = ColorGenerator().generate_gradient(start, end, 9, 'oklch')
+    oklch = color_engine.convert(color_engine.hex_to_rgb(gradient[1:-1]) / 255, 'srgb', 'oklch')
+    green = color_engine.convert(np.array([0.0, 1.0, 0.0]), 'srgb', 'oklch')[2]
+    # Branco/preto/cinza não têm matiz: o caminho não passa por amarelo ou marrom
+    assert np.allclose(oklch[:, 2], green, atol=2)
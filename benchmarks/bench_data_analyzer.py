@@ -0,0 +1,32 @@
+"""
+Benchmarks do DataAnalyzer
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.data_analyzer import DataAnalyzer
+
+
+@pytest.mark.parametrize('rows', [1_000, 10_000, 50_000])
+def test_analyze_dataframe(perf, synthetic_frame, rows):
+    df = synthetic_frame(rows)
+    analysis = perf(DataAnalyzer().analyze_dataframe, df, rounds=5)
+    assert analysis['rows'] == rows
+
+
+def _wide_frame(width: int, rows: int = 5_000) -> pd.DataFrame:
+    """Metade das colunas com nomes de chave (id/key/code), que disparam a comparação de valores"""
+    rng = np.random.default_rng(width)
+    columns = {}
+    for i in range(width):
+        name = f'entity_{i}_id' if i % 2 == 0 else f'value_{i}'
+        columns[name] = rng.integers(0, 1_000, rows)
+    return pd.DataFrame(columns)
+
+
+@pytest.mark.parametrize('width', [8, 24, 48])
+def test_detect_relationships(perf, width):
+    df = _wide_frame(width)
+    relationships = perf(DataAnalyzer()._detect_relationships, df, rounds=5)
+    assert relationships
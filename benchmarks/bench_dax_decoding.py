@@ -0,0 +1,68 @@
+"""
+Benchmarks da decodificação de resultados DAX (reader fake, sem servidor)
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from modules import tracing
+from modules.as_backend import AnalysisServicesBackend
+from modules.fake_as_backend import FakeConnection, FakeDataReader
+from modules.mcp_powerbi_client import MCPPowerBIClient
+
+
+class StaticReaderBackend(AnalysisServicesBackend):
+    """Backend que devolve sempre o mesmo resultado materializado"""
+
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self.rows = rows
+
+    def load(self) -> bool:
+        return True
+
+    def execute_reader(self, connection, query: str):
+        return FakeDataReader(self.columns, self.rows)
+
+
+def _result(rows: int):
+    start = datetime(2024, 1, 1)
+    columns = ['Product[Category]', 'Date[Date]', '[Total Sales]', '[Orders]', '[Is Active]']
+    data = [
+        (f'Categoria {i % 25}', start + timedelta(days=i % 365), i * 1.5, i, i % 2 == 0)
+        for i in range(rows)
+    ]
+    return columns, data
+
+
+@pytest.mark.parametrize('rows', [1_000, 10_000, 100_000])
+def test_execute_dax_query_decoding(perf, rows):
+    client = MCPPowerBIClient(backend=StaticReaderBackend(*_result(rows)))
+    client.connection = FakeConnection('Bench')
+
+    result = perf(client.execute_dax_query, 'EVALUATE Bench', max_rows=rows)
+    assert result['success'] and result['row_count'] == rows
+
+
+def test_traced_query_counts_decoded_bytes(caplog):
+    columns, data = _result(2)
+    client = MCPPowerBIClient(backend=StaticReaderBackend(columns, data))
+    client.connection = FakeConnection('Bench')
+    tracing.reset()
+    tracing.enable()
+    try:
+        result = client.execute_dax_query('EVALUATE Bench')
+    finally:
+        tracing.disable()
+    # Textos em UTF-8 ('Categoria 0', data ISO) e 8 bytes por número/booleano
+    expected = sum(len(str(value).encode('utf-8')) if isinstance(value, (str, datetime)) else 8
+                   for row in data for value in row)
+    span = tracing.tracer.spans()[-1]
+    assert span.name == 'dax.query' and span.counters == {'rows': 2, 'bytes': expected}
+    assert tracing.tracer.counters == {'rows': 2, 'bytes': expected} and result['row_count'] == 2
+    tracing.reset()
+
+    client.backend.execute_reader = lambda connection, query: 1 / 0
+    with caplog.at_level('ERROR', logger='modules.mcp_powerbi_client'):
+        assert not client.execute_dax_query('EVALUATE Bench')['success']
+    assert 'Erro ao executar DAX' in caplog.text
@@ -0,0 +1,48 @@
+"""
+Benchmarks do PowerBIExporter
+"""
+from modules.color_generator import ColorGenerator
+from modules.content_cache import ContentCache
+from modules.layout_engine import LayoutEngine
+from modules.powerbi_exporter import PowerBIExporter
+
+
+def test_create_theme_bundle(perf, tmp_path):
+    palette = ColorGenerator().get_preset_palette('corporate_blue')
+    layout = LayoutEngine().generate_layout('executive_summary')
+
+    files = perf(PowerBIExporter().create_theme_bundle, palette, layout, str(tmp_path / 'bundle'))
+    assert set(files) >= {'theme', 'layout', 'readme'}
+
+
+def _large_palette():
+    palette = ColorGenerator().get_preset_palette('corporate_blue')
+    return dict(palette, colors=ColorGenerator().generate_categorical(100)['colors'])
+
+
+def test_export_theme_cold(perf):
+    # max_entries=0: toda chamada monta e serializa o tema (custo sem cache)
+    exporter = PowerBIExporter(cache=ContentCache(max_entries=0))
+    theme = perf(exporter.export_theme_bytes, _large_palette(), 'Tema')
+    assert theme.startswith(b'{')
+
+
+def test_export_theme_cached(perf):
+    exporter = PowerBIExporter(cache=ContentCache())
+    palette = _large_palette()
+    first = exporter.export_theme_bytes(palette, 'Tema')
+
+    theme = perf(exporter.export_theme_bytes, dict(palette), 'Tema')
+    assert theme is first
+
+
+def test_compiled_theme_edits_do_not_reach_the_cache():
+    exporter = PowerBIExporter(cache=ContentCache())
+    palette = ColorGenerator().get_preset_palette('corporate_blue')
+    compiled = exporter.compile_theme(palette)
+    compiled['theme']['visualStyles']['card']['*']['labels'][0]['fontSize'] = 99
+    compiled['errors'].append('alterado')
+
+    again = exporter.compile_theme(palette)
+    assert again['theme']['visualStyles']['card']['*']['labels'][0]['fontSize'] != 99 and again['errors'] == []
+    assert again['pretty'] is compiled['pretty']  # bytes compartilhados, sem cópia
@@ -0,0 +1,82 @@
+"""
+Benchmarks da JobQueue (operações longas do app em segundo plano)
+"""
+import json
+import os
+import stat
+import subprocess
+import sys
+
+from modules.job_queue import JobQueue
+
+
+def _steps(count, job=None):
+    for step in range(count):
+        job.progress(step / count)
+    return count
+
+
+def test_submit_and_wait_200_jobs(perf, tmp_path):
+    def run_batch():
+        queue = JobQueue(max_workers=4, storage_dir=str(tmp_path / 'jobs'))
+        ids = [queue.submit(f'job {i}', _steps, 100, owner='sessão') for i in range(200)]
+        records = [queue.wait(job_id) for job_id in ids]
+        queue.shutdown(wait=True)
+        return records
+
+    records = perf(run_batch, rounds=3)
+    assert all(record['status'] == 'done' and record['progress'] == 1.0 for record in records)
+    # Resultados persistidos: uma nova fila (processo reiniciado) ainda os encontra
+    restored = JobQueue(storage_dir=str(tmp_path / 'jobs'))
+    assert restored.result(records[0]['id']) == 100
+    restored.shutdown()
+
+
+def test_status_polling(perf):
+    queue = JobQueue(max_workers=2, storage_dir=None, max_jobs=1_000)
+    ids = [queue.submit(f'job {i}', _steps, 10, owner=f'sessão {i % 50}') for i in range(500)]
+    queue.wait(ids[-1])
+
+    def poll():
+        # O que cada rerun faz: status do próprio job + lista da sessão
+        return [queue.status(job_id) for job_id in ids[:50]], queue.jobs(owner='sessão 7')
+
+    statuses, own = perf(poll)
+    assert len(own) == 10 and all(status is not None for status in statuses)
+    queue.shutdown()
+
+
+def _record(job_id, pid, status):
+    return {'id': job_id, 'name': job_id, 'owner': None, 'pid': pid, 'instance': 'outra', 'key': None,
+            'executor': 'thread', 'status': status, 'progress': 0.0, 'message': 'Executando', 'error': None,
+            'cancel_requested': False, 'created_at': 0.0, 'started_at': 0.0, 'finished_at': None,
+            'elapsed_ms': None}
+
+
+def test_restore_only_touches_jobs_of_dead_processes(tmp_path):
+    storage = tmp_path / 'jobs'
+    storage.mkdir(mode=0o777)
+    storage.chmod(0o777)
+    finished = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'],
+                              capture_output=True, text=True, check=True)
+    for record in (_record('vivo', os.getppid(), 'running'), _record('morto', int(finished.stdout), 'running')):
+        (storage / f"{record['id']}.json").write_text(json.dumps(record))
+
+    queue = JobQueue(storage_dir=str(storage))
+    # Diretório privado; o job de outro processo ainda vivo não é marcado nem carregado
+    assert stat.S_IMODE(os.stat(storage).st_mode) == 0o700
+    assert queue.status('vivo') is None
+    assert json.loads((storage / 'vivo.json').read_text())['status'] == 'running'
+    assert queue.status('morto')['message'] == 'Interrompido'
+    queue.shutdown()
+
+
+def test_unpicklable_result_is_logged_not_printed(tmp_path, caplog, capsys):
+    storage = tmp_path / 'jobs'
+    queue = JobQueue(storage_dir=str(storage))
+    job_id = queue.submit('lambda', lambda: (lambda: None))
+    with caplog.at_level('WARNING', logger='modules.job_queue'):
+        assert queue.wait(job_id, timeout=5)['status'] == 'done'
+        queue.shutdown(wait=True)  # a gravação do resultado acontece depois do status
+    assert any(f'Resultado do job {job_id} não persistido' in record.getMessage() for record in caplog.records)
+    assert capsys.readouterr().out == ''
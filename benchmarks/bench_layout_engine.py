@@ -0,0 +1,206 @@
+"""
+Benchmarks do LayoutEngine
+"""
+import numpy as np
+import pytest
+
+from modules.layout_engine import LayoutEngine
+from modules.layout_solver import LayoutSolver, VisualSpec
+from modules.layout_validator import LayoutValidator, UniformGridIndex
+
+
+@pytest.mark.parametrize('template', sorted(LayoutEngine.TEMPLATES))
+def test_generate_layout(perf, template):
+    layout = perf(LayoutEngine().generate_layout, template)
+    assert 'visuals' in layout
+
+
+@pytest.mark.parametrize('visual_count', [12, 50, 100])
+def test_solve_layout(perf, visual_count):
+    types = ['card', 'chart', 'table', 'slicer']
+    priorities = ['high', 'medium', 'low']
+    specs = [
+        VisualSpec.from_type(f'v{i}', types[i % len(types)], priorities[i % len(priorities)])
+        for i in range(visual_count)
+    ]
+    result = perf(LayoutSolver().solve, specs)
+    assert not result.unplaced and result.score > 0
+
+
+def test_solver_reports_visuals_below_minimum():
+    types = ['card', 'chart', 'table', 'slicer', 'map', 'text']
+    specs = [VisualSpec.from_type(f'v{i}', types[i % len(types)]) for i in range(50)]
+    shrunk = LayoutSolver().solve(specs)
+    layout = shrunk.to_layout()
+    # Reduzidos abaixo do mínimo para caber: listados e penalizados no score
+    assert shrunk.below_min and layout['quality']['below_min'] == shrunk.below_min
+    assert shrunk.components['min_size_fit'] < 1 and 'tamanho mínimo' in LayoutEngine().quality_summary(layout['quality'])
+    roomy = LayoutSolver().solve(specs[:6])
+    assert not roomy.below_min and roomy.components['min_size_fit'] == 1
+    strict = LayoutSolver(strict_min=True).solve(specs)
+    assert not strict.below_min and strict.unplaced
+
+
+def test_generate_batch(perf):
+    templates = sorted(LayoutEngine.TEMPLATES)
+    pages = [
+        {'name': f'page_{i}', 'template': templates[i % len(templates)], 'visual_count': [None, 8, 12][i % 3]}
+        for i in range(300)
+    ]
+    batch = perf(LayoutEngine().generate_batch, pages, ['hd', 'full_hd', '4_3', 'mobile'])
+    assert len(batch) == 300
+
+
+def test_responsive_layout_keeps_visual_keys():
+    engine = LayoutEngine()
+    layout = engine.generate_layout('executive_summary')
+    layout['visuals'][0].update(title='Receita', fields=['Vendas'])
+    mobile = engine.get_responsive_layout(layout, 320, 568)
+    assert mobile['visuals'][0]['title'] == 'Receita' and mobile['visuals'][0]['fields'] == ['Vendas']
+    assert mobile['canvas'] == {'width': 320, 'height': 568}
+
+
+def test_batch_pages_do_not_share_extras():
+    batch = LayoutEngine().generate_batch([{'name': 'A', 'template': 'executive_summary'},
+                                           {'name': 'B', 'template': 'executive_summary'}], ['hd'])
+    page = batch.page('A', 'hd')
+    page.extra['theme'] = 'escuro'
+    page.visual_extra[0]['title'] = 'Só na A'
+    other = batch.page('B', 'hd').to_layout()
+    assert 'theme' not in other and 'title' not in other['visuals'][0]
+
+
+def _messy_layout(visual_count: int):
+    rng = np.random.default_rng(3)
+    columns = 20
+    visuals = []
+    for i in range(visual_count):
+        row, col = divmod(i, columns)
+        visuals.append({
+            'id': f'v{i}',
+            'type': 'chart',
+            'position': {
+                'x': int(20 + col * 62 + rng.integers(-3, 4)),
+                'y': int(20 + row * 36 + rng.integers(-3, 4)),
+                'width': int(58 + rng.integers(-2, 8)),
+                'height': int(30 + rng.integers(-2, 6)),
+                'z_index': 0
+            }
+        })
+    return {'template': 'messy', 'canvas': {'width': 1280, 'height': 720}, 'visuals': visuals}
+
+
+def test_quality_summary_for_solver_and_optimizer():
+    engine = LayoutEngine()
+    specs = [VisualSpec.from_type(f'v{i}', 'chart') for i in range(4)]
+    solved = engine.solve_layout(specs)
+    optimized = engine.optimize_for_suggestions(
+        [{'type': 'bar_chart', 'priority': 'high', 'title': 'Vendas', 'columns': {'metrics': ['a']}}],
+        time_budget_ms=50)
+    # O otimizador não mede cobertura: o resumo usa só os componentes presentes
+    assert 'cobertura' in engine.quality_summary(solved['quality'])
+    assert 'área ponderada' in engine.quality_summary(optimized['quality'])
+    for layout in (solved, optimized):
+        assert 'ordem de leitura' in engine.quality_summary(layout['quality'])
+
+
+def _jittered_grid(rows: int, columns: int):
+    """Grade que cabe no canvas, com visuais deslocados e maiores que a célula (sobreposições)"""
+    rng = np.random.default_rng(3)
+    step_x, step_y = 1260 // columns, 700 // rows
+    visuals = [{
+        'id': f'v{row}_{col}',
+        'type': 'chart',
+        'position': {
+            'x': int(20 + col * step_x + rng.integers(-3, 4)),
+            'y': int(20 + row * step_y + rng.integers(-3, 4)),
+            'width': int(step_x - 4 + rng.integers(-2, 8)),
+            'height': int(step_y - 6 + rng.integers(-2, 6)),
+            'z_index': 0
+        }
+    } for row in range(rows) for col in range(columns)]
+    return {'template': 'grid', 'canvas': {'width': 1280, 'height': 720}, 'visuals': visuals}
+
+
+@pytest.mark.parametrize('rows, columns', [(5, 4), (10, 8), (15, 20)])
+def test_auto_snap_clears_feasible_grid(rows, columns):
+    validator = LayoutValidator()
+    layout = _jittered_grid(rows, columns)
+    assert validator.validate(layout).counts().get('overlap', 0) > 0
+    fixed, report = validator.auto_snap(layout)
+    assert report.counts().get('overlap', 0) == 0
+    # Ninguém encolhe abaixo de min_size (nem do próprio tamanho, se já era menor)
+    for before, after in zip(layout['visuals'], fixed['visuals']):
+        for key in ('width', 'height'):
+            assert after['position'][key] >= min(before['position'][key], validator.min_size)
+
+
+def _random_layout(visual_count: int, width: int, height: int, seed: int):
+    """Visuais de tamanho e posição aleatórios (muitas sobreposições, sem grade por trás)"""
+    rng = np.random.default_rng(seed)
+    visuals = []
+    for i in range(visual_count):
+        w, h = int(rng.integers(40, 250)), int(rng.integers(40, 250))
+        visuals.append({
+            'id': f'v{i}',
+            'type': 'chart',
+            'position': {'x': int(rng.integers(0, width - w)), 'y': int(rng.integers(0, height - h)),
+                         'width': w, 'height': h, 'z_index': 0}
+        })
+    return {'template': 'random', 'canvas': {'width': width, 'height': height}, 'visuals': visuals}
+
+
+@pytest.mark.parametrize('visual_count, width, height', [(20, 1280, 720), (500, 4000, 4000)])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_auto_snap_clears_random_layout(visual_count, width, height, seed):
+    validator = LayoutValidator()
+    layout = _random_layout(visual_count, width, height, seed)
+    assert validator.validate(layout).counts().get('overlap', 0) > 0
+    fixed, report = validator.auto_snap(layout)
+    counts = report.counts()
+    assert counts.get('overlap', 0) == 0 and counts.get('out_of_bounds', 0) == 0
+    for before, after in zip(layout['visuals'], fixed['visuals']):
+        for key in ('width', 'height'):
+            assert after['position'][key] >= min(before['position'][key], validator.min_size)
+
+
+def test_auto_snap_reports_overlaps_that_do_not_fit():
+    # Quatro visuais do tamanho do canvas sem poder encolher abaixo de 300px: não há onde realocar
+    layout = _random_layout(4, 600, 400, 0)
+    for visual in layout['visuals']:
+        visual['position'].update({'x': 0, 'y': 0, 'width': 600, 'height': 400})
+    validator = LayoutValidator(min_size=300)
+    fixed, report = validator.auto_snap(layout)
+    assert not report.is_valid
+    assert 0 < report.counts()['overlap'] <= validator.validate(layout).counts()['overlap']
+
+
+def test_candidate_pairs_in_dense_cell():
+    # 200 visuais empilhados na mesma célula, lado a lado em x: nenhum par se cruza
+    boxes = np.array([(i * 10, 0, i * 10 + 10, 10) for i in range(200)], dtype=np.float64)
+    assert UniformGridIndex(boxes, cell_size=4000).candidate_pairs() == set()
+    stacked = np.array([(0, i, 10, i + 1) for i in range(200)], dtype=np.float64)
+    assert len(UniformGridIndex(stacked, cell_size=4000).candidate_pairs()) == 200 * 199 // 2
+
+
+@pytest.mark.parametrize('visual_count', [50, 380])
+def test_validate_layout(perf, visual_count):
+    layout = _messy_layout(visual_count)
+    report = perf(LayoutValidator().validate, layout)
+    assert report.visual_count == visual_count
+
+
+def test_auto_snap(perf):
+    layout = _messy_layout(380)
+    fixed, report = perf(LayoutValidator().auto_snap, layout, rounds=5)
+    assert report.counts().get('overlap', 0) < LayoutValidator().validate(layout).counts().get('overlap', 0)
+
+
+def test_optimize_for_suggestions(perf):
+    suggestions = [
+        {'type': kind, 'priority': priority, 'title': kind, 'columns': {'metrics': ['a', 'b', 'c', 'd']}}
+        for kind, priority in [('line_chart', 'high'), ('bar_chart', 'high'), ('kpi_card', 'high'),
+                               ('histogram', 'medium'), ('scatter_plot', 'medium'), ('heatmap', 'low')]
+    ]
+    layout = perf(LayoutEngine().optimize_for_suggestions, suggestions, time_budget_ms=10_000, rounds=3)
+    assert len(layout['visuals']) == 9 and layout['quality']['iterations'] == 2000
@@ -0,0 +1,44 @@
+"""
+Benchmarks do preview de layout (renderização em lote e cache)
+"""
+import copy
+
+import pytest
+
+from modules.layout_engine import LayoutEngine
+from modules.layout_preview import LayoutPreview, layout_hash
+
+
+@pytest.fixture(scope='module')
+def layout_100():
+    return LayoutEngine().generate_layout('executive_summary', 100)
+
+
+def test_figure_cold(perf, layout_100):
+    def render():
+        return LayoutPreview().figure(layout_100)
+    figure = perf(render)
+    assert len(figure['data']) <= 5
+
+
+def test_figure_cached(perf, layout_100):
+    preview = LayoutPreview()
+    preview.figure(layout_100)
+    perf(preview.figure, layout_100)
+    assert preview.misses == 1
+
+
+def test_svg_cold(perf, layout_100):
+    def render():
+        return LayoutPreview().svg(layout_100)
+    assert perf(render).startswith('<svg')
+
+
+def test_hover_change_misses_cache(layout_100):
+    preview = LayoutPreview()
+    preview.figure(layout_100)
+    renamed = copy.deepcopy(layout_100)
+    renamed['visuals'][0]['suggested_visual'] = 'Gráfico de Pizza'
+    assert layout_hash(renamed) != layout_hash(layout_100)
+    assert 'Gráfico de Pizza' in preview.figure(renamed)['data'][-1]['hovertext'][0]
+    assert preview.misses == 2
@@ -0,0 +1,40 @@
+"""
+Benchmarks da criação de medidas em lote (backend fake em memória)
+"""
+from modules.fake_as_backend import FakeAnalysisServicesBackend
+from modules.powerbi_connector import PowerBIConnector
+
+
+def _measures(count=20):
+    measures = [{'name': 'Base', 'table': 'Sales', 'expression': "SUM('Sales'[Amount])"}]
+    measures += [{'name': f'Derivada {i}', 'table': 'Sales', 'expression': f'[Base] * {i + 1}'}
+                 for i in range(count)]
+    measures.append({'name': 'Inválida', 'table': 'Sales', 'expression': "SUM('Sales'[Inexistente])"})
+    return measures
+
+
+def test_partial_batch_keeps_sibling_references(perf):
+    backend = FakeAnalysisServicesBackend(table_rows={'Sales': 200})
+    connector = PowerBIConnector(backend=backend)
+    connector.connect_to_desktop(port=backend.port)
+
+    result = perf(connector.create_measures_batch, _measures(), atomic=False, refresh=False, rounds=5)
+    failed = [item['name'] for item in result['results'] if not item['success']]
+    # Só a medida inválida cai; as que referenciam 'Base' continuam válidas
+    assert failed == ['Inválida']
+    assert result['message'].startswith('21 medida(s) criada(s)')
+
+
+def test_validation_bisects_failing_batch():
+    backend = FakeAnalysisServicesBackend(table_rows={'Sales': 200})
+    connector = PowerBIConnector(backend=backend)
+    connector.connect_to_desktop(port=backend.port)
+
+    measures = _measures(200)
+    # Referência a uma medida declarada depois, na outra metade do lote
+    measures.insert(1, {'name': 'Antecipada', 'table': 'Sales', 'expression': '[Derivada 199] + 1'})
+    backend.reset_stats()
+    result = connector.create_measures_batch(measures, atomic=False, refresh=False)
+    assert [item['name'] for item in result['results'] if not item['success']] == ['Inválida']
+    # Uma medida inválida em 203: divisão ao meio, não uma query por medida
+    assert backend.stats['query'] <= 40
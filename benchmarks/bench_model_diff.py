@@ -0,0 +1,95 @@
+"""
+Benchmarks do deploy incremental (diff de modelo + tema) contra o backend fake
+"""
+from modules.fake_as_backend import FakeAnalysisServicesBackend
+from modules.model_diff import ModelDiffEngine
+from modules.powerbi_connector import PowerBIConnector
+from modules.theme_applier import ThemeApplier
+
+
+THEME = {
+    'name': 'Corporativo',
+    'colors': {'primary': ['#1E88E5', '#43A047'], 'background': '#FFFFFF'},
+    'measure_formats': {'Total Sales': 'R$ #,##0.00', 'Orders': '#,##0'}
+}
+
+
+class DaxOnlyBackend(FakeAnalysisServicesBackend):
+    """Backend sem TOM: a estrutura vem das queries DAX, sem anotações"""
+
+    def open_server(self, connection_string: str):
+        raise RuntimeError('TOM indisponível')
+
+
+def _connector(backend_class=FakeAnalysisServicesBackend):
+    backend = backend_class(table_rows={'Sales': 200})
+    connector = PowerBIConnector(backend=backend)
+    connector.connect_to_desktop(port=backend.port)
+    return backend, connector
+
+
+def test_reapply_same_theme_has_no_writes(perf):
+    backend, connector = _connector()
+    applier = ThemeApplier(connector)
+    first = applier.apply_theme(THEME)
+    assert first['writes'] == 1 and all(item['status'] == 'applied' for item in first['applied'])
+
+    backend.reset_stats()
+    again = perf(applier.apply_theme, THEME, rounds=20)
+    assert again['writes'] == 0 and all(item['status'] == 'unchanged' for item in again['applied'])
+    assert backend.stats['command'] == 0
+
+
+def test_annotation_diff_keeps_existing_annotations():
+    engine = ModelDiffEngine({'measures': [], 'relationships': [],
+                              'annotations': {'Origem': 'manual', 'Versao': '1'}})
+    changes = engine.diff({'annotations': {'Versao': '2', 'Tema': {'cor': '#FFFFFF'}, 'Origem': 'manual'}})
+    assert sorted((change.key, change.action) for change in changes) == [('Tema', 'create'), ('Versao', 'update')]
+
+    tmsl = engine.to_tmsl(changes, 'Modelo')
+    alter = tmsl['sequence']['operations'][-1]['alter']['model']
+    # O alter substitui a coleção inteira: a anotação não alterada precisa estar nele
+    assert {item['name']: item['value'] for item in alter['annotations']} == {
+        'Origem': 'manual', 'Versao': '2', 'Tema': '{"cor": "#FFFFFF"}'}
+    engine.apply(changes)
+    assert engine.diff({'annotations': {'Versao': '2'}}) == []
+
+
+def test_unknown_annotations_are_not_overwritten():
+    # Sem TOM as anotações atuais não são lidas; nenhum alter do modelo é enviado
+    engine = ModelDiffEngine({'measures': [], 'relationships': []})
+    assert engine.diff({'annotations': {'Tema': 'novo'}}) == []
+    assert engine.skipped_annotations == ['Tema']
+
+    backend, connector = _connector(DaxOnlyBackend)
+    result = ThemeApplier(connector).apply_theme(THEME)
+    assert result['success'] and result['writes'] == 0
+    statuses = {item['type']: item['status'] for item in result['applied']}
+    assert statuses['theme_annotations'] == 'skipped' and statuses['measure_formats'] == 'skipped'
+    assert backend.stats['command'] == 0
+
+
+def test_measure_update_alters_only_changed_properties():
+    backend, connector = _connector()
+    measure = backend.model.Tables['Sales'].Measures['Orders']
+    measure.Description, measure.DisplayFolder = 'Pedidos distintos', 'Vendas'
+    # Propriedade que o diff não lê (ex.: isHidden) não pode ser descartada
+    measure.IsHidden = True
+
+    preview = connector.deploy_model_spec({'measures': [{'name': 'Orders', 'format': '0'}]}, dry_run=True)
+    operation = preview['tmsl']['sequence']['operations'][0]
+    assert operation == {'alter': {'object': {'database': backend.database, 'table': 'Sales', 'measure': 'Orders'},
+                                   'measure': {'name': 'Orders', 'formatString': '0'}}}
+
+    assert connector.deploy_model_spec({'measures': [{'name': 'Orders', 'format': '0'}]})['writes'] == 1
+    measure = backend.model.Tables['Sales'].Measures['Orders']
+    assert (measure.FormatString, measure.Description, measure.DisplayFolder) == ('0', 'Pedidos distintos', 'Vendas')
+    assert measure.IsHidden is True and measure.Expression == "COUNTROWS('Sales')"
+
+
+def test_unresolved_measure_formats_are_reported():
+    _, connector = _connector()
+    result = ThemeApplier(connector).apply_theme({'measure_formats': {'Orders': '0', 'Inexistente': '0.0%'}})
+    section = {item['type']: item for item in result['applied']}['measure_formats']
+    assert section['status'] == 'applied' and section['unresolved'] == ['Inexistente']
+    assert any('Inexistente' in warning for warning in result['warnings'])
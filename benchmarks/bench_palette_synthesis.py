@@ -0,0 +1,41 @@
+"""
+Benchmarks da síntese de paletas categóricas
+"""
+import pytest
+
+from modules import palette_synthesis
+
+
+@pytest.mark.parametrize('count', [10, 100])
+def test_synthesize_palette_cold(perf, count):
+    def synthesize():
+        palette_synthesis.clear_cache()
+        return palette_synthesis.synthesize_palette(count)
+
+    colors = perf(synthesize)
+    assert len(set(colors)) == count
+
+
+def test_synthesize_palette_cached(perf):
+    palette_synthesis.synthesize_palette(100)
+    assert len(perf(palette_synthesis.synthesize_palette, 100)) == 100
+
+
+def test_fixed_colors_are_normalized():
+    palette = palette_synthesis.synthesize_palette(5, fixed=['1e88e5', '#43a047'])
+    assert palette[:2] == ['#1E88E5', '#43A047']
+    assert palette_synthesis.synthesize_palette(5, fixed=['#1E88E5', '43A047']) == palette
+
+
+def test_short_hex_fixed_colors():
+    palette = palette_synthesis.synthesize_palette(5, fixed=['#fff', '0a0'])
+    assert palette[:2] == ['#FFFFFF', '#00AA00']
+    with pytest.raises(ValueError, match="'#12345'"):
+        palette_synthesis.synthesize_palette(5, fixed=['#12345'])
+    with pytest.raises(ValueError, match="'#GGHHII'"):
+        palette_synthesis.synthesize_palette(5, fixed=['#1E88E5', '#GGHHII'])
+
+
+def test_count_above_pool_raises():
+    with pytest.raises(ValueError):
+        palette_synthesis.synthesize_palette(palette_synthesis.POOL_SIZE + 1)
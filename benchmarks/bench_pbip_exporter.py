@@ -0,0 +1,119 @@
+"""
+Benchmarks do PBIPExporter
+"""
+import json
+import os
+import stat
+
+import pandas as pd
+
+from modules.bundle_builder import default_mode
+from modules.color_generator import ColorGenerator
+from modules.data_analyzer import DataAnalyzer
+from modules.layout_engine import LayoutEngine
+from modules.pbip_exporter import PBIPExporter, bind_visuals, suggestion_roles
+
+SUGGESTIONS = [
+    {'type': 'line_chart', 'priority': 'high', 'columns': {'x': 'Data', 'y': ['Vendas', 'Lucro']},
+     'title': 'Evolução de Vendas'},
+    {'type': 'bar_chart', 'priority': 'high', 'columns': {'category': 'Categoria', 'value': 'Vendas'},
+     'title': 'Vendas por Categoria'},
+    {'type': 'kpi_card', 'priority': 'high', 'columns': {'metrics': ['Vendas', 'Lucro', 'Custo']},
+     'title': 'KPIs Principais'},
+    {'type': 'scatter_plot', 'priority': 'medium', 'columns': {'x': 'Vendas', 'y': 'Lucro'},
+     'title': 'Vendas x Lucro'},
+    {'type': 'heatmap', 'priority': 'low', 'columns': {'metrics': ['Vendas', 'Lucro', 'Custo']},
+     'title': 'Mapa de Calor'},
+]
+
+
+def _pages(count):
+    engine = LayoutEngine()
+    templates = list(engine.TEMPLATES)
+    return [{'name': f'Página {index + 1}', 'layout': engine.generate_layout(templates[index % len(templates)])}
+            for index in range(count)]
+
+
+def test_export_50_pages(perf, tmp_path):
+    exporter = PBIPExporter()
+    pages = _pages(50)
+    palette = ColorGenerator().get_preset_palette('corporate_blue')
+
+    result = perf(exporter.export, 'Relatorio', pages, str(tmp_path / 'projeto'),
+                  suggestions=SUGGESTIONS, palette=palette, rounds=5)
+    assert result['success'] and result['pages'] == 50
+
+
+def test_validate_50_pages(perf, tmp_path):
+    exporter = PBIPExporter()
+    exporter.export('Relatorio', _pages(50), str(tmp_path / 'projeto'), suggestions=SUGGESTIONS)
+
+    validation = perf(exporter.validate, str(tmp_path / 'projeto'), rounds=10)
+    assert validation['success'] and validation['pages'] == 50
+
+
+def test_export_permissions_and_foreign_target(tmp_path):
+    exporter = PBIPExporter()
+    result = exporter.export('Relatorio', _pages(1), str(tmp_path / 'projeto'))
+    # mkdtemp cria 0700; o projeto promovido tem o modo de um mkdir comum
+    assert stat.S_IMODE(os.stat(result['project_dir']).st_mode) == default_mode(directory=True)
+    assert exporter.export('Relatorio', _pages(1), str(tmp_path / 'projeto'))['success']
+
+    # Pasta alheia (sem .pbip) não é apagada
+    foreign = tmp_path / 'documentos'
+    foreign.mkdir()
+    (foreign / 'notas.txt').write_text('não apagar')
+    refused = exporter.export('Relatorio', _pages(1), str(foreign))
+    assert not refused['success'] and (foreign / 'notas.txt').read_text() == 'não apagar'
+
+    # Pasta com .pbip mas com outras entradas (ex.: repositório) também é recusada
+    (foreign / 'notas.txt').unlink()
+    (foreign / '.git').mkdir()
+    (foreign / 'Vendas.pbip').write_text('{}')
+    assert not exporter.export('Outro', _pages(1), str(foreign))['success']
+    assert sorted(os.listdir(foreign)) == ['.git', 'Vendas.pbip']
+
+    # Projeto gerado com uma entrada a mais deixa de ser substituível
+    (tmp_path / 'projeto' / 'leia-me.md').write_text('anotações')
+    assert not exporter.export('Outro', _pages(1), str(tmp_path / 'projeto'))['success']
+    assert (tmp_path / 'projeto' / 'leia-me.md').exists()
+
+
+def test_scatter_plots_one_point_per_detail(tmp_path):
+    # Com identificador: Details (role Category) ligado a ele; sem: X/Y sem agregação
+    with_details = suggestion_roles({'type': 'scatter_plot', 'columns': {'x': 'Vendas', 'y': 'Lucro', 'details': 'Pedido'}})
+    assert with_details['Category'] == [('Pedido', None)]
+    assert suggestion_roles(SUGGESTIONS[3]) == {'X': [('Vendas', None)], 'Y': [('Lucro', None)]}
+
+    layout = {'canvas': {'width': 1280, 'height': 720},
+              'visuals': [{'id': 'scatter_plot_1', 'type': 'chart',
+                           'position': {'x': 0, 'y': 0, 'width': 600, 'height': 400}}]}
+    exporter = PBIPExporter()
+    result = exporter.export('Relatorio', [{'name': 'Dispersão', 'layout': layout}], str(tmp_path / 'projeto'),
+                             suggestions=[SUGGESTIONS[3]])
+    assert result['success'] and result['validation']['success']
+    model = json.loads(next((tmp_path / 'projeto').glob('*.SemanticModel')).joinpath('model.bim').read_text())
+    types = {column['name']: column['dataType'] for column in model['model']['tables'][0]['columns']}
+    assert types == {'Lucro': 'double', 'Vendas': 'double'}
+
+
+def test_analyzer_scatter_suggestion_has_details():
+    df = pd.DataFrame({'Pedido': range(1, 201), 'Vendas': [float(i % 37) * 10.5 for i in range(200)],
+                       'Lucro': [float(i % 23) * 3.25 for i in range(200)]})
+    scatter = next(s for s in DataAnalyzer().analyze_dataframe(df)['suggested_visuals'] if s['type'] == 'scatter_plot')
+    assert scatter['columns']['details'] == 'Pedido'
+
+
+def test_cards_of_every_kpi_suggestion_are_bound():
+    suggestions = [
+        {'type': 'kpi_card', 'priority': 'high', 'columns': {'metrics': ['Vendas', 'Lucro']}, 'title': 'KPIs'},
+        SUGGESTIONS[0],
+        {'type': 'kpi_card', 'priority': 'high', 'columns': {'metrics': ['Custo', 'Margem']}, 'title': 'Custos'},
+    ]
+    layout = LayoutEngine().optimize_for_suggestions(suggestions, time_budget_ms=10_000)
+    ids = [visual['id'] for visual in layout['visuals']]
+    assert sorted(ids) == ['kpi_1_1', 'kpi_1_2', 'kpi_3_1', 'kpi_3_2', 'line_chart_2']
+
+    titles = {binding['visual']['id']: binding['title'] for binding in bind_visuals(layout, suggestions)}
+    assert titles == {'kpi_1_1': 'Vendas', 'kpi_1_2': 'Lucro', 'kpi_3_1': 'Custo', 'kpi_3_2': 'Margem',
+                      'line_chart_2': 'Evolução de Vendas'}
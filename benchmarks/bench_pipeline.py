@@ -0,0 +1,38 @@
+"""
+Benchmarks do pipeline em lote (CLI avi-bi export)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.pipeline import DashboardPipeline, PipelineConfig, run_batch
+
+CONFIG = PipelineConfig(outputs=('bundle', 'analysis'), time_budget_ms=50)
+
+
+@pytest.fixture(scope='module')
+def extracts(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('extratos')
+    rng = np.random.default_rng(3)
+    for i in range(4):
+        n = 5_000
+        pd.DataFrame({
+            'Data': pd.date_range('2024-01-01', periods=n, freq='h'),
+            'Categoria': rng.choice(list('ABCDEFGH'), n),
+            'Vendas': rng.gamma(2.0, 500.0, n).round(2),
+            'Quantidade': rng.integers(1, 50, n),
+        }).to_csv(directory / f'extrato_{i}.csv', index=False)
+    return directory
+
+
+def test_pipeline_single_dataset(perf, extracts, tmp_path):
+    pipeline = DashboardPipeline(CONFIG)
+
+    result = perf(pipeline.run, str(extracts / 'extrato_0.csv'), str(tmp_path / 'extrato_0'), rounds=3)
+    assert result['success'], result.get('error')
+    assert set(result['files']) == {'bundle', 'analysis'} and result['visuals'] > 0
+
+
+def test_run_batch_serial(perf, extracts, tmp_path):
+    summary = perf(run_batch, [str(extracts)], str(tmp_path / 'saida'), CONFIG, workers=1, rounds=3)
+    assert summary['succeeded'] == 4 and (tmp_path / 'saida' / 'summary.json').exists()
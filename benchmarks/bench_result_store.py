@@ -0,0 +1,63 @@
+"""
+Benchmarks do ResultStore (grade paginada do console DAX)
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.result_store import ResultStore
+
+
+def _rows(count):
+    return [{'Product[Category]': f'Categoria {i % 25}', '[Total Sales]': i * 1.5, '[Orders]': i % 997}
+            for i in range(count)]
+
+
+def _frame(count):
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({
+        'Product[Category]': pd.Categorical([f'Categoria {i}' for i in rng.integers(0, 25, count)]),
+        '[Total Sales]': rng.gamma(2.0, 100.0, count),
+        '[Orders]': rng.integers(0, 1_000, count),
+    })
+
+
+def test_from_result_100k(perf):
+    result = {'rows': _rows(100_000), 'columns': ['Product[Category]', '[Total Sales]', '[Orders]']}
+
+    store = perf(ResultStore.from_result, result, rounds=5)
+    assert len(store) == 100_000 and str(store.frame['Product[Category]'].dtype) == 'category'
+
+
+def test_sorted_filtered_page_cold_1m(perf):
+    frame = _frame(1_000_000)
+    filters = [{'column': 'Product[Category]', 'op': 'contains', 'value': 'ria 1'}]
+
+    def cold_page():
+        return ResultStore(frame).page(10, 100, sort_by='[Total Sales]', ascending=False, filters=filters)
+
+    page = perf(cold_page, rounds=3)
+    assert len(page['rows']) == 100 and page['total_rows'] < 1_000_000
+
+
+@pytest.mark.parametrize('page_number', [0, 5_000])
+def test_page_warm_1m(perf, page_number):
+    store = ResultStore(_frame(1_000_000))
+    view = {'sort_by': '[Orders]', 'filters': [{'column': '[Total Sales]', 'op': '>', 'value': '100'}]}
+    store.page(0, 100, **view)
+
+    page = perf(store.page, page_number, 100, **view)
+    assert page['page'] == min(page_number, page['page_count'] - 1)
+
+
+def test_exports_removed_with_store(tmp_path):
+    import gc
+
+    store = ResultStore(pd.DataFrame({'Valor': range(1_000)}))
+    path = store.export('csv', directory=str(tmp_path))['path']
+    assert os.path.exists(path)
+    del store
+    gc.collect()
+    assert not os.path.exists(path)
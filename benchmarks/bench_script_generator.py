@@ -0,0 +1,49 @@
+"""
+Benchmarks do ScriptGenerator (execução do script gerado sobre dados sintéticos)
+"""
+import numpy as np
+
+from modules.data_analyzer import DataAnalyzer
+from modules.script_generator import ScriptGenerator
+
+PALETTE = {'colors': ['#1E88E5', '#FFA726', '#26C6DA', '#66BB6A', '#AB47BC']}
+
+
+def _namespace(frame):
+    analysis = DataAnalyzer().analyze_dataframe(frame.sample(5_000, random_state=1))
+    namespace = {'__name__': 'analise_exploratoria'}
+    exec(compile(ScriptGenerator().generate(analysis, PALETTE), 'analise_exploratoria.py', 'exec'), namespace)
+    return namespace
+
+
+def test_generated_figures_200k(perf, synthetic_frame):
+    frame = synthetic_frame(200_000)
+    namespace = _namespace(frame)
+    df = namespace['otimizar_tipos'](frame[namespace['COLUMNS']].copy())
+
+    figures = perf(namespace['figuras'], df, rounds=3)
+    points = [len(trace.x) for figure in figures for trace in figure.data if getattr(trace, 'x', None) is not None]
+    assert figures and max(points) <= namespace['MAX_POINTS']
+
+
+def test_lttb_1m_points(perf, synthetic_frame):
+    namespace = _namespace(synthetic_frame(10_000))
+    x = np.arange(1_000_000, dtype=np.float64)
+    y = np.sin(x / 5_000) + np.random.default_rng(7).normal(0, 0.1, x.size)
+
+    indices = perf(namespace['lttb_indices'], x, y, 5_000, rounds=5)
+    assert len(indices) == 5_000 and indices[0] == 0 and indices[-1] == x.size - 1
+
+
+def test_script_imports_only_what_it_uses():
+    # Sem visuais (só identificadores): nem numpy nem plotly
+    empty = ScriptGenerator().generate({'column_analysis': {}, 'suggested_visuals': []}, PALETTE)
+    assert 'import numpy' not in empty and 'import plotly' not in empty and 'FIGURAS = []' in empty
+
+    line = {'type': 'line_chart', 'columns': {'x': 'Data', 'y': ['Vendas']}, 'title': 'Vendas'}
+    script = ScriptGenerator().generate({'column_analysis': {}, 'suggested_visuals': [line]}, PALETTE)
+    assert 'import numpy as np' in script and 'import plotly.graph_objects as go' in script
+    assert 'import warnings' in script
+    # Details do scatter é só do relatório PBIP: o script não carrega a coluna
+    scatter = {'type': 'scatter_plot', 'columns': {'x': 'Vendas', 'y': 'Lucro', 'details': 'Pedido'}}
+    assert ScriptGenerator().used_columns([scatter], {}) == ['Lucro', 'Vendas']
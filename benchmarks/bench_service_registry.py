@@ -0,0 +1,44 @@
+"""
+Benchmarks do ServiceRegistry (registro preguiçoso dos serviços do app)
+"""
+import sys
+
+from modules.service_registry import ServiceRegistry
+
+SERVICES = {
+    'analyzer': 'modules.data_analyzer:DataAnalyzer',
+    'color_gen': 'modules.color_generator:ColorGenerator',
+    'accessibility': 'modules.accessibility:AccessibilityChecker',
+    'layout': 'modules.layout_engine:LayoutEngine',
+    'preview': 'modules.layout_preview:LayoutPreview',
+    'exporter': 'modules.powerbi_exporter:PowerBIExporter',
+    'cache': 'modules.content_cache:default_cache',
+    'missing': 'modules.modulo_inexistente:Classe',
+}
+
+
+def _registry():
+    registry = ServiceRegistry()
+    for name, target in SERVICES.items():
+        registry.register(name, target)
+    return registry
+
+
+def test_register_all_services(perf):
+    registry = perf(_registry)
+    # Registrar não importa nada: o módulo inexistente só falharia no primeiro acesso
+    assert registry.names() == sorted(SERVICES) and not registry.report()['loaded']
+    assert 'modules.modulo_inexistente' not in sys.modules
+
+
+def test_get_loaded_service(perf):
+    registry = _registry()
+    registry['layout']
+
+    def lookups():
+        for _ in range(1_000):
+            registry['layout']
+            registry.get('cache')
+        return registry['layout']
+
+    assert perf(lookups) is registry['layout']
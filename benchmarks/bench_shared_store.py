@@ -0,0 +1,92 @@
+"""
+Benchmarks do SharedStore (datasets compartilhados entre sessões do app)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.shared_store import SharedStore, session_memory
+from modules.result_store import ResultStore
+
+
+def _dataset(count=500_000):
+    rng = np.random.default_rng(11)
+    return pd.DataFrame({
+        'Categoria': pd.Categorical([f'Categoria {i}' for i in rng.integers(0, 30, count)]),
+        'Valor': rng.gamma(2.0, 100.0, count),
+        'Quantidade': rng.integers(0, 500, count),
+    })
+
+
+@pytest.fixture
+def copy_on_write():
+    """Restaura o copy-on-write (opção global do pandas) que o SharedStore liga na primeira visão"""
+    if int(pd.__version__.split('.')[0]) >= 3:  # sempre ligado, sem opção
+        yield
+        return
+    with pd.option_context('mode.copy_on_write', False):
+        yield
+
+
+def test_fifty_sessions_share_one_dataset(perf, copy_on_write):
+    frame = _dataset()
+
+    def fifty_sessions():
+        store = SharedStore()
+        sessions = [store.open_session() for _ in range(50)]
+        views = [store.acquire(('dataset', 'vendas'), lambda: frame, session)
+                 for session in sessions]
+        return store, sessions, views
+
+    store, sessions, views = perf(fifty_sessions, rounds=5)
+    stats = store.stats()
+    # Um DataFrame no processo, não 50: as visões são cópias rasas
+    assert stats['entries'] == 1 and stats['sessions'] == 50 and stats['misses'] == 1
+    assert stats['pinned_bytes'] == store.session_usage(sessions[0])['shared_bytes']
+    views[0]['Extra'] = 1
+    views[0].loc[0, 'Valor'] = -1.0
+    # Copy-on-write: a alteração de uma sessão não chega às outras nem ao original
+    assert 'Extra' not in views[1].columns and views[1].loc[0, 'Valor'] == frame.loc[0, 'Valor'] != -1.0
+    for session in sessions:
+        session.close()
+    assert store.stats()['pinned_entries'] == 0
+
+
+def test_session_memory_report(perf, copy_on_write):
+    store = SharedStore()
+    session = store.open_session()
+    store.acquire(('dataset', 'vendas'), _dataset, session)
+    state = {
+        'dax_result_store': ResultStore(_dataset(200_000)),
+        'current_layout': {'visuals': [{'id': i, 'position': {'x': i, 'y': 0, 'width': 10, 'height': 10}}
+                                       for i in range(500)]},
+        'dax_history': [{'query': 'EVALUATE Vendas' * 20, 'rows': 1_000}] * 10,
+        'shared_session': session,
+    }
+
+    usage = perf(session_memory, state.items(), store, session, rounds=20)
+    assert usage['largest'][0][0] == 'dax_result_store'
+    assert usage['shared_bytes'] > 0 and usage['total_bytes'] == usage['private_bytes'] + usage['attributed_bytes']
+
+
+def test_failed_load_does_not_stay_loading():
+    store = SharedStore()
+
+    def broken():
+        raise OSError('arquivo indisponível')
+
+    with pytest.raises(OSError):
+        store.acquire(('dataset', 'vendas'), broken)
+    assert not store._loading
+    assert store.acquire(('dataset', 'vendas'), lambda: 42, view=False) == 42
+
+
+def test_first_dataframe_view_enables_copy_on_write(copy_on_write):
+    if int(pd.__version__.split('.')[0]) >= 3:
+        pytest.skip('copy-on-write é o único modo no pandas 3')
+    store = SharedStore()
+    session = store.open_session()
+    assert store.acquire('config', lambda: {'tema': 'escuro'}, session) == {'tema': 'escuro'}
+    assert not pd.get_option('mode.copy_on_write')
+    store.acquire(('dataset', 'vendas'), lambda: _dataset(100), session)
+    assert pd.get_option('mode.copy_on_write')
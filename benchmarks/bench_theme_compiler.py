@@ -0,0 +1,87 @@
+"""
+Benchmarks do ThemeCompiler
+"""
+import copy
+import json
+
+import jsonschema
+import pytest
+
+from modules.color_generator import ColorGenerator
+from modules import theme_compiler
+from modules.theme_compiler import ThemeCompiler
+
+
+def _brand_palettes(count):
+    generator = ColorGenerator()
+    return [
+        generator.generate_from_base_color('#%06X' % (index * 99991 % 0xFFFFFF), 'triadic', 6)
+        for index in range(count)
+    ]
+
+
+def test_compile_theme(perf):
+    compiler = ThemeCompiler()
+    palette = ColorGenerator().get_preset_palette('corporate_blue')
+    theme = perf(compiler.compile, palette)
+    assert {'tableEx', 'pivotTable', 'slicer', 'card'} <= set(theme['visualStyles'])
+
+
+def test_validate_theme(perf):
+    compiler = ThemeCompiler()
+    theme = compiler.compile(ColorGenerator().get_preset_palette('corporate_blue'))
+    assert perf(compiler.validate, theme) == []
+
+
+def test_build_batch_100(perf):
+    compiler = ThemeCompiler()
+    results = perf(compiler.build_batch, _brand_palettes(100), rounds=5)
+    assert len(results) == 100 and all(result['success'] for result in results)
+
+
+def test_short_hex_and_bad_status_colors():
+    compiler = ThemeCompiler()
+    palette = {'name': 'Curto', 'colors': ['#123', 'abc'], 'primary': '#123', 'background': '#fff',
+               'good': ['#00FF00'], 'neutral': None, 'bad': '#f00'}
+    result = compiler.build(palette)
+    theme = result['theme']
+    assert result['success'] and theme['dataColors'] == ['#112233', '#AABBCC'] and theme['background'] == '#FFFFFF'
+    # Status que não é texto volta ao padrão
+    assert (theme['good'], theme['neutral'], theme['bad']) == ('#4CAF50', '#FFC107', '#FF0000')
+
+    # HEX inválido vira erro de schema, sem exceção
+    broken = compiler.build({'name': 'Inválido', 'colors': ['#12345'], 'foreground': 'preto'})
+    assert not broken['success'] and broken['errors']
+
+
+def test_unknown_visual_card_and_property_rejected():
+    compiler = ThemeCompiler()
+    theme = copy.deepcopy(compiler.build(_brand_palettes(1)[0])['theme'])
+    styles = theme['visualStyles']
+    styles['lineChrt'] = styles.pop('lineChart')
+    styles['tableEx']['*']['legnd'] = [{'show': True}]
+    styles['card']['*']['labels'][0]['fontSze'] = 10
+
+    errors = compiler.validate(theme)
+    assert len(errors) == 3
+    assert [error.split(':')[0] for error in errors] == ['$.visualStyles', '$.visualStyles.card.*.labels[0]',
+                                                         '$.visualStyles.tableEx.*']
+    assert all(name in ' '.join(errors) for name in ('lineChrt', 'legnd', 'fontSze'))
+
+
+
+def test_fetch_official_schema_replaces_bundled_schema(tmp_path, monkeypatch):
+    source = tmp_path / 'reportThemeSchema-9.999.json'
+    source.write_text(json.dumps({'type': 'object', 'required': ['visualStyles']}))
+    monkeypatch.setattr(theme_compiler, 'OFFICIAL_SCHEMA_URL', f'file://{tmp_path}/reportThemeSchema-{{version}}.json')
+    path = theme_compiler.fetch_official_schema('9.999', path=str(tmp_path / 'schema.json'))
+
+    compiler = ThemeCompiler(path)
+    assert compiler.validate({'visualStyles': {}}) == []
+    assert compiler.validate({}) == ["$: 'visualStyles' is a required property"]
+
+    # Schema inválido não é gravado
+    source.write_text(json.dumps({'type': 'objeto'}))
+    with pytest.raises(jsonschema.SchemaError):
+        theme_compiler.fetch_official_schema('9.999', path=str(tmp_path / 'outro.json'))
+    assert not (tmp_path / 'outro.json').exists()
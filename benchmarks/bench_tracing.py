@@ -0,0 +1,60 @@
+"""
+Benchmarks do tracing (custo desligado nos caminhos quentes e árvore de spans ligada)
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from modules import tracing
+from modules.data_analyzer import DataAnalyzer
+from modules.tracing import Tracer, NULL_SPAN
+
+
+def test_disabled_tracing_overhead(perf):
+    tracer = Tracer(enabled=False)
+
+    @tracer.traced('bench.soma')
+    def soma(a, b):
+        return a + b
+
+    def calls(count=200_000):
+        total = 0
+        for value in range(count):
+            with tracer.span('bench.loop', value=value):
+                total = soma(total, value)
+            tracer.count('rows')
+        return total
+
+    assert perf(calls, rounds=5) == sum(range(200_000))
+    # Desligado nada é alocado nem coletado
+    assert tracer.span('bench.loop') is NULL_SPAN and not tracer.spans() and not tracer.counters
+
+
+def test_enabled_analysis_span_tree(perf, tmp_path):
+    rng = np.random.default_rng(5)
+    frame = pd.DataFrame({
+        'Regiao': rng.choice(['Norte', 'Sul', 'Leste', 'Oeste'], 50_000),
+        'Vendas': rng.gamma(2.0, 100.0, 50_000),
+        'Data': pd.date_range('2024-01-01', periods=50_000, freq='min'),
+    })
+    analyzer = DataAnalyzer()
+
+    def traced_analysis():
+        tracing.reset()
+        tracing.enable()
+        try:
+            return analyzer.analyze_dataframe(frame)
+        finally:
+            tracing.disable()
+
+    perf(traced_analysis, rounds=5)
+    root = tracing.tracer.spans()[-1]
+    assert root.name == 'analyzer.analyze_dataframe' and root.counters['rows'] == 50_000
+    assert [child.name for child in root.children] == [
+        'analyzer.columns', 'analyzer.relationships', 'analyzer.suggestions', 'analyzer.quality']
+
+    trace = json.load(open(tracing.export_chrome_trace(str(tmp_path / 'trace.json'))))
+    names = {event['name'] for event in trace['traceEvents'] if event['ph'] == 'X'}
+    assert 'analyzer.columns' in names and trace['traceEvents'][-1]['ph'] == 'C'
+    tracing.reset()
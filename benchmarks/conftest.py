@@ -0,0 +1,215 @@
+"""
+Infraestrutura dos benchmarks - baseline versionado e comparação por limite
+
+Uso:
+    pytest                              # mede, sem comparar com o baseline
+    pytest --perf-compare               # compara com benchmarks/baseline.json
+    pytest --perf-compare --perf-threshold 0.2   # falha se piorar mais de 20%
+    pytest --perf-update-baseline       # regrava o baseline com os tempos atuais
+    pytest --benchmark-disable          # só executa (sem medir nem comparar)
+
+A comparação é opcional (--perf-compare ou AVI_BI_PERF_COMPARE=1): tempos
+medidos em outra máquina não servem de limite. O baseline guarda a impressão
+digital do ambiente (Python, NumPy, pandas, CPU) em que foi gravado e, se ela
+não bater com a atual, a comparação é pulada com um aviso.
+
+Compara o menor tempo de cada benchmark (mais estável que média/mediana),
+normalizado por uma carga de calibração medida no início da sessão, para que o
+baseline versionado valha em máquinas diferentes. Diferenças abaixo de
+--perf-min-delta (ruído em funções de microssegundos) são ignoradas, e um
+resultado acima do limite só falha se continuar acima com uma nova calibração
+medida logo após o benchmark (a velocidade da máquina varia ao longo da sessão).
+
+Cada medição começa com gc.collect() e gc.freeze(): os objetos deixados pelos
+benchmarks anteriores (ex.: DataFrames sintéticos em cache) saem das coleções
+do GC, que senão dobravam o tempo de funções pequenas no fim da sessão.
+"""
+import gc
+import json
+import os
+import platform
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modules.synthetic_data import SyntheticDataGenerator, DatasetSpec  # noqa: E402
+
+BASELINE_FILE = Path(__file__).with_name('baseline.json')
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_MIN_DELTA = 50e-6
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('perf-baseline', 'Baseline de performance')
+    group.addoption('--perf-baseline', default=str(BASELINE_FILE),
+                    help='Arquivo de baseline (padrão: benchmarks/baseline.json)')
+    group.addoption('--perf-threshold', type=float, default=None,
+                    help='Piora máxima tolerada, em fração (padrão: do baseline ou 0.5)')
+    group.addoption('--perf-min-delta', type=float, default=DEFAULT_MIN_DELTA,
+                    help='Diferença absoluta mínima (s) para considerar regressão')
+    group.addoption('--perf-update-baseline', action='store_true',
+                    help='Regrava o baseline com os resultados desta execução')
+    group.addoption('--perf-compare', action='store_true',
+                    default=os.environ.get('AVI_BI_PERF_COMPARE', '') not in ('', '0'),
+                    help='Falha nas regressões em relação ao baseline '
+                         '(padrão: desligado; ou AVI_BI_PERF_COMPARE=1)')
+
+
+def environment_fingerprint() -> dict:
+    """Ambiente em que os tempos foram medidos (baselines só valem no mesmo)"""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count()
+    }
+
+
+def _calibration_workload():
+    total = 0
+    for i in range(200_000):
+        total += i * i % 7
+    values = np.arange(200_000, dtype=np.float64)
+    return total + float(np.sort(values[::-1]).sum())
+
+
+def measure_calibration(runs: int = 5) -> float:
+    """Menor tempo (s) da carga de calibração"""
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        _calibration_workload()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class PerfBaseline:
+    """Compara os tempos dos benchmarks com o baseline versionado"""
+
+    def __init__(self, path: Path, threshold, update: bool, min_delta: float = DEFAULT_MIN_DELTA,
+                 compare: bool = False):
+        self.path = Path(path)
+        self.update = update
+        self.data = json.loads(self.path.read_text(encoding='utf-8')) if self.path.exists() else {}
+        self.threshold = threshold if threshold is not None else self.data.get('threshold', DEFAULT_THRESHOLD)
+        self.min_delta = min_delta
+        self.environment = environment_fingerprint()
+        self.skip_reason = None
+        if not compare:
+            self.skip_reason = 'use --perf-compare para comparar com o baseline'
+        elif self.data.get('environment') != self.environment:
+            self.skip_reason = (
+                f"baseline gravado em outro ambiente ({self.data.get('environment')}; "
+                f"atual {self.environment}); regrave com --perf-update-baseline"
+            )
+        self.compare = self.skip_reason is None
+        self.calibration = measure_calibration()
+        self.results = {}
+
+    def check(self, name: str, benchmark):
+        stats = getattr(benchmark, 'stats', None)
+        if stats is None:  # --benchmark-disable
+            return
+
+        seconds = stats.stats.min
+        normalized = seconds / self.calibration
+        self.results[name] = float(f'{normalized:.4g}')
+
+        expected = self.data.get('benchmarks', {}).get(name)
+        if self.update or not self.compare or expected is None:
+            return
+
+        limit = max(expected * (1 + self.threshold), expected + self.min_delta / self.calibration)
+        if normalized > limit:
+            # A calibração do início da sessão pode ter pego a máquina mais rápida
+            # que agora: antes de falhar, confirma com uma calibração medida ao lado
+            calibration = measure_calibration()
+            normalized = seconds / calibration
+            limit = max(expected * (1 + self.threshold), expected + self.min_delta / calibration)
+        if normalized > limit:
+            pytest.fail(
+                f"Regressão de performance em {name}: {seconds * 1000:.3f} ms "
+                f"({normalized:.4g} unidades) acima do limite {limit:.4g} "
+                f"(baseline {expected:.4g} + {self.threshold:.0%})",
+                pytrace=False
+            )
+
+    def save(self):
+        # Tempos de outro ambiente não se misturam com os desta execução
+        same_environment = self.data.get('environment') == self.environment
+        benchmarks = dict(self.data.get('benchmarks', {})) if same_environment else {}
+        benchmarks.update(self.results)
+        payload = {
+            'unit': 'tempo mínimo / tempo da carga de calibração',
+            'threshold': self.threshold,
+            'calibration_seconds': round(self.calibration, 6),
+            'environment': self.environment,
+            'benchmarks': dict(sorted(benchmarks.items()))
+        }
+        self.path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+
+
+@pytest.fixture(scope='session')
+def perf_baseline(request):
+    config = request.config
+    baseline = PerfBaseline(
+        config.getoption('--perf-baseline'),
+        config.getoption('--perf-threshold'),
+        config.getoption('--perf-update-baseline'),
+        config.getoption('--perf-min-delta'),
+        config.getoption('--perf-compare')
+    )
+    if baseline.skip_reason and config.getoption('--perf-compare'):
+        reporter = config.pluginmanager.get_plugin('terminalreporter')
+        if reporter is not None:
+            reporter.write_line(f'Comparação com o baseline pulada: {baseline.skip_reason}', yellow=True)
+    yield baseline
+    if baseline.update and baseline.results:
+        baseline.save()
+
+
+@pytest.fixture
+def perf(benchmark, perf_baseline, request):
+    """
+    Executa a função sob benchmark e compara com o baseline
+
+    rounds: para cargas pesadas, número fixo de rodadas (benchmark.pedantic)
+    """
+    name = f"{request.node.module.__name__.split('.')[-1]}::{request.node.name}"
+
+    def run(function, *args, rounds: int = None, **kwargs):
+        gc.collect()
+        gc.freeze()
+        try:
+            if rounds:
+                result = benchmark.pedantic(function, args=args, kwargs=kwargs,
+                                            rounds=rounds, iterations=1, warmup_rounds=1)
+            else:
+                result = benchmark(function, *args, **kwargs)
+        finally:
+            gc.unfreeze()
+        perf_baseline.check(name, benchmark)
+        return result
+
+    return run
+
+
+@lru_cache(maxsize=None)
+def _synthetic_frame(rows: int) -> pd.DataFrame:
+    spec = DatasetSpec(rows=rows, null_rate=0.02, duplicate_ratio=0.01, seed=7)
+    return SyntheticDataGenerator(spec).generate_fact()
+
+
+@pytest.fixture
+def synthetic_frame():
+    """Fábrica de DataFrames sintéticos (cacheados por tamanho; não modificar)"""
+    return _synthetic_frame
@@ -23,10 +23,10 @@ def exemplo_completo():
     print("\n1. Criando dados de exemplo...")
     df = pd.DataFrame({
         'Data': pd.date_range('2024-01-01', periods=100, freq='D'),
-        'Vendas': [1000 + i*10 + (i%7)*50 for i in range(100)],
+        'Vendas': [1000 + (i%30)*10 + (i%7)*50 for i in range(100)],
         'Categoria': ['A', 'B', 'C'] * 33 + ['A'],
         'Região': ['Norte', 'Sul', 'Leste', 'Oeste'] * 25,
-        'Lucro': [500 + i*5 + (i%5)*30 for i in range(100)]
+        'Lucro': [500 + (i%20)*5 + (i%5)*30 for i in range(100)]
     })
     print(f"✓ Dataset criado: {len(df)} linhas, {len(df.columns)} colunas")
     
@@ -1,9 +1,16 @@
-
 # Script de Análise Exploratória
 # Gerado automaticamente pelo Power BI Assistant
+#
+# Carrega só as colunas usadas, com tipos enxutos, e pré-agrega cada visual
+# (MinMaxLTTB, faixas, densidade) antes de plotar com traços WebGL.
+#
+# Uso: python analise_exploratoria.py [caminho_dos_dados.parquet|.csv|.xlsx]
+
+import sys
+import warnings
 
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 
 # Configuração de cores
@@ -15,19 +22,255 @@ COLORS = [
     "#AB47BC"
 ]
 
-# Carregue seus dados aqui
-# df = pd.read_csv('seu_arquivo.csv')
-# ou
-# df = pd.read_excel('seu_arquivo.xlsx')
+# Dados: Parquet é o formato mais rápido (colunar, tipos preservados)
+DATA_PATH = 'dados.parquet'
+COLUMNS = ['Data', 'Vendas', 'Categoria', 'Lucro']
+DTYPES = {'Vendas': 'int16', 'Categoria': 'category', 'Lucro': 'int16'}
+DATE_COLUMNS = ['Data']
+
+# Limites de pontos por visual
+MAX_POINTS = 5000
+MAX_SCATTER_POINTS = 20000
+HIST_BINS = 50
+DENSITY_BINS = 200
+TOP_N = 20
+
+
+def carregar_dados(caminho=DATA_PATH):
+    """Lê só COLUMNS, já com DTYPES e DATE_COLUMNS aplicados"""
+    extensao = caminho.rsplit('.', 1)[-1].lower()
+    if extensao in ('parquet', 'pq'):
+        df = pd.read_parquet(caminho, columns=COLUMNS)
+    elif extensao in ('xlsx', 'xls'):
+        df = pd.read_excel(caminho, usecols=COLUMNS)
+    else:
+        dtypes = {coluna: tipo for coluna, tipo in DTYPES.items() if coluna not in DATE_COLUMNS}
+        return pd.read_csv(caminho, usecols=COLUMNS, dtype=dtypes, parse_dates=DATE_COLUMNS)
+    return otimizar_tipos(df)
+
+
+def otimizar_tipos(df):
+    """Converte para DTYPES e DATE_COLUMNS só as colunas que ainda não estão no tipo certo"""
+    for coluna in DATE_COLUMNS:
+        if coluna in df and not pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            df[coluna] = pd.to_datetime(df[coluna], errors='coerce')
+    pendentes = {coluna: tipo for coluna, tipo in DTYPES.items()
+                 if coluna in df and coluna not in DATE_COLUMNS and str(df[coluna].dtype) != tipo}
+    return df.astype(pendentes) if pendentes else df
+
+
+def resumo(df):
+    """Resumo em uma passada (sem percentis, que exigem ordenar cada coluna)"""
+    memoria = df.memory_usage(deep=False).sum() / 1024 ** 2
+    print(f"Resumo dos dados: {len(df):,} linhas, {df.shape[1]} colunas, {memoria:.1f} MB")
+    print(df.dtypes.to_string())
+    numericas = df.select_dtypes('number')
+    if not numericas.empty:
+        print("\nEstatísticas descritivas:")
+        print(numericas.agg(['count', 'mean', 'std', 'min', 'max']).T.to_string())
+
+
+MINMAX_RATIO = 4
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Índices do mínimo e do máximo de cada uma de (n_out - 2) // 2 faixas de tamanho
+    igual, mais o primeiro e o último ponto, em ordem crescente (no máximo n_out)
+    """
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    buckets = (n_out - 2) // 2
+    if buckets < 1:
+        return np.array([0, n - 1], dtype=np.int64)[:max(n_out, 0)]
+    size = -(-n // buckets)
+    # Faixas completas numa visão (sem copiar y); a última, incompleta, à parte
+    full = n // size
+    view = y[:full * size].reshape(full, size)
+    offsets = np.arange(full) * size
+    parts = [[0], offsets + view.argmin(axis=1), offsets + view.argmax(axis=1)]
+    if full * size < n:
+        tail = y[full * size:]
+        parts.append([full * size + tail.argmin(), full * size + tail.argmax()])
+    parts.append([n - 1])
+    return np.unique(np.concatenate(parts))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Índices escolhidos pelo Largest-Triangle-Three-Buckets (x crescente, sem NaN)"""
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    xs = (x.astype('int64') if x.dtype.kind == 'M' else x).astype(np.float64)
+    ys = y.astype(np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Médias da faixa seguinte de todas as faixas de uma vez (somas acumuladas)
+    cum_x = np.concatenate([[0.0], np.cumsum(xs)])
+    cum_y = np.concatenate([[0.0], np.cumsum(ys)])
+    next_start = edges[1:]
+    next_end = np.append(edges[2:], n)
+    counts = next_end - next_start
+    mean_x = (cum_x[next_end] - cum_x[next_start]) / counts
+    mean_y = (cum_y[next_end] - cum_y[next_start]) / counts
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        px, py = xs[previous], ys[previous]
+        area = np.abs((px - mean_x[bucket]) * (ys[start:end] - py) - (px - xs[start:end]) * (mean_y[bucket] - py))
+        previous = start + int(area.argmax())
+        indices[bucket + 1] = previous
+    return indices
+
+
+def downsample_indices(x: np.ndarray, y: np.ndarray, n_out: int, method: str = 'minmaxlttb') -> np.ndarray:
+    """
+    Índices de uma série reduzida a no máximo n_out pontos (x não numérico: pelas posições)
+
+    Args:
+        method: 'minmaxlttb' (padrão: min-max até MINMAX_RATIO x n_out, depois LTTB),
+            'lttb' ou 'minmax'
+    """
+    n = len(x)
+    if n <= n_out:
+        return np.arange(n)
+    if x.dtype.kind not in 'iufM':
+        x = np.arange(n)  # x categórico (texto): a redução usa as posições
+    if method == 'minmax':
+        return minmax_indices(y, n_out)
+    if method == 'lttb':
+        return lttb_indices(x, y, n_out)
+    if method != 'minmaxlttb':
+        raise ValueError(f"Método de redução desconhecido: {method}")
+    if n <= n_out * MINMAX_RATIO:
+        return lttb_indices(x, y, n_out)
+    preselected = minmax_indices(y, n_out * MINMAX_RATIO)
+    return preselected[lttb_indices(x[preselected], y[preselected], n_out)]
+
+
+def axis_keys(series: pd.Series) -> pd.Series:
+    """
+    Eixo x ordenável: números e datas como estão; texto que é todo data vira datetime
+
+    Datas lidas de CSV chegam como texto ("31/01/2024"); convertidas, a série
+    fica em ordem cronológica. Texto que não é data continua texto.
+    """
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        parsed = pd.to_datetime(series, errors='coerce')
+    return parsed if parsed.notna().sum() == series.notna().sum() else series
+
+
+def finite_values(series: pd.Series) -> np.ndarray:
+    """Valores da série como float64, sem nulos nem infinitos"""
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return values[np.isfinite(values)]
+
+
+def ranking(df: pd.DataFrame, category: str, value: str, aggregation: str, top_n: int) -> pd.Series:
+    """Agrega value por category; acima de top_n, soma o restante em "Outros\""""
+    totals = df.groupby(category, observed=True, sort=False)[value].agg(aggregation)
+    totals = totals.sort_values(ascending=False)
+    if len(totals) <= top_n:
+        return totals
+    if aggregation != 'sum':
+        return totals.iloc[:top_n]
+    head = totals.iloc[:top_n - 1]
+    head.index = head.index.astype(str)
+    return pd.concat([head, pd.Series({'Outros': totals.iloc[top_n - 1:].sum()})])
+
+
+def figura_1(df):
+    """Evolução de Vendas, Lucro ao longo do tempo"""
+    # Uma linha por data (agregada) e no máximo MAX_POINTS pontos por série (MinMaxLTTB)
+    serie = df.groupby(axis_keys(df['Data']), observed=True, sort=True).agg({'Vendas': 'sum', 'Lucro': 'sum'})
+    fig = go.Figure()
+    for posicao, coluna in enumerate(['Vendas', 'Lucro']):
+        pontos = serie[coluna].dropna()
+        x, y = pontos.index.to_numpy(), pontos.to_numpy(dtype='float64')
+        indices = downsample_indices(x, y, MAX_POINTS)
+        fig.add_trace(go.Scattergl(x=x[indices], y=y[indices], mode='lines', name=coluna,
+                                   line=dict(color=COLORS[posicao % len(COLORS)])))
+    fig.update_layout(title='Evolução de Vendas, Lucro ao longo do tempo')
+    return fig
+
+
+def figura_2(df):
+    """Vendas por Categoria"""
+    totais = ranking(df, 'Categoria', 'Vendas', 'sum', TOP_N)
+    fig = go.Figure(go.Bar(x=totais.index.astype(str), y=totais.to_numpy(), marker_color=COLORS[0]))
+    fig.update_layout(title='Vendas por Categoria', xaxis_title='Categoria', yaxis_title='Vendas')
+    return fig
+
+
+def figura_3(df):
+    """KPIs Principais"""
+    fig = go.Figure()
+    for posicao, (coluna, agregacao) in enumerate({'Vendas': 'sum', 'Lucro': 'sum'}.items()):
+        fig.add_trace(go.Indicator(mode='number', value=float(df[coluna].agg(agregacao)),
+                                   title=dict(text=coluna), number=dict(font=dict(color=COLORS[posicao % len(COLORS)])),
+                                   domain=dict(row=0, column=posicao)))
+    fig.update_layout(title='KPIs Principais', grid=dict(rows=1, columns=2))
+    return fig
+
+
+def figura_4(df):
+    """Distribuição de Vendas"""
+    # Contagens por faixa calculadas aqui: o Plotly recebe HIST_BINS barras, não as linhas
+    contagens, bordas = np.histogram(finite_values(df['Vendas']), bins=HIST_BINS)
+    fig = go.Figure(go.Bar(x=(bordas[:-1] + bordas[1:]) / 2, y=contagens, width=np.diff(bordas),
+                           marker_color=COLORS[0]))
+    fig.update_layout(title='Distribuição de Vendas', xaxis_title='Vendas', yaxis_title='Frequência', bargap=0)
+    return fig
+
+
+def figura_5(df):
+    """Relação entre Vendas e Lucro"""
+    pares = df[['Vendas', 'Lucro']].dropna()
+    if len(pares) <= MAX_SCATTER_POINTS:
+        fig = go.Figure(go.Scattergl(x=pares['Vendas'].to_numpy(), y=pares['Lucro'].to_numpy(),
+                                     mode='markers', marker=dict(color=COLORS[0], size=5, opacity=0.6)))
+        fig.update_layout(title='Relação entre Vendas e Lucro', xaxis_title='Vendas', yaxis_title='Lucro')
+        return fig
+    # Muitos pontos: densidade em grade DENSITY_BINS x DENSITY_BINS
+    contagens, bordas_x, bordas_y = np.histogram2d(
+        pares['Vendas'].to_numpy(dtype='float64'), pares['Lucro'].to_numpy(dtype='float64'), bins=DENSITY_BINS)
+    fig = go.Figure(go.Heatmap(x=(bordas_x[:-1] + bordas_x[1:]) / 2, y=(bordas_y[:-1] + bordas_y[1:]) / 2,
+                               z=np.where(contagens.T > 0, contagens.T, np.nan),
+                               colorscale=[[0, '#FFFFFF'], [1, COLORS[0]]], colorbar=dict(title='Pontos')))
+    fig.update_layout(title='Relação entre Vendas e Lucro (densidade)', xaxis_title='Vendas', yaxis_title='Lucro')
+    return fig
+
+
+def figura_6(df):
+    """Composição de Vendas por Categoria"""
+    totais = ranking(df, 'Categoria', 'Vendas', 'sum', TOP_N)
+    fig = go.Figure(go.Pie(labels=totais.index.astype(str), values=totais.to_numpy(), hole=0.5,
+                           marker=dict(colors=COLORS)))
+    fig.update_layout(title='Composição de Vendas por Categoria')
+    return fig
+
+
+FIGURAS = [figura_1, figura_2, figura_3, figura_4, figura_5, figura_6]
+
 
-# Análise de dados básica
-print("Resumo dos dados:")
-print(df.info())
-print("\nEstatísticas descritivas:")
-print(df.describe())
+def figuras(df):
+    """Todas as figuras sugeridas, na ordem de prioridade"""
+    return [gerar(df) for gerar in FIGURAS]
 
-# Visualizações sugeridas
 
+if __name__ == '__main__':
+    df = carregar_dados(sys.argv[1] if len(sys.argv) > 1 else DATA_PATH)
+    resumo(df)
+    for fig in figuras(df):
+        fig.show()
 
-# Salvar dashboard
-# fig.write_html('dashboard.html')
+    # Salvar dashboard
+    # with open('dashboard.html', 'w', encoding='utf-8') as arquivo:
+    #     for fig in figuras(df):
+    #         arquivo.write(fig.to_html(full_html=False, include_plotlyjs='cdn'))
@@ -0,0 +1,310 @@
+"""
+Acessibilidade de Paletas - Matriz de contraste WCAG, simulação de daltonismo e busca de paleta acessível
+
+Tudo roda sobre arrays do color_engine:
+    - matriz de contraste de todas as cores (paleta + fundo + texto) em uma passada
+    - simulação de protanopia/deuteranopia/tritanopia no espaço LMS
+      (projeções de Viénot/Brettel) e detecção de pares confundíveis em OKLab
+    - busca limitada por tempo da paleta mais próxima das cores da marca que
+      atende WCAG AA/AAA e separa as cores para os três tipos de daltonismo
+"""
+import time
+from typing import Dict, List, Any, Optional, Sequence
+
+import numpy as np
+
+from . import color_engine
+
+
+# Limites WCAG 2.1 por nível e alvo (texto normal, texto grande, elementos gráficos 1.4.11)
+WCAG_LEVELS = {
+    'AA': {'text': 4.5, 'large_text': 3.0, 'graphics': 3.0},
+    'AAA': {'text': 7.0, 'large_text': 4.5, 'graphics': 3.0},
+}
+
+# RGB linear -> LMS (Viénot, Brettel & Mollon 1999)
+_RGB_TO_LMS = np.array([
+    [17.8824, 43.5161, 4.11935],
+    [3.45565, 27.1554, 3.86714],
+    [0.0299566, 0.184309, 1.46709],
+])
+_LMS_TO_RGB = np.linalg.inv(_RGB_TO_LMS)
+
+# Projeção no plano de confusão de cada deficiência (cone ausente reconstruído pelos outros dois)
+_LMS_PROJECTIONS = {
+    'protan': np.array([[0.0, 2.02344, -2.52581], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]),
+    'deutan': np.array([[1.0, 0.0, 0.0], [0.494207, 0.0, 1.24827], [0.0, 0.0, 1.0]]),
+    'tritan': np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [-0.395913, 0.801109, 0.0]]),
+}
+CVD_TYPES = tuple(_LMS_PROJECTIONS)
+
+# Matriz única em RGB linear por deficiência: LMS^-1 · projeção · LMS
+_CVD_MATRICES = {kind: _LMS_TO_RGB @ projection @ _RGB_TO_LMS for kind, projection in _LMS_PROJECTIONS.items()}
+
+# Distância OKLab abaixo da qual duas cores de série são consideradas confundíveis
+DEFAULT_MIN_DISTANCE = 0.06
+
+
+def simulate_cvd(srgb: np.ndarray, kind: str, severity: float = 1.0) -> np.ndarray:
+    """
+    Simula a percepção de uma deficiência de visão de cores
+
+    Args:
+        srgb: Cores (..., 3) em sRGB 0-1
+        kind: 'protan', 'deutan' ou 'tritan'
+        severity: 0 (visão normal) a 1 (dicromacia completa)
+
+    Returns:
+        Cores simuladas (..., 3) em sRGB 0-1
+    """
+    if kind not in _CVD_MATRICES:
+        raise ValueError(f"Tipo de daltonismo desconhecido: {kind} (use {', '.join(CVD_TYPES)})")
+    linear = color_engine.srgb_to_linear(srgb)
+    simulated = linear @ _CVD_MATRICES[kind].T
+    if severity < 1.0:
+        simulated = linear + (simulated - linear) * severity
+    return color_engine.linear_to_srgb(np.clip(simulated, 0.0, 1.0))
+
+
+def _pairwise_distance(oklab: np.ndarray) -> np.ndarray:
+    """Distâncias OKLab entre todas as cores do último eixo de lote: (..., n, 3) -> (..., n, n)"""
+    return np.linalg.norm(oklab[..., :, None, :] - oklab[..., None, :, :], axis=-1)
+
+
+class AccessibilityChecker:
+    """
+    Auditoria e correção de acessibilidade de paletas
+
+    Exemplo:
+        checker = AccessibilityChecker()
+        report = checker.audit(['#1E88E5', '#FFA726'], background='#FFFFFF', foreground='#1A1A1A')
+        fixed = checker.find_accessible_palette(['#FFD93D', '#6BCF7F'], level='AA')
+    """
+
+    def __init__(self, min_distance: float = DEFAULT_MIN_DISTANCE):
+        """
+        Args:
+            min_distance: Distância OKLab mínima entre cores de série (visão normal e simulada)
+        """
+        self.min_distance = min_distance
+
+    def contrast_matrix(self, colors: Sequence[str]) -> np.ndarray:
+        """Razão de contraste WCAG entre todas as cores (n, n), em uma passada"""
+        srgb = color_engine.to_srgb(list(colors))
+        return color_engine.contrast_ratio(srgb[:, None, :], srgb[None, :, :])
+
+    def confusion_pairs(self, palette: Sequence[str], kinds: Sequence[str] = CVD_TYPES) -> List[Dict[str, Any]]:
+        """
+        Pares de cores confundíveis em visão normal ou sob cada deficiência
+
+        Returns:
+            Lista de {pair, colors, vision, distance, normal_distance}
+        """
+        palette = list(palette)
+        if len(palette) < 2:
+            return []
+        srgb = color_engine.to_srgb(palette)
+        normal = _pairwise_distance(color_engine.srgb_to_oklab(srgb))
+        visions = {'normal': normal}
+        for kind in kinds:
+            visions[kind] = _pairwise_distance(color_engine.srgb_to_oklab(simulate_cvd(srgb, kind)))
+
+        upper = np.triu_indices(len(palette), k=1)
+        pairs = []
+        for vision, distances in visions.items():
+            close = distances[upper] < self.min_distance
+            for i, j, distance in zip(upper[0][close], upper[1][close], distances[upper][close]):
+                pairs.append({
+                    'pair': [int(i), int(j)],
+                    'colors': [palette[i], palette[j]],
+                    'vision': vision,
+                    'distance': round(float(distance), 4),
+                    'normal_distance': round(float(normal[i, j]), 4)
+                })
+        return sorted(pairs, key=lambda pair: pair['distance'])
+
+    def audit(self, palette: Sequence[str], background: str = '#FFFFFF',
+              foreground: Optional[str] = None, level: str = 'AA',
+              target: str = 'graphics') -> Dict[str, Any]:
+        """
+        Auditoria completa: matriz de contraste, limites WCAG e pares confundíveis
+
+        Args:
+            palette: Cores de série/dados
+            background: Cor de fundo do relatório
+            foreground: Cor do texto (verificada contra o fundo com o limite de texto)
+            level: 'AA' ou 'AAA'
+            target: Limite aplicado às cores da paleta ('graphics', 'text' ou 'large_text')
+        """
+        limits = WCAG_LEVELS[level]
+        palette = list(palette)
+        labels = palette + [background] + ([foreground] if foreground else [])
+        matrix = self.contrast_matrix(labels)
+        background_index = len(palette)
+        against_background = matrix[:len(palette), background_index]
+
+        failing = [
+            {'index': i, 'color': color, 'contrast': round(float(ratio), 2), 'required': limits[target]}
+            for i, (color, ratio) in enumerate(zip(palette, against_background.tolist()))
+            if ratio < limits[target]
+        ]
+        foreground_contrast = float(matrix[-1, background_index]) if foreground else None
+        confusions = self.confusion_pairs(palette)
+
+        return {
+            'level': level,
+            'target': target,
+            'labels': labels,
+            'matrix': np.round(matrix, 2).tolist(),
+            'background_contrast': [round(ratio, 2) for ratio in against_background.tolist()],
+            'failing': failing,
+            'foreground_contrast': round(foreground_contrast, 2) if foreground else None,
+            'foreground_passes': foreground_contrast >= limits['text'] if foreground else None,
+            'confusions': confusions,
+            'passes': not failing and not confusions and (not foreground or foreground_contrast >= limits['text'])
+        }
+
+    # ------------------------------------------------------------------ busca
+
+    def _candidates(self, brand_srgb: np.ndarray, lightness_steps: int, chroma_factors, hue_offsets) -> np.ndarray:
+        """Grade OKLCH ao redor de cada cor (n, K, 3) em sRGB quantizado; o índice 0 é a própria cor"""
+        lch = color_engine.srgb_to_oklch(brand_srgb)
+        lightness = np.linspace(0.05, 0.98, lightness_steps)
+        L, C, H = np.meshgrid(lightness, np.asarray(chroma_factors), np.asarray(hue_offsets), indexing='ij')
+        grid = np.stack([
+            np.broadcast_to(L.ravel(), (len(lch), L.size)),
+            lch[:, 1:2] * C.ravel(),
+            (lch[:, 2:3] + H.ravel()) % 360
+        ], axis=-1)
+        srgb = color_engine.gamut_map_oklch(grid.reshape(-1, 3)).reshape(grid.shape)
+        srgb = np.concatenate([brand_srgb[:, None, :], srgb], axis=1)
+        # Quantiza para avaliar exatamente as cores HEX que serão devolvidas
+        return color_engine.quantize(srgb) / 255.0
+
+    def find_accessible_palette(self, palette: Sequence[str], background: str = '#FFFFFF',
+                                foreground: Optional[str] = None, level: str = 'AA',
+                                target: str = 'graphics', check_cvd: bool = True,
+                                timeout_ms: float = 500, max_rounds: int = 100,
+                                lightness_steps: int = 64) -> Dict[str, Any]:
+        """
+        Paleta mais próxima das cores da marca que atende WCAG e separa cores para daltônicos
+
+        Fase 1 (vetorizada): para cada cor, o candidato da grade OKLCH (luminosidade,
+        croma reduzido e pequenos giros de matiz) com menor ΔE OKLab que atinge o
+        contraste exigido contra o fundo. Fase 2 (reparo guloso, limitada por
+        timeout_ms/max_rounds): enquanto houver pares confundíveis, troca a cor de
+        menor prioridade (mais ao fim da paleta) pelo candidato viável que os separa
+        com o menor desvio da marca.
+
+        Returns:
+            Resultado com palette, changes, confusions restantes e estatísticas da busca
+        """
+        start = time.perf_counter()
+        deadline = start + timeout_ms / 1000
+        limits = WCAG_LEVELS.get(level)
+        if limits is None:
+            return {'success': False, 'error': f"Nível WCAG inválido: {level} (use AA ou AAA)"}
+
+        palette = list(palette)
+        colors = palette + ([foreground] if foreground else [])
+        required = np.array([limits[target]] * len(palette) + ([limits['text']] if foreground else []))
+        if not colors:
+            return {'success': True, 'palette': [], 'original': [], 'changes': [], 'confusions': [],
+                    'message': 'Paleta vazia'}
+
+        brand = color_engine.to_srgb(colors)
+        brand_lab = color_engine.srgb_to_oklab(brand)
+        background_srgb = color_engine.to_srgb(background)[0]
+
+        candidates = self._candidates(brand, lightness_steps, (1.0, 0.8, 0.6, 0.4, 0.2), (0, -12, 12, -25, 25, -40, 40))
+        candidate_lab = color_engine.srgb_to_oklab(candidates)
+        contrast = color_engine.contrast_ratio(candidates, background_srgb)
+        feasible = contrast >= required[:, None]
+        cost = np.linalg.norm(candidate_lab - brand_lab[:, None, :], axis=-1)
+
+        # Fase 1: contraste com o fundo
+        choice = np.where(feasible.any(axis=1),
+                          np.argmin(np.where(feasible, cost, np.inf), axis=1),
+                          np.argmax(contrast, axis=1))
+
+        # Fase 2: separação sob visão normal e simulada (apenas cores da paleta)
+        rounds, timed_out, unresolved = 0, False, set()
+        series = len(palette)
+        if check_cvd and series > 1:
+            visions = [candidate_lab[:series]] + [
+                color_engine.srgb_to_oklab(simulate_cvd(candidates[:series], kind)) for kind in CVD_TYPES
+            ]
+            visions = np.stack(visions)                                  # (V, n, K, 3)
+            rows = np.arange(series)
+
+            while rounds < max_rounds:
+                if time.perf_counter() > deadline:
+                    timed_out = True
+                    break
+                selected = visions[:, rows, choice[:series]]             # (V, n, 3)
+                distances = _pairwise_distance(selected).min(axis=0)     # pior visão por par
+                distances[np.tril_indices(series)] = np.inf
+                for pair in unresolved:
+                    distances[pair] = np.inf
+                i, j = np.unravel_index(np.argmin(distances), distances.shape)
+                if distances[i, j] >= self.min_distance:
+                    break
+                rounds += 1
+
+                moved = False
+                for index in (j, i):
+                    others = np.delete(rows, index)
+                    # Menor distância de cada candidato às demais cores escolhidas, em qualquer visão
+                    separation = np.linalg.norm(
+                        visions[:, index, :, None, :] - selected[:, None, others, :], axis=-1
+                    ).min(axis=(0, 2))
+                    valid = feasible[index] & (separation >= self.min_distance)
+                    if valid.any():
+                        best = int(np.argmin(np.where(valid, cost[index], np.inf)))
+                    else:
+                        best = int(np.argmax(np.where(feasible[index], separation, -np.inf)))
+                    if best != choice[index]:
+                        choice[index] = best
+                        moved = True
+                        break
+                if not moved:
+                    unresolved.add((int(i), int(j)))
+
+        chosen = candidates[np.arange(len(colors)), choice]
+        fixed = color_engine.srgb_to_hex(chosen)
+        original_contrast = contrast[:, 0]
+        final_contrast = contrast[np.arange(len(colors)), choice]
+
+        changes = [
+            {
+                'index': index,
+                'role': 'foreground' if index >= series else 'series',
+                'from': colors[index].upper(),
+                'to': fixed[index],
+                'delta_e': round(float(cost[index, choice[index]]), 4),
+                'contrast_before': round(float(original_contrast[index]), 2),
+                'contrast_after': round(float(final_contrast[index]), 2)
+            }
+            for index in range(len(colors)) if choice[index] != 0
+        ]
+        failures = [index for index in range(len(colors)) if final_contrast[index] < required[index]]
+        confusions = self.confusion_pairs(fixed[:series]) if check_cvd else []
+        success = not failures and not confusions
+
+        return {
+            'success': success,
+            'palette': fixed[:series],
+            'foreground': fixed[series] if foreground else None,
+            'original': [color.upper() for color in palette],
+            'background': background,
+            'level': level,
+            'required_ratio': limits[target],
+            'changes': changes,
+            'failures': failures,
+            'confusions': confusions,
+            'rounds': rounds,
+            'timed_out': timed_out,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 2),
+            'message': (f"✅ Paleta atende WCAG {level} ({len(changes)} cor(es) ajustada(s))" if success
+                        else f"⚠️ {len(failures)} cor(es) sem contraste e {len(confusions)} par(es) confundível(is)")
+        }
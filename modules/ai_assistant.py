@@ -5,6 +5,8 @@ import os
 from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
 
+from .content_cache import ContentCache, content_key, default_cache, thaw
+
 # Carrega variáveis de ambiente
 load_dotenv()
 
@@ -12,14 +14,16 @@ load_dotenv()
 class AIAssistant:
     """Assistente de IA para sugestões criativas de visualização"""
     
-    def __init__(self, provider: str = "openai"):
+    def __init__(self, provider: str = "openai", cache: ContentCache = None):
         """
         Inicializa o assistente de IA
         
         Args:
             provider: 'openai' ou 'anthropic'
+            cache: Cache de conteúdo para as paletas sugeridas (padrão: compartilhado)
         """
         self.provider = provider.lower()
+        self.cache = cache if cache is not None else default_cache()
         self.client = None
         self.model = os.getenv("AI_MODEL", "gpt-4-turbo-preview")
         
@@ -52,6 +56,16 @@ class AIAssistant:
         except ImportError:
             print("⚠️ Biblioteca anthropic não instalada. Execute: pip install anthropic")
     
+    @staticmethod
+    def is_configured(provider: str = "openai") -> bool:
+        """Chave de API e biblioteca presentes, sem importar o SDK nem criar o cliente"""
+        import importlib.util
+        packages = {"openai": ("openai", "OPENAI_API_KEY"), "anthropic": ("anthropic", "ANTHROPIC_API_KEY")}
+        if provider.lower() not in packages:
+            return False
+        package, variable = packages[provider.lower()]
+        return bool(os.getenv(variable)) and importlib.util.find_spec(package) is not None
+    
     def is_available(self) -> bool:
         """Verifica se o assistente está disponível"""
         return self.client is not None
@@ -87,20 +101,35 @@ class AIAssistant:
             context: Contexto (tipo de dados, mood, indústria, etc.)
         
         Returns:
-            Sugestões de paletas
+            Sugestões de paletas (em cache pelo contexto; respostas da IA que não
+            puderam ser interpretadas não são guardadas)
         """
         if not self.is_available():
-            return self._fallback_colors(context)
+            return thaw(self.cache.get_or_compute(
+                'ai_palette_fallback', lambda: self._fallback_colors(context), context
+            ))
+        
+        key_inputs = (self.provider, self.model, context)
+        cached = self.cache.get(self._color_cache_key(*key_inputs))
+        if cached is not None:
+            return thaw(cached)
         
         prompt = self._build_color_prompt(context)
         
         try:
             response = self._call_ai(prompt)
-            return self._parse_color_response(response)
+            result = self._parse_color_response(response)
+            if result.get("palette"):
+                self.cache.put(self._color_cache_key(*key_inputs), result)
+            return thaw(result)
         except Exception as e:
             print(f"⚠️ Erro ao chamar IA: {e}")
             return self._fallback_colors(context)
     
+    @staticmethod
+    def _color_cache_key(provider: str, model: str, context: Dict[str, Any]) -> str:
+        return content_key('ai_palette', provider, model, context)
+    
     def suggest_layout(self, visual_count: int, dashboard_purpose: str) -> Dict[str, Any]:
         """
         Sugere layout baseado no propósito do dashboard
@@ -0,0 +1,162 @@
+"""
+Backends do Analysis Services - Interface plugável entre os clientes e o servidor
+"""
+import logging
+import os
+import socket
+import sys
+from typing import Dict, List, Any, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisServicesBackend:
+    """
+    Interface de acesso ao Analysis Services usada por MCPPowerBIClient e PowerBIConnector
+
+    Os objetos retornados seguem as APIs do ADOMD.NET e do TOM:
+    - conexão: atributo Database e método Close()
+    - reader: FieldCount, GetName(i), Read(), GetValue(i), Close()
+    - servidor TOM: Databases (Count, [i]) e Disconnect()
+    """
+
+    name = 'base'
+
+    def load(self) -> bool:
+        """Carrega as bibliotecas do backend. Retorna True se disponível"""
+        raise NotImplementedError
+
+    def open_connection(self, connection_string: str):
+        """Abre uma conexão ADOMD (já aberta ao retornar)"""
+        raise NotImplementedError
+
+    def execute_reader(self, connection, query: str):
+        """Executa uma query DAX e retorna um data reader"""
+        raise NotImplementedError
+
+    def execute_command(self, connection, script: str) -> None:
+        """Executa um comando (script TMSL serializado)"""
+        raise NotImplementedError
+
+    def open_server(self, connection_string: str):
+        """Conecta ao servidor via TOM e retorna o objeto Server conectado"""
+        raise NotImplementedError
+
+    def list_instances(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Lista instâncias conhecidas pelo backend
+
+        Returns:
+            Lista de instâncias ou None para usar a descoberta por processos/portas
+        """
+        return None
+
+    def is_port_open(self, host: str, port: int) -> bool:
+        """Verifica se uma porta está aberta"""
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(0.5)
+            result = sock.connect_ex((host, port))
+            sock.close()
+            return result == 0
+        except:
+            return False
+
+
+class AdomdBackend(AnalysisServicesBackend):
+    """Backend real: ADOMD.NET e TOM via pythonnet (Windows + Power BI Desktop)"""
+
+    name = 'adomd'
+
+    # Diretórios conhecidos das DLLs
+    DLL_PATHS = [
+        r"C:\Program Files\Microsoft.NET\ADOMD.NET\160",
+        r"C:\Program Files (x86)\Microsoft SQL Server Management Studio 20\Common7\IDE",
+        r"C:\Program Files\Microsoft SQL Server\160\DTS\Binn",
+        r"C:\Program Files\Microsoft SQL Server\160\SDK\Assemblies",
+    ]
+
+    def __init__(self):
+        self._tom_loaded = False
+
+    def _add_dll_paths(self):
+        """Adiciona diretórios conhecidos das DLLs ao PATH"""
+        for dll_path in self.DLL_PATHS:
+            if os.path.exists(dll_path) and dll_path not in sys.path:
+                sys.path.append(dll_path)
+                os.environ['PATH'] = dll_path + os.pathsep + os.environ.get('PATH', '')
+
+    def load(self) -> bool:
+        """Carrega biblioteca ADOMD.NET via pythonnet"""
+        try:
+            import clr
+
+            self._add_dll_paths()
+
+            # Tentar adicionar referências para Microsoft.AnalysisServices.AdomdClient
+            try:
+                clr.AddReference("Microsoft.AnalysisServices.AdomdClient")
+                logger.info("Microsoft.AnalysisServices.AdomdClient carregado")
+                return True
+            except Exception as e:
+                logger.warning("ADOMD Client não disponível: %s. Para executar queries DAX, instale "
+                               "SQL Server Management Studio ou Analysis Services Client", e)
+                return False
+
+        except ImportError:
+            logger.warning("pythonnet não disponível")
+            return False
+
+    def open_connection(self, connection_string: str):
+        from Microsoft.AnalysisServices.AdomdClient import AdomdConnection
+
+        connection = AdomdConnection(connection_string)
+        connection.Open()
+        return connection
+
+    def execute_reader(self, connection, query: str):
+        from Microsoft.AnalysisServices.AdomdClient import AdomdCommand
+
+        command = AdomdCommand(query, connection)
+        return command.ExecuteReader()
+
+    def execute_command(self, connection, script: str) -> None:
+        from Microsoft.AnalysisServices.AdomdClient import AdomdCommand
+
+        command = AdomdCommand(script, connection)
+        command.Execute()
+
+    def open_server(self, connection_string: str):
+        import clr
+
+        if not self._tom_loaded:
+            self._add_dll_paths()
+            clr.AddReference("Microsoft.AnalysisServices.Tabular")
+            self._tom_loaded = True
+
+        from Microsoft.AnalysisServices.Tabular import Server
+
+        server = Server()
+        server.Connect(connection_string)
+        return server
+
+
+def create_backend(name: Optional[str] = None) -> AnalysisServicesBackend:
+    """
+    Cria um backend pelo nome
+
+    Args:
+        name: 'adomd' (padrão) ou 'fake' (servidor local em memória).
+              Se None, usa a variável de ambiente PBI_BACKEND.
+
+    Returns:
+        Instância do backend
+    """
+    name = (name or os.getenv('PBI_BACKEND', 'adomd')).lower()
+
+    if name == 'fake':
+        from .fake_as_backend import FakeAnalysisServicesBackend
+        return FakeAnalysisServicesBackend()
+
+    return AdomdBackend()
@@ -0,0 +1,227 @@
+"""
+Construtor de Pacotes de Tema - Renderização em memória, escrita atômica, zip determinístico e lote paralelo
+
+Cada pacote (theme.json, theme.min.json, layout_guide.md, README.md) é
+renderizado inteiro em memória antes de tocar o disco. Cada arquivo é gravado
+num temporário no mesmo diretório e promovido com os.replace: a troca é atômica
+por arquivo, não por pacote. Uma queda no meio nunca deixa um arquivo pela
+metade, mas pode deixar arquivos novos ao lado de antigos (o manifest é gravado
+por último, então a geração seguinte regrava o que divergir).
+
+O manifest.json guarda o SHA-256 de cada artefato: numa nova geração, artefatos
+com o mesmo hash (e ainda presentes no disco) não são regravados. O zip usa
+ordem, datas e permissões fixas, então o mesmo conteúdo gera os mesmos bytes.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+from . import tracing
+
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# Nome do artefato -> chave no dicionário de arquivos devolvido (compatível com create_theme_bundle)
+ARTIFACT_KEYS = {
+    'theme.json': 'theme',
+    'theme.min.json': 'theme_min',
+    'layout_guide.md': 'layout',
+    'README.md': 'readme'
+}
+
+# 1980-01-01: menor data aceita pelo formato zip
+_ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+def _read_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# Lida uma vez no import: trocar a umask durante as gravações (em threads) abriria uma janela sem máscara
+_UMASK = _read_umask()
+
+
+def default_mode(directory: bool = False) -> int:
+    """Permissões que open()/mkdir() dariam pela umask (mkstemp/mkdtemp criam 0600/0700)"""
+    return (0o777 if directory else 0o666) & ~_UMASK
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def atomic_write(path: str, data: bytes):
+    """Grava bytes em path via temporário no mesmo diretório + os.replace"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, default_mode())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def deterministic_zip(artifacts: Dict[str, bytes], prefix: str = '') -> bytes:
+    """Zip em memória com entradas ordenadas, data fixa e permissões fixas (mesmo conteúdo, mesmos bytes)"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name in sorted(artifacts):
+            info = zipfile.ZipInfo(prefix + name, date_time=_ZIP_EPOCH)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 3  # Unix: external_attr interpretado igual em qualquer SO
+            info.external_attr = 0o100644 << 16
+            archive.writestr(info, artifacts[name], compresslevel=9)
+    return buffer.getvalue()
+
+
+def load_manifest(output_dir: str) -> Dict[str, Any]:
+    """Manifesto de um pacote já gerado ({} se ausente ou ilegível)"""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get('version') == MANIFEST_VERSION else {}
+
+
+class BundleBuilder:
+    """
+    Gera pacotes de tema de forma atômica, individualmente ou em lote
+
+    Exemplo:
+        builder = BundleBuilder()
+        result = builder.build(palette, layout, 'export/cliente_a', zip_path='export/cliente_a.zip')
+
+        results = builder.build_many([
+            {'palette': p, 'layout': l, 'output_dir': f'export/{nome}'} for nome, p, l in clientes
+        ])
+    """
+
+    def __init__(self, exporter=None, max_workers: Optional[int] = None):
+        """
+        Args:
+            exporter: PowerBIExporter usado para compilar temas e guias (padrão: novo)
+            max_workers: Threads do modo em lote (padrão: o do ThreadPoolExecutor)
+        """
+        if exporter is None:
+            from .powerbi_exporter import PowerBIExporter
+            exporter = PowerBIExporter()
+        self.exporter = exporter
+        self.max_workers = max_workers
+
+    def render(self, palette: Dict[str, Any], layout: Dict[str, Any],
+               typography: Optional[Dict[str, Any]] = None, name: Optional[str] = None) -> Dict[str, bytes]:
+        """Todos os artefatos do pacote em memória ({nome do arquivo: bytes})"""
+        compiled = self.exporter.compile_theme(palette, name, typography)
+        return {
+            'theme.json': compiled['pretty'],
+            'theme.min.json': compiled['minified'],
+            'layout_guide.md': self.exporter.generate_layout_guide(layout).encode('utf-8'),
+            'README.md': self.exporter.render_readme(palette, sha256(compiled['minified'])[:12]).encode('utf-8')
+        }
+
+    def write(self, artifacts: Dict[str, bytes], output_dir: str, force: bool = False) -> Dict[str, Any]:
+        """
+        Grava cada artefato atomicamente, pulando os que não mudaram desde o último manifesto
+
+        Returns:
+            Dict com files (chave -> caminho), written, skipped e manifest
+        """
+        previous = {} if force else load_manifest(output_dir).get('files', {})
+        entries, written, skipped, files = {}, [], [], {}
+
+        for name in sorted(artifacts):
+            data = artifacts[name]
+            digest = sha256(data)
+            path = os.path.join(output_dir, name)
+            entries[name] = {'sha256': digest, 'size': len(data)}
+            files[ARTIFACT_KEYS.get(name, name)] = path
+
+            if previous.get(name, {}).get('sha256') == digest and os.path.exists(path):
+                skipped.append(name)
+                continue
+            atomic_write(path, data)
+            written.append(name)
+            tracing.count('bytes_written', len(data))
+
+        manifest = {'version': MANIFEST_VERSION, 'files': entries}
+        if written or not os.path.exists(os.path.join(output_dir, MANIFEST_NAME)):
+            # Manifesto por último: só lista o que já está gravado por inteiro
+            atomic_write(os.path.join(output_dir, MANIFEST_NAME),
+                         json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+        return {'files': files, 'written': written, 'skipped': skipped, 'manifest': manifest}
+
+    @tracing.traced('export.bundle_build')
+    def build(self, palette: Dict[str, Any], layout: Dict[str, Any], output_dir: str,
+              zip_path: Optional[str] = None, typography: Optional[Dict[str, Any]] = None,
+              name: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
+        """
+        Renderiza e grava um pacote (e opcionalmente o zip)
+
+        Returns:
+            Dict com success, output_dir, files, written, skipped, zip, manifest e message
+            (ou success=False e error)
+        """
+        try:
+            artifacts = self.render(palette, layout, typography, name)
+            result = self.write(artifacts, output_dir, force=force)
+            if zip_path:
+                data = deterministic_zip(artifacts)
+                if force or not os.path.exists(zip_path) or sha256(data) != self._file_hash(zip_path):
+                    atomic_write(zip_path, data)
+                result['zip'] = zip_path
+            result.update({
+                'success': True,
+                'output_dir': output_dir,
+                'message': (f"Pacote em {output_dir}: {len(result['written'])} gravado(s), "
+                            f"{len(result['skipped'])} sem alteração")
+            })
+            return result
+        except Exception as e:
+            return {'success': False, 'output_dir': output_dir, 'error': str(e),
+                    'message': f"Erro ao gerar pacote em {output_dir}: {e}"}
+
+    def build_many(self, jobs: List[Dict[str, Any]], force: bool = False) -> List[Dict[str, Any]]:
+        """
+        Gera vários pacotes em paralelo (um por cliente/marca)
+
+        Args:
+            jobs: Dicts com palette, layout, output_dir e opcionalmente zip_path,
+                typography e name
+
+        Returns:
+            Resultados de build na mesma ordem dos jobs; falhas não interrompem os demais
+        """
+        def run(job):
+            return self.build(job['palette'], job['layout'], job['output_dir'], job.get('zip_path'),
+                              job.get('typography'), job.get('name'), force=force)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(run, jobs))
+
+    def zip_bytes(self, palette: Dict[str, Any], layout: Dict[str, Any],
+                  typography: Optional[Dict[str, Any]] = None, name: Optional[str] = None) -> bytes:
+        """Zip determinístico do pacote, sem tocar o disco (ex.: st.download_button)"""
+        return deterministic_zip(self.render(palette, layout, typography, name))
+
+    @staticmethod
+    def _file_hash(path: str) -> Optional[str]:
+        try:
+            with open(path, 'rb') as f:
+                return sha256(f.read())
+        except OSError:
+            return None
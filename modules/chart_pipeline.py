@@ -0,0 +1,420 @@
+"""
+Pipeline de Gráficos - Pré-agregação no servidor com payload limitado para o navegador
+
+Entre o DataFrame e o Plotly/Streamlit, cada tipo de visual é reduzido no
+servidor antes de virar figura, então o JSON enviado ao navegador tem tamanho
+limitado qualquer que seja o número de linhas:
+
+    line_chart    agregação por x + MinMaxLTTB (min-max por faixa, depois LTTB)
+    bar_chart     groupby da categoria, top N + "Outros"
+    donut_chart   groupby da categoria, poucas fatias + "Outros"
+    histogram     contagens por faixa (np.histogram)
+    heatmap       matriz de correlação (métricas) ou densidade 2D (x/y)
+    scatter_plot  Scattergl até max_points, acima disso hexbin
+    kpi_card      uma agregação por métrica
+
+Os núcleos numéricos (minmax_indices, lttb_indices, hexbin) são funções
+NumPy vetorizadas e independentes de Plotly; os usados pelo script gerado
+(ScriptGenerator) são copiados de lá a partir daqui, então prévia e script
+reduzem os dados do mesmo jeito.
+"""
+import logging
+import warnings
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import plotly.graph_objects as go
+    PLOTLY_AVAILABLE = True
+except ImportError:
+    PLOTLY_AVAILABLE = False
+    logging.getLogger(__name__).warning("Plotly não instalado. Execute: pip install plotly")
+
+
+DEFAULT_COLORS = ['#1E88E5', '#FFA726', '#26C6DA', '#66BB6A', '#AB47BC', '#EF5350', '#8D6E63', '#78909C']
+
+# Fator de pré-seleção do MinMaxLTTB: o min-max reduz a ratio x n_out pontos antes do LTTB
+MINMAX_RATIO = 4
+
+
+# ---------------------------------------------------------------------- núcleos numéricos
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Índices do mínimo e do máximo de cada uma de (n_out - 2) // 2 faixas de tamanho
+    igual, mais o primeiro e o último ponto, em ordem crescente (no máximo n_out)
+    """
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    buckets = (n_out - 2) // 2
+    if buckets < 1:
+        return np.array([0, n - 1], dtype=np.int64)[:max(n_out, 0)]
+    size = -(-n // buckets)
+    # Faixas completas numa visão (sem copiar y); a última, incompleta, à parte
+    full = n // size
+    view = y[:full * size].reshape(full, size)
+    offsets = np.arange(full) * size
+    parts = [[0], offsets + view.argmin(axis=1), offsets + view.argmax(axis=1)]
+    if full * size < n:
+        tail = y[full * size:]
+        parts.append([full * size + tail.argmin(), full * size + tail.argmax()])
+    parts.append([n - 1])
+    return np.unique(np.concatenate(parts))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Índices escolhidos pelo Largest-Triangle-Three-Buckets (x crescente, sem NaN)"""
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    xs = (x.astype('int64') if x.dtype.kind == 'M' else x).astype(np.float64)
+    ys = y.astype(np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Médias da faixa seguinte de todas as faixas de uma vez (somas acumuladas)
+    cum_x = np.concatenate([[0.0], np.cumsum(xs)])
+    cum_y = np.concatenate([[0.0], np.cumsum(ys)])
+    next_start = edges[1:]
+    next_end = np.append(edges[2:], n)
+    counts = next_end - next_start
+    mean_x = (cum_x[next_end] - cum_x[next_start]) / counts
+    mean_y = (cum_y[next_end] - cum_y[next_start]) / counts
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        px, py = xs[previous], ys[previous]
+        area = np.abs((px - mean_x[bucket]) * (ys[start:end] - py) - (px - xs[start:end]) * (mean_y[bucket] - py))
+        previous = start + int(area.argmax())
+        indices[bucket + 1] = previous
+    return indices
+
+
+def downsample_indices(x: np.ndarray, y: np.ndarray, n_out: int, method: str = 'minmaxlttb') -> np.ndarray:
+    """
+    Índices de uma série reduzida a no máximo n_out pontos (x não numérico: pelas posições)
+
+    Args:
+        method: 'minmaxlttb' (padrão: min-max até MINMAX_RATIO x n_out, depois LTTB),
+            'lttb' ou 'minmax'
+    """
+    n = len(x)
+    if n <= n_out:
+        return np.arange(n)
+    if x.dtype.kind not in 'iufM':
+        x = np.arange(n)  # x categórico (texto): a redução usa as posições
+    if method == 'minmax':
+        return minmax_indices(y, n_out)
+    if method == 'lttb':
+        return lttb_indices(x, y, n_out)
+    if method != 'minmaxlttb':
+        raise ValueError(f"Método de redução desconhecido: {method}")
+    if n <= n_out * MINMAX_RATIO:
+        return lttb_indices(x, y, n_out)
+    preselected = minmax_indices(y, n_out * MINMAX_RATIO)
+    return preselected[lttb_indices(x[preselected], y[preselected], n_out)]
+
+
+def hexbin(x: np.ndarray, y: np.ndarray, gridsize: int = 60) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Contagens em grade hexagonal (mesma grade do matplotlib.hexbin)
+
+    Returns:
+        (centros x, centros y, contagens) só dos hexágonos não vazios
+    """
+    if len(x) == 0:
+        empty = np.empty(0)
+        return empty, empty, empty.astype(np.int64)
+    nx = max(int(gridsize), 1)
+    ny = max(int(nx / np.sqrt(3)), 1)
+    xmin, xmax = float(x.min()), float(x.max())
+    ymin, ymax = float(y.min()), float(y.max())
+    sx = (xmax - xmin) / nx or 1.0
+    sy = (ymax - ymin) / ny or 1.0
+
+    xs = (x - xmin) / sx
+    ys = (y - ymin) / sy
+    # Duas redes deslocadas de meia célula; cada ponto vai para o centro mais próximo
+    i1, j1 = np.floor(xs + 0.5).astype(np.int64), np.floor(ys + 0.5).astype(np.int64)
+    i2, j2 = np.floor(xs).astype(np.int64), np.floor(ys).astype(np.int64)
+    d1 = (xs - i1) ** 2 + 3.0 * (ys - j1) ** 2
+    d2 = (xs - i2 - 0.5) ** 2 + 3.0 * (ys - j2 - 0.5) ** 2
+    first = d1 < d2
+
+    size1 = (nx + 1) * (ny + 1)
+    np.clip(i2, 0, nx - 1, out=i2)
+    np.clip(j2, 0, ny - 1, out=j2)
+    codes = np.where(first, i1 * (ny + 1) + j1, size1 + i2 * ny + j2)
+    counts = np.bincount(codes, minlength=size1 + nx * ny)
+
+    grid1_i, grid1_j = np.divmod(np.arange(size1), ny + 1)
+    grid2_i, grid2_j = np.divmod(np.arange(nx * ny), ny)
+    centers_x = np.concatenate([grid1_i * sx, (grid2_i + 0.5) * sx]) + xmin
+    centers_y = np.concatenate([grid1_j * sy, (grid2_j + 0.5) * sy]) + ymin
+    filled = counts > 0
+    return centers_x[filled], centers_y[filled], counts[filled]
+
+
+def finite_values(series: pd.Series) -> np.ndarray:
+    """Valores da série como float64, sem nulos nem infinitos"""
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return values[np.isfinite(values)]
+
+
+def axis_keys(series: pd.Series) -> pd.Series:
+    """
+    Eixo x ordenável: números e datas como estão; texto que é todo data vira datetime
+
+    Datas lidas de CSV chegam como texto ("31/01/2024"); convertidas, a série
+    fica em ordem cronológica. Texto que não é data continua texto.
+    """
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        parsed = pd.to_datetime(series, errors='coerce')
+    return parsed if parsed.notna().sum() == series.notna().sum() else series
+
+
+def ranking(df: pd.DataFrame, category: str, value: str, aggregation: str, top_n: int) -> pd.Series:
+    """Agrega value por category; acima de top_n, soma o restante em "Outros\""""
+    totals = df.groupby(category, observed=True, sort=False)[value].agg(aggregation)
+    totals = totals.sort_values(ascending=False)
+    if len(totals) <= top_n:
+        return totals
+    if aggregation != 'sum':
+        return totals.iloc[:top_n]
+    head = totals.iloc[:top_n - 1]
+    head.index = head.index.astype(str)
+    return pd.concat([head, pd.Series({'Outros': totals.iloc[top_n - 1:].sum()})])
+
+
+def default_aggregation(column_analysis: Dict[str, Any], column: str) -> str:
+    """Percentuais são médias; as demais métricas são somadas"""
+    return 'mean' if column_analysis.get(column, {}).get('detected_type') == 'percentage' else 'sum'
+
+
+def as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def payload_points(figure) -> int:
+    """Número de valores de dados serializados na figura (x, y, z, values, labels)"""
+    total = 0
+    for trace in figure.data:
+        for attribute in ('x', 'y', 'z', 'values', 'labels'):
+            value = getattr(trace, attribute, None)
+            if value is not None and not isinstance(value, (str, int, float)):
+                total += int(np.size(value))
+    return total
+
+
+# ---------------------------------------------------------------------- pipeline
+
+class ChartPipeline:
+    """
+    Constrói figuras Plotly com pré-agregação no servidor e payload limitado
+
+    Exemplo:
+        pipeline = ChartPipeline(colors=palette['colors'])
+        fig = pipeline.figure(df, suggestion)          # sugestão do DataAnalyzer
+        fig = pipeline.figure(df, pipeline.auto_suggestion(df))
+    """
+
+    def __init__(self, colors: Optional[List[str]] = None, max_points: int = 5000,
+                 max_categories: int = 30, max_slices: int = 8, bins: int = 60,
+                 hex_gridsize: int = 60, line_method: str = 'minmaxlttb'):
+        """
+        Args:
+            colors: Cores da paleta (padrão: DEFAULT_COLORS)
+            max_points: Pontos máximos por figura (divididos entre as séries)
+            max_categories: Barras máximas (as demais viram "Outros")
+            max_slices: Fatias máximas do donut
+            bins: Faixas do histograma e da densidade 2D (por eixo)
+            hex_gridsize: Hexágonos na largura do hexbin
+            line_method: Redução das séries ('minmaxlttb', 'lttb' ou 'minmax')
+        """
+        if not PLOTLY_AVAILABLE:
+            raise ImportError("Plotly é necessário. Execute: pip install plotly")
+        self.colors = list(colors) if colors else list(DEFAULT_COLORS)
+        self.max_points = max_points
+        self.max_categories = max_categories
+        self.max_slices = max_slices
+        self.bins = bins
+        self.hex_gridsize = hex_gridsize
+        self.line_method = line_method
+
+    def figure(self, df: pd.DataFrame, suggestion: Dict[str, Any],
+               column_analysis: Optional[Dict[str, Any]] = None):
+        """
+        Figura de uma sugestão de visual do DataAnalyzer
+
+        Args:
+            df: Dados completos (não são enviados ao navegador)
+            suggestion: Dict com type, columns e title
+            column_analysis: Análise das colunas (define média vs soma)
+
+        Returns:
+            go.Figure, ou None se o tipo não é suportado ou faltam colunas
+        """
+        kind = suggestion.get('type')
+        columns = suggestion.get('columns', {})
+        title = suggestion.get('title', '')
+        analysis = column_analysis or {}
+
+        missing = [column for column in self._referenced(columns) if column not in df.columns]
+        if missing:
+            return None
+
+        if kind == 'line_chart' and columns.get('x') and columns.get('y'):
+            ys = as_list(columns['y'])
+            return self.line(df, columns['x'], ys, {y: default_aggregation(analysis, y) for y in ys}, title)
+        if kind == 'bar_chart' and columns.get('category') and columns.get('value'):
+            value = columns['value']
+            return self.bar(df, columns['category'], value, default_aggregation(analysis, value), title)
+        if kind == 'donut_chart' and columns.get('category') and columns.get('value'):
+            return self.donut(df, columns['category'], columns['value'], title)
+        if kind == 'histogram' and columns.get('value'):
+            return self.histogram(df, columns['value'], title)
+        if kind == 'scatter_plot' and columns.get('x') and columns.get('y'):
+            return self.scatter(df, columns['x'], columns['y'], title)
+        if kind == 'heatmap':
+            if columns.get('x') and columns.get('y'):
+                return self.density(df, columns['x'], columns['y'], title)
+            if len(as_list(columns.get('metrics'))) >= 2:
+                return self.correlation(df, as_list(columns['metrics']), title)
+        if kind == 'kpi_card' and columns.get('metrics'):
+            metrics = as_list(columns['metrics'])
+            return self.kpis(df, {metric: default_aggregation(analysis, metric) for metric in metrics}, title)
+        return None
+
+    def auto_suggestion(self, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """Sugestão simples pelos dtypes (ex.: resultado de query DAX, sem DataAnalyzer)"""
+        numeric = [column for column in df.columns
+                   if pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column])]
+        dates = [column for column in df.columns if pd.api.types.is_datetime64_any_dtype(df[column])]
+        others = [column for column in df.columns if column not in numeric and column not in dates]
+
+        if dates and numeric:
+            return {'type': 'line_chart', 'columns': {'x': dates[0], 'y': numeric[:3]},
+                    'title': f"{', '.join(numeric[:3])} por {dates[0]}"}
+        if others and numeric:
+            return {'type': 'bar_chart', 'columns': {'category': others[0], 'value': numeric[0]},
+                    'title': f"{numeric[0]} por {others[0]}"}
+        if len(numeric) >= 2:
+            return {'type': 'scatter_plot', 'columns': {'x': numeric[0], 'y': numeric[1]},
+                    'title': f"{numeric[0]} x {numeric[1]}"}
+        if numeric:
+            return {'type': 'histogram', 'columns': {'value': numeric[0]},
+                    'title': f"Distribuição de {numeric[0]}"}
+        return None
+
+    # ------------------------------------------------------------------ visuais
+
+    def line(self, df: pd.DataFrame, x: str, ys: List[str],
+             aggregation: Optional[Dict[str, str]] = None, title: str = ''):
+        """Séries agregadas por x e reduzidas a max_points no total (Scattergl)"""
+        aggregation = aggregation or {y: 'sum' for y in ys}
+        series = df.groupby(axis_keys(df[x]), observed=True, sort=True).agg(aggregation)
+        per_trace = max(self.max_points // max(len(ys), 1), 3)
+
+        fig = go.Figure()
+        for position, column in enumerate(ys):
+            points = series[column].dropna()
+            x_values, y_values = points.index.to_numpy(), points.to_numpy(dtype=np.float64)
+            indices = downsample_indices(x_values, y_values, per_trace, self.line_method)
+            fig.add_trace(go.Scattergl(x=x_values[indices], y=y_values[indices], mode='lines', name=column,
+                                       line=dict(color=self._color(position))))
+        return self._layout(fig, title, x, ys[0] if len(ys) == 1 else None)
+
+    def bar(self, df: pd.DataFrame, category: str, value: str, aggregation: str = 'sum', title: str = ''):
+        totals = ranking(df, category, value, aggregation, self.max_categories)
+        fig = go.Figure(go.Bar(x=totals.index.astype(str), y=totals.to_numpy(), marker_color=self._color(0)))
+        return self._layout(fig, title, category, value)
+
+    def donut(self, df: pd.DataFrame, category: str, value: str, title: str = ''):
+        totals = ranking(df, category, value, 'sum', self.max_slices)
+        fig = go.Figure(go.Pie(labels=totals.index.astype(str), values=totals.to_numpy(), hole=0.5,
+                               marker=dict(colors=self.colors), sort=False))
+        return self._layout(fig, title)
+
+    def histogram(self, df: pd.DataFrame, value: str, title: str = ''):
+        counts, edges = np.histogram(finite_values(df[value]), bins=self.bins)
+        fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+                               marker_color=self._color(0)))
+        fig.update_layout(bargap=0)
+        return self._layout(fig, title, value, 'Frequência')
+
+    def scatter(self, df: pd.DataFrame, x: str, y: str, title: str = ''):
+        """Scattergl com todos os pontos até max_points; acima disso, hexbin"""
+        pairs = df[[x, y]].dropna()
+        if len(pairs) <= self.max_points:
+            fig = go.Figure(go.Scattergl(x=pairs[x].to_numpy(), y=pairs[y].to_numpy(), mode='markers',
+                                         marker=dict(color=self._color(0), size=5, opacity=0.6)))
+            return self._layout(fig, title, x, y)
+
+        centers_x, centers_y, counts = hexbin(pairs[x].to_numpy(dtype=np.float64),
+                                              pairs[y].to_numpy(dtype=np.float64), self.hex_gridsize)
+        fig = go.Figure(go.Scattergl(
+            x=centers_x, y=centers_y, mode='markers', text=counts,
+            hovertemplate=f'{x}: %{{x}}<br>{y}: %{{y}}<br>Pontos: %{{text}}<extra></extra>',
+            marker=dict(symbol='hexagon', size=max(600 // self.hex_gridsize, 4), color=np.log1p(counts),
+                        colorscale=[[0, '#FFFFFF'], [1, self._color(0)]],
+                        colorbar=dict(title='log(1+n)'))
+        ))
+        return self._layout(fig, f"{title} (hexbin, {len(pairs):,} pontos)" if title else '', x, y)
+
+    def density(self, df: pd.DataFrame, x: str, y: str, title: str = ''):
+        """Mapa de calor da contagem em grade bins x bins"""
+        pairs = df[[x, y]].dropna()
+        counts, edges_x, edges_y = np.histogram2d(pairs[x].to_numpy(dtype=np.float64),
+                                                  pairs[y].to_numpy(dtype=np.float64), bins=self.bins)
+        fig = go.Figure(go.Heatmap(x=(edges_x[:-1] + edges_x[1:]) / 2, y=(edges_y[:-1] + edges_y[1:]) / 2,
+                                   z=np.where(counts.T > 0, counts.T, np.nan),
+                                   colorscale=[[0, '#FFFFFF'], [1, self._color(0)]]))
+        return self._layout(fig, title, x, y)
+
+    def correlation(self, df: pd.DataFrame, metrics: List[str], title: str = ''):
+        matrix = df[metrics].corr()
+        fig = go.Figure(go.Heatmap(z=matrix.to_numpy(), x=list(matrix.columns), y=list(matrix.index),
+                                   zmin=-1, zmax=1,
+                                   colorscale=[[0, self.colors[-1]], [0.5, '#FFFFFF'], [1, self._color(0)]],
+                                   text=matrix.round(2).to_numpy(), texttemplate='%{text}'))
+        return self._layout(fig, title)
+
+    def kpis(self, df: pd.DataFrame, aggregation: Dict[str, str], title: str = ''):
+        fig = go.Figure()
+        for position, (column, function) in enumerate(aggregation.items()):
+            fig.add_trace(go.Indicator(mode='number', value=float(df[column].agg(function)),
+                                       title=dict(text=column),
+                                       number=dict(font=dict(color=self._color(position))),
+                                       domain=dict(row=0, column=position)))
+        fig.update_layout(grid=dict(rows=1, columns=max(len(aggregation), 1)))
+        return self._layout(fig, title)
+
+    # ------------------------------------------------------------------ auxiliares
+
+    def _layout(self, fig, title: str, x_title: Optional[str] = None, y_title: Optional[str] = None):
+        fig.update_layout(title=title or None, colorway=self.colors,
+                          margin=dict(l=40, r=20, t=50 if title else 20, b=40))
+        if x_title:
+            fig.update_xaxes(title_text=x_title)
+        if y_title:
+            fig.update_yaxes(title_text=y_title)
+        return fig
+
+    def _color(self, position: int) -> str:
+        return self.colors[position % len(self.colors)]
+
+    @classmethod
+    def _referenced(cls, columns: Dict[str, Any]) -> List[str]:
+        referenced = []
+        for value in columns.values():
+            referenced.extend(as_list(value))
+        return referenced
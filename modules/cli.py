@@ -0,0 +1,235 @@
+"""
+CLI avi-bi - Análise, paletas, layouts e exportação em lote sem o Streamlit
+
+Uso:
+    python -m modules.cli analyze dados/vendas.csv
+    python -m modules.cli palette --base "#1E88E5" --scheme complementary -o tema.json
+    python -m modules.cli layout executive_summary --visuals 6 -o layout.json
+    python -m modules.cli export dados/ -o saida --workers 8 --outputs bundle,pbip,analysis
+    python -m modules.cli --trace trace.json export dados/ -o saida --workers 1
+    python -m modules.cli theme-schema
+
+O comando export roda o pipeline (modules/pipeline.py) sobre arquivos e
+diretórios, em paralelo por processos, e sai com código 1 se algum dataset
+falhar (ver saida/summary.json). Com --trace os spans da execução são
+gravados no formato Trace Event (abrir em chrome://tracing ou Perfetto); os
+processos do pool não são rastreados, use --workers 1 para o trace completo.
+O comando theme-schema baixa o reportThemeSchema oficial fixado e substitui o
+schema empacotado em modules/schemas, contra o qual o ThemeCompiler valida os temas.
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from . import tracing
+from .theme_compiler import OFFICIAL_SCHEMA_VERSION, fetch_official_schema
+from .pipeline import OUTPUTS, PipelineConfig, DashboardPipeline, load_dataset, run_batch, to_json
+
+
+def _write(content: str, output: Optional[str]):
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f"✅ Gravado: {output}")
+    else:
+        print(content)
+
+
+def _config(args) -> PipelineConfig:
+    return PipelineConfig(
+        palette=getattr(args, 'palette', 'auto'),
+        scheme=getattr(args, 'scheme', 'analogous'),
+        colors=getattr(args, 'colors', 5),
+        template=getattr(args, 'template', None),
+        visual_count=getattr(args, 'visuals', None),
+        optimize=not getattr(args, 'no_optimize', False),
+        time_budget_ms=getattr(args, 'time_budget', 500),
+        seed=getattr(args, 'seed', 0),
+        outputs=tuple(getattr(args, 'outputs', ('bundle', 'analysis'))),
+        zip=not getattr(args, 'no_zip', False)
+    )
+
+
+def cmd_analyze(args) -> int:
+    pipeline = DashboardPipeline()
+    df = load_dataset(args.dataset)
+    analysis = pipeline.analyze(df)
+    if 'error' in analysis:
+        print(f"❌ {analysis['error']}")
+        return 1
+    if args.json or args.output:
+        _write(to_json(analysis), args.output)
+        return 0
+
+    quality = analysis['data_quality']
+    print(f"📊 {args.dataset}: {analysis['rows']:,} linhas, {analysis['columns']} colunas")
+    print(f"✅ Completude: {quality['completeness_score']}% · Duplicatas: {quality['duplicate_rows']}")
+    for name, info in analysis['column_analysis'].items():
+        print(f"   {name:<30} {info['detected_type']:<26} {info['unique_count']:>8} únicos")
+    print(f"💡 Visuais sugeridos ({len(analysis['suggested_visuals'])}):")
+    for position, visual in enumerate(analysis['suggested_visuals'], 1):
+        print(f"   {position}. [{visual['priority']}] {visual['type']} - {visual['title']}")
+    return 0
+
+
+def cmd_palette(args) -> int:
+    pipeline = DashboardPipeline(_config(args))
+    if args.list:
+        print('\n'.join(pipeline.color_gen.list_presets()))
+        return 0
+    analysis = pipeline.analyze(load_dataset(args.data)) if args.data else None
+    palette = pipeline.palette(analysis)
+    if args.output:
+        _write(pipeline.exporter.export_theme(palette, args.name), args.output)
+    elif args.json:
+        print(to_json(palette))
+    else:
+        print(f"🎨 {palette['name']}")
+        print('   ' + ' '.join(palette['colors']))
+    return 0
+
+
+def cmd_layout(args) -> int:
+    pipeline = DashboardPipeline(_config(args))
+    if args.list:
+        for template in pipeline.layout_engine.list_templates():
+            print(f"{template['name']:<24} {template['description']}")
+        return 0
+    analysis = pipeline.analyze(load_dataset(args.data)) if args.data else None
+    if analysis is None and not args.template:
+        print("❌ Informe um template ou --data para otimizar pelas sugestões")
+        return 2
+    layout = pipeline.layout(analysis)
+    if args.output or args.json:
+        _write(to_json(layout), args.output)
+    else:
+        print(pipeline.exporter.generate_layout_guide(layout))
+    return 0
+
+
+def cmd_export(args) -> int:
+    def report(result):
+        elapsed = result['timings'].get('total_ms', 0) / 1000
+        if result['success']:
+            print(f"✅ {result['dataset']} → {result['output_dir']} ({elapsed:.1f} s)")
+        else:
+            print(f"❌ {result['dataset']}: {result['error']}")
+
+    try:
+        summary = run_batch(args.inputs, args.output, _config(args), workers=args.workers,
+                            recursive=args.recursive, on_result=None if args.quiet else report)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 2
+    if not summary['datasets']:
+        print("⚠️ Nenhum dataset encontrado (CSV, Excel ou Parquet)")
+        return 1
+    print(f"{'✅' if summary['success'] else '⚠️'} {summary['message']} em {summary['elapsed_ms'] / 1000:.1f} s")
+    print(f"📄 Resumo: {summary['summary']}")
+    return 0 if summary['success'] else 1
+
+
+def cmd_theme_schema(args) -> int:
+    path = fetch_official_schema(args.version)
+    print(f"✅ reportThemeSchema {args.version} gravado: {path}")
+    return 0
+
+
+def _outputs(value: str) -> List[str]:
+    outputs = [item.strip() for item in value.split(',') if item.strip()]
+    unknown = set(outputs) - set(OUTPUTS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"saídas desconhecidas: {', '.join(sorted(unknown))}")
+    return outputs
+
+
+def _add_palette_options(parser):
+    parser.add_argument('--palette', default='auto',
+                        help="'auto' (pelo conteúdo), nome de preset ou cor base #RRGGBB (padrão: auto)")
+    parser.add_argument('--scheme', default='analogous',
+                        help='Esquema da cor base: analogous, complementary, triadic, monochromatic...')
+    parser.add_argument('--colors', type=int, default=5, help='Cores geradas a partir da cor base')
+
+
+def _add_layout_options(parser):
+    parser.add_argument('--visuals', type=int, default=None, help='Número de visuais do template')
+    parser.add_argument('--no-optimize', action='store_true',
+                        help='Usa o template sem posicionar as sugestões da análise')
+    parser.add_argument('--time-budget', type=float, default=500, help='Orçamento da otimização (ms)')
+    parser.add_argument('--seed', type=int, default=0, help='Semente da otimização')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='avi-bi', description='Power BI Design Assistant em linha de comando')
+    parser.add_argument('--trace', metavar='ARQUIVO',
+                        help='Grava os spans da execução em JSON do Chrome trace e imprime o resumo')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    analyze = commands.add_parser('analyze', help='Analisa um dataset e sugere visuais')
+    analyze.add_argument('dataset', help='CSV, Excel ou Parquet')
+    analyze.add_argument('--json', action='store_true', help='Imprime a análise completa em JSON')
+    analyze.add_argument('-o', '--output', help='Grava a análise em JSON')
+    analyze.set_defaults(handler=cmd_analyze)
+
+    palette = commands.add_parser('palette', help='Gera uma paleta (ou tema do Power BI)')
+    palette.add_argument('--preset', dest='palette', default=argparse.SUPPRESS,
+                         help='Nome do preset (atalho para --palette)')
+    palette.add_argument('--base', dest='palette', default=argparse.SUPPRESS,
+                         help='Cor base #RRGGBB (atalho para --palette)')
+    _add_palette_options(palette)
+    palette.add_argument('--data', help="Dataset usado por --palette auto")
+    palette.add_argument('--name', help='Nome do tema')
+    palette.add_argument('--list', action='store_true', help='Lista os presets')
+    palette.add_argument('--json', action='store_true', help='Imprime a paleta em JSON')
+    palette.add_argument('-o', '--output', help='Grava o tema JSON do Power BI')
+    palette.set_defaults(handler=cmd_palette)
+
+    layout = commands.add_parser('layout', help='Gera um layout de dashboard')
+    layout.add_argument('template', nargs='?', help='Template (ver --list)')
+    _add_layout_options(layout)
+    layout.add_argument('--data', help='Dataset cujas sugestões de visuais são posicionadas')
+    layout.add_argument('--list', action='store_true', help='Lista os templates')
+    layout.add_argument('--json', action='store_true', help='Imprime o layout em JSON (padrão: guia em markdown)')
+    layout.add_argument('-o', '--output', help='Grava o layout em JSON')
+    layout.set_defaults(handler=cmd_layout)
+
+    export = commands.add_parser('export', help='Pipeline completo sobre arquivos/diretórios, em paralelo')
+    export.add_argument('inputs', nargs='+', help='Arquivos e/ou diretórios de datasets')
+    export.add_argument('-o', '--output', required=True, help='Diretório de saída (um subdiretório por dataset)')
+    export.add_argument('--outputs', type=_outputs, default=['bundle', 'analysis'],
+                        help=f"Saídas por dataset, separadas por vírgula: {','.join(OUTPUTS)} (padrão: bundle,analysis)")
+    export.add_argument('--template', default=None, help='Template de layout (padrão: só as sugestões)')
+    _add_palette_options(export)
+    _add_layout_options(export)
+    export.add_argument('--workers', type=int, default=None, help='Processos em paralelo (padrão: nº de CPUs)')
+    export.add_argument('--recursive', action='store_true', help='Procura datasets nos subdiretórios')
+    export.add_argument('--no-zip', action='store_true', help='Não gera o zip do pacote de tema')
+    export.add_argument('-q', '--quiet', action='store_true', help='Só o resumo final')
+    export.set_defaults(handler=cmd_export)
+
+    schema = commands.add_parser('theme-schema', help='Substitui o schema de temas empacotado pelo oficial')
+    schema.add_argument('--version', default=OFFICIAL_SCHEMA_VERSION,
+                        help=f'Versão do reportThemeSchema (padrão: {OFFICIAL_SCHEMA_VERSION})')
+    schema.set_defaults(handler=cmd_theme_schema)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.trace:
+        tracing.reset()
+        tracing.enable()
+    try:
+        return args.handler(args)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        if args.trace:
+            tracing.disable()
+            print(tracing.format_summary(), file=sys.stderr)
+            print(f"🔬 Trace: {tracing.export_chrome_trace(args.trace)}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,483 @@
+"""
+Motor de Cores Vetorizado - Conversões e esquemas de paleta sobre arrays NumPy
+
+Todas as funções recebem arrays (..., 3) e convertem lotes inteiros de uma vez:
+
+    sRGB (0-1) <-> RGB linear <-> CIE XYZ (D65) <-> CIELAB
+                               <-> OKLab <-> OKLCH
+    sRGB (0-1) <-> HSV
+
+Os esquemas de paleta (análogo, triádico, ...) são tabelas de deslocamento de
+matiz/saturação/valor aplicadas a N cores base em uma única operação, o que
+permite avaliar milhares de paletas candidatas por segundo. Para uma única
+cor, scheme_hex usa a mesma tabela em Python puro (sem overhead de arrays).
+"""
+import colorsys
+from functools import lru_cache
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+
+
+ColorInput = Union[str, Sequence[str], np.ndarray]
+
+# Matrizes sRGB linear <-> XYZ (D65)
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_XYZ_TO_RGB = np.linalg.inv(_RGB_TO_XYZ)
+_WHITE_D65 = np.array([0.95047, 1.0, 1.08883])
+
+# Matrizes OKLab (Björn Ottosson)
+_RGB_TO_LMS = np.array([
+    [0.4122214708, 0.5363325363, 0.0514459929],
+    [0.2119034982, 0.6806995451, 0.1073969566],
+    [0.0883024619, 0.2817188376, 0.6299787005],
+])
+_LMS_TO_OKLAB = np.array([
+    [0.2104542553, 0.7936177850, -0.0040720468],
+    [1.9779984951, -2.4285922050, 0.4505937099],
+    [0.0259040371, 0.7827717662, -0.8086757660],
+])
+_OKLAB_TO_LMS = np.linalg.inv(_LMS_TO_OKLAB)
+_LMS_TO_RGB = np.linalg.inv(_RGB_TO_LMS)
+
+SPACES = ('srgb', 'linear', 'hsv', 'lab', 'oklab', 'oklch')
+
+# Croma OKLCH abaixo da qual a matiz é ruído numérico (cinzas de sRGB ficam em ~1e-8)
+ACHROMATIC_CHROMA = 1e-4
+
+
+# ---------------------------------------------------------------- HEX <-> sRGB
+
+def _rrggbb(color: str) -> str:
+    """'#RGB', '#RGBA', '#RRGGBB' ou '#RRGGBBAA' (com ou sem '#') -> 'RRGGBB'; alfa descartado"""
+    digits = color.strip().lstrip('#')
+    if len(digits) in (3, 4):
+        return ''.join(digit * 2 for digit in digits[:3])
+    if len(digits) not in (6, 8):
+        raise ValueError(f"Cor HEX inválida: {color!r} (use #RGB ou #RRGGBB)")
+    return digits[:6]
+
+
+def _is_hex(digits: str) -> bool:
+    try:
+        bytes.fromhex(digits)
+    except ValueError:
+        return False
+    return True
+
+
+def hex_to_rgb(colors: ColorInput) -> np.ndarray:
+    """HEX ('#RRGGBB', '#RGB' ou lista) -> array uint8 (n, 3)"""
+    if isinstance(colors, str):
+        colors = [colors]
+    digits = ''.join(_rrggbb(color) for color in colors)
+    try:
+        return np.frombuffer(bytes.fromhex(digits), dtype=np.uint8).reshape(-1, 3)
+    except ValueError:
+        invalid = next(color for color in colors if not _is_hex(_rrggbb(color)))
+        raise ValueError(f"Cor HEX inválida: {invalid!r} (use #RGB ou #RRGGBB)") from None
+
+
+def rgb_to_hex(rgb: np.ndarray) -> List[str]:
+    """Array (n, 3) uint8/int -> lista de '#RRGGBB'"""
+    digits = np.ascontiguousarray(rgb, dtype=np.uint8).reshape(-1, 3).tobytes().hex().upper()
+    return ['#' + digits[i:i + 6] for i in range(0, len(digits), 6)]
+
+
+def to_srgb(colors: ColorInput) -> np.ndarray:
+    """HEX, array uint8 (0-255) ou float (0-1) -> sRGB float (n, 3) em 0-1"""
+    if isinstance(colors, str) or (isinstance(colors, (list, tuple)) and colors and isinstance(colors[0], str)):
+        return hex_to_rgb(colors) / 255.0
+    array = np.asarray(colors)
+    if array.dtype.kind in 'ui':
+        return array / 255.0
+    return array.astype(np.float64, copy=False)
+
+
+def quantize(srgb: np.ndarray, mode: str = 'round') -> np.ndarray:
+    """sRGB 0-1 -> uint8; mode='truncate' reproduz int(x * 255)"""
+    scaled = np.clip(srgb, 0.0, 1.0) * 255
+    scaled = np.floor(scaled) if mode == 'truncate' else np.rint(scaled)
+    return scaled.astype(np.uint8)
+
+
+def srgb_to_hex(srgb: np.ndarray, mode: str = 'round') -> List[str]:
+    return rgb_to_hex(quantize(srgb, mode))
+
+
+# ---------------------------------------------------------------- sRGB <-> linear
+
+def srgb_to_linear(srgb: np.ndarray) -> np.ndarray:
+    srgb = np.asarray(srgb, dtype=np.float64)
+    return np.where(srgb <= 0.04045, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(linear: np.ndarray) -> np.ndarray:
+    linear = np.asarray(linear, dtype=np.float64)
+    return np.where(linear <= 0.0031308, linear * 12.92,
+                    1.055 * np.power(np.maximum(linear, 0.0031308), 1 / 2.4) - 0.055)
+
+
+# ---------------------------------------------------------------- sRGB <-> HSV
+
+def srgb_to_hsv(srgb: np.ndarray) -> np.ndarray:
+    """Mesmas operações de colorsys.rgb_to_hsv, vetorizadas (matiz em 0-1)"""
+    srgb = np.asarray(srgb, dtype=np.float64)
+    r, g, b = srgb[..., 0], srgb[..., 1], srgb[..., 2]
+    maxc = srgb.max(axis=-1)
+    minc = srgb.min(axis=-1)
+    rangec = maxc - minc
+    gray = rangec == 0
+    safe_range = np.where(gray, 1.0, rangec)
+
+    s = np.where(gray, 0.0, rangec / np.where(maxc == 0, 1.0, maxc))
+    rc = (maxc - r) / safe_range
+    gc = (maxc - g) / safe_range
+    bc = (maxc - b) / safe_range
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = np.where(gray, 0.0, (h / 6.0) % 1.0)
+    return np.stack([h, s, maxc], axis=-1)
+
+
+def hsv_to_srgb(hsv: np.ndarray) -> np.ndarray:
+    """Mesmas operações de colorsys.hsv_to_rgb, vetorizadas"""
+    hsv = np.asarray(hsv, dtype=np.float64)
+    h, s, v = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+    i = np.floor(h * 6.0)
+    f = (h * 6.0) - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = i.astype(np.int64) % 6
+
+    r = np.choose(i, [v, q, p, p, t, v])
+    g = np.choose(i, [t, v, v, q, p, p])
+    b = np.choose(i, [p, p, t, v, v, q])
+    rgb = np.stack([r, g, b], axis=-1)
+    # Sem saturação: cinza (colorsys devolve v, v, v)
+    return np.where((s == 0.0)[..., None], v[..., None], rgb)
+
+
+# ---------------------------------------------------------------- CIELAB
+
+def linear_to_xyz(linear: np.ndarray) -> np.ndarray:
+    return np.asarray(linear, dtype=np.float64) @ _RGB_TO_XYZ.T
+
+
+def xyz_to_linear(xyz: np.ndarray) -> np.ndarray:
+    return np.asarray(xyz, dtype=np.float64) @ _XYZ_TO_RGB.T
+
+
+def xyz_to_lab(xyz: np.ndarray) -> np.ndarray:
+    ratio = np.asarray(xyz, dtype=np.float64) / _WHITE_D65
+    delta = 6 / 29
+    f = np.where(ratio > delta ** 3, np.cbrt(ratio), ratio / (3 * delta ** 2) + 4 / 29)
+    L = 116 * f[..., 1] - 16
+    a = 500 * (f[..., 0] - f[..., 1])
+    b = 200 * (f[..., 1] - f[..., 2])
+    return np.stack([L, a, b], axis=-1)
+
+
+def lab_to_xyz(lab: np.ndarray) -> np.ndarray:
+    lab = np.asarray(lab, dtype=np.float64)
+    fy = (lab[..., 0] + 16) / 116
+    f = np.stack([fy + lab[..., 1] / 500, fy, fy - lab[..., 2] / 200], axis=-1)
+    delta = 6 / 29
+    ratio = np.where(f > delta, f ** 3, 3 * delta ** 2 * (f - 4 / 29))
+    return ratio * _WHITE_D65
+
+
+def srgb_to_lab(srgb: np.ndarray) -> np.ndarray:
+    return xyz_to_lab(linear_to_xyz(srgb_to_linear(srgb)))
+
+
+def lab_to_srgb(lab: np.ndarray) -> np.ndarray:
+    return linear_to_srgb(xyz_to_linear(lab_to_xyz(lab)))
+
+
+# ---------------------------------------------------------------- OKLab / OKLCH
+
+def linear_to_oklab(linear: np.ndarray) -> np.ndarray:
+    lms = np.asarray(linear, dtype=np.float64) @ _RGB_TO_LMS.T
+    return np.cbrt(lms) @ _LMS_TO_OKLAB.T
+
+
+def oklab_to_linear(oklab: np.ndarray) -> np.ndarray:
+    lms = (np.asarray(oklab, dtype=np.float64) @ _OKLAB_TO_LMS.T) ** 3
+    return lms @ _LMS_TO_RGB.T
+
+
+def oklab_to_oklch(oklab: np.ndarray) -> np.ndarray:
+    """OKLab -> OKLCH (matiz em graus, 0-360)"""
+    oklab = np.asarray(oklab, dtype=np.float64)
+    chroma = np.hypot(oklab[..., 1], oklab[..., 2])
+    hue = np.degrees(np.arctan2(oklab[..., 2], oklab[..., 1])) % 360
+    return np.stack([oklab[..., 0], chroma, hue], axis=-1)
+
+
+def oklch_to_oklab(oklch: np.ndarray) -> np.ndarray:
+    oklch = np.asarray(oklch, dtype=np.float64)
+    hue = np.radians(oklch[..., 2])
+    return np.stack([oklch[..., 0], oklch[..., 1] * np.cos(hue), oklch[..., 1] * np.sin(hue)], axis=-1)
+
+
+def srgb_to_oklab(srgb: np.ndarray) -> np.ndarray:
+    return linear_to_oklab(srgb_to_linear(srgb))
+
+
+def oklab_to_srgb(oklab: np.ndarray) -> np.ndarray:
+    return linear_to_srgb(oklab_to_linear(oklab))
+
+
+def srgb_to_oklch(srgb: np.ndarray) -> np.ndarray:
+    return oklab_to_oklch(srgb_to_oklab(srgb))
+
+
+def oklch_to_srgb(oklch: np.ndarray) -> np.ndarray:
+    return oklab_to_srgb(oklch_to_oklab(oklch))
+
+
+def in_gamut(srgb: np.ndarray, tolerance: float = 1e-6) -> np.ndarray:
+    srgb = np.asarray(srgb)
+    return ((srgb >= -tolerance) & (srgb <= 1 + tolerance)).all(axis=-1)
+
+
+def gamut_map_oklch(oklch: np.ndarray, iterations: int = 16) -> np.ndarray:
+    """
+    Traz cores OKLCH para dentro do gamut sRGB reduzindo só o croma
+
+    Bisseção vetorizada: mantém luminosidade e matiz, que são o que o olho
+    percebe primeiro, e devolve sRGB 0-1.
+    """
+    oklch = np.asarray(oklch, dtype=np.float64)
+    srgb = oklch_to_srgb(oklch)
+    outside = ~in_gamut(srgb)
+    if not outside.any():
+        return np.clip(srgb, 0.0, 1.0)
+
+    low = np.zeros(oklch.shape[:-1])
+    high = oklch[..., 1].copy()
+    candidate = oklch.copy()
+    for _ in range(iterations):
+        mid = (low + high) / 2
+        candidate[..., 1] = np.where(outside, mid, oklch[..., 1])
+        fits = in_gamut(oklch_to_srgb(candidate))
+        low = np.where(fits, mid, low)
+        high = np.where(fits, high, mid)
+    candidate[..., 1] = np.where(outside, low, oklch[..., 1])
+    return np.clip(oklch_to_srgb(candidate), 0.0, 1.0)
+
+
+_TO_SRGB = {
+    'srgb': lambda values: values,
+    'linear': linear_to_srgb,
+    'hsv': hsv_to_srgb,
+    'lab': lab_to_srgb,
+    'oklab': oklab_to_srgb,
+    'oklch': oklch_to_srgb,
+}
+_FROM_SRGB = {
+    'srgb': lambda values: values,
+    'linear': srgb_to_linear,
+    'hsv': srgb_to_hsv,
+    'lab': srgb_to_lab,
+    'oklab': srgb_to_oklab,
+    'oklch': srgb_to_oklch,
+}
+
+
+def convert(values: np.ndarray, source: str, target: str) -> np.ndarray:
+    """Converte um array (..., 3) entre quaisquer dos SPACES (via sRGB)"""
+    if source not in _TO_SRGB or target not in _FROM_SRGB:
+        raise ValueError(f"Espaço de cor desconhecido: {source} -> {target} (use {', '.join(SPACES)})")
+    if source == target:
+        return np.asarray(values, dtype=np.float64)
+    return _FROM_SRGB[target](_TO_SRGB[source](np.asarray(values, dtype=np.float64)))
+
+
+# ---------------------------------------------------------------- contraste
+
+def relative_luminance(srgb: np.ndarray) -> np.ndarray:
+    """Luminância relativa WCAG (limiar 0.03928 do texto da norma)"""
+    srgb = np.asarray(srgb, dtype=np.float64)
+    linear = np.where(srgb <= 0.03928, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+    return linear @ np.array([0.2126, 0.7152, 0.0722])
+
+
+def contrast_ratio(srgb_a: np.ndarray, srgb_b: np.ndarray) -> np.ndarray:
+    """Razão de contraste WCAG com broadcasting entre os dois arrays"""
+    la = relative_luminance(srgb_a)
+    lb = relative_luminance(srgb_b)
+    return (np.maximum(la, lb) + 0.05) / (np.minimum(la, lb) + 0.05)
+
+
+def _luminance_hex(color: str) -> float:
+    digits = color.lstrip('#')
+    r, g, b = (int(digits[i:i + 2], 16) / 255 for i in (0, 2, 4))
+    r, g, b = (c / 12.92 if c <= 0.03928 else ((c + 0.055) / 1.055) ** 2.4 for c in (r, g, b))
+    return r * 0.2126 + g * 0.7152 + b * 0.0722
+
+
+def contrast_ratio_hex(color_a: str, color_b: str) -> float:
+    """Razão de contraste de um único par HEX (caminho escalar, sem overhead de arrays)"""
+    la, lb = _luminance_hex(color_a), _luminance_hex(color_b)
+    return (max(la, lb) + 0.05) / (min(la, lb) + 0.05)
+
+
+# ---------------------------------------------------------------- esquemas
+
+SCHEMES = ('analogous', 'complementary', 'triadic', 'tetradic', 'monochromatic', 'split_complementary')
+
+
+@lru_cache(maxsize=128)
+def _scheme_table(scheme: str, count: int) -> Dict[str, np.ndarray]:
+    """
+    Deslocamentos de cada posição da paleta
+
+    matiz = ((h + a) [% 1 se wrap] + c1 + c2) % 1, saturação = s * s_mul e
+    valor = v * v_mul (ou v_abs quando definido). A ordem das somas segue a dos
+    geradores originais, para que as cores sejam idênticas às do colorsys.
+    Em cache: os arrays retornados são somente leitura.
+    """
+    a, wrap, c1, c2 = np.zeros(count), np.zeros(count, bool), np.zeros(count), np.zeros(count)
+    s_mul, v_mul, v_abs = np.ones(count), np.ones(count), np.full(count, np.nan)
+    keep_hue = np.zeros(count, bool)
+    index = np.arange(count)
+    twelfth = 30 / 360
+
+    if scheme == 'complementary':
+        a[1:2] = 0.5
+        wrap[1:2] = True
+        extra = index[2:] - 2
+        even = extra % 2 == 0
+        a[2:] = np.where(even, (extra + 1) * 0.1, 0.5)
+        wrap[2:] = ~even
+        c1[2:] = np.where(even, 0.0, (extra + 1) * 0.1)
+        s_mul[2:] = 0.8
+    elif scheme == 'triadic':
+        a[:] = (index % 3) / 3
+        a[:3] = index[:3] / 3
+        c1[3:] = 0.05 * index[3:]
+        s_mul[3:], v_mul[3:] = 0.8, 0.9
+    elif scheme == 'tetradic':
+        a[:] = (index % 4) / 4
+        a[:4] = index[:4] / 4
+        c1[4:] = 0.03 * index[4:]
+        s_mul[4:], v_mul[4:] = 0.8, 0.9
+    elif scheme == 'monochromatic':
+        factor = 0.3 + (index / (count - 1)) * 0.7 if count > 1 else np.ones(count)
+        s_mul[:] = factor
+        v_abs[:] = 0.4 + factor * 0.6
+        keep_hue[:] = True
+    elif scheme == 'split_complementary':
+        # Posição 0: matiz base; 1 e 2: vizinhas (±30°) da complementar
+        position = index % 3
+        base = position == 0
+        a[:] = np.where(base, 0.05 * index, 0.5)
+        wrap[:] = ~base
+        c1[:] = np.select([position == 1, position == 2], [-twelfth, twelfth], 0.0)
+        c2[3:] = np.where(base[3:], 0.0, 0.05 * index[3:])
+        s_mul[3:], v_mul[3:] = 0.8, 0.9
+    else:  # analogous
+        a[:] = (index - count // 2) * twelfth
+
+    table = {'a': a, 'wrap': wrap, 'c1': c1, 'c2': c2, 's_mul': s_mul,
+             'v_mul': v_mul, 'v_abs': v_abs, 'keep_hue': keep_hue}
+    for array in table.values():
+        array.setflags(write=False)
+    return table
+
+
+@lru_cache(maxsize=128)
+def _scheme_rows(scheme: str, count: int) -> tuple:
+    """Tabela do esquema como tuplas de floats Python (caminho escalar)"""
+    table = _scheme_table(scheme, count)
+    columns = [table[key].tolist() for key in ('a', 'wrap', 'c1', 'c2', 's_mul', 'v_mul', 'v_abs', 'keep_hue')]
+    return tuple(zip(*columns))
+
+
+def scheme_hex(base_color: str, scheme: str = 'analogous', count: int = 5) -> List[str]:
+    """Paleta de uma única cor base, em HEX (mesmo resultado de scheme_palettes)"""
+    digits = base_color.lstrip('#')
+    r, g, b = (int(digits[i:i + 2], 16) / 255 for i in (0, 2, 4))
+    h, s, v = colorsys.rgb_to_hsv(r, g, b)
+
+    colors = []
+    for a, wrap, c1, c2, s_mul, v_mul, v_abs, keep_hue in _scheme_rows(scheme, max(count, 0)):
+        if keep_hue:
+            hue = h
+        else:
+            hue = h + a
+            if wrap:
+                hue %= 1.0
+            hue = ((hue + c1) + c2) % 1.0
+        value = v * v_mul if v_abs != v_abs else v_abs  # NaN: valor relativo
+        rgb = colorsys.hsv_to_rgb(hue, s * s_mul, value)
+        colors.append('#%02X%02X%02X' % tuple(int(channel * 255) for channel in rgb))
+    return colors
+
+
+def scheme_palettes(base_srgb: np.ndarray, scheme: str = 'analogous', count: int = 5) -> np.ndarray:
+    """
+    Gera a paleta do esquema para N cores base de uma vez
+
+    Args:
+        base_srgb: Cores base (n, 3) em sRGB 0-1
+        scheme: Um de SCHEMES (desconhecido = analogous)
+        count: Cores por paleta
+
+    Returns:
+        Array (n, count, 3) em sRGB 0-1
+    """
+    base_hsv = srgb_to_hsv(np.asarray(base_srgb, dtype=np.float64).reshape(-1, 3))
+    if count <= 0:
+        return np.empty((len(base_hsv), 0, 3))
+    table = _scheme_table(scheme, count)
+    h = base_hsv[:, 0:1]
+    s = base_hsv[:, 1:2]
+    v = base_hsv[:, 2:3]
+
+    shifted = h + table['a']
+    shifted = np.where(table['wrap'], shifted % 1.0, shifted)
+    hue = ((shifted + table['c1']) + table['c2']) % 1.0
+    # Monocromático usa a matiz original sem módulo (já está em [0, 1))
+    hue = np.where(table['keep_hue'], h, hue)
+    saturation = s * table['s_mul']
+    value = np.where(np.isnan(table['v_abs']), v * table['v_mul'], table['v_abs'])
+
+    return hsv_to_srgb(np.stack(np.broadcast_arrays(hue, saturation, value), axis=-1))
+
+
+def interpolate(srgb_a: np.ndarray, srgb_b: np.ndarray, steps: int, space: str = 'srgb') -> np.ndarray:
+    """
+    Gradiente entre pares de cores no espaço pedido
+
+    Args:
+        srgb_a, srgb_b: Cores (n, 3) ou (3,) em sRGB 0-1
+        steps: Número de cores do gradiente
+        space: 'srgb', 'linear', 'lab', 'oklab' ou 'oklch'
+
+    Returns:
+        Array (n, steps, 3) ou (steps, 3) em sRGB 0-1
+    """
+    factor = np.linspace(0.0, 1.0, steps) if steps > 1 else np.zeros(max(steps, 0))
+    start = convert(srgb_a, 'srgb', space)
+    end = convert(srgb_b, 'srgb', space)
+    if space == 'oklch':
+        # Matiz indefinida em cores acromáticas (branco, preto, cinzas): usa a da outra ponta
+        start, end = start.copy(), end.copy()
+        gray_start = start[..., 1] < ACHROMATIC_CHROMA
+        gray_end = end[..., 1] < ACHROMATIC_CHROMA
+        start[..., 2] = np.where(gray_start, end[..., 2], start[..., 2])
+        end[..., 2] = np.where(gray_end & ~gray_start, start[..., 2], end[..., 2])
+        # Caminho mais curto na roda de matiz
+        delta = (end[..., 2] - start[..., 2] + 180) % 360 - 180
+        end[..., 2] = start[..., 2] + delta
+    mixed = start[..., None, :] + (end - start)[..., None, :] * factor[:, None]
+    if space == 'oklch':
+        return gamut_map_oklch(mixed)
+    return np.clip(convert(mixed, space, 'srgb'), 0.0, 1.0)
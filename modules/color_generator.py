@@ -1,11 +1,15 @@
 """
 Gerador de Paletas de Cores - Cria combinações harmônicas e profissionais
 """
-import colorsys
 import random
 from typing import List, Dict, Tuple
 import math
 
+import numpy as np
+
+from . import color_engine
+from .content_cache import ContentCache, default_cache, thaw
+
 
 class ColorGenerator:
     """Gera paletas de cores profissionais e harmônicas"""
@@ -77,8 +81,9 @@ class ColorGenerator:
         }
     }
     
-    def __init__(self):
+    def __init__(self, cache: ContentCache = None):
         self.current_palette = None
+        self.cache = cache if cache is not None else default_cache()
     
     def get_preset_palette(self, name: str) -> Dict:
         """Retorna uma paleta pré-definida"""
@@ -97,26 +102,21 @@ class ColorGenerator:
         Gera uma paleta a partir de uma cor base
         
         Schemes: analogous, complementary, triadic, tetradic, monochromatic, split_complementary
-        """
-        rgb = self._hex_to_rgb(base_color)
-        hsv = colorsys.rgb_to_hsv(rgb[0]/255, rgb[1]/255, rgb[2]/255)
         
-        colors = []
-        
-        if scheme == "analogous":
-            colors = self._generate_analogous(hsv, count)
-        elif scheme == "complementary":
-            colors = self._generate_complementary(hsv, count)
-        elif scheme == "triadic":
-            colors = self._generate_triadic(hsv, count)
-        elif scheme == "tetradic":
-            colors = self._generate_tetradic(hsv, count)
-        elif scheme == "monochromatic":
-            colors = self._generate_monochromatic(hsv, count)
-        elif scheme == "split_complementary":
-            colors = self._generate_split_complementary(hsv, count)
-        else:
-            colors = self._generate_analogous(hsv, count)
+        Memoizada por (cor base, esquema, quantidade): reruns do Streamlit não recalculam.
+        """
+        palette = self.cache.get_or_compute(
+            'palette', lambda: self._build_from_base_color(base_color, scheme, count),
+            base_color, scheme, count
+        )
+        # Cópia dos contêineres: quem recebe pode alterar sem afetar o cache. A chave
+        # ignora a caixa do HEX, então o nome reflete a cor como foi pedida
+        palette = thaw(palette)
+        palette["name"] = f"{scheme.title()} ({base_color})"
+        return palette
+    
+    def _build_from_base_color(self, base_color: str, scheme: str, count: int) -> Dict:
+        colors = color_engine.scheme_hex(base_color, scheme, count)
         
         return {
             "name": f"{scheme.title()} ({base_color})",
@@ -129,118 +129,73 @@ class ColorGenerator:
             "scheme": scheme
         }
     
-    def _generate_analogous(self, hsv: Tuple[float, float, float], count: int) -> List[str]:
-        """Cores análogas (próximas na roda de cores)"""
-        h, s, v = hsv
-        colors = []
-        step = 30 / 360  # 30 graus
-        
-        for i in range(count):
-            offset = (i - count // 2) * step
-            new_h = (h + offset) % 1.0
-            colors.append(self._hsv_to_hex(new_h, s, v))
-        
-        return colors
-    
-    def _generate_complementary(self, hsv: Tuple[float, float, float], count: int) -> List[str]:
-        """Cores complementares (opostas na roda)"""
-        h, s, v = hsv
-        colors = [self._hsv_to_hex(h, s, v)]
-        
-        # Cor complementar (180 graus)
-        comp_h = (h + 0.5) % 1.0
-        colors.append(self._hsv_to_hex(comp_h, s, v))
-        
-        # Variações
-        for i in range(count - 2):
-            if i % 2 == 0:
-                var_h = (h + (i + 1) * 0.1) % 1.0
-            else:
-                var_h = (comp_h + (i + 1) * 0.1) % 1.0
-            colors.append(self._hsv_to_hex(var_h, s * 0.8, v))
-        
-        return colors[:count]
-    
-    def _generate_triadic(self, hsv: Tuple[float, float, float], count: int) -> List[str]:
-        """Cores triádicas (120 graus de separação)"""
-        h, s, v = hsv
-        colors = []
-        
-        for i in range(3):
-            new_h = (h + i / 3) % 1.0
-            colors.append(self._hsv_to_hex(new_h, s, v))
-        
-        # Adiciona variações se precisar de mais cores
-        while len(colors) < count:
-            base_idx = len(colors) % 3
-            new_h = (h + base_idx / 3 + 0.05 * len(colors)) % 1.0
-            colors.append(self._hsv_to_hex(new_h, s * 0.8, v * 0.9))
+    def generate_batch(self, base_colors: List[str], scheme: str = "analogous", count: int = 5) -> List[List[str]]:
+        """
+        Gera a paleta do esquema para várias cores base de uma vez (vetorizado)
         
-        return colors[:count]
+        Returns:
+            Uma lista de cores HEX por cor base
+        """
+        palettes = color_engine.scheme_palettes(color_engine.to_srgb(base_colors), scheme, count)
+        hexes = color_engine.srgb_to_hex(palettes.reshape(-1, 3), 'truncate')
+        return [hexes[i:i + count] for i in range(0, len(hexes), count)] if count > 0 else [[] for _ in base_colors]
     
-    def _generate_tetradic(self, hsv: Tuple[float, float, float], count: int) -> List[str]:
-        """Cores tetrádicas (90 graus de separação)"""
-        h, s, v = hsv
-        colors = []
-        
-        for i in range(4):
-            new_h = (h + i / 4) % 1.0
-            colors.append(self._hsv_to_hex(new_h, s, v))
+    def generate_gradient(self, color1: str, color2: str, steps: int = 5, space: str = "srgb") -> List[str]:
+        """
+        Gera um gradiente entre duas cores
         
-        # Variações
-        while len(colors) < count:
-            base_idx = len(colors) % 4
-            new_h = (h + base_idx / 4 + 0.03 * len(colors)) % 1.0
-            colors.append(self._hsv_to_hex(new_h, s * 0.8, v * 0.9))
+        space: srgb (interpolação direta, padrão), linear, lab, oklab ou oklch
+        (perceptualmente uniformes)
+        """
+        if space == "srgb":
+            # Interpolação em 0-255 com truncamento, como nas versões anteriores
+            factor = np.arange(steps) / (steps - 1) if steps > 1 else np.zeros(max(steps, 0))
+            start, end = color_engine.hex_to_rgb([color1, color2]).astype(np.float64)
+            values = start + (end - start) * factor[:, None]
+            return color_engine.rgb_to_hex(np.trunc(values).astype(np.uint8))
         
-        return colors[:count]
+        srgb = color_engine.to_srgb([color1, color2])
+        return color_engine.srgb_to_hex(color_engine.interpolate(srgb[0], srgb[1], steps, space))
     
-    def _generate_monochromatic(self, hsv: Tuple[float, float, float], count: int) -> List[str]:
-        """Cores monocromáticas (mesma matiz, diferentes saturações/valores)"""
-        h, s, v = hsv
-        colors = []
+    def generate_categorical(self, count: int, brand_colors: List[str] = None, seed: int = 0) -> Dict:
+        """
+        Gera uma paleta categórica com N cores maximamente distinguíveis (OKLab)
         
-        for i in range(count):
-            factor = 0.3 + (i / (count - 1)) * 0.7 if count > 1 else 1
-            new_s = s * factor
-            new_v = 0.4 + factor * 0.6
-            colors.append(self._hsv_to_hex(h, new_s, new_v))
+        Args:
+            count: Número de categorias
+            brand_colors: Cores da marca que abrem a paleta
+            seed: Semente (mesma semente = mesma paleta)
+        """
+        from .palette_synthesis import synthesize_palette
         
-        return colors
+        colors = synthesize_palette(count, seed=seed, fixed=brand_colors or ())
+        return {
+            "name": f"Categórica ({count} cores)",
+            "primary": colors[0] if colors else "#1E88E5",
+            "secondary": colors[1] if len(colors) > 1 else "#FFA726",
+            "accent": colors[2] if len(colors) > 2 else "#26C6DA",
+            "background": "#FFFFFF",
+            "foreground": "#1A1A1A",
+            "colors": colors,
+            "scheme": "categorical"
+        }
     
-    def _generate_split_complementary(self, hsv: Tuple[float, float, float], count: int) -> List[str]:
-        """Cores complementares divididas"""
-        h, s, v = hsv
-        colors = [self._hsv_to_hex(h, s, v)]
-        
-        # Duas cores adjacentes à complementar
-        comp_h = (h + 0.5) % 1.0
-        colors.append(self._hsv_to_hex((comp_h - 30/360) % 1.0, s, v))
-        colors.append(self._hsv_to_hex((comp_h + 30/360) % 1.0, s, v))
-        
-        # Variações
-        while len(colors) < count:
-            idx = len(colors) % 3
-            base_h = h if idx == 0 else (comp_h - 30/360 if idx == 1 else comp_h + 30/360)
-            new_h = (base_h + 0.05 * len(colors)) % 1.0
-            colors.append(self._hsv_to_hex(new_h, s * 0.8, v * 0.9))
+    def suggest_palettes_for_columns(self, column_analysis: Dict, max_colors: int = 100,
+                                     brand_colors: List[str] = None) -> Dict[str, Dict]:
+        """
+        Paletas dimensionadas pela cardinalidade das colunas categóricas
         
-        return colors[:count]
-    
-    def generate_gradient(self, color1: str, color2: str, steps: int = 5) -> List[str]:
-        """Gera um gradiente entre duas cores"""
-        rgb1 = self._hex_to_rgb(color1)
-        rgb2 = self._hex_to_rgb(color2)
+        Args:
+            column_analysis: analysis['column_analysis'] do DataAnalyzer
+            max_colors: Limite de cores por coluna
+            brand_colors: Cores da marca que abrem cada paleta
         
-        gradient = []
-        for i in range(steps):
-            factor = i / (steps - 1) if steps > 1 else 0
-            r = int(rgb1[0] + (rgb2[0] - rgb1[0]) * factor)
-            g = int(rgb1[1] + (rgb2[1] - rgb1[1]) * factor)
-            b = int(rgb1[2] + (rgb2[2] - rgb1[2]) * factor)
-            gradient.append(self._rgb_to_hex(r, g, b))
+        Returns:
+            {coluna: {colors, levels, min_distance, truncated}}
+        """
+        from .palette_synthesis import palettes_for_columns
         
-        return gradient
+        return palettes_for_columns(column_analysis, max_colors, fixed=brand_colors or ())
     
     def suggest_palette_for_data(self, data_type: str, mood: str = "professional") -> Dict:
         """
@@ -274,12 +229,6 @@ class ColorGenerator:
         """Converte RGB para HEX"""
         return f"#{r:02x}{g:02x}{b:02x}".upper()
     
-    def _hsv_to_hex(self, h: float, s: float, v: float) -> str:
-        """Converte HSV para HEX"""
-        rgb = colorsys.hsv_to_rgb(h, s, v)
-        r, g, b = [int(x * 255) for x in rgb]
-        return self._rgb_to_hex(r, g, b)
-    
     def get_contrast_color(self, hex_color: str) -> str:
         """Retorna preto ou branco baseado no contraste"""
         rgb = self._hex_to_rgb(hex_color)
@@ -289,25 +238,7 @@ class ColorGenerator:
     
     def validate_accessibility(self, color1: str, color2: str) -> Dict[str, any]:
         """Valida contraste de cores para acessibilidade (WCAG)"""
-        rgb1 = self._hex_to_rgb(color1)
-        rgb2 = self._hex_to_rgb(color2)
-        
-        # Calcula luminância relativa
-        def relative_luminance(rgb):
-            rgb_norm = [c / 255 for c in rgb]
-            rgb_linear = []
-            for c in rgb_norm:
-                if c <= 0.03928:
-                    rgb_linear.append(c / 12.92)
-                else:
-                    rgb_linear.append(((c + 0.055) / 1.055) ** 2.4)
-            return 0.2126 * rgb_linear[0] + 0.7152 * rgb_linear[1] + 0.0722 * rgb_linear[2]
-        
-        l1 = relative_luminance(rgb1)
-        l2 = relative_luminance(rgb2)
-        
-        # Contraste
-        contrast = (max(l1, l2) + 0.05) / (min(l1, l2) + 0.05)
+        contrast = color_engine.contrast_ratio_hex(color1, color2)
         
         return {
             "contrast_ratio": round(contrast, 2),
@@ -317,3 +248,8 @@ class ColorGenerator:
             "wcag_aaa_large": contrast >= 4.5,
             "rating": "Excelente" if contrast >= 7 else "Bom" if contrast >= 4.5 else "Regular" if contrast >= 3 else "Ruim"
         }
+    
+    def contrast_ratios(self, foregrounds: List[str], background: str = "#FFFFFF") -> List[float]:
+        """Razões de contraste WCAG de várias cores contra um fundo (vetorizado)"""
+        ratios = color_engine.contrast_ratio(color_engine.to_srgb(foregrounds), color_engine.to_srgb(background))
+        return [round(ratio, 2) for ratio in ratios.tolist()]
@@ -0,0 +1,157 @@
+"""
+Cache Endereçado por Conteúdo - Memoização de paletas, temas e auditorias com LRU
+
+A chave é o hash (blake2b) das entradas canonicalizadas: dicts com chaves
+ordenadas, tuplas como listas e cores HEX em maiúsculas, de modo que
+{'colors': ['#1e88e5']} e {'colors': ['#1E88E5']} caem na mesma entrada.
+Os valores podem ser objetos (paletas) ou bytes serializados (temas JSON);
+o despejo é LRU limitado por número de entradas e por bytes.
+"""
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from . import tracing
+
+
+# Cores HEX como strings JSON inteiras ("#RRGGBB" / "#RRGGBBAA")
+_HEX_COLOR = re.compile(r'"#[0-9A-Fa-f]{6}(?:[0-9A-Fa-f]{2})?"')
+_HEX_LOWER = re.compile(r'"#(?=[0-9A-Fa-f]{0,7}[a-f])[0-9A-Fa-f]{6}(?:[0-9A-Fa-f]{2})?"')
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    return str(value)
+
+
+def canonical_json(*inputs: Any) -> str:
+    """
+    Serialização canônica das entradas: chaves ordenadas, tuplas como listas,
+    sets ordenados e cores HEX em maiúsculas
+    """
+    payload = json.dumps(list(inputs), sort_keys=True, separators=(',', ':'),
+                         ensure_ascii=False, default=_json_default)
+    # Paletas geradas aqui já vêm em maiúsculas: o sub só roda se houver HEX minúsculo
+    if _HEX_LOWER.search(payload):
+        payload = _HEX_COLOR.sub(lambda match: match.group(0).upper(), payload)
+    return payload
+
+
+def content_key(namespace: str, *inputs: Any) -> str:
+    """Chave de conteúdo: namespace + hash das entradas canonicalizadas"""
+    digest = hashlib.blake2b(canonical_json(*inputs).encode('utf-8'), digest_size=16).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+def thaw(value: Any) -> Any:
+    """Cópia dos contêineres (dict/list) de um valor em cache; folhas imutáveis são compartilhadas"""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    return value
+
+
+def _size_of(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, dict):
+        # Resultados com payload serializado (ex.: tema compilado): conta os bytes
+        return 256 + sum(len(item) for item in value.values() if isinstance(item, (bytes, bytearray)))
+    return 256  # objetos pequenos (paletas, relatórios): custo nominal
+
+
+class ContentCache:
+    """
+    Cache LRU thread-safe endereçado por conteúdo
+
+    Exemplo:
+        cache = ContentCache()
+        palette = cache.get_or_compute('palette', lambda: gerar(...), base_color, scheme, count)
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key: str, value: Any) -> Any:
+        size = _size_of(value)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._sizes[key]
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self.bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+                evicted, _ = self._entries.popitem(last=False)
+                self.bytes -= self._sizes.pop(evicted)
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, namespace: str, compute: Callable[[], Any], *inputs: Any) -> Any:
+        """Valor em cache para as entradas; calcula e guarda na primeira vez"""
+        key = content_key(namespace, *inputs)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                tracing.count('cache_hits')
+                return self._entries[key]
+            self.misses += 1
+        tracing.count('cache_misses')
+        # Calcula fora do lock; duas threads com a mesma chave só repetem o trabalho
+        return self.put(key, compute())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.bytes = self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
+
+
+_default_cache: Optional[ContentCache] = None
+
+
+def default_cache() -> ContentCache:
+    """Cache compartilhado do processo (usado quando nenhum é injetado)"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ContentCache()
+    return _default_cache
@@ -3,8 +3,9 @@ Analisador de Dados - Detecta tipos de dados e sugere visualizações apropriada
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, List, Tuple, Any, Callable, Optional
 from collections import Counter
+from . import tracing
 
 
 class DataAnalyzer:
@@ -16,8 +17,17 @@ class DataAnalyzer:
         self.recommendations = []
         self.powerbi_connector = powerbi_connector
     
-    def analyze_dataframe(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Analisa um DataFrame e retorna insights completos"""
+    @tracing.traced('analyzer.analyze_dataframe')
+    def analyze_dataframe(self, df: pd.DataFrame,
+                          progress: Optional[Callable[[float, str], None]] = None) -> Dict[str, Any]:
+        """
+        Analisa um DataFrame e retorna insights completos
+        
+        Args:
+            df: Dados
+            progress: Opcional, chamado como progress(fração, mensagem) a cada etapa
+                (ex.: JobContext.progress, que também interrompe a análise se o job for cancelado)
+        """
         if df is None or df.empty:
             return {"error": "DataFrame vazio ou inválido"}
         
@@ -30,18 +40,33 @@ class DataAnalyzer:
             "data_quality": {}
         }
         
+        tracing.count('rows', len(df))
+        
         # Analisa cada coluna
-        for col in df.columns:
-            analysis["column_analysis"][col] = self._analyze_column(df[col])
+        with tracing.span('analyzer.columns') as span:
+            for position, col in enumerate(df.columns):
+                if progress:
+                    progress(0.8 * position / len(df.columns), f"Coluna {col}")
+                analysis["column_analysis"][col] = self._analyze_column(df[col])
+            span.count('columns', len(df.columns))
         
         # Detecta relacionamentos
-        analysis["relationships"] = self._detect_relationships(df)
+        if progress:
+            progress(0.8, "Relacionamentos")
+        with tracing.span('analyzer.relationships'):
+            analysis["relationships"] = self._detect_relationships(df)
         
         # Sugere visualizações
-        analysis["suggested_visuals"] = self._suggest_visualizations(df, analysis["column_analysis"])
+        if progress:
+            progress(0.9, "Sugestões de visuais")
+        with tracing.span('analyzer.suggestions'):
+            analysis["suggested_visuals"] = self._suggest_visualizations(df, analysis["column_analysis"])
         
         # Qualidade dos dados
-        analysis["data_quality"] = self._assess_data_quality(df)
+        if progress:
+            progress(0.95, "Qualidade dos dados")
+        with tracing.span('analyzer.quality'):
+            analysis["data_quality"] = self._assess_data_quality(df)
         
         return analysis
     
@@ -186,10 +211,15 @@ class DataAnalyzer:
         
         # Correlação
         if len(numeric_cols) >= 2:
+            # Um ponto por identificador (ou categoria); sem ele o Power BI agrega tudo num ponto
+            id_cols = [col for col, info in column_analysis.items() if info['detected_type'] == 'identifier']
+            scatter_columns = {"x": numeric_cols[0], "y": numeric_cols[1]}
+            if id_cols or category_cols:
+                scatter_columns["details"] = (id_cols or category_cols)[0]
             suggestions.append({
                 "type": "scatter_plot",
                 "priority": "medium",
-                "columns": {"x": numeric_cols[0], "y": numeric_cols[1]},
+                "columns": scatter_columns,
                 "reason": "Análise de correlação entre métricas",
                 "title": f"Relação entre {numeric_cols[0]} e {numeric_cols[1]}"
             })
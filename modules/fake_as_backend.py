@@ -0,0 +1,1205 @@
+"""
+Backend Fake do Analysis Services - Servidor tabular em memória para testes offline
+
+Substitui ADOMD.NET/TOM em ambientes sem Windows, pythonnet ou Power BI Desktop:
+serve um modelo sintético, responde a um subconjunto de DAX, executa scripts TMSL
+no modelo em memória e permite injetar latências roteirizadas.
+"""
+import copy
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple, Callable
+
+from .as_backend import AnalysisServicesBackend
+
+
+class FakeDaxError(Exception):
+    """Erro de query DAX no backend local (equivalente ao AdomdErrorResponseException)"""
+
+
+class FakeTmslError(Exception):
+    """Erro de comando TMSL no backend local"""
+
+
+# ---------------------------------------------------------------------------
+# Objetos do modelo (mesmos atributos usados do TOM)
+# ---------------------------------------------------------------------------
+
+class FakeCollection(list):
+    """Coleção no estilo TOM: Count, índice numérico ou por nome"""
+
+    @property
+    def Count(self) -> int:
+        return len(self)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            item = self.Find(key)
+            if item is None:
+                raise KeyError(key)
+            return item
+        return list.__getitem__(self, key)
+
+    def Find(self, name: str):
+        for item in self:
+            if item.Name == name:
+                return item
+        return None
+
+
+class _TypeInfo:
+    def __init__(self, name: str):
+        self.Name = name
+
+
+class FakeColumn:
+    def __init__(self, name: str, data_type: str, is_hidden: bool = False):
+        self.Name = name
+        self.DataType = data_type
+        self.IsHidden = is_hidden
+
+
+class FakeMeasure:
+    def __init__(self, name: str, expression: str, format_string: str = None,
+                 description: str = None, display_folder: str = None):
+        self.Name = name
+        self.Expression = expression
+        self.FormatString = format_string
+        self.Description = description
+        self.DisplayFolder = display_folder
+
+
+class FakeAnnotation:
+    def __init__(self, name: str, value: str):
+        self.Name = name
+        self.Value = value
+
+
+class FakeTable:
+    """Tabela do modelo com dados em colunas (geradas sob demanda)"""
+
+    def __init__(self, name: str, columns: Dict[str, str],
+                 data_factory: Callable[[], Dict[str, List[Any]]], is_hidden: bool = False):
+        self.Name = name
+        self.IsHidden = is_hidden
+        self.Columns = FakeCollection(FakeColumn(col, dtype) for col, dtype in columns.items())
+        self.Measures = FakeCollection()
+        self._data_factory = data_factory
+        self._data = None
+
+    def GetType(self):
+        return _TypeInfo('Table')
+
+    @property
+    def data(self) -> Dict[str, List[Any]]:
+        if self._data is None:
+            self._data = self._data_factory()
+        return self._data
+
+    @property
+    def row_count(self) -> int:
+        data = self.data
+        return len(next(iter(data.values()))) if data else 0
+
+
+class FakeRelationship:
+    def __init__(self, name: str, from_table: FakeTable, from_column: FakeColumn,
+                 to_table: FakeTable, to_column: FakeColumn,
+                 from_cardinality: str = 'Many', to_cardinality: str = 'One',
+                 cross_filtering: str = 'OneDirection', is_active: bool = True):
+        self.Name = name
+        self.FromTable = from_table
+        self.FromColumn = from_column
+        self.ToTable = to_table
+        self.ToColumn = to_column
+        self.FromCardinality = from_cardinality
+        self.ToCardinality = to_cardinality
+        self.CrossFilteringBehavior = cross_filtering
+        self.IsActive = is_active
+
+
+class FakeModel:
+    def __init__(self, name: str = 'Model'):
+        self.Name = name
+        self.Tables = FakeCollection()
+        self.Relationships = FakeCollection()
+        self.Annotations = FakeCollection()
+
+
+class FakeDatabase:
+    def __init__(self, name: str, model: FakeModel):
+        self.Name = name
+        self.Model = model
+
+
+class FakeServer:
+    """Equivalente ao Microsoft.AnalysisServices.Tabular.Server já conectado"""
+
+    def __init__(self, databases: List[FakeDatabase]):
+        self.Databases = FakeCollection(databases)
+        self.Connected = True
+
+    def Disconnect(self):
+        self.Connected = False
+
+
+class FakeConnection:
+    """Equivalente ao AdomdConnection aberto"""
+
+    def __init__(self, database: str):
+        self.Database = database
+        self.State = 'Open'
+
+    def Close(self):
+        self.State = 'Closed'
+
+
+class FakeDataReader:
+    """Equivalente ao AdomdDataReader sobre um resultado materializado"""
+
+    def __init__(self, columns: List[str], rows: List[tuple]):
+        self._columns = columns
+        self._rows = rows
+        self._position = -1
+
+    @property
+    def FieldCount(self) -> int:
+        return len(self._columns)
+
+    def GetName(self, index: int) -> str:
+        return self._columns[index]
+
+    def Read(self) -> bool:
+        self._position += 1
+        return self._position < len(self._rows)
+
+    def GetValue(self, index: int):
+        return self._rows[self._position][index]
+
+    def Close(self):
+        self._position = len(self._rows)
+
+
+# ---------------------------------------------------------------------------
+# Modelo sintético
+# ---------------------------------------------------------------------------
+
+DEFAULT_TABLE_ROWS = {'Sales': 10000, 'Product': 100, 'Customer': 500, 'Date': 365}
+
+CATEGORIES = ['Eletrônicos', 'Vestuário', 'Alimentos', 'Casa', 'Esportes']
+REGIONS = ['Norte', 'Nordeste', 'Centro-Oeste', 'Sudeste', 'Sul']
+SEGMENTS = ['Varejo', 'Atacado', 'Corporativo']
+
+
+def build_synthetic_model(table_rows: Optional[Dict[str, int]] = None, seed: int = 42) -> FakeModel:
+    """
+    Cria um modelo estrela sintético (Sales, Product, Customer, Date)
+
+    Args:
+        table_rows: Número de linhas por tabela (sobrescreve DEFAULT_TABLE_ROWS)
+        seed: Semente para dados reprodutíveis
+
+    Returns:
+        Modelo em memória com medidas e relacionamentos
+    """
+    sizes = {**DEFAULT_TABLE_ROWS, **(table_rows or {})}
+    start_date = datetime(2023, 1, 1)
+
+    def date_data():
+        dates = [start_date + timedelta(days=i) for i in range(sizes['Date'])]
+        return {
+            'Date': dates,
+            'Year': [d.year for d in dates],
+            'Month': [d.month for d in dates]
+        }
+
+    def product_data():
+        rng = random.Random(seed + 1)
+        n = sizes['Product']
+        return {
+            'ProductKey': list(range(1, n + 1)),
+            'Product': [f'Produto {i}' for i in range(1, n + 1)],
+            'Category': [CATEGORIES[i % len(CATEGORIES)] for i in range(n)],
+            'Price': [round(rng.uniform(5, 500), 2) for _ in range(n)]
+        }
+
+    def customer_data():
+        rng = random.Random(seed + 2)
+        n = sizes['Customer']
+        return {
+            'CustomerKey': list(range(1, n + 1)),
+            'Customer': [f'Cliente {i}' for i in range(1, n + 1)],
+            'Region': [rng.choice(REGIONS) for _ in range(n)],
+            'Segment': [rng.choice(SEGMENTS) for _ in range(n)]
+        }
+
+    def sales_data():
+        rng = random.Random(seed + 3)
+        n = sizes['Sales']
+        quantities = [rng.randint(1, 10) for _ in range(n)]
+        return {
+            'SalesKey': list(range(1, n + 1)),
+            'OrderDate': [start_date + timedelta(days=rng.randrange(sizes['Date'])) for _ in range(n)],
+            'ProductKey': [rng.randint(1, sizes['Product']) for _ in range(n)],
+            'CustomerKey': [rng.randint(1, sizes['Customer']) for _ in range(n)],
+            'Quantity': quantities,
+            'Amount': [round(q * rng.uniform(5, 500), 2) for q in quantities]
+        }
+
+    model = FakeModel()
+    date = FakeTable('Date', {'Date': 'DateTime', 'Year': 'Int64', 'Month': 'Int64'}, date_data)
+    product = FakeTable('Product', {'ProductKey': 'Int64', 'Product': 'String',
+                                    'Category': 'String', 'Price': 'Decimal'}, product_data)
+    customer = FakeTable('Customer', {'CustomerKey': 'Int64', 'Customer': 'String',
+                                      'Region': 'String', 'Segment': 'String'}, customer_data)
+    sales = FakeTable('Sales', {'SalesKey': 'Int64', 'OrderDate': 'DateTime', 'ProductKey': 'Int64',
+                                'CustomerKey': 'Int64', 'Quantity': 'Int64', 'Amount': 'Decimal'}, sales_data)
+
+    sales.Measures.extend([
+        FakeMeasure('Total Sales', "SUM('Sales'[Amount])", '#,##0.00'),
+        FakeMeasure('Total Quantity', "SUM('Sales'[Quantity])", '#,##0'),
+        FakeMeasure('Orders', "COUNTROWS('Sales')", '#,##0'),
+        FakeMeasure('Average Ticket', "DIVIDE([Total Sales], [Orders])", '#,##0.00'),
+    ])
+    model.Tables.extend([sales, product, customer, date])
+
+    for fact_col, dim, dim_col in [('ProductKey', product, 'ProductKey'),
+                                   ('CustomerKey', customer, 'CustomerKey'),
+                                   ('OrderDate', date, 'Date')]:
+        model.Relationships.append(FakeRelationship(
+            f'Sales_{dim.Name}', sales, sales.Columns[fact_col], dim, dim.Columns[dim_col]
+        ))
+
+    return model
+
+
+# ---------------------------------------------------------------------------
+# Subconjunto de DAX
+# ---------------------------------------------------------------------------
+
+_TOKEN_RE = re.compile(r'''
+    (?P<ws>\s+|--[^\n]*|//[^\n]*|/\*.*?\*/)
+  | (?P<string>"(?:[^"]|"")*")
+  | (?P<table>'(?:[^']|'')*')
+  | (?P<column>\[(?:[^\]]|\]\])*\])
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_.]*)
+  | (?P<op><=|>=|<>|==|&&|\|\||[(),+\-*/=<>&])
+''', re.VERBOSE | re.DOTALL)
+
+_DATA_TYPE_CODES = {'String': 2, 'Int64': 6, 'Double': 8, 'DateTime': 9, 'Decimal': 10, 'Boolean': 11}
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = _TOKEN_RE.match(text, position)
+        if not match:
+            raise FakeDaxError(f"Erro de sintaxe DAX próximo de: {text[position:position + 20]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        position = match.end()
+
+        if kind == 'ws':
+            continue
+        if kind == 'string':
+            value = value[1:-1].replace('""', '"')
+        elif kind == 'table':
+            value = value[1:-1].replace("''", "'")
+        elif kind == 'column':
+            value = value[1:-1].replace(']]', ']')
+        tokens.append((kind, value))
+    return tokens
+
+
+class _DaxParser:
+    """Parser descendente recursivo para o subconjunto de DAX suportado"""
+
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def peek(self, offset: int = 0) -> Tuple[Optional[str], Optional[str]]:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def next(self) -> Tuple[str, str]:
+        token = self.peek()
+        if token[0] is None:
+            raise FakeDaxError("Fim inesperado da query DAX")
+        self.pos += 1
+        return token
+
+    def expect(self, kind: str, value: str = None) -> str:
+        token_kind, token_value = self.next()
+        if token_kind != kind or (value is not None and token_value.upper() != value):
+            raise FakeDaxError(f"Erro de sintaxe DAX: esperado {value or kind}, encontrado {token_value!r}")
+        return token_value
+
+    def at_keyword(self, word: str) -> bool:
+        kind, value = self.peek()
+        return kind == 'ident' and value.upper() == word
+
+    def at_op(self, *ops: str) -> bool:
+        kind, value = self.peek()
+        return kind == 'op' and value in ops
+
+    def parse_query(self) -> Dict[str, Any]:
+        measures, variables, order = {}, [], []
+
+        if self.at_keyword('DEFINE'):
+            self.next()
+            while True:
+                if self.at_keyword('MEASURE'):
+                    self.next()
+                    kind, table = self.next()
+                    if kind not in ('table', 'ident'):
+                        raise FakeDaxError("Erro de sintaxe DAX: tabela esperada em MEASURE")
+                    name = self.expect('column')
+                    self.expect('op', '=')
+                    measures[name] = self.parse_expr()
+                elif self.at_keyword('VAR'):
+                    self.next()
+                    name = self.expect('ident')
+                    self.expect('op', '=')
+                    variables.append((name, self.parse_expr()))
+                else:
+                    break
+
+        self.expect('ident', 'EVALUATE')
+        evaluate = self.parse_expr()
+
+        if self.at_keyword('ORDER'):
+            self.next()
+            self.expect('ident', 'BY')
+            while True:
+                expr = self.parse_expr()
+                descending = False
+                if self.at_keyword('ASC') or self.at_keyword('DESC'):
+                    descending = self.next()[1].upper() == 'DESC'
+                order.append((expr, descending))
+                if not self.at_op(','):
+                    break
+                self.next()
+
+        if self.peek()[0] is not None:
+            raise FakeDaxError(f"Construção DAX não suportada pelo backend local: {self.peek()[1]!r}")
+
+        return {'measures': measures, 'vars': variables, 'evaluate': evaluate, 'order': order}
+
+    def parse_expression_only(self):
+        expr = self.parse_expr()
+        if self.peek()[0] is not None:
+            raise FakeDaxError(f"Erro de sintaxe DAX próximo de {self.peek()[1]!r}")
+        return expr
+
+    def parse_expr(self):
+        return self._binary(0)
+
+    _LEVELS = [('||',), ('&&',), ('=', '==', '<>', '<', '>', '<=', '>='), ('&',), ('+', '-'), ('*', '/')]
+
+    def _binary(self, level: int):
+        if level == len(self._LEVELS):
+            return self._unary()
+        left = self._binary(level + 1)
+        while self.at_op(*self._LEVELS[level]):
+            op = self.next()[1]
+            left = ('binop', op, left, self._binary(level + 1))
+        return left
+
+    def _unary(self):
+        if self.at_op('-'):
+            self.next()
+            return ('neg', self._unary())
+        if self.at_op('+'):
+            self.next()
+            return self._unary()
+        return self._primary()
+
+    def _primary(self):
+        kind, value = self.next()
+
+        if kind == 'number':
+            return ('const', float(value) if '.' in value else int(value))
+        if kind == 'string':
+            return ('const', value)
+        if kind == 'op' and value == '(':
+            expr = self.parse_expr()
+            self.expect('op', ')')
+            return expr
+        if kind == 'table':
+            if self.peek()[0] == 'column':
+                return ('colref', value, self.next()[1])
+            return ('table', value)
+        if kind == 'column':
+            return ('colref', None, value)
+        if kind == 'ident':
+            if value.upper() == 'VAR':
+                return self._var_block(value)
+            if self.at_op('('):
+                self.next()
+                args = []
+                if not self.at_op(')'):
+                    while True:
+                        args.append(self.parse_expr())
+                        if not self.at_op(','):
+                            break
+                        self.next()
+                self.expect('op', ')')
+                return ('call', value.upper(), args)
+            if self.peek()[0] == 'column':
+                return ('colref', value, self.next()[1])
+            return ('name', value)
+
+        raise FakeDaxError(f"Erro de sintaxe DAX próximo de {value!r}")
+
+    def _var_block(self, _):
+        variables = []
+        while True:
+            name = self.expect('ident')
+            self.expect('op', '=')
+            variables.append((name, self.parse_expr()))
+            if self.at_keyword('VAR'):
+                self.next()
+                continue
+            self.expect('ident', 'RETURN')
+            return ('let', variables, self.parse_expr())
+
+
+class _Table:
+    """Resultado tabular intermediário (com índices de origem quando é tabela do modelo)"""
+
+    def __init__(self, columns: List[str], rows: List[tuple],
+                 source: Optional[str] = None, indices: Optional[List[int]] = None):
+        self.columns = columns
+        self.rows = rows
+        self.source = source
+        self.indices = indices
+
+    def row_context(self, position: int) -> Dict[str, Any]:
+        row = {}
+        for column, value in zip(self.columns, self.rows[position]):
+            row[column] = value
+            row.setdefault(_bare_name(column), value)
+        if self.source is not None:
+            row['__source__'] = self.source
+            row['__index__'] = self.indices[position]
+        return row
+
+
+def _bare_name(column: str) -> str:
+    return column[column.rfind('[') + 1:-1] if column.endswith(']') else column
+
+
+class _Context:
+    def __init__(self, row=None, filters=None, variables=None):
+        self.row = row
+        self.filters = filters or {}
+        self.variables = variables or {}
+
+    def derive(self, row=..., filters=None, variables=None):
+        return _Context(
+            self.row if row is ... else row,
+            self.filters if filters is None else filters,
+            self.variables if variables is None else {**self.variables, **variables}
+        )
+
+
+class _DaxEvaluator:
+    """Avalia queries DAX parseadas sobre o modelo em memória"""
+
+    AGGREGATIONS = {'SUM', 'AVERAGE', 'MIN', 'MAX', 'COUNT', 'COUNTA', 'DISTINCTCOUNT'}
+
+    def __init__(self, model: FakeModel, parsed_measures: Dict[str, Any]):
+        self.model = model
+        self.parsed_measures = parsed_measures
+        self.query_measures = {}
+
+    def run(self, query: Dict[str, Any]) -> Tuple[List[str], List[tuple]]:
+        self.query_measures = query['measures']
+        ctx = _Context()
+        for name, expr in query['vars']:
+            ctx = ctx.derive(variables={name.upper(): self.scalar(expr, ctx)})
+
+        table = self.table(query['evaluate'], ctx)
+
+        if query['order']:
+            def sort_key(position):
+                row_ctx = ctx.derive(row=table.row_context(position))
+                return [_SortKey(self.scalar(expr, row_ctx), desc) for expr, desc in query['order']]
+            order = sorted(range(len(table.rows)), key=sort_key)
+            return table.columns, [table.rows[i] for i in order]
+
+        return table.columns, table.rows
+
+    # -- tabelas --------------------------------------------------------------
+
+    def table(self, node, ctx: _Context) -> _Table:
+        kind = node[0]
+
+        if kind in ('table', 'name'):
+            return self._scan(node[1], ctx)
+
+        if kind != 'call':
+            raise FakeDaxError("A expressão de EVALUATE deve retornar uma tabela")
+
+        name, args = node[1], node[2]
+        handler = {
+            'TOPN': self._topn,
+            'ROW': self._row,
+            'SUMMARIZECOLUMNS': self._summarizecolumns,
+            'SELECTCOLUMNS': self._selectcolumns,
+            'FILTER': self._filter,
+            'VALUES': self._values,
+            'DISTINCT': self._values,
+            'INFO.TABLES': self._info_tables,
+            'INFO.COLUMNS': self._info_columns,
+            'INFO.MEASURES': self._info_measures,
+            'INFO.RELATIONSHIPS': self._info_relationships,
+        }.get(name)
+
+        if handler is None:
+            raise FakeDaxError(f"Função de tabela não suportada pelo backend local: {name}")
+        return handler(args, ctx)
+
+    def _model_table(self, name: str) -> FakeTable:
+        table = self.model.Tables.Find(name)
+        if table is None:
+            raise FakeDaxError(f"Não foi possível encontrar a tabela '{name}'")
+        return table
+
+    def _scan(self, name: str, ctx: _Context) -> _Table:
+        table = self._model_table(name)
+        data = table.data
+        columns = [column.Name for column in table.Columns]
+        indices = self._filtered_indices(name, ctx.filters)
+        series = [data[column] for column in columns]
+        rows = [tuple(values[i] for values in series) for i in indices]
+        return _Table([f"{name}[{column}]" for column in columns], rows, name, indices)
+
+    def _filtered_indices(self, name: str, filters: Dict[str, set]) -> List[int]:
+        """Linhas visíveis da tabela, propagando filtros das dimensões relacionadas"""
+        table = self._model_table(name)
+        allowed = filters.get(name)
+        indices = range(table.row_count) if allowed is None else sorted(allowed)
+
+        for rel in self.model.Relationships:
+            target = rel.ToTable.Name
+            if rel.IsActive and rel.FromTable.Name == name and target in filters and target != name:
+                target_data = rel.ToTable.data[rel.ToColumn.Name]
+                keys = {target_data[i] for i in filters[target]}
+                source_data = table.data[rel.FromColumn.Name]
+                indices = [i for i in indices if source_data[i] in keys]
+
+        return list(indices)
+
+    def _topn(self, args, ctx):
+        if len(args) < 2:
+            raise FakeDaxError("TOPN requer ao menos 2 argumentos")
+        count = int(self.scalar(args[0], ctx))
+        table = self.table(args[1], ctx)
+
+        order_args = args[2:]
+        positions = list(range(len(table.rows)))
+        if order_args:
+            keys = []
+            i = 0
+            while i < len(order_args):
+                expr = order_args[i]
+                descending = True  # padrão do TOPN
+                if i + 1 < len(order_args) and order_args[i + 1][0] == 'name' \
+                        and order_args[i + 1][1].upper() in ('ASC', 'DESC'):
+                    descending = order_args[i + 1][1].upper() == 'DESC'
+                    i += 1
+                keys.append((expr, descending))
+                i += 1
+
+            def sort_key(position):
+                row_ctx = ctx.derive(row=table.row_context(position))
+                return [_SortKey(self.scalar(expr, row_ctx), desc) for expr, desc in keys]
+            positions.sort(key=sort_key)
+
+        positions = positions[:max(count, 0)]
+        return _Table(
+            table.columns, [table.rows[p] for p in positions], table.source,
+            [table.indices[p] for p in positions] if table.source else None
+        )
+
+    def _name_value_pairs(self, args, function: str) -> List[Tuple[str, Any]]:
+        if len(args) % 2:
+            raise FakeDaxError(f"{function}: argumentos devem ser pares nome/expressão")
+        pairs = []
+        for i in range(0, len(args), 2):
+            if args[i][0] != 'const' or not isinstance(args[i][1], str):
+                raise FakeDaxError(f"{function}: nome de coluna deve ser uma string")
+            pairs.append((args[i][1], args[i + 1]))
+        return pairs
+
+    def _row(self, args, ctx):
+        pairs = self._name_value_pairs(args, 'ROW')
+        return _Table([f"[{name}]" for name, _ in pairs], [tuple(self.scalar(expr, ctx) for _, expr in pairs)])
+
+    def _selectcolumns(self, args, ctx):
+        table = self.table(args[0], ctx)
+        pairs = self._name_value_pairs(args[1:], 'SELECTCOLUMNS')
+        rows = []
+        for position in range(len(table.rows)):
+            row_ctx = ctx.derive(row=table.row_context(position))
+            rows.append(tuple(self.scalar(expr, row_ctx) for _, expr in pairs))
+        return _Table([f"[{name}]" for name, _ in pairs], rows)
+
+    def _filter(self, args, ctx):
+        if len(args) != 2:
+            raise FakeDaxError("FILTER requer 2 argumentos")
+        table = self.table(args[0], ctx)
+        keep = [
+            position for position in range(len(table.rows))
+            if self.scalar(args[1], ctx.derive(row=table.row_context(position)))
+        ]
+        return _Table(
+            table.columns, [table.rows[p] for p in keep], table.source,
+            [table.indices[p] for p in keep] if table.source else None
+        )
+
+    def _values(self, args, ctx):
+        if len(args) != 1 or args[0][0] != 'colref' or not args[0][1]:
+            raise FakeDaxError("VALUES/DISTINCT: apenas referências 'Tabela'[Coluna] são suportadas")
+        _, table_name, column = args[0]
+        data = self._column_data(table_name, column)
+        values = []
+        seen = set()
+        for i in self._filtered_indices(table_name, ctx.filters):
+            if data[i] not in seen:
+                seen.add(data[i])
+                values.append((data[i],))
+        return _Table([f"{table_name}[{column}]"], values)
+
+    def _summarizecolumns(self, args, ctx):
+        group_columns = []
+        position = 0
+        while position < len(args) and args[position][0] == 'colref':
+            group_columns.append(args[position])
+            position += 1
+
+        filters = dict(ctx.filters)
+        while position < len(args) and not (args[position][0] == 'const' and isinstance(args[position][1], str)):
+            filter_table = self.table(args[position], ctx)
+            if filter_table.source is None:
+                raise FakeDaxError("SUMMARIZECOLUMNS: apenas filtros sobre tabelas do modelo são suportados")
+            filters[filter_table.source] = set(filter_table.indices)
+            position += 1
+
+        pairs = self._name_value_pairs(args[position:], 'SUMMARIZECOLUMNS')
+        columns = [f"{t}[{c}]" for _, t, c in group_columns] + [f"[{name}]" for name, _ in pairs]
+
+        if not group_columns:
+            values = tuple(self.scalar(expr, ctx.derive(filters=filters)) for _, expr in pairs)
+            return _Table(columns, [values] if any(v is not None for v in values) else [])
+
+        tables = {t for _, t, _ in group_columns}
+        if len(tables) != 1 or None in tables:
+            raise FakeDaxError("SUMMARIZECOLUMNS: agrupamento por colunas de uma única tabela suportado")
+        group_table = tables.pop()
+        series = [self._column_data(group_table, c) for _, _, c in group_columns]
+
+        groups: Dict[tuple, List[int]] = {}
+        for i in self._filtered_indices(group_table, filters):
+            groups.setdefault(tuple(values[i] for values in series), []).append(i)
+
+        rows = []
+        for key in sorted(groups, key=lambda k: [_SortKey(v, False) for v in k]):
+            group_ctx = ctx.derive(filters={**filters, group_table: set(groups[key])})
+            values = tuple(self.scalar(expr, group_ctx) for _, expr in pairs)
+            if pairs and all(v is None for v in values):
+                continue
+            rows.append(key + values)
+        return _Table(columns, rows)
+
+    def _info_tables(self, args, ctx):
+        rows = [(i, 1, t.Name, None, t.IsHidden) for i, t in enumerate(self.model.Tables, 1)]
+        return _Table(['[ID]', '[ModelID]', '[Name]', '[Description]', '[IsHidden]'], rows)
+
+    def _info_columns(self, args, ctx):
+        rows = []
+        column_id = 1
+        for table_id, table in enumerate(self.model.Tables, 1):
+            for column in table.Columns:
+                rows.append((column_id, table_id, column.Name,
+                             _DATA_TYPE_CODES.get(column.DataType, 1), column.IsHidden))
+                column_id += 1
+        return _Table(['[ID]', '[TableID]', '[ExplicitName]', '[DataType]', '[IsHidden]'], rows)
+
+    def _info_measures(self, args, ctx):
+        rows = []
+        measure_id = 1
+        for table_id, table in enumerate(self.model.Tables, 1):
+            for measure in table.Measures:
+                rows.append((measure_id, table_id, measure.Name, measure.Expression,
+                             measure.FormatString, measure.Description, measure.DisplayFolder))
+                measure_id += 1
+        return _Table(['[ID]', '[TableID]', '[Name]', '[Expression]',
+                       '[FormatString]', '[Description]', '[DisplayFolder]'], rows)
+
+    def _info_relationships(self, args, ctx):
+        rows = [
+            (i, rel.Name, rel.IsActive, rel.CrossFilteringBehavior,
+             rel.FromTable.Name, rel.FromColumn.Name, rel.FromCardinality,
+             rel.ToTable.Name, rel.ToColumn.Name, rel.ToCardinality)
+            for i, rel in enumerate(self.model.Relationships, 1)
+        ]
+        return _Table(['[ID]', '[Name]', '[IsActive]', '[CrossFilteringBehavior]',
+                       '[FromTable]', '[FromColumn]', '[FromCardinality]',
+                       '[ToTable]', '[ToColumn]', '[ToCardinality]'], rows)
+
+    # -- escalares ------------------------------------------------------------
+
+    def _column_data(self, table_name: str, column: str) -> List[Any]:
+        table = self._model_table(table_name)
+        if table.Columns.Find(column) is None:
+            raise FakeDaxError(f"Não foi possível encontrar a coluna '{table_name}'[{column}]")
+        return table.data[column]
+
+    def _measure_expression(self, name: str):
+        if name in self.query_measures:
+            return self.query_measures[name]
+        for table in self.model.Tables:
+            measure = table.Measures.Find(name)
+            if measure is not None:
+                if measure.Expression not in self.parsed_measures:
+                    self.parsed_measures[measure.Expression] = _DaxParser(measure.Expression).parse_expression_only()
+                return self.parsed_measures[measure.Expression]
+        return None
+
+    def scalar(self, node, ctx: _Context):
+        kind = node[0]
+
+        if kind == 'const':
+            return node[1]
+
+        if kind == 'colref':
+            _, table_name, column = node
+            row = ctx.row or {}
+            key = f"{table_name}[{column}]" if table_name else column
+            if key in row:
+                return row[key]
+
+            measure = self._measure_expression(column)
+            if measure is not None:
+                filters = ctx.filters
+                if '__source__' in row:
+                    # Transição de contexto: a linha atual vira filtro
+                    filters = {**filters, row['__source__']: {row['__index__']}}
+                return self.scalar(measure, _Context(None, filters, {}))
+
+            raise FakeDaxError(
+                f"Não é possível determinar um valor único para a coluna "
+                f"'{table_name or ''}'[{column}] neste contexto"
+            )
+
+        if kind == 'name':
+            variable = node[1].upper()
+            if variable in ctx.variables:
+                return ctx.variables[variable]
+            raise FakeDaxError(f"Nome desconhecido na expressão DAX: {node[1]}")
+
+        if kind == 'let':
+            local = ctx
+            for name, expr in node[1]:
+                local = local.derive(variables={name.upper(): self.scalar(expr, local)})
+            return self.scalar(node[2], local)
+
+        if kind == 'neg':
+            value = self.scalar(node[1], ctx)
+            return None if value is None else -value
+
+        if kind == 'binop':
+            return self._binop(node[1], self.scalar(node[2], ctx), self.scalar(node[3], ctx))
+
+        if kind == 'call':
+            return self._call(node[1], node[2], ctx)
+
+        raise FakeDaxError("Uma tabela não pode ser usada onde um valor escalar é esperado")
+
+    def _binop(self, op: str, left, right):
+        if op in ('&&', '||'):
+            return (bool(left) and bool(right)) if op == '&&' else (bool(left) or bool(right))
+        if op == '&':
+            return f"{'' if left is None else left}{'' if right is None else right}"
+
+        if op in ('=', '==', '<>', '<', '>', '<=', '>='):
+            if isinstance(left, str) and isinstance(right, str) and op in ('=', '<>'):
+                left, right = left.lower(), right.lower()
+            elif op == '=':
+                left = 0 if left is None and isinstance(right, (int, float)) else left
+                right = 0 if right is None and isinstance(left, (int, float)) else right
+            if op in ('=', '=='):
+                return left == right
+            if op == '<>':
+                return left != right
+            left_key, right_key = _SortKey(left, False), _SortKey(right, False)
+            return {'<': left_key < right_key, '>': right_key < left_key,
+                    '<=': not right_key < left_key, '>=': not left_key < right_key}[op]
+
+        if left is None and right is None:
+            return None
+        if op == '/':
+            if not right:
+                raise FakeDaxError("Divisão por zero")
+            return (left or 0) / right
+        left = 0 if left is None else left
+        right = 0 if right is None else right
+        if isinstance(left, datetime) or isinstance(right, datetime):
+            return left - right if op == '-' else left + right
+        return {'+': left + right, '-': left - right, '*': left * right}[op]
+
+    def _call(self, name: str, args, ctx: _Context):
+        if name in self.AGGREGATIONS:
+            if len(args) != 1 or args[0][0] != 'colref' or not args[0][1]:
+                raise FakeDaxError(f"{name}: apenas referências 'Tabela'[Coluna] são suportadas")
+            _, table_name, column = args[0]
+            data = self._column_data(table_name, column)
+            indices = self._filtered_indices(table_name, ctx.filters)
+            if name == 'COUNTA':
+                return sum(1 for i in indices if data[i] is not None) or None
+            values = [data[i] for i in indices if data[i] is not None]
+            if name == 'DISTINCTCOUNT':
+                return len(set(values)) or None
+            if name == 'COUNT':
+                return len(values) or None
+            if not values:
+                return None
+            if name == 'SUM':
+                return sum(values)
+            if name == 'AVERAGE':
+                return sum(values) / len(values)
+            return min(values) if name == 'MIN' else max(values)
+
+        if name in ('SUMX', 'AVERAGEX', 'MINX', 'MAXX'):
+            table = self.table(args[0], ctx)
+            values = [
+                self.scalar(args[1], ctx.derive(row=table.row_context(p)))
+                for p in range(len(table.rows))
+            ]
+            values = [v for v in values if v is not None]
+            if not values:
+                return None
+            return {'SUMX': sum, 'MINX': min, 'MAXX': max}.get(name, lambda v: sum(v) / len(v))(values)
+
+        if name == 'COUNTROWS':
+            if len(args) != 1:
+                raise FakeDaxError("COUNTROWS requer 1 argumento")
+            if args[0][0] in ('table', 'name') and args[0][1].upper() not in ctx.variables:
+                count = len(self._filtered_indices(args[0][1], ctx.filters))
+            else:
+                count = len(self.table(args[0], ctx).rows)
+            return count or None
+
+        if name == 'CALCULATE':
+            filters = dict(ctx.filters)
+            for arg in args[1:]:
+                if not (arg[0] == 'binop' and arg[1] == '=' and arg[2][0] == 'colref' and arg[2][1]):
+                    raise FakeDaxError("CALCULATE: apenas filtros 'Tabela'[Coluna] = valor são suportados")
+                _, table_name, column = arg[2]
+                value = self.scalar(arg[3], ctx)
+                data = self._column_data(table_name, column)
+                filters[table_name] = {
+                    i for i in range(len(data)) if self._binop('=', data[i], value)
+                }
+            return self.scalar(args[0], _Context(None, filters, ctx.variables))
+
+        if name == 'DIVIDE':
+            numerator = self.scalar(args[0], ctx)
+            denominator = self.scalar(args[1], ctx)
+            if not denominator:
+                return self.scalar(args[2], ctx) if len(args) > 2 else None
+            return None if numerator is None else numerator / denominator
+
+        if name == 'IF':
+            if self.scalar(args[0], ctx):
+                return self.scalar(args[1], ctx)
+            return self.scalar(args[2], ctx) if len(args) > 2 else None
+
+        simple = {
+            'BLANK': lambda: None,
+            'TRUE': lambda: True,
+            'FALSE': lambda: False,
+            'NOW': datetime.now,
+            'TODAY': lambda: datetime.now().replace(hour=0, minute=0, second=0, microsecond=0),
+        }
+        if name in simple:
+            return simple[name]()
+
+        values = [self.scalar(arg, ctx) for arg in args]
+        if name == 'ABS':
+            return None if values[0] is None else abs(values[0])
+        if name == 'ROUND':
+            return None if values[0] is None else round(values[0], int(values[1]) if len(values) > 1 else 0)
+        if name == 'FORMAT':
+            return '' if values[0] is None else str(values[0])
+
+        raise FakeDaxError(f"Função não suportada pelo backend local: {name}")
+
+
+class _SortKey:
+    """Chave de ordenação tolerante a tipos mistos e valores em branco"""
+
+    __slots__ = ('value', 'descending')
+
+    def __init__(self, value, descending: bool):
+        self.value = value
+        self.descending = descending
+
+    def __lt__(self, other):
+        a, b = (other.value, self.value) if self.descending else (self.value, other.value)
+        if a is None or b is None:
+            return a is None and b is not None
+        try:
+            return a < b
+        except TypeError:
+            return str(a) < str(b)
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+# ---------------------------------------------------------------------------
+# Backend
+# ---------------------------------------------------------------------------
+
+class FakeAnalysisServicesBackend(AnalysisServicesBackend):
+    """
+    Servidor Analysis Services local em memória
+
+    Exemplo:
+        backend = FakeAnalysisServicesBackend(table_rows={'Sales': 100000},
+                                              latency={'query': 0.02, 'server': 0.3})
+        connector = PowerBIConnector(backend=backend)
+        connector.connect_to_desktop(port=backend.port)
+
+    Latências por operação ('connect', 'query', 'command', 'server', 'discover'
+    ou '*' para todas) podem ser um número em segundos, uma lista roteirizada
+    (consumida em ordem, repetindo o último valor) ou uma função (op, texto) -> segundos.
+    """
+
+    name = 'fake'
+
+    # Propriedades TMSL de medida -> atributos de FakeMeasure
+    MEASURE_PROPERTIES = {
+        'expression': 'Expression',
+        'formatString': 'FormatString',
+        'description': 'Description',
+        'displayFolder': 'DisplayFolder'
+    }
+
+    def __init__(self, table_rows: Optional[Dict[str, int]] = None, seed: int = 42,
+                 latency: Optional[Dict[str, Any]] = None, model: Optional[FakeModel] = None,
+                 database: str = 'FakeModel', port: int = 55555):
+        """
+        Args:
+            table_rows: Linhas por tabela do modelo sintético
+            seed: Semente dos dados sintéticos
+            latency: Latências injetadas por operação
+            model: Modelo pronto (ignora table_rows/seed)
+            database: Nome do database servido
+            port: Porta simulada da instância
+        """
+        self.model = model or build_synthetic_model(table_rows, seed)
+        self.database = database
+        self.port = port
+        self.latency = latency or {}
+        self.stats = Counter()
+        self._scripts = {}
+        self._parsed_measures = {}
+        self._lock = threading.RLock()
+
+    def _delay(self, operation: str, text: str = ''):
+        """Aplica a latência configurada e contabiliza a operação"""
+        spec = self.latency.get(operation, self.latency.get('*', 0))
+
+        if callable(spec):
+            seconds = spec(operation, text)
+        elif isinstance(spec, (list, tuple)):
+            script = self._scripts.setdefault(operation, deque(spec))
+            seconds = script.popleft() if len(script) > 1 else (script[0] if script else 0)
+        else:
+            seconds = spec
+
+        with self._lock:
+            self.stats[operation] += 1
+        if seconds:
+            time.sleep(seconds)
+
+    def reset_stats(self):
+        """Zera contadores de operações e roteiros de latência"""
+        with self._lock:
+            self.stats.clear()
+            self._scripts.clear()
+
+    def load(self) -> bool:
+        return True
+
+    def list_instances(self) -> Optional[List[Dict[str, Any]]]:
+        self._delay('discover')
+        return [{
+            'name': f'localhost:{self.port}',
+            'port': self.port,
+            'dataset': self.database
+        }]
+
+    def is_port_open(self, host: str, port: int) -> bool:
+        return port == self.port
+
+    def open_connection(self, connection_string: str):
+        self._delay('connect', connection_string)
+        return FakeConnection(self.database)
+
+    def execute_reader(self, connection, query: str):
+        if getattr(connection, 'State', 'Open') != 'Open':
+            raise FakeDaxError("A conexão não está aberta")
+
+        self._delay('query', query)
+        parsed = _DaxParser(query).parse_query()
+        with self._lock:
+            columns, rows = _DaxEvaluator(self.model, self._parsed_measures).run(parsed)
+        return FakeDataReader(columns, rows)
+
+    def open_server(self, connection_string: str):
+        self._delay('server', connection_string)
+        return FakeServer([FakeDatabase(self.database, self.model)])
+
+    def execute_command(self, connection, script: str) -> None:
+        self._delay('command', script)
+
+        try:
+            command = json.loads(script)
+        except ValueError as e:
+            raise FakeTmslError(f"Script TMSL inválido: {e}")
+
+        with self._lock:
+            # Comandos são transacionais: em caso de erro o modelo volta ao estado anterior
+            snapshot = self._snapshot()
+            try:
+                self._apply(command)
+            except Exception:
+                self._restore(snapshot)
+                raise
+
+    def _snapshot(self):
+        return (
+            {table.Name: list(table.Measures) for table in self.model.Tables},
+            list(self.model.Relationships),
+            list(self.model.Annotations)
+        )
+
+    def _restore(self, snapshot):
+        measures, relationships, annotations = snapshot
+        for table in self.model.Tables:
+            table.Measures[:] = measures.get(table.Name, [])
+        self.model.Relationships[:] = relationships
+        self.model.Annotations[:] = annotations
+
+    def _apply(self, command: Dict[str, Any]):
+        """Aplica um comando TMSL ao modelo em memória"""
+        if 'sequence' in command:
+            for operation in command['sequence'].get('operations', []):
+                self._apply(operation)
+
+        elif 'createOrReplace' in command:
+            body = command['createOrReplace']
+            path = body.get('object', {})
+            if 'measure' in body:
+                table = self._table(path.get('table'))
+                definition = body['measure']
+                name = definition.get('name', path.get('measure'))
+                table.Measures[:] = [m for m in table.Measures if m.Name != name]
+                table.Measures.append(FakeMeasure(
+                    name, definition.get('expression', ''), definition.get('formatString'),
+                    definition.get('description'), definition.get('displayFolder')
+                ))
+            elif 'relationship' in body:
+                relationship = self._relationship(body['relationship'])
+                self.model.Relationships[:] = [
+                    r for r in self.model.Relationships if r.Name != relationship.Name
+                ]
+                self.model.Relationships.append(relationship)
+            else:
+                raise FakeTmslError("createOrReplace: tipo de objeto não suportado pelo backend local")
+
+        elif 'delete' in command:
+            path = command['delete'].get('object', {})
+            if 'measure' in path:
+                table = self._table(path.get('table'))
+                if table.Measures.Find(path['measure']) is None:
+                    raise FakeTmslError(f"Medida '{path['measure']}' não encontrada")
+                table.Measures[:] = [m for m in table.Measures if m.Name != path['measure']]
+            elif 'relationship' in path:
+                if self.model.Relationships.Find(path['relationship']) is None:
+                    raise FakeTmslError(f"Relacionamento '{path['relationship']}' não encontrado")
+                self.model.Relationships[:] = [
+                    r for r in self.model.Relationships if r.Name != path['relationship']
+                ]
+            else:
+                raise FakeTmslError("delete: tipo de objeto não suportado pelo backend local")
+
+        elif 'alter' in command:
+            body = command['alter']
+            if 'measure' in body:
+                path = body.get('object', {})
+                table = self._table(path.get('table'))
+                current = table.Measures.Find(path.get('measure'))
+                if current is None:
+                    raise FakeTmslError(f"Medida '{path.get('measure')}' não encontrada")
+                # alter muda só as propriedades enviadas; a cópia mantém o snapshot válido
+                measure = copy.copy(current)
+                for prop, attribute in self.MEASURE_PROPERTIES.items():
+                    if prop in body['measure']:
+                        setattr(measure, attribute, body['measure'][prop])
+                table.Measures[:] = [measure if m is current else m for m in table.Measures]
+                return
+            target = body.get('model') or body.get('database') or {}
+            if 'annotations' in target:
+                self.model.Annotations[:] = [
+                    FakeAnnotation(a['name'], a.get('value')) for a in target['annotations']
+                ]
+
+        elif 'refresh' in command:
+            pass  # Recalculo é implícito: medidas são avaliadas sob demanda
+
+        else:
+            raise FakeTmslError(f"Comando TMSL não suportado pelo backend local: {list(command)}")
+
+    def _table(self, name: str) -> FakeTable:
+        table = self.model.Tables.Find(name)
+        if table is None:
+            raise FakeTmslError(f"Tabela '{name}' não encontrada")
+        return table
+
+    def _relationship(self, definition: Dict[str, Any]) -> FakeRelationship:
+        from_table = self._table(definition.get('fromTable'))
+        to_table = self._table(definition.get('toTable'))
+        from_column = from_table.Columns.Find(definition.get('fromColumn'))
+        to_column = to_table.Columns.Find(definition.get('toColumn'))
+        if from_column is None or to_column is None:
+            raise FakeTmslError("Coluna do relacionamento não encontrada")
+
+        from_card = definition.get('fromCardinality')
+        to_card = definition.get('toCardinality')
+        if not from_card and definition.get('cardinality'):
+            parts = re.findall(r'Many|One', definition['cardinality'], re.IGNORECASE)
+            from_card, to_card = (parts + ['many', 'one'])[:2]
+
+        cross_filter = str(definition.get('crossFilteringBehavior', 'oneDirection')).lower()
+        return FakeRelationship(
+            definition.get('name') or f"{from_table.Name}_{to_table.Name}",
+            from_table, from_column, to_table, to_column,
+            str(from_card or 'many').capitalize(), str(to_card or 'one').capitalize(),
+            'BothDirections' if 'both' in cross_filter else
+            'Automatic' if cross_filter == 'automatic' else 'OneDirection',
+            definition.get('isActive', True)
+        )
@@ -0,0 +1,429 @@
+"""
+Fila de Jobs - Operações longas em segundo plano, com progresso, cancelamento e persistência
+
+O script do Streamlit roda de novo a cada interação; trabalho feito inline
+bloqueia a página e é interrompido por um rerun. Aqui cada operação longa
+(análise de um arquivo grande, benchmark de medidas, exportação de pacote) é
+submetida a um pool de threads (ou de processos, para funções puras e
+serializáveis) e fica num registro do processo: a sessão guarda só o id do
+job e consulta o estado a cada rerun.
+
+Funções que aceitam o parâmetro `job` recebem um JobContext para reportar
+progresso; job.progress() também é o ponto de cancelamento cooperativo
+(levanta JobCancelled se o cancelamento foi pedido). Por padrão os jobs ficam
+só em memória. Com storage_dir (opcional; ex.: DEFAULT_STORAGE), metadados e
+resultados dos jobs concluídos (até max_jobs) são gravados lá (pickle,
+diretório privado do usuário, 0700) e recarregados quando o processo reinicia;
+jobs de outro processo do app ainda vivo não são tocados.
+"""
+import inspect
+import json
+import logging
+import os
+import pickle
+import stat
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, List, Any, Callable, Hashable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('pending', 'running')
+FINAL_STATUSES = ('done', 'failed', 'cancelled')
+# Persistência opcional, por usuário (não no temp compartilhado): os resultados são pickles
+DEFAULT_STORAGE = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                               'powerbi_assistant', 'jobs')
+
+
+class JobCancelled(Exception):
+    """Levantada dentro do job quando o cancelamento foi pedido"""
+
+
+class JobContext:
+    """
+    Canal entre a função do job e o registro (progresso e cancelamento)
+
+    Exemplo:
+        def analisar(df, job=None):
+            for i, col in enumerate(df.columns):
+                job.progress(i / len(df.columns), f"Coluna {col}")
+                ...
+    """
+
+    def __init__(self, record: Dict[str, Any], cancel_event: threading.Event, lock: threading.Lock):
+        self._record = record
+        self._cancel_event = cancel_event
+        self._lock = lock
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check(self):
+        if self._cancel_event.is_set():
+            raise JobCancelled(self._record['id'])
+
+    def progress(self, fraction: float, message: Optional[str] = None):
+        """Atualiza o progresso (0..1) e a mensagem; levanta JobCancelled se cancelado"""
+        with self._lock:
+            self._record['progress'] = round(min(max(float(fraction), 0.0), 1.0), 4)
+            if message is not None:
+                self._record['message'] = message
+        self.check()
+
+
+def private_dir(path: str) -> bool:
+    """Cria o diretório com 0700; False se não for um diretório só deste usuário (pickle inseguro)"""
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        info = os.lstat(path)
+        if not stat.S_ISDIR(info.st_mode):
+            return False
+        if hasattr(os, 'getuid'):
+            if info.st_uid != os.getuid():
+                return False
+            if info.st_mode & 0o077:
+                os.chmod(path, 0o700)
+    except OSError:
+        return False
+    return True
+
+
+def process_alive(pid: int) -> bool:
+    """Se o processo ainda existe (jobs dele não são marcados nem apagados por outro processo)"""
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        # os.kill no Windows encerra o processo: consulta o código de saída
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def accepts_context(fn: Callable) -> bool:
+    try:
+        return 'job' in inspect.signature(fn).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+class JobQueue:
+    """
+    Pool de threads/processos com registro de jobs do processo
+
+    Exemplo:
+        queue = JobQueue(max_workers=4)
+        job_id = queue.submit('Análise', analyzer.analyze_dataframe, df, owner=session_id)
+        queue.status(job_id)    # {'status': 'running', 'progress': 0.4, ...}
+        queue.cancel(job_id)
+        queue.result(job_id)    # resultado (da memória ou do disco)
+    """
+
+    def __init__(self, max_workers: int = 4, process_workers: int = 0, storage_dir: Optional[str] = None,
+                 max_jobs: int = 200):
+        """
+        Args:
+            max_workers: Threads do pool (também acompanham os jobs de processo)
+            process_workers: Processos do pool de processos (0 = os.cpu_count())
+            storage_dir: Diretório de persistência dos jobs (padrão None = só memória); precisa
+                ser privado deste usuário, senão os jobs ficam só em memória. Os resultados são
+                gravados em pickle: análises completas de datasets podem ocupar bastante disco
+            max_jobs: Jobs concluídos mantidos no registro (e no disco); os mais antigos são descartados
+        """
+        self.max_workers = max_workers
+        self.process_workers = process_workers or None
+        self.instance_id = uuid.uuid4().hex[:12]
+        if storage_dir and not private_dir(storage_dir):
+            logger.warning("%s não é um diretório privado deste usuário: jobs só em memória", storage_dir)
+            storage_dir = None
+        self.storage_dir = storage_dir
+        self.max_jobs = max_jobs
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._results: Dict[str, Any] = {}
+        self._events: Dict[str, threading.Event] = {}
+        self._futures: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._threads = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._processes: Optional[ProcessPoolExecutor] = None
+        if storage_dir:
+            self._restore()
+
+    def submit(self, name: str, fn: Callable, *args, owner: Optional[str] = None, key: Optional[Hashable] = None,
+               executor: str = 'thread', **kwargs) -> str:
+        """
+        Submete um job e retorna o id
+
+        Args:
+            name: Descrição exibida na interface
+            fn: Função do job (recebe job=JobContext se tiver esse parâmetro)
+            owner: Dono do job (ex.: id da sessão), para listar só os seus
+            key: Identidade do trabalho; enquanto um job com a mesma key estiver ativo, ele é reaproveitado
+            executor: 'thread' ou 'process' (função e argumentos serializáveis; sem JobContext)
+            *args, **kwargs: Argumentos da função
+        """
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"executor inválido: {executor}")
+        with self._lock:
+            if key is not None:
+                for record in self._jobs.values():
+                    if record['key'] == repr(key) and record['owner'] == owner and record['status'] in ACTIVE_STATUSES:
+                        return record['id']
+            job_id = uuid.uuid4().hex[:12]
+            record = {
+                'id': job_id,
+                'name': name,
+                'owner': owner,
+                'pid': os.getpid(),
+                'instance': self.instance_id,
+                'key': repr(key) if key is not None else None,
+                'executor': executor,
+                'status': 'pending',
+                'progress': 0.0,
+                'message': 'Na fila',
+                'error': None,
+                'cancel_requested': False,
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'elapsed_ms': None
+            }
+            self._jobs[job_id] = record
+            self._events[job_id] = threading.Event()
+        self._save(record)
+        future = self._threads.submit(self._run, job_id, fn, args, kwargs)
+        with self._lock:
+            if record['status'] in ACTIVE_STATUSES:
+                self._futures[job_id] = future
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cópia do registro do job (None se não existe)"""
+        with self._lock:
+            record = self._jobs.get(job_id)
+            return dict(record) if record else None
+
+    def jobs(self, owner: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Registros dos jobs (do dono, se informado), mais recentes primeiro"""
+        with self._lock:
+            records = [dict(record) for record in self._jobs.values() if owner is None or record['owner'] == owner]
+        return sorted(records, key=lambda record: record['created_at'], reverse=True)
+
+    def result(self, job_id: str, default: Any = None) -> Any:
+        """Resultado de um job concluído (recarregado do disco se preciso)"""
+        with self._lock:
+            if job_id in self._results:
+                return self._results[job_id]
+            record = self._jobs.get(job_id)
+        if not record or record['status'] != 'done' or not self.storage_dir:
+            return default
+        try:
+            with open(self._path(job_id, 'pkl'), 'rb') as f:
+                if hasattr(os, 'getuid') and os.fstat(f.fileno()).st_uid != os.getuid():
+                    return default
+                value = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            return default
+        with self._lock:
+            self._results[job_id] = value
+        return value
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Bloqueia até o job terminar (ou o timeout) e retorna o registro"""
+        future = self._futures.get(job_id)
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except FutureTimeout:
+                pass
+        return self.status(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Pede o cancelamento do job
+
+        Jobs na fila são cancelados na hora; em execução, o cancelamento é
+        cooperativo (JobContext) e, sem ele, o resultado é descartado ao final.
+        """
+        with self._lock:
+            record = self._jobs.get(job_id)
+            if not record or record['status'] in FINAL_STATUSES:
+                return False
+            record['cancel_requested'] = True
+            record['message'] = 'Cancelando...'
+            self._events[job_id].set()
+        future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            self._finish(job_id, 'cancelled', message='Cancelado antes de iniciar')
+        return True
+
+    def remove(self, job_id: str) -> bool:
+        """Remove um job concluído do registro e do disco"""
+        with self._lock:
+            record = self._jobs.get(job_id)
+            if not record or record['status'] not in FINAL_STATUSES:
+                return False
+            self._forget(job_id)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {status: 0 for status in ACTIVE_STATUSES + FINAL_STATUSES}
+            for record in self._jobs.values():
+                counts[record['status']] += 1
+        return {'jobs': sum(counts.values()), 'workers': self.max_workers, **counts}
+
+    def shutdown(self, wait: bool = False):
+        for job_id in [record['id'] for record in self.jobs() if record['status'] in ACTIVE_STATUSES]:
+            self.cancel(job_id)
+        self._threads.shutdown(wait=wait, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job_id: str, fn: Callable, args: tuple, kwargs: Dict[str, Any]):
+        event = self._events[job_id]
+        with self._lock:
+            record = self._jobs[job_id]
+            cancelled = event.is_set()
+            if not cancelled:
+                record['status'] = 'running'
+                record['message'] = 'Executando'
+                record['started_at'] = time.time()
+        if cancelled:
+            self._finish(job_id, 'cancelled', message='Cancelado antes de iniciar')
+            return
+        self._save(record)
+
+        try:
+            if record['executor'] == 'process':
+                result = self._run_in_process(fn, args, kwargs, event)
+            elif accepts_context(fn):
+                result = fn(*args, job=JobContext(record, event, self._lock), **kwargs)
+            else:
+                result = fn(*args, **kwargs)
+        except JobCancelled:
+            self._finish(job_id, 'cancelled', message='Cancelado')
+        except Exception as e:
+            self._finish(job_id, 'failed', error=f"{type(e).__name__}: {e}", message='Falhou')
+        else:
+            if event.is_set():
+                self._finish(job_id, 'cancelled', message='Cancelado (resultado descartado)')
+            else:
+                self._finish(job_id, 'done', result=result, message='Concluído')
+
+    def _run_in_process(self, fn: Callable, args: tuple, kwargs: Dict[str, Any], event: threading.Event) -> Any:
+        if self._processes is None:
+            with self._lock:
+                if self._processes is None:
+                    self._processes = ProcessPoolExecutor(max_workers=self.process_workers)
+        future = self._processes.submit(fn, *args, **kwargs)
+        while True:
+            try:
+                return future.result(timeout=0.1)
+            except FutureTimeout:
+                if event.is_set():
+                    future.cancel()
+                    raise JobCancelled()
+
+    def _finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None,
+                message: Optional[str] = None):
+        with self._lock:
+            record = self._jobs.get(job_id)
+            if record is None or record['status'] in FINAL_STATUSES:
+                return
+            record['status'] = status
+            record['error'] = error
+            record['message'] = message or status
+            record['finished_at'] = time.time()
+            if status == 'done':
+                record['progress'] = 1.0
+                self._results[job_id] = result
+            if record['started_at']:
+                record['elapsed_ms'] = round((record['finished_at'] - record['started_at']) * 1000, 2)
+            self._futures.pop(job_id, None)
+            snapshot = dict(record)
+        if status == 'done':
+            self._save_result(job_id, result)
+        self._save(snapshot)
+        self._prune()
+
+    def _prune(self):
+        with self._lock:
+            finished = sorted((record for record in self._jobs.values() if record['status'] in FINAL_STATUSES),
+                              key=lambda record: record['finished_at'] or 0)
+            for record in finished[:max(len(finished) - self.max_jobs, 0)]:
+                self._forget(record['id'])
+
+    def _forget(self, job_id: str):
+        self._jobs.pop(job_id, None)
+        self._results.pop(job_id, None)
+        self._events.pop(job_id, None)
+        if self.storage_dir:
+            for extension in ('json', 'pkl'):
+                try:
+                    os.remove(self._path(job_id, extension))
+                except OSError:
+                    pass
+
+    def _path(self, job_id: str, extension: str) -> str:
+        return os.path.join(self.storage_dir, f"{job_id}.{extension}")
+
+    def _save(self, record: Dict[str, Any]):
+        if not self.storage_dir:
+            return
+        path = self._path(record['id'], 'json')
+        try:
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            logger.warning("Não foi possível gravar o job %s: %s", record['id'], e)
+
+    def _save_result(self, job_id: str, result: Any):
+        if not self.storage_dir:
+            return
+        path = self._path(job_id, 'pkl')
+        try:
+            with open(path + '.tmp', 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + '.tmp', path)
+        except (OSError, pickle.PickleError, TypeError, AttributeError) as e:
+            logger.warning("Resultado do job %s não persistido: %s", job_id, e)
+
+    def _restore(self):
+        # Jobs que estavam ativos quando o processo parou não voltam a rodar; os de
+        # outro processo ainda vivo (ou ativos em outra fila deste) ficam como estão
+        for filename in os.listdir(self.storage_dir):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.storage_dir, filename), encoding='utf-8') as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                continue
+            pid = record.get('pid')
+            if pid and process_alive(pid) and (pid != os.getpid() or record.get('status') in ACTIVE_STATUSES):
+                continue
+            if record.get('status') in ACTIVE_STATUSES:
+                record.update(status='failed', message='Interrompido', error='Processo reiniciado durante o job')
+                self._save(record)
+            self._jobs[record['id']] = record
+            self._events[record['id']] = threading.Event()
+        self._prune()
@@ -0,0 +1,258 @@
+"""
+Geração de Layouts em Lote - Muitas páginas e resoluções com posições em arrays NumPy
+
+As posições de cada página ficam em um record array (x, y, width, height,
+z_index); o redimensionamento para cada resolução é uma única transformação
+vetorizada sobre todas as páginas e os dicts/JSON só são montados na exportação.
+"""
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+import numpy as np
+
+from .layout_engine import LayoutEngine
+
+
+POSITION_DTYPE = np.dtype([
+    ('x', np.int32), ('y', np.int32),
+    ('width', np.int32), ('height', np.int32),
+    ('z_index', np.int16)
+])
+
+# Chaves de visual guardadas nas colunas do PageLayout; as demais vão em visual_extra
+VISUAL_KEYS = ('id', 'type', 'position', 'suggested_visual', 'priority')
+
+# Resoluções comuns de relatório
+RESOLUTIONS = {
+    'hd': (1280, 720),
+    'full_hd': (1920, 1080),
+    'qhd': (2560, 1440),
+    '4_3': (1024, 768),
+    'letter': (816, 1056),
+    'mobile': (320, 568),
+}
+
+
+@dataclass
+class PageSpec:
+    """Página a gerar: template base e número de visuais (ou VisualSpecs próprios)"""
+    name: str
+    template: str = 'executive_summary'
+    visual_count: Optional[int] = None
+    visuals: Optional[List[Any]] = None
+
+
+class PageLayout:
+    """Layout de uma página com posições em record array"""
+
+    def __init__(self, name: str, canvas: Tuple[int, int], positions: np.recarray,
+                 ids: List[str], types: List[str], suggested: List[str], priorities: List[str],
+                 extra: Optional[Dict[str, Any]] = None, visual_extra: Optional[List[Dict[str, Any]]] = None):
+        self.name = name
+        self.canvas = canvas
+        self.positions = positions
+        self.ids = ids
+        self.types = types
+        self.suggested = suggested
+        self.priorities = priorities
+        self.extra = extra or {}
+        self.visual_extra = visual_extra
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    @classmethod
+    def from_layout(cls, layout: Dict[str, Any], name: str = None) -> 'PageLayout':
+        """Converte um layout no formato do LayoutEngine"""
+        visuals = layout.get('visuals', [])
+        positions = np.rec.array(
+            [(p['x'], p['y'], p['width'], p['height'], p.get('z_index', 0))
+             for p in (v['position'] for v in visuals)] or np.empty(0, POSITION_DTYPE),
+            dtype=POSITION_DTYPE
+        )
+        canvas = layout.get('canvas', {})
+        return cls(
+            name or layout.get('template', 'Page'),
+            (canvas.get('width', LayoutEngine.CANVAS_WIDTH), canvas.get('height', LayoutEngine.CANVAS_HEIGHT)),
+            positions,
+            [v['id'] for v in visuals],
+            [v.get('type', 'chart') for v in visuals],
+            [v.get('suggested_visual', '') for v in visuals],
+            [v.get('priority', 'medium') for v in visuals],
+            {k: v for k, v in layout.items() if k not in ('visuals', 'canvas')},
+            [{k: value for k, value in v.items() if k not in VISUAL_KEYS} for v in visuals]
+        )
+
+    def derived(self, name: str, canvas: Tuple[int, int], positions: np.recarray) -> 'PageLayout':
+        """Nova página com os mesmos visuais; extra/visual_extra copiados (alterar uma não altera a outra)"""
+        visual_extra = None if self.visual_extra is None else [dict(extra) for extra in self.visual_extra]
+        return PageLayout(name, canvas, positions, list(self.ids), list(self.types), list(self.suggested),
+                          list(self.priorities), dict(self.extra), visual_extra)
+
+    def scaled(self, width: int, height: int) -> 'PageLayout':
+        """Mesma página redimensionada para outra resolução"""
+        return self.derived(self.name, (width, height), scale_positions(self.positions, self.canvas, (width, height)))
+
+    def to_layout(self) -> Dict[str, Any]:
+        """Monta o dict no formato do LayoutEngine (apenas na exportação)"""
+        rows = self.positions.tolist()
+        extras = self.visual_extra or [{}] * len(rows)
+        visuals = [
+            {
+                "id": visual_id,
+                "type": visual_type,
+                "position": {"x": x, "y": y, "width": w, "height": h, "z_index": z},
+                "suggested_visual": suggested,
+                "priority": priority,
+                **extra
+            }
+            for (x, y, w, h, z), visual_id, visual_type, suggested, priority, extra
+            in zip(rows, self.ids, self.types, self.suggested, self.priorities, extras)
+        ]
+        layout = dict(self.extra)
+        layout.update({
+            "canvas": {"width": self.canvas[0], "height": self.canvas[1]},
+            "visuals": visuals
+        })
+        layout.setdefault("template", self.name)
+        return layout
+
+
+def scale_positions(positions: np.ndarray, source: Union[Tuple[int, int], np.ndarray],
+                    target: Tuple[int, int]) -> np.recarray:
+    """
+    Redimensiona posições em uma única operação vetorizada
+
+    As bordas (x0, x1, y0, y1) são arredondadas e a largura/altura derivada
+    delas, para que visuais adjacentes continuem encostados e os gutters não
+    acumulem erro de truncamento.
+
+    Args:
+        positions: Array com POSITION_DTYPE
+        source: Canvas de origem (w, h) ou array (n, 2) com o canvas de cada linha
+        target: Canvas de destino (w, h)
+    """
+    source = np.asarray(source, dtype=np.float64)
+    scale_x = target[0] / (source[..., 0] if source.ndim > 1 else source[0])
+    scale_y = target[1] / (source[..., 1] if source.ndim > 1 else source[1])
+
+    x0 = np.rint(positions['x'] * scale_x)
+    y0 = np.rint(positions['y'] * scale_y)
+    x1 = np.rint((positions['x'] + positions['width']) * scale_x)
+    y1 = np.rint((positions['y'] + positions['height']) * scale_y)
+
+    scaled = np.empty(len(positions), dtype=POSITION_DTYPE)
+    scaled['x'] = x0
+    scaled['y'] = y0
+    scaled['width'] = x1 - x0
+    scaled['height'] = y1 - y0
+    scaled['z_index'] = positions['z_index']
+    return scaled.view(np.recarray)
+
+
+def _resolve(resolution: Union[Tuple[int, int], str]) -> Tuple[int, int]:
+    return RESOLUTIONS[resolution] if isinstance(resolution, str) else tuple(resolution)
+
+
+class LayoutBatch:
+    """
+    Resultado em lote: posições de todas as páginas concatenadas por resolução
+
+    batch.page('Vendas', (1920, 1080)) -> PageLayout
+    batch.to_layouts((1920, 1080))     -> lista de dicts
+    """
+
+    def __init__(self, pages: List[PageLayout], resolutions: List[Tuple[int, int]]):
+        self.pages = pages
+        self.resolutions = [_resolve(r) for r in resolutions]
+        self._index = {page.name: i for i, page in enumerate(pages)}
+
+        counts = np.array([len(page) for page in pages], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.positions = (np.concatenate([page.positions for page in pages])
+                          if pages else np.empty(0, POSITION_DTYPE)).view(np.recarray)
+        canvases = np.repeat(np.array([page.canvas for page in pages] or np.empty((0, 2)), dtype=np.float64),
+                             counts, axis=0)
+
+        # Uma transformação vetorizada por resolução para todas as páginas
+        self.scaled = {
+            resolution: scale_positions(self.positions, canvases, resolution)
+            for resolution in self.resolutions
+        }
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    @property
+    def page_names(self) -> List[str]:
+        return [page.name for page in self.pages]
+
+    def page(self, name: str, resolution: Union[Tuple[int, int], str, None] = None) -> PageLayout:
+        """Página na resolução pedida (None = canvas original)"""
+        index = self._index[name]
+        page = self.pages[index]
+        if resolution is None:
+            return page
+        resolution = _resolve(resolution)
+        if resolution not in self.scaled:
+            return page.scaled(*resolution)
+        return page.derived(page.name, resolution, self.scaled[resolution][self.offsets[index]:self.offsets[index + 1]])
+
+    def to_layouts(self, resolution: Union[Tuple[int, int], str, None] = None) -> List[Dict[str, Any]]:
+        """Dicts de todas as páginas em uma resolução"""
+        return [
+            dict(self.page(page.name, resolution).to_layout(), page=page.name)
+            for page in self.pages
+        ]
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        """JSON com todas as páginas em todas as resoluções"""
+        payload = {
+            "pages": self.page_names,
+            "resolutions": {
+                f"{w}x{h}": self.to_layouts((w, h)) for w, h in self.resolutions
+            }
+        }
+        return json.dumps(payload, indent=indent, ensure_ascii=False)
+
+
+class BatchLayoutGenerator:
+    """Gera layouts para muitas páginas e resoluções reaproveitando layouts base"""
+
+    def __init__(self, engine: Optional[LayoutEngine] = None):
+        self.engine = engine or LayoutEngine()
+        self._cache: Dict[Tuple[str, Optional[int]], PageLayout] = {}
+
+    def _base_page(self, spec: PageSpec) -> PageLayout:
+        if spec.visuals is not None:
+            return PageLayout.from_layout(self.engine.solve_layout(spec.visuals, spec.name), spec.name)
+
+        # Páginas com o mesmo template/quantidade compartilham o layout base
+        key = (spec.template, spec.visual_count)
+        if key not in self._cache:
+            self._cache[key] = PageLayout.from_layout(
+                self.engine.generate_layout(spec.template, spec.visual_count)
+            )
+        base = self._cache[key]
+        return base.derived(spec.name, base.canvas, base.positions)
+
+    def generate(self, pages: List[Union[PageSpec, Dict[str, Any]]],
+                 resolutions: Optional[List[Union[Tuple[int, int], str]]] = None) -> LayoutBatch:
+        """
+        Gera todas as páginas em todas as resoluções
+
+        Args:
+            pages: PageSpec ou dicts com name/template/visual_count/visuals
+            resolutions: Tuplas (largura, altura) ou nomes de RESOLUTIONS
+
+        Returns:
+            LayoutBatch
+        """
+        specs = [page if isinstance(page, PageSpec) else PageSpec(**page) for page in pages]
+        names = [spec.name for spec in specs]
+        if len(set(names)) != len(names):
+            raise ValueError("Nomes de página duplicados no lote")
+
+        targets = resolutions or [(LayoutEngine.CANVAS_WIDTH, LayoutEngine.CANVAS_HEIGHT)]
+        return LayoutBatch([self._base_page(spec) for spec in specs], targets)
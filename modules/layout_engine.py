@@ -3,6 +3,7 @@ Motor de Templates de Layout - Define layouts profissionais para dashboards
 """
 from typing import Dict, List, Any
 from dataclasses import dataclass, asdict
+from . import tracing
 
 
 @dataclass
@@ -88,6 +89,7 @@ class LayoutEngine:
     def __init__(self):
         self.current_layout = None
     
+    @tracing.traced('layout.generate')
     def generate_layout(self, template_name: str, visual_count: int = None) -> Dict[str, Any]:
         """
         Gera um layout completo baseado no template
@@ -103,10 +105,19 @@ class LayoutEngine:
             template_name = "detailed_analysis"
         
         template = self.TEMPLATES[template_name]
+        layout = self._generate_template_layout(template)
         
-        # Gera layout específico baseado no tipo
+        # Template sem visuais ou com quantidade diferente: usa o solver com o template como semente
+        if not layout["visuals"] or (visual_count is not None and visual_count != len(layout["visuals"])):
+            specs = self.template_specs(template_name, visual_count)
+            return self.solve_layout(specs, template["name"])
+        
+        return layout
+    
+    def _generate_template_layout(self, template: Dict) -> Dict[str, Any]:
+        """Gera o layout fixo do template"""
         if template["layout"] == "grid":
-            return self._generate_grid_layout(template, visual_count)
+            return self._generate_grid_layout(template)
         elif template["layout"] == "centered":
             return self._generate_centered_layout(template)
         elif template["layout"] == "columns":
@@ -116,9 +127,97 @@ class LayoutEngine:
         elif template["layout"] == "asymmetric":
             return self._generate_asymmetric_layout(template)
         
-        return self._generate_grid_layout(template, visual_count)
+        return self._generate_grid_layout(template)
     
-    def _generate_grid_layout(self, template: Dict, visual_count: int = None) -> Dict[str, Any]:
+    def template_specs(self, template_name: str, visual_count: int = None) -> List:
+        """
+        Converte um template em restrições para o LayoutSolver
+        
+        Os visuais do template viram sementes (tamanho preferido, prioridade e
+        ordem de leitura). Se visual_count for maior, completa com gráficos de
+        prioridade média; se for menor, descarta os de menor prioridade.
+        
+        Returns:
+            Lista de VisualSpec
+        """
+        from .layout_solver import VisualSpec, PRIORITY_WEIGHTS
+        
+        template = self.TEMPLATES.get(template_name, self.TEMPLATES["detailed_analysis"])
+        seeds = self._generate_template_layout(template)["visuals"]
+        
+        if seeds:
+            specs = []
+            for visual in seeds:
+                pos = visual["position"]
+                visual_type = "card" if visual["type"] in ("card", "kpi") else visual["type"]
+                specs.append(VisualSpec.from_type(
+                    visual["id"], visual_type, visual["priority"],
+                    preferred_width=pos["width"], preferred_height=pos["height"],
+                    suggested_visual=visual["suggested_visual"],
+                    order=pos["y"] * self.CANVAS_WIDTH + pos["x"]
+                ))
+        else:
+            specs = self._section_specs(template)
+        
+        if visual_count is not None:
+            if visual_count < len(specs):
+                ranked = sorted(specs, key=lambda s: (-PRIORITY_WEIGHTS.get(s.priority, 2), s.order))
+                keep = {s.id for s in ranked[:visual_count]}
+                specs = [s for s in specs if s.id in keep]
+            for i in range(len(specs), visual_count):
+                specs.append(VisualSpec.from_type(
+                    f"chart_{i + 1}", "chart", "medium",
+                    suggested_visual="Supporting Chart", order=float(self.CANVAS_WIDTH * self.CANVAS_HEIGHT + i)
+                ))
+        
+        return specs
+    
+    def _section_specs(self, template: Dict) -> List:
+        """Restrições a partir das seções do template (quando não há gerador fixo)"""
+        from .layout_solver import VisualSpec
+        
+        specs = []
+        for index, section in enumerate(template["sections"]):
+            if section["type"] == "title_bar":
+                specs.append(VisualSpec.from_type(
+                    "title", "text", "high", preferred_height=section.get("height", 80),
+                    suggested_visual="Title/Header", order=index
+                ))
+            elif section["type"] == "filters":
+                specs.append(VisualSpec.from_type(
+                    "filters", "slicer", "medium", preferred_width=section.get("width", 280),
+                    preferred_height=self.CANVAS_HEIGHT, min_height=200,
+                    suggested_visual="Slicers", order=index
+                ))
+            elif section["type"] == "main_content":
+                for i in range(section.get("charts", 4)):
+                    specs.append(VisualSpec.from_type(
+                        f"chart_{i + 1}", "chart", "high" if i < 2 else "medium",
+                        preferred_width=440, preferred_height=280,
+                        suggested_visual="Analysis Chart", order=index + i / 100
+                    ))
+        return specs
+    
+    @tracing.traced('layout.solve')
+    def solve_layout(self, visuals: List, name: str = "Custom") -> Dict[str, Any]:
+        """
+        Calcula um layout sem sobreposição para visuais arbitrários (MaxRects)
+        
+        Args:
+            visuals: Lista de VisualSpec
+            name: Nome do layout
+        
+        Returns:
+            Layout no formato padrão, com "quality" (score de 0 a 1 e componentes)
+        """
+        from .layout_solver import LayoutSolver
+        
+        solver = LayoutSolver(self.CANVAS_WIDTH, self.CANVAS_HEIGHT)
+        layout = solver.solve(visuals).to_layout(name)
+        self.current_layout = layout
+        return layout
+    
+    def _generate_grid_layout(self, template: Dict) -> Dict[str, Any]:
         """Gera layout em grade"""
         layout = {
             "template": template["name"],
@@ -399,11 +498,37 @@ class LayoutEngine:
             return layout
         
         # Reordena z-index baseado em prioridades
-        for i, visual_id in enumerate(priorities):
-            for visual in layout["visuals"]:
-                if visual["id"] == visual_id:
-                    visual["position"]["z_index"] = len(priorities) - i
+        ranks = {visual_id: len(priorities) - i for i, visual_id in enumerate(priorities)}
+        for visual in layout["visuals"]:
+            if visual["id"] in ranks:
+                visual["position"]["z_index"] = ranks[visual["id"]]
+        
+        return layout
+    
+    @tracing.traced('layout.optimize_for_suggestions')
+    def optimize_for_suggestions(self, suggestions: List[Dict[str, Any]], template_name: str = None,
+                                 time_budget_ms: float = 500, seed: int = 0) -> Dict[str, Any]:
+        """
+        Monta o layout para as sugestões do DataAnalyzer por simulated annealing
+        
+        Args:
+            suggestions: analysis['suggested_visuals']
+            template_name: Template usado como semente dos slots (padrão: MaxRects)
+            time_budget_ms: Orçamento de tempo da busca
+            seed: Semente (mesma semente = mesmo layout, salvo corte por tempo)
         
+        Returns:
+            Layout com "quality" (objetivo, componentes e estatísticas da busca)
+        """
+        from .layout_optimizer import LayoutOptimizer, specs_from_suggestions
+        
+        specs = specs_from_suggestions(suggestions)
+        seed_layout = self.generate_layout(template_name, len(specs)) if template_name else None
+        optimizer = LayoutOptimizer(self.CANVAS_WIDTH, self.CANVAS_HEIGHT,
+                                    time_budget_ms=time_budget_ms, seed=seed)
+        name = self.TEMPLATES[template_name]["name"] if template_name in self.TEMPLATES else "Sugestões"
+        layout = optimizer.optimize(specs, seed_layout).to_layout(name)
+        self.current_layout = layout
         return layout
     
     def get_responsive_layout(self, layout: Dict[str, Any], target_width: int, target_height: int) -> Dict[str, Any]:
@@ -418,26 +543,71 @@ class LayoutEngine:
         Returns:
             Layout adaptado
         """
-        scale_x = target_width / self.CANVAS_WIDTH
-        scale_y = target_height / self.CANVAS_HEIGHT
+        from .layout_batch import PageLayout
         
-        responsive_layout = layout.copy()
-        responsive_layout["canvas"] = {"width": target_width, "height": target_height}
-        responsive_layout["visuals"] = []
+        return PageLayout.from_layout(layout).scaled(target_width, target_height).to_layout()
+    
+    def generate_batch(self, pages: List, resolutions: List = None):
+        """
+        Gera layouts para várias páginas e resoluções de uma vez
         
-        for visual in layout["visuals"]:
-            pos = visual["position"]
-            new_visual = visual.copy()
-            new_visual["position"] = {
-                "x": int(pos["x"] * scale_x),
-                "y": int(pos["y"] * scale_y),
-                "width": int(pos["width"] * scale_x),
-                "height": int(pos["height"] * scale_y),
-                "z_index": pos.get("z_index", 0)
-            }
-            responsive_layout["visuals"].append(new_visual)
+        Args:
+            pages: PageSpec ou dicts com name/template/visual_count
+            resolutions: Tuplas (largura, altura) ou nomes ('full_hd', 'mobile', ...)
+        
+        Returns:
+            LayoutBatch (use to_layouts()/to_json() para exportar)
+        """
+        from .layout_batch import BatchLayoutGenerator
+        
+        return BatchLayoutGenerator(self).generate(pages, resolutions)
+    
+    def validate_layout(self, layout: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Verifica sobreposições, limites do canvas, alinhamento e gutters
+        
+        Returns:
+            Relatório com is_valid, counts e issues
+        """
+        from .layout_validator import LayoutValidator
+        
+        return LayoutValidator().validate(layout).to_dict()
+    
+    def snap_layout(self, layout: Dict[str, Any], gutter: int = None) -> Dict[str, Any]:
+        """
+        Corrige alinhamento, gutters e sobreposições de um layout
+        
+        Args:
+            layout: Layout original (não é modificado)
+            gutter: Gutter desejado (padrão: o mais comum no layout)
+        
+        Returns:
+            Layout corrigido com o relatório em "validation"
+        """
+        from .layout_validator import LayoutValidator
         
-        return responsive_layout
+        fixed, report = LayoutValidator().auto_snap(layout, gutter)
+        fixed["validation"] = report.to_dict()
+        return fixed
+    
+    # Componentes exibidos no resumo: o solver mede cobertura, o otimizador área ponderada
+    QUALITY_LABELS = {
+        "coverage": "cobertura",
+        "weighted_area": "área ponderada",
+        "reading_order": "ordem de leitura",
+        "min_size_fit": "tamanho mínimo",
+    }
+    
+    def quality_summary(self, quality: Dict[str, Any]) -> str:
+        """
+        Resumo de layout['quality'] para exibição (solver ou otimizador)
+        
+        Returns:
+            Texto com o score e os componentes presentes, ex.: "82% (cobertura 70%, ordem de leitura 90%)"
+        """
+        parts = [f"{label} {quality[key]:.0%}" for key, label in self.QUALITY_LABELS.items() if key in quality]
+        summary = f"{quality.get('score', 0.0):.0%}"
+        return f"{summary} ({', '.join(parts)})" if parts else summary
     
     def list_templates(self) -> List[Dict[str, str]]:
         """Lista todos os templates disponíveis"""
@@ -0,0 +1,277 @@
+"""
+Otimizador de Layout - Busca por simulated annealing sobre as sugestões do DataAnalyzer
+
+Parte de um layout semente (template ou MaxRects) e procura, dentro de um
+orçamento de tempo, a melhor atribuição de visuais sugeridos aos slots e o
+melhor tamanho de cada slot. Os movimentos são trocas de visuais entre slots e
+deslocamentos de bordas compartilhadas (o vizinho encostado acompanha a borda).
+
+Objetivo (0 a 1):
+    - área ponderada por prioridade: visuais importantes ocupam mais canvas
+    - ordem de leitura: visuais importantes no topo à esquerda
+    - ajuste de proporção: cada tipo de gráfico perto da sua proporção ideal
+
+A busca é determinística para a mesma semente e o mesmo número de iterações;
+o orçamento de tempo apenas interrompe antes.
+"""
+import math
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from .layout_engine import VisualPosition
+from .layout_solver import LayoutSolver, VisualSpec, SolverResult
+
+
+# Tipo sugerido pelo DataAnalyzer -> (tipo para o solver, visual do Power BI, proporção ideal)
+SUGGESTION_TYPES = {
+    'line_chart': ('chart', 'Line Chart', 2.4),
+    'bar_chart': ('chart', 'Clustered Bar Chart', 1.6),
+    'histogram': ('chart', 'Clustered Column Chart', 1.6),
+    'scatter_plot': ('chart', 'Scatter Chart', 1.3),
+    'kpi_card': ('card', 'Card', 2.0),
+    'donut_chart': ('chart', 'Donut Chart', 1.1),
+    'heatmap': ('matrix', 'Matrix', 1.5),
+    'table': ('table', 'Table', 1.8),
+    'map': ('map', 'Map', 1.5),
+    'slicer': ('slicer', 'Slicer', 2.6),
+}
+
+OBJECTIVE_WEIGHTS = {'weighted_area': 0.4, 'reading_order': 0.3, 'aspect_fit': 0.3}
+
+
+def specs_from_suggestions(suggestions: List[Dict[str, Any]], max_cards: int = 4) -> List[VisualSpec]:
+    """
+    Converte as sugestões do DataAnalyzer em VisualSpec
+
+    Sugestões kpi_card com várias métricas viram um card por métrica (até max_cards),
+    com id 'kpi_<sugestão>_<métrica>'; os demais visuais recebem '<tipo>_<sugestão>'.
+    """
+    specs = []
+    for index, suggestion in enumerate(suggestions):
+        kind = suggestion.get('type', 'chart')
+        visual_type, visual_name, aspect = SUGGESTION_TYPES.get(kind, ('chart', kind.replace('_', ' ').title(), 1.6))
+        priority = suggestion.get('priority', 'medium')
+
+        if kind == 'kpi_card':
+            metrics = suggestion.get('columns', {}).get('metrics') or ['kpi']
+            for position, metric in enumerate(metrics[:max_cards]):
+                specs.append(VisualSpec.from_type(
+                    f"kpi_{index + 1}_{position + 1}", visual_type, priority, aspect=aspect,
+                    suggested_visual=f"{visual_name}: {metric}", order=index + position / 100
+                ))
+            continue
+
+        specs.append(VisualSpec.from_type(
+            f"{kind}_{index + 1}", visual_type, priority, aspect=aspect,
+            suggested_visual=suggestion.get('title') or visual_name, order=index
+        ))
+    # Posicionamentos e spec_map são indexados pelo id: um id repetido descartaria visuais
+    assert len({spec.id for spec in specs}) == len(specs), 'ids de visuais repetidos'
+    return specs
+
+
+class LayoutOptimizer:
+    """
+    Simulated annealing sobre atribuição visual→slot e tamanho dos slots
+
+    Exemplo:
+        analysis = DataAnalyzer().analyze_dataframe(df)
+        optimizer = LayoutOptimizer(time_budget_ms=500, seed=42)
+        layout = optimizer.optimize(specs_from_suggestions(analysis['suggested_visuals'])).to_layout()
+    """
+
+    def __init__(self, canvas_width: int = 1280, canvas_height: int = 720,
+                 padding: int = 20, gap: int = 15, time_budget_ms: float = 500,
+                 max_iterations: int = 2000, seed: int = 0, step: int = 10,
+                 min_size: Tuple[int, int] = (80, 50), t_start: float = 0.02, t_end: float = 0.0005):
+        """
+        Args:
+            time_budget_ms: Tempo máximo da busca (retorna o melhor encontrado até então)
+            max_iterations: Número de iterações do resfriamento (define o resultado para a semente)
+            seed: Semente do gerador aleatório
+            step: Granularidade (px) dos deslocamentos de borda
+            min_size: Menor largura/altura aceita para um slot
+            t_start, t_end: Temperatura inicial/final (na escala do objetivo)
+        """
+        self.canvas_width = canvas_width
+        self.canvas_height = canvas_height
+        self.padding = padding
+        self.gap = gap
+        self.time_budget_ms = time_budget_ms
+        self.max_iterations = max_iterations
+        self.seed = seed
+        self.step = step
+        self.min_size = min_size
+        self.t_start = t_start
+        self.t_end = t_end
+
+    # ------------------------------------------------------------------ objetivo
+
+    def _prepare(self, specs: List[VisualSpec]):
+        self._weights = np.array([spec.weight for spec in specs], dtype=np.float64)
+        self._aspects = np.array([spec.target_aspect for spec in specs], dtype=np.float64)
+        usable_w = self.canvas_width - 2 * self.padding
+        usable_h = self.canvas_height - 2 * self.padding
+        self._usable_area = float(usable_w * usable_h)
+        self._diagonal = float(usable_w + 2 * usable_h)
+        self._max_weight = float(self._weights.max()) if len(specs) else 1.0
+
+    def _objective(self, slots: np.ndarray, assignment: np.ndarray) -> Tuple[float, Dict[str, float]]:
+        """Objetivo vetorizado; slots (m, 4) em x0, y0, x1, y1 e assignment[visual] = slot"""
+        boxes = slots[assignment]
+        widths = boxes[:, 2] - boxes[:, 0]
+        heights = boxes[:, 3] - boxes[:, 1]
+        weights = self._weights
+
+        weighted_area = min(1.0, float(weights @ (widths * heights)) / (self._max_weight * self._usable_area))
+        distance = ((boxes[:, 1] - self.padding) * 2 + (boxes[:, 0] - self.padding)) / self._diagonal
+        reading_order = float(weights @ (1 - np.minimum(distance, 1.0))) / float(weights.sum())
+        aspect_fit = float(np.exp(-np.abs(np.log((widths / np.maximum(heights, 1)) / self._aspects))).mean())
+
+        components = {'weighted_area': weighted_area, 'reading_order': reading_order, 'aspect_fit': aspect_fit}
+        score = sum(OBJECTIVE_WEIGHTS[key] * value for key, value in components.items())
+        return score, components
+
+    # ------------------------------------------------------------------ movimentos
+
+    def _feasible(self, slots: np.ndarray, changed: np.ndarray) -> bool:
+        """Slots alterados dentro do canvas, acima do mínimo e sem sobreposição (com gap)"""
+        moved = slots[changed]
+        if (moved[:, 0] < self.padding).any() or (moved[:, 1] < self.padding).any():
+            return False
+        if (moved[:, 2] > self.canvas_width - self.padding).any() or (moved[:, 3] > self.canvas_height - self.padding).any():
+            return False
+        if ((moved[:, 2] - moved[:, 0]) < self.min_size[0]).any() or ((moved[:, 3] - moved[:, 1]) < self.min_size[1]).any():
+            return False
+
+        gap = self.gap
+        overlap = ((moved[:, None, 0] < slots[None, :, 2] + gap) & (slots[None, :, 0] < moved[:, None, 2] + gap)
+                   & (moved[:, None, 1] < slots[None, :, 3] + gap) & (slots[None, :, 1] < moved[:, None, 3] + gap))
+        overlap[np.arange(len(changed)), changed] = False
+        return not overlap.any()
+
+    def _edge_move(self, slots: np.ndarray, rng: np.random.Generator) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Desloca uma borda; slots encostados do outro lado acompanham (borda compartilhada)"""
+        slot = int(rng.integers(len(slots)))
+        side = int(rng.integers(4))                         # 0=esquerda, 1=topo, 2=direita, 3=base
+        delta = int(rng.integers(1, 5)) * self.step * (1 if rng.random() < 0.5 else -1)
+
+        axis = side % 2                                      # 0 = x, 1 = y
+        low, high = axis, axis + 2
+        edge = slots[slot, side]
+        # Vizinhos que encostam nesta borda (separados pelo gap) e se sobrepõem no outro eixo
+        other_low, other_high = 1 - axis, 3 - axis
+        span = ((slots[:, other_low] < slots[slot, other_high]) & (slots[:, other_high] > slots[slot, other_low]))
+        if side < 2:
+            neighbours = np.flatnonzero(span & (np.abs(slots[:, high] + self.gap - edge) <= 2))
+            opposite = high
+        else:
+            neighbours = np.flatnonzero(span & (np.abs(slots[:, low] - self.gap - edge) <= 2))
+            opposite = low
+
+        candidate = slots.copy()
+        candidate[slot, side] += delta
+        candidate[neighbours, opposite] += delta
+        changed = np.concatenate([[slot], neighbours]).astype(np.int64)
+        return candidate, changed
+
+    # ------------------------------------------------------------------ busca
+
+    def _seed_slots(self, specs: List[VisualSpec],
+                    seed_layout: Optional[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Slots iniciais e atribuição gulosa (mais importante -> slot mais cedo na leitura)"""
+        if seed_layout is None:
+            solver = LayoutSolver(self.canvas_width, self.canvas_height, self.padding, self.gap)
+            result = solver.solve(specs)
+            positions = [result.placements[spec.id] for spec in specs if spec.id in result.placements]
+            rects = [(p.x, p.y, p.x + p.width, p.y + p.height) for p in positions]
+        else:
+            rects = [
+                (p['x'], p['y'], p['x'] + p['width'], p['y'] + p['height'])
+                for p in (visual['position'] for visual in seed_layout.get('visuals', []))
+            ]
+        slots = np.array(rects[:len(specs)] or np.empty((0, 4)), dtype=np.float64).reshape(-1, 4)
+
+        slot_order = np.lexsort((slots[:, 0], slots[:, 1]))
+        visual_order = sorted(range(len(specs)), key=lambda i: (-specs[i].weight, specs[i].order))
+        assignment = np.empty(len(slots), dtype=np.int64)
+        assignment[np.array(visual_order[:len(slots)], dtype=np.int64)] = slot_order
+        return slots, assignment
+
+    def optimize(self, specs: List[VisualSpec], seed_layout: Optional[Dict[str, Any]] = None) -> SolverResult:
+        """
+        Otimiza o layout para os visuais
+
+        Args:
+            specs: Visuais (ex.: specs_from_suggestions(analysis['suggested_visuals']))
+            seed_layout: Layout inicial cujos slots serão reaproveitados (padrão: MaxRects)
+
+        Returns:
+            SolverResult com score/componentes do objetivo e estatísticas da busca
+        """
+        start = time.perf_counter()
+        spec_map = {spec.id: spec for spec in specs}
+        slots, assignment = self._seed_slots(specs, seed_layout)
+        placed = list(specs)
+        if len(slots) < len(specs):
+            # Menos slots que visuais: ficam os mais importantes, o resto vai para unplaced
+            ranked = sorted(specs, key=lambda spec: (-spec.weight, spec.order))
+            keep = {spec.id for spec in ranked[:len(slots)]}
+            placed = [spec for spec in specs if spec.id in keep]
+            slots, assignment = self._seed_slots(placed, seed_layout)
+        placed_ids = {spec.id for spec in placed}
+        unplaced = [spec.id for spec in specs if spec.id not in placed_ids]
+
+        stats = {'iterations': 0, 'accepted': 0, 'improved': 0, 'initial_score': 0.0}
+        if not placed:
+            return SolverResult({}, spec_map, 0.0, dict.fromkeys(OBJECTIVE_WEIGHTS, 0.0), unplaced,
+                                (time.perf_counter() - start) * 1000, (self.canvas_width, self.canvas_height))
+
+        self._prepare(placed)
+        rng = np.random.default_rng(self.seed)
+        current_score, current_components = self._objective(slots, assignment)
+        best = (current_score, current_components, slots.copy(), assignment.copy())
+        stats['initial_score'] = current_score
+
+        deadline = start + self.time_budget_ms / 1000
+        cooling = (self.t_end / self.t_start) ** (1 / max(self.max_iterations - 1, 1))
+        temperature = self.t_start
+
+        for iteration in range(self.max_iterations):
+            # Checa o relógio em blocos para não pagar perf_counter a cada iteração
+            if iteration % 64 == 0 and time.perf_counter() > deadline:
+                break
+            stats['iterations'] = iteration + 1
+
+            if len(placed) > 1 and rng.random() < 0.3:
+                i, j = rng.choice(len(placed), 2, replace=False)
+                candidate_slots, candidate_assignment = slots, assignment.copy()
+                candidate_assignment[[i, j]] = candidate_assignment[[j, i]]
+            else:
+                candidate_slots, changed = self._edge_move(slots, rng)
+                if not self._feasible(candidate_slots, changed):
+                    temperature *= cooling
+                    continue
+                candidate_assignment = assignment
+
+            score, components = self._objective(candidate_slots, candidate_assignment)
+            delta = score - current_score
+            if delta >= 0 or rng.random() < math.exp(delta / temperature):
+                slots, assignment = candidate_slots, candidate_assignment
+                current_score, current_components = score, components
+                stats['accepted'] += 1
+                if score > best[0]:
+                    best = (score, components, slots.copy(), assignment.copy())
+                    stats['improved'] += 1
+            temperature *= cooling
+
+        score, components, slots, assignment = best
+        placements = {
+            spec.id: VisualPosition(int(x0), int(y0), int(x1 - x0), int(y1 - y0))
+            for spec, (x0, y0, x1, y1) in zip(placed, slots[assignment].tolist())
+        }
+        components = dict(components, **stats, seed=self.seed)
+        return SolverResult(placements, spec_map, score, components, unplaced,
+                            (time.perf_counter() - start) * 1000, (self.canvas_width, self.canvas_height))
@@ -0,0 +1,170 @@
+"""
+Preview de Layout - Renderização em lote (um trace por prioridade) ou SVG, memoizada por hash
+
+Em vez de um add_shape + add_annotation por visual, os retângulos de cada
+prioridade viram um único Scatter com fill='toself' (segmentos separados por
+None) e os rótulos um único trace de texto. O resultado é um dict de figura
+Plotly (aceito por st.plotly_chart) guardado em cache pelo hash do layout.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from html import escape
+from typing import Dict, List, Any, Optional
+
+
+PRIORITY_STYLES = {
+    'highest': ('#1F4E79', 'rgba(31, 78, 121, 0.35)'),
+    'high': ('#2E75B6', 'rgba(46, 117, 182, 0.3)'),
+    'medium': ('#5B9BD5', 'rgba(91, 155, 213, 0.25)'),
+    'low': ('#9DC3E6', 'rgba(157, 195, 230, 0.25)'),
+}
+
+
+def layout_hash(layout: Dict[str, Any]) -> str:
+    """Hash do que o preview desenha (canvas, ids, posições, prioridades e o visual sugerido do hover)"""
+    canvas = layout.get('canvas', {})
+    # Lista plana (7 valores por visual): sem ambiguidade e mais barata de serializar que listas aninhadas
+    values = [canvas.get('width'), canvas.get('height')]
+    for v in layout.get('visuals', []):
+        pos = v['position']
+        values += (v['id'], v.get('priority'), v.get('suggested_visual', ''),
+                   pos['x'], pos['y'], pos['width'], pos['height'])
+    payload = json.dumps(values, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class LayoutPreview:
+    """
+    Renderiza previews de layout com cache LRU
+
+    Exemplo:
+        preview = LayoutPreview()
+        st.plotly_chart(preview.figure(layout), use_container_width=True)
+        svg = preview.svg(layout)
+    """
+
+    def __init__(self, max_entries: int = 64, label_limit: int = 150):
+        """
+        Args:
+            max_entries: Layouts mantidos em cache (por formato)
+            label_limit: Acima deste número de visuais os rótulos ficam só no hover
+        """
+        self.max_entries = max_entries
+        self.label_limit = label_limit
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()  # uma instância atende todas as sessões do app
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, key, build):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._cache[key] = value
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+    def figure(self, layout: Dict[str, Any], title: str = "Preview do Layout",
+               height: int = 500) -> Dict[str, Any]:
+        """
+        Figura Plotly (dict) com um trace preenchido por prioridade e um de rótulos
+
+        O dict retornado é compartilhado pelo cache: não modificar.
+        """
+        key = ('figure', layout_hash(layout), title, height)
+        return self._cached(key, lambda: self._build_figure(layout, title, height))
+
+    def svg(self, layout: Dict[str, Any], width: Optional[int] = None) -> str:
+        """SVG do layout (string), em cache pelo hash"""
+        key = ('svg', layout_hash(layout), width)
+        return self._cached(key, lambda: self._build_svg(layout, width))
+
+    def _build_figure(self, layout: Dict[str, Any], title: str, height: int) -> Dict[str, Any]:
+        canvas = layout.get('canvas', {})
+        canvas_w, canvas_h = canvas.get('width', 1280), canvas.get('height', 720)
+        visuals = layout.get('visuals', [])
+
+        groups: Dict[str, Dict[str, List]] = {}
+        label_x, label_y, labels, hover = [], [], [], []
+        for visual in visuals:
+            pos = visual['position']
+            x0, y0 = pos['x'], pos['y']
+            x1, y1 = x0 + pos['width'], y0 + pos['height']
+            priority = visual.get('priority', 'medium')
+            group = groups.setdefault(priority if priority in PRIORITY_STYLES else 'medium', {'x': [], 'y': []})
+            # Contorno fechado + None separa os retângulos dentro do mesmo trace
+            group['x'].extend((x0, x1, x1, x0, x0, None))
+            group['y'].extend((y0, y0, y1, y1, y0, None))
+
+            label_x.append((x0 + x1) / 2)
+            label_y.append((y0 + y1) / 2)
+            labels.append(visual['id'])
+            hover.append(f"{visual['id']}<br>{visual.get('suggested_visual', '')}<br>"
+                         f"{pos['width']}x{pos['height']} @ ({x0}, {y0})")
+
+        data = [
+            {
+                'type': 'scatter', 'mode': 'lines', 'name': priority,
+                'x': group['x'], 'y': group['y'], 'fill': 'toself',
+                'fillcolor': PRIORITY_STYLES[priority][1],
+                'line': {'color': PRIORITY_STYLES[priority][0], 'width': 2},
+                'hoverinfo': 'skip'
+            }
+            for priority, group in groups.items()
+        ]
+        data.append({
+            'type': 'scatter', 'mode': 'text' if len(visuals) <= self.label_limit else 'markers',
+            'x': label_x, 'y': label_y, 'text': labels, 'hovertext': hover,
+            'hoverinfo': 'text', 'textfont': {'size': 10},
+            'marker': {'size': 1, 'opacity': 0}, 'showlegend': False
+        })
+
+        return {
+            'data': data,
+            'layout': {
+                'title': {'text': title},
+                'height': height,
+                'showlegend': len(groups) > 1,
+                'xaxis': {'range': [0, canvas_w], 'showgrid': True, 'zeroline': False},
+                'yaxis': {'range': [canvas_h, 0], 'showgrid': True, 'zeroline': False,
+                          'scaleanchor': 'x', 'scaleratio': 1},
+                'margin': {'l': 40, 'r': 20, 't': 50, 'b': 40}
+            }
+        }
+
+    def _build_svg(self, layout: Dict[str, Any], width: Optional[int]) -> str:
+        canvas = layout.get('canvas', {})
+        canvas_w, canvas_h = canvas.get('width', 1280), canvas.get('height', 720)
+        size = f' width="{width}" height="{round(width * canvas_h / canvas_w)}"' if width else ''
+
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {canvas_w} {canvas_h}"{size}>',
+            f'<rect width="{canvas_w}" height="{canvas_h}" fill="#FFFFFF" stroke="#D9D9D9"/>'
+        ]
+        for visual in layout.get('visuals', []):
+            pos = visual['position']
+            stroke, fill = PRIORITY_STYLES.get(visual.get('priority', 'medium'), PRIORITY_STYLES['medium'])
+            label = escape(str(visual['id']))
+            parts.append(
+                f'<g><title>{label}</title>'
+                f'<rect x="{pos["x"]}" y="{pos["y"]}" width="{pos["width"]}" height="{pos["height"]}" '
+                f'fill="{fill}" stroke="{stroke}" stroke-width="2"/>'
+                f'<text x="{pos["x"] + pos["width"] / 2:g}" y="{pos["y"] + pos["height"] / 2:g}" '
+                f'font-size="12" font-family="Segoe UI, sans-serif" text-anchor="middle" '
+                f'dominant-baseline="middle">{label}</text></g>'
+            )
+        parts.append('</svg>')
+        return ''.join(parts)
@@ -0,0 +1,344 @@
+"""
+Solver de Layout - Empacotamento por restrições (MaxRects) com pontuação de qualidade
+
+Recebe N visuais com prioridade, tamanho mínimo/preferido e proporção desejada e
+calcula um arranjo sem sobreposição no canvas, priorizando a ordem de leitura
+(visuais mais importantes no topo à esquerda).
+"""
+import math
+import time
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Any, Optional, Tuple
+
+from .layout_engine import VisualPosition
+
+
+PRIORITY_WEIGHTS = {'highest': 4, 'high': 3, 'medium': 2, 'low': 1}
+
+# Tamanhos por tipo de visual: (min_w, min_h, pref_w, pref_h)
+TYPE_SIZES = {
+    'card': (160, 90, 260, 130),
+    'kpi': (160, 90, 260, 130),
+    'text': (200, 50, 1240, 70),
+    'slicer': (160, 60, 240, 90),
+    'table': (320, 200, 600, 320),
+    'matrix': (320, 200, 600, 320),
+    'map': (320, 220, 560, 360),
+    'chart': (280, 180, 560, 300),
+}
+
+
+@dataclass
+class VisualSpec:
+    """Restrições de um visual para o solver"""
+    id: str
+    type: str = 'chart'
+    priority: str = 'medium'
+    min_width: int = 280
+    min_height: int = 180
+    preferred_width: int = 560
+    preferred_height: int = 300
+    aspect: Optional[float] = None
+    suggested_visual: str = ''
+    order: float = 0.0
+
+    @classmethod
+    def from_type(cls, visual_id: str, visual_type: str = 'chart', priority: str = 'medium',
+                  **overrides) -> 'VisualSpec':
+        """Cria a especificação com os tamanhos padrão do tipo de visual"""
+        min_w, min_h, pref_w, pref_h = TYPE_SIZES.get(visual_type, TYPE_SIZES['chart'])
+        values = dict(id=visual_id, type=visual_type, priority=priority,
+                      min_width=min_w, min_height=min_h,
+                      preferred_width=pref_w, preferred_height=pref_h)
+        values.update(overrides)
+        return cls(**values)
+
+    @property
+    def weight(self) -> int:
+        return PRIORITY_WEIGHTS.get(self.priority, 2)
+
+    @property
+    def target_aspect(self) -> float:
+        return self.aspect or self.preferred_width / max(self.preferred_height, 1)
+
+
+@dataclass
+class SolverResult:
+    """Resultado do solver"""
+    placements: Dict[str, VisualPosition]
+    specs: Dict[str, VisualSpec]
+    score: float
+    components: Dict[str, float]
+    unplaced: List[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+    canvas: Tuple[int, int] = (1280, 720)
+    below_min: List[str] = field(default_factory=list)
+
+    def to_layout(self, name: str = 'Custom') -> Dict[str, Any]:
+        """Converte para o formato de layout do LayoutEngine"""
+        visuals = []
+        for visual_id, position in sorted(self.placements.items(), key=lambda item: (item[1].y, item[1].x)):
+            spec = self.specs[visual_id]
+            visuals.append({
+                "id": visual_id,
+                "type": spec.type,
+                "position": asdict(position),
+                "suggested_visual": spec.suggested_visual or spec.type.title(),
+                "priority": spec.priority
+            })
+        return {
+            "template": name,
+            "canvas": {"width": self.canvas[0], "height": self.canvas[1]},
+            "visuals": visuals,
+            "quality": {
+                "score": round(self.score, 4),
+                **{key: round(value, 4) for key, value in self.components.items()},
+                "unplaced": list(self.unplaced),
+                "below_min": list(self.below_min),
+                "elapsed_ms": round(self.elapsed_ms, 2)
+            }
+        }
+
+
+class _MaxRects:
+    """Bin MaxRects: lista de retângulos livres maximais"""
+
+    def __init__(self, x: int, y: int, width: int, height: int):
+        self.free = [(x, y, width, height)]
+
+    def find(self, width: int, height: int) -> Optional[Tuple[int, int]]:
+        """Melhor posição: mais acima, depois mais à esquerda, depois menor sobra (BSSF)"""
+        best = None
+        best_key = None
+        for fx, fy, fw, fh in self.free:
+            if fw >= width and fh >= height:
+                key = (fy, fx, min(fw - width, fh - height))
+                if best_key is None or key < best_key:
+                    best_key = key
+                    best = (fx, fy)
+        return best
+
+    def place(self, x: int, y: int, width: int, height: int):
+        right, bottom = x + width, y + height
+        kept, created = [], []
+
+        for rect in self.free:
+            fx, fy, fw, fh = rect
+            if fx >= right or fx + fw <= x or fy >= bottom or fy + fh <= y:
+                kept.append(rect)
+                continue
+            if fx < x:
+                created.append((fx, fy, x - fx, fh))
+            if fx + fw > right:
+                created.append((right, fy, fx + fw - right, fh))
+            if fy < y:
+                created.append((fx, fy, fw, y - fy))
+            if fy + fh > bottom:
+                created.append((fx, bottom, fw, fy + fh - bottom))
+
+        # Poda: só os retângulos novos precisam ser testados por contenção
+        pruned = []
+        for i, rect in enumerate(created):
+            if any(_contains(other, rect) for other in kept):
+                continue
+            if any(_contains(other, rect) and (other != rect or j < i)
+                   for j, other in enumerate(created) if j != i):
+                continue
+            pruned.append(rect)
+        self.free = kept + pruned
+
+
+def _contains(outer, inner) -> bool:
+    return (outer[0] <= inner[0] and outer[1] <= inner[1]
+            and outer[0] + outer[2] >= inner[0] + inner[2]
+            and outer[1] + outer[3] >= inner[1] + inner[3])
+
+
+class LayoutSolver:
+    """
+    Empacota visuais no canvas com heurística MaxRects
+
+    Exemplo:
+        solver = LayoutSolver()
+        specs = [VisualSpec.from_type(f"v{i}", "chart") for i in range(12)]
+        layout = solver.solve(specs).to_layout("Meu Layout")
+    """
+
+    def __init__(self, canvas_width: int = 1280, canvas_height: int = 720,
+                 padding: int = 20, gap: int = 15, fill_target: float = 0.9,
+                 max_attempts: int = 10, strict_min: bool = False, min_floor: float = 0.2):
+        """
+        Args:
+            strict_min: Se True, nunca reduz abaixo do tamanho mínimo (sobras ficam em unplaced)
+            min_floor: Menor fração do tamanho mínimo aceita quando strict_min é False; os
+                visuais reduzidos abaixo do mínimo ficam em below_min e penalizam o score
+        """
+        self.canvas_width = canvas_width
+        self.canvas_height = canvas_height
+        self.padding = padding
+        self.gap = gap
+        self.fill_target = fill_target
+        self.max_attempts = max_attempts
+        self.strict_min = strict_min
+        self.min_floor = min_floor
+
+    @property
+    def usable_width(self) -> int:
+        return self.canvas_width - 2 * self.padding
+
+    @property
+    def usable_height(self) -> int:
+        return self.canvas_height - 2 * self.padding
+
+    def solve(self, visuals: List[VisualSpec]) -> SolverResult:
+        """
+        Calcula o arranjo dos visuais
+
+        Os tamanhos preferidos são reduzidos por um fator global até que todos
+        caibam respeitando os mínimos. Se ainda sobrarem visuais e strict_min
+        for False, os mínimos também são reduzidos (até min_floor); o que não
+        couber fica em `unplaced`. Ao final, cada visual cresce sobre o espaço livre.
+        """
+        start = time.perf_counter()
+        specs = {spec.id: spec for spec in visuals}
+        ordered = sorted(visuals, key=lambda s: (-s.weight, s.order,
+                                                 -s.preferred_width * s.preferred_height))
+
+        preferred_area = sum((s.preferred_width + self.gap) * (s.preferred_height + self.gap) for s in ordered)
+        capacity = (self.usable_width + self.gap) * (self.usable_height + self.gap) * self.fill_target
+        scale = min(1.0, math.sqrt(capacity / preferred_area)) if preferred_area else 1.0
+
+        best_placements, best_unplaced = {}, [s.id for s in ordered]
+        for _ in range(self.max_attempts):
+            placements, unplaced = self._pack(ordered, scale)
+            if len(unplaced) < len(best_unplaced):
+                best_placements, best_unplaced = placements, unplaced
+            if not unplaced:
+                break
+            scale *= 0.85
+
+        if best_unplaced and not self.strict_min:
+            min_area = sum((s.min_width + self.gap) * (s.min_height + self.gap) for s in ordered)
+            min_scale = min(1.0, math.sqrt(capacity / min_area))
+            while best_unplaced and min_scale >= self.min_floor:
+                placements, unplaced = self._pack(ordered, min_scale, min_scale)
+                if len(unplaced) < len(best_unplaced):
+                    best_placements, best_unplaced = placements, unplaced
+                min_scale *= 0.9
+
+        self._grow(best_placements, specs)
+        score, components = self.score(best_placements, specs, best_unplaced)
+
+        return SolverResult(
+            placements=best_placements,
+            specs=specs,
+            score=score,
+            components=components,
+            unplaced=best_unplaced,
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+            canvas=(self.canvas_width, self.canvas_height),
+            below_min=self.below_min(best_placements, specs)
+        )
+
+    def below_min(self, placements: Dict[str, VisualPosition], specs: Dict[str, VisualSpec]) -> List[str]:
+        """Visuais posicionados menores que o próprio mínimo (limitado ao canvas útil)"""
+        below = []
+        for visual_id, pos in placements.items():
+            min_width, min_height = self._min_size(specs[visual_id], 1.0)
+            if pos.width < min_width or pos.height < min_height:
+                below.append(visual_id)
+        return below
+
+    def _min_size(self, spec: VisualSpec, min_scale: float) -> Tuple[int, int]:
+        return (min(int(spec.min_width * min_scale), self.usable_width),
+                min(int(spec.min_height * min_scale), self.usable_height))
+
+    def _size(self, spec: VisualSpec, scale: float, min_scale: float) -> Tuple[int, int]:
+        min_width, min_height = self._min_size(spec, min_scale)
+        width = max(min_width, int(spec.preferred_width * scale))
+        height = max(min_height, int(spec.preferred_height * scale))
+        return min(width, self.usable_width), min(height, self.usable_height)
+
+    def _pack(self, ordered: List[VisualSpec], scale: float, min_scale: float = 1.0):
+        # O bin inclui um gap extra à direita/abaixo para o espaçamento do último visual
+        bin_ = _MaxRects(self.padding, self.padding, self.usable_width + self.gap, self.usable_height + self.gap)
+        placements, unplaced = {}, []
+
+        for spec in ordered:
+            width, height = self._size(spec, scale, min_scale)
+            position = bin_.find(width + self.gap, height + self.gap)
+            if position is None:
+                # Tenta o tamanho mínimo antes de desistir do visual
+                width, height = self._min_size(spec, min_scale)
+                position = bin_.find(width + self.gap, height + self.gap)
+            if position is None:
+                unplaced.append(spec.id)
+                continue
+            bin_.place(position[0], position[1], width + self.gap, height + self.gap)
+            placements[spec.id] = VisualPosition(position[0], position[1], width, height)
+
+        return placements, unplaced
+
+    def _grow(self, placements: Dict[str, VisualPosition], specs: Dict[str, VisualSpec]):
+        """Expande cada visual para a direita e para baixo sobre o espaço livre (até 2x o preferido)"""
+        right_limit = self.canvas_width - self.padding
+        bottom_limit = self.canvas_height - self.padding
+        items = sorted(placements.items(), key=lambda item: -specs[item[0]].weight)
+
+        for visual_id, pos in items:
+            spec = specs[visual_id]
+            others = [other for other_id, other in placements.items() if other_id != visual_id]
+
+            max_right = right_limit
+            for other in others:
+                if other.y < pos.y + pos.height and other.y + other.height > pos.y and other.x >= pos.x + pos.width:
+                    max_right = min(max_right, other.x - self.gap)
+            pos.width = max(pos.width, min(max_right - pos.x, max(spec.preferred_width * 2, pos.width)))
+
+            max_bottom = bottom_limit
+            for other in others:
+                if other.x < pos.x + pos.width and other.x + other.width > pos.x and other.y >= pos.y + pos.height:
+                    max_bottom = min(max_bottom, other.y - self.gap)
+            pos.height = max(pos.height, min(max_bottom - pos.y, max(spec.preferred_height * 2, pos.height)))
+
+    def score(self, placements: Dict[str, VisualPosition], specs: Dict[str, VisualSpec],
+              unplaced: Optional[List[str]] = None) -> Tuple[float, Dict[str, float]]:
+        """
+        Qualidade do arranjo entre 0 e 1
+
+        Componentes: cobertura do canvas, fração posicionada, fidelidade ao
+        tamanho preferido, ajuste de proporção e ordem de leitura ponderada por
+        prioridade. A fração de visuais que respeitam o tamanho mínimo
+        (min_size_fit) multiplica o score: com todos abaixo do mínimo, ele cai pela metade.
+        """
+        total = len(placements) + len(unplaced or [])
+        if not placements:
+            return 0.0, {'coverage': 0.0, 'placed': 0.0, 'size_fit': 0.0, 'aspect_fit': 0.0, 'reading_order': 0.0,
+                         'min_size_fit': 0.0}
+
+        usable_area = self.usable_width * self.usable_height
+        coverage = min(1.0, sum(p.width * p.height for p in placements.values()) / usable_area)
+
+        size_fit, aspect_fit, reading, weights = 0.0, 0.0, 0.0, 0.0
+        diagonal = self.usable_width + self.usable_height
+        for visual_id, pos in placements.items():
+            spec = specs[visual_id]
+            size_fit += min(1.0, (pos.width * pos.height) / (spec.preferred_width * spec.preferred_height))
+            aspect_fit += math.exp(-abs(math.log((pos.width / max(pos.height, 1)) / spec.target_aspect)))
+            # Visuais importantes devem ficar próximos do canto superior esquerdo
+            distance = ((pos.y - self.padding) * 2 + (pos.x - self.padding)) / (diagonal + self.usable_height)
+            reading += spec.weight * (1 - min(1.0, distance))
+            weights += spec.weight
+
+        components = {
+            'coverage': coverage,
+            'placed': len(placements) / total,
+            'size_fit': size_fit / len(placements),
+            'aspect_fit': aspect_fit / len(placements),
+            'reading_order': reading / weights,
+            'min_size_fit': 1 - len(self.below_min(placements, specs)) / len(placements)
+        }
+        score = (0.25 * components['coverage'] + 0.25 * components['placed']
+                 + 0.15 * components['size_fit'] + 0.15 * components['aspect_fit']
+                 + 0.2 * components['reading_order'])
+        return score * (0.5 + 0.5 * components['min_size_fit']), components
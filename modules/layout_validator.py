@@ -0,0 +1,522 @@
+"""
+Validador de Layout - Sobreposição, limites, alinhamento e gutters com índice espacial
+
+Detecta visuais sobrepostos, fora do canvas, bordas quase alinhadas e
+espaçamentos irregulares usando um índice em grade uniforme (quase linear para
+layouts típicos) e oferece um passe de auto-snap que corrige os problemas.
+"""
+import copy
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple, Iterator
+
+import numpy as np
+
+
+@dataclass
+class LayoutIssue:
+    """Problema encontrado no layout"""
+    type: str
+    severity: str
+    visuals: List[str]
+    detail: str
+    value: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'type': self.type,
+            'severity': self.severity,
+            'visuals': self.visuals,
+            'detail': self.detail,
+            'value': self.value
+        }
+
+
+@dataclass
+class ValidationReport:
+    """Resultado da validação"""
+    issues: List[LayoutIssue] = field(default_factory=list)
+    visual_count: int = 0
+    dominant_gutter: Optional[int] = None
+
+    @property
+    def is_valid(self) -> bool:
+        """Sem erros (sobreposição/fora do canvas); avisos não invalidam"""
+        return not any(issue.severity == 'error' for issue in self.issues)
+
+    def counts(self) -> Dict[str, int]:
+        return dict(Counter(issue.type for issue in self.issues))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'is_valid': self.is_valid,
+            'visual_count': self.visual_count,
+            'dominant_gutter': self.dominant_gutter,
+            'counts': self.counts(),
+            'issues': [issue.to_dict() for issue in self.issues]
+        }
+
+
+class UniformGridIndex:
+    """Índice espacial em grade uniforme sobre retângulos (x0, y0, x1, y1)"""
+
+    # Células com mais membros que isso são varridas em x em vez de pareadas todas
+    DENSE_CELL = 32
+
+    def __init__(self, boxes: np.ndarray, cell_size: Optional[float] = None):
+        self.boxes = boxes
+        if cell_size is None:
+            sizes = np.concatenate([boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]]) if len(boxes) else []
+            cell_size = max(16.0, float(np.median(sizes))) if len(sizes) else 64.0
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+
+        for index, (x0, y0, x1, y1) in enumerate(boxes.tolist()):
+            for cx, cy in self._cells(x0, y0, x1, y1):
+                self.cells[(cx, cy)].append(index)
+
+    def _cells(self, x0, y0, x1, y1) -> Iterator[Tuple[int, int]]:
+        size = self.cell_size
+        for cx in range(int(x0 // size), int(max(x0, x1 - 1) // size) + 1):
+            for cy in range(int(y0 // size), int(max(y0, y1 - 1) // size) + 1):
+                yield cx, cy
+
+    def query(self, x0: float, y0: float, x1: float, y1: float) -> set:
+        """Índices com célula em comum com a região"""
+        found = set()
+        for key in self._cells(x0, y0, x1, y1):
+            found.update(self.cells.get(key, ()))
+        return found
+
+    def candidate_pairs(self) -> set:
+        """
+        Pares (i, j), i < j, que compartilham ao menos uma célula
+
+        Em células densas (muitos retângulos empilhados) só entram os pares que
+        também se cruzam em x, para não gerar todos os pares da célula.
+        """
+        pairs = set()
+        for members in self.cells.values():
+            if len(members) > self.DENSE_CELL:
+                pairs.update(self._sweep_pairs(members))
+            elif len(members) > 1:
+                for a in range(len(members)):
+                    for b in range(a + 1, len(members)):
+                        i, j = members[a], members[b]
+                        pairs.add((i, j) if i < j else (j, i))
+        return pairs
+
+    def _sweep_pairs(self, members: List[int]) -> Iterator[Tuple[int, int]]:
+        """Pares da célula cujos intervalos em x se cruzam (varredura ordenada por x0)"""
+        ordered = sorted(members, key=lambda k: self.boxes[k, 0])
+        starts = self.boxes[ordered, 0].tolist()
+        ends = self.boxes[ordered, 2].tolist()
+        for a, i in enumerate(ordered):
+            for b in range(a + 1, len(ordered)):
+                if starts[b] >= ends[a]:
+                    break
+                j = ordered[b]
+                yield (i, j) if i < j else (j, i)
+
+
+def _boxes(layout: Dict[str, Any]) -> Tuple[List[str], np.ndarray]:
+    visuals = layout.get('visuals', [])
+    ids = [visual.get('id', str(i)) for i, visual in enumerate(visuals)]
+    boxes = np.array([
+        (p['x'], p['y'], p['x'] + p['width'], p['y'] + p['height'])
+        for p in (visual['position'] for visual in visuals)
+    ], dtype=np.float64).reshape(-1, 4)
+    return ids, boxes
+
+
+class LayoutValidator:
+    """
+    Valida a geometria de layouts no formato do LayoutEngine
+
+    Exemplo:
+        validator = LayoutValidator()
+        report = validator.validate(layout)
+        if not report.is_valid:
+            layout, report = validator.auto_snap(layout)
+    """
+
+    def __init__(self, align_tolerance: int = 4, gutter_tolerance: int = 2,
+                 max_gutter: int = 60, min_size: int = 40):
+        """
+        Args:
+            align_tolerance: Bordas a até N px (e diferentes) são consideradas desalinhadas
+            gutter_tolerance: Desvio tolerado em relação ao gutter dominante
+            max_gutter: Espaços maiores que isso são intencionais (não são gutters)
+            min_size: Menor largura/altura aceita ao encolher visuais no auto-snap
+        """
+        self.align_tolerance = align_tolerance
+        self.gutter_tolerance = gutter_tolerance
+        self.max_gutter = max_gutter
+        self.min_size = min_size
+
+    def validate(self, layout: Dict[str, Any]) -> ValidationReport:
+        """Executa todas as verificações"""
+        ids, boxes = _boxes(layout)
+        canvas = layout.get('canvas', {})
+        width, height = canvas.get('width', 1280), canvas.get('height', 720)
+
+        report = ValidationReport(visual_count=len(ids))
+        if not len(ids):
+            return report
+
+        index = UniformGridIndex(boxes)
+        report.issues.extend(self._out_of_bounds(ids, boxes, width, height))
+        report.issues.extend(self._overlaps(ids, boxes, index))
+        report.issues.extend(self._misaligned(ids, boxes))
+
+        gutters = self._gutters(boxes, index)
+        report.dominant_gutter = self._dominant(gutters)
+        report.issues.extend(self._uneven_gutters(ids, gutters, report.dominant_gutter))
+        return report
+
+    # -- verificações ---------------------------------------------------------
+
+    def _out_of_bounds(self, ids, boxes, width, height) -> List[LayoutIssue]:
+        outside = (boxes[:, 0] < 0) | (boxes[:, 1] < 0) | (boxes[:, 2] > width) | (boxes[:, 3] > height)
+        issues = []
+        for i in np.flatnonzero(outside):
+            x0, y0, x1, y1 = boxes[i]
+            excess = max(0 - x0, 0 - y0, x1 - width, y1 - height)
+            issues.append(LayoutIssue(
+                'out_of_bounds', 'error', [ids[i]],
+                f"{ids[i]} excede o canvas {width}x{height} em {excess:.0f}px", float(excess)
+            ))
+        return issues
+
+    def _overlap_area(self, a, b) -> float:
+        dx = min(a[2], b[2]) - max(a[0], b[0])
+        dy = min(a[3], b[3]) - max(a[1], b[1])
+        return dx * dy if dx > 0 and dy > 0 else 0.0
+
+    def _overlaps(self, ids, boxes, index: UniformGridIndex) -> List[LayoutIssue]:
+        issues = []
+        rows = boxes.tolist()
+        for i, j in sorted(index.candidate_pairs()):
+            area = self._overlap_area(rows[i], rows[j])
+            if area > 0:
+                issues.append(LayoutIssue(
+                    'overlap', 'error', [ids[i], ids[j]],
+                    f"{ids[i]} e {ids[j]} se sobrepõem em {area:.0f}px²", float(area)
+                ))
+        return issues
+
+    def _edge_clusters(self, values: np.ndarray) -> List[np.ndarray]:
+        """Grupos de índices com valores próximos (ordenação + varredura, O(n log n))"""
+        order = np.argsort(values, kind='stable')
+        ordered = values[order]
+        clusters, start = [], 0
+        for k in range(1, len(ordered) + 1):
+            if k == len(ordered) or ordered[k] - ordered[k - 1] > self.align_tolerance \
+                    or ordered[k] - ordered[start] > 2 * self.align_tolerance:
+                if k - start > 1:
+                    clusters.append(order[start:k])
+                start = k
+        return clusters
+
+    def _misaligned(self, ids, boxes) -> List[LayoutIssue]:
+        issues = []
+        for column, edge in ((0, 'esquerda'), (1, 'topo'), (2, 'direita'), (3, 'base')):
+            for cluster in self._edge_clusters(boxes[:, column]):
+                values = boxes[cluster, column]
+                if values.max() != values.min():
+                    members = [ids[i] for i in cluster]
+                    issues.append(LayoutIssue(
+                        'misaligned', 'warning', members,
+                        f"Bordas ({edge}) quase alinhadas: {sorted(set(values.astype(int).tolist()))}",
+                        float(values.max() - values.min())
+                    ))
+        return issues
+
+    def _gutters(self, boxes, index: UniformGridIndex) -> List[Tuple[str, int, int, float]]:
+        """(eixo, i, vizinho, gutter) para o vizinho mais próximo à direita e abaixo"""
+        gutters = []
+        rows = boxes.tolist()
+        for i, (x0, y0, x1, y1) in enumerate(rows):
+            right = [(rows[j][0] - x1, j) for j in index.query(x1, y0, x1 + self.max_gutter, y1)
+                     if j != i and rows[j][0] >= x1 and rows[j][1] < y1 and rows[j][3] > y0]
+            if right:
+                gap, j = min(right)
+                if gap <= self.max_gutter:
+                    gutters.append(('x', i, j, gap))
+
+            below = [(rows[j][1] - y1, j) for j in index.query(x0, y1, x1, y1 + self.max_gutter)
+                     if j != i and rows[j][1] >= y1 and rows[j][0] < x1 and rows[j][2] > x0]
+            if below:
+                gap, j = min(below)
+                if gap <= self.max_gutter:
+                    gutters.append(('y', i, j, gap))
+        return gutters
+
+    @staticmethod
+    def _dominant(gutters) -> Optional[int]:
+        if not gutters:
+            return None
+        counts = Counter(int(round(g[3])) for g in gutters)
+        return max(counts.items(), key=lambda item: (item[1], -item[0]))[0]
+
+    def _uneven_gutters(self, ids, gutters, dominant) -> List[LayoutIssue]:
+        if dominant is None:
+            return []
+        return [
+            LayoutIssue(
+                'uneven_gutter', 'warning', [ids[i], ids[j]],
+                f"Espaço {'horizontal' if axis == 'x' else 'vertical'} de {gap:.0f}px entre "
+                f"{ids[i]} e {ids[j]} (padrão: {dominant}px)", float(gap)
+            )
+            for axis, i, j, gap in gutters
+            if abs(gap - dominant) > self.gutter_tolerance
+        ]
+
+    # -- correção -------------------------------------------------------------
+
+    def auto_snap(self, layout: Dict[str, Any], gutter: Optional[int] = None,
+                  max_passes: int = 8) -> Tuple[Dict[str, Any], ValidationReport]:
+        """
+        Corrige o layout: limites do canvas, alinhamento de bordas, gutters e sobreposições
+
+        Visuais só encolhem até min_size (os já menores não encolhem) e o
+        resultado nunca tem mais sobreposições que o layout de entrada. As
+        sobreposições que os passes locais não desfazem são resolvidas
+        realocando um visual de cada par para o espaço livre mais próximo
+        (encolhendo até min_size se preciso); se o canvas não comporta todos os
+        visuais, os pares restantes ficam como 'overlap' no relatório.
+
+        Args:
+            layout: Layout original (não é modificado)
+            gutter: Gutter desejado (padrão: o dominante do layout)
+            max_passes: Máximo de passes de correção
+
+        Returns:
+            (layout corrigido, relatório da validação após a correção)
+        """
+        fixed = copy.deepcopy(layout)
+        ids, boxes = _boxes(fixed)
+        if not len(ids):
+            return fixed, self.validate(fixed)
+
+        canvas = fixed.get('canvas', {})
+        width, height = canvas.get('width', 1280), canvas.get('height', 720)
+
+        if gutter is None:
+            gutter = self._dominant(self._gutters(boxes, UniformGridIndex(boxes)))
+            gutter = gutter if gutter is not None else 15
+
+        self._clamp(boxes, width, height)
+        best, best_overlaps = boxes.copy(), self._overlap_count(boxes)
+        # Cada passe realinha as bordas movidas pelo passe anterior; para quando
+        # um passe não reduz as sobreposições e fica com o melhor resultado.
+        # Depois, realinha só o que não cria sobreposição nova
+        for attempt in range(max_passes):
+            self._snap_edges(boxes)
+            self._normalize_gutters(boxes, gutter)
+            self._clamp(boxes, width, height)
+            self._resolve_overlaps(boxes, gutter, (width, height))
+            overlaps = self._overlap_count(boxes)
+            if overlaps > best_overlaps:
+                break
+            # Empate fica com o passe mais recente (mais alinhado), mas encerra
+            reduced = overlaps < best_overlaps
+            best, best_overlaps = boxes.copy(), overlaps
+            if not overlaps or not reduced and attempt:
+                break
+        boxes = best
+        if best_overlaps:
+            self._relocate(boxes, width, height)
+        for _ in range(max_passes):
+            aligned = self._realign(boxes, gutter, width, height)
+            if np.array_equal(aligned, boxes):
+                break
+            boxes = aligned
+
+        for visual, (x0, y0, x1, y1) in zip(fixed['visuals'], boxes.tolist()):
+            position = visual['position']
+            position.update({'x': int(x0), 'y': int(y0), 'width': int(x1 - x0), 'height': int(y1 - y0)})
+
+        return fixed, self.validate(fixed)
+
+    @staticmethod
+    def _overlap_pairs(boxes) -> List[Tuple[int, int]]:
+        """Pares (i, j), i < j, que se sobrepõem, ordenados (varredura em x vetorizada)"""
+        order = np.argsort(boxes[:, 0], kind='stable')
+        ordered = boxes[order]
+        # Candidatos de k: os seguintes na ordem que começam antes do fim de k em x
+        ends = np.searchsorted(ordered[:, 0], ordered[:, 2], side='left')
+        counts = np.maximum(ends - np.arange(1, len(ordered) + 1), 0)
+        first = np.repeat(np.arange(len(ordered)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        second = first + 1 + offsets
+        a, b = ordered[first], ordered[second]
+        hit = (np.minimum(a[:, 2], b[:, 2]) > b[:, 0]) & (np.minimum(a[:, 3], b[:, 3]) > np.maximum(a[:, 1], b[:, 1]))
+        i, j = order[first[hit]], order[second[hit]]
+        return sorted(zip(np.minimum(i, j).tolist(), np.maximum(i, j).tolist()))
+
+    def _overlap_count(self, boxes) -> int:
+        return len(self._overlap_pairs(boxes))
+
+    def _realign(self, boxes, gutter, width, height):
+        """Realinha bordas e gutters; visuais que passariam a se sobrepor voltam à posição anterior"""
+        before = set(self._overlap_pairs(boxes))
+        aligned = boxes.copy()
+        self._snap_edges(aligned)
+        self._normalize_gutters(aligned, gutter)
+        self._clamp(aligned, width, height)
+        while True:
+            created = set(self._overlap_pairs(aligned)) - before
+            if not created:
+                return aligned
+            reverted = sorted({k for pair in created for k in pair})
+            aligned[reverted] = boxes[reverted]
+
+    def _relocate(self, boxes, width, height):
+        """Realoca um visual de cada par sobreposto para o espaço livre mais próximo"""
+        evicted = set()
+        for i, j in self._overlap_pairs(boxes):
+            if i in evicted or j in evicted:
+                continue
+            area = (boxes[[i, j], 2] - boxes[[i, j], 0]) * (boxes[[i, j], 3] - boxes[[i, j], 1])
+            evicted.add(i if area[0] < area[1] else j)
+
+        keep = np.ones(len(boxes), dtype=bool)
+        keep[list(evicted)] = False
+        # Maiores primeiro: os pequenos cabem nas sobras
+        for k in sorted(evicted, key=lambda k: -(boxes[k, 2] - boxes[k, 0]) * (boxes[k, 3] - boxes[k, 1])):
+            position = self._free_position(boxes[keep], boxes[k], width, height)
+            if position is not None:
+                boxes[k] = position
+                keep[k] = True
+
+    def _free_position(self, placed, box, width, height) -> Optional[Tuple[float, float, float, float]]:
+        """
+        Posição livre mais próxima de box entre os retângulos placed (None se não houver)
+
+        As coordenadas das bordas são comprimidas numa grade de ocupação com
+        tabela de somas acumuladas; cada tamanho (do original até min_size)
+        testa todas as posições candidatas de uma vez.
+        """
+        xs = np.unique(np.concatenate([[0.0, width], placed[:, 0], placed[:, 2]]).clip(0, width))
+        ys = np.unique(np.concatenate([[0.0, height], placed[:, 1], placed[:, 3]]).clip(0, height))
+        diff = np.zeros((len(ys), len(xs)), dtype=np.int32)
+        x0, x1 = np.searchsorted(xs, placed[:, 0].clip(0, width)), np.searchsorted(xs, placed[:, 2].clip(0, width))
+        y0, y1 = np.searchsorted(ys, placed[:, 1].clip(0, height)), np.searchsorted(ys, placed[:, 3].clip(0, height))
+        np.add.at(diff, (y0, x0), 1)
+        np.add.at(diff, (y0, x1), -1)
+        np.add.at(diff, (y1, x0), -1)
+        np.add.at(diff, (y1, x1), 1)
+        occupied = (diff.cumsum(0).cumsum(1)[:-1, :-1] > 0).astype(np.int32)
+        table = np.zeros((len(ys), len(xs)), dtype=np.int32)
+        table[1:, 1:] = occupied.cumsum(0).cumsum(1)
+
+        w, h = box[2] - box[0], box[3] - box[1]
+        floor_w, floor_h = self._shrink_floor(w), self._shrink_floor(h)
+        for scale in np.linspace(1.0, 0.0, 5):
+            size_w = float(np.floor(floor_w + (w - floor_w) * scale))
+            size_h = float(np.floor(floor_h + (h - floor_h) * scale))
+            # Encostado à esquerda/topo ou à direita/base de uma borda existente
+            cx = np.unique(np.concatenate([xs, xs - size_w]))
+            cy = np.unique(np.concatenate([ys, ys - size_h]))
+            cx = cx[(cx >= 0) & (cx + size_w <= width)]
+            cy = cy[(cy >= 0) & (cy + size_h <= height)]
+            if not len(cx) or not len(cy):
+                continue
+            # Células da grade cobertas (as parcialmente cobertas contam inteiras)
+            i0 = np.searchsorted(xs, cx, side='right') - 1
+            i1 = np.searchsorted(xs, cx + size_w, side='left')
+            j0 = np.searchsorted(ys, cy, side='right') - 1
+            j1 = np.searchsorted(ys, cy + size_h, side='left')
+            covered = (table[j1[:, None], i1[None, :]] - table[j0[:, None], i1[None, :]]
+                       - table[j1[:, None], i0[None, :]] + table[j0[:, None], i0[None, :]])
+            free_y, free_x = np.nonzero(covered == 0)
+            if not len(free_y):
+                continue
+            distance = (cx[free_x] - box[0]) ** 2 + (cy[free_y] - box[1]) ** 2
+            best = int(np.argmin(distance))
+            x, y = cx[free_x[best]], cy[free_y[best]]
+            return x, y, x + size_w, y + size_h
+        return None
+
+    def _clamp(self, boxes, width, height):
+        """Traz para dentro do canvas: desloca e, se ainda exceder, encolhe"""
+        for lo, hi, limit in ((0, 2, width), (1, 3, height)):
+            size = np.minimum(boxes[:, hi] - boxes[:, lo], limit)
+            start = np.clip(boxes[:, lo], 0, limit - size)
+            boxes[:, lo] = start
+            boxes[:, hi] = start + size
+
+    def _snap_edges(self, boxes):
+        """Bordas próximas assumem o valor mais frequente do grupo"""
+        for column in range(4):
+            for cluster in self._edge_clusters(boxes[:, column]):
+                values = boxes[cluster, column]
+                counts = Counter(values.tolist())
+                target = max(counts.items(), key=lambda item: (item[1], -item[0]))[0]
+                if column < 2:
+                    # Borda esquerda/topo: move a borda mantendo a oposta, sem encolher abaixo do piso
+                    end = boxes[cluster, column + 2]
+                    ceiling = end - np.minimum(self.min_size, end - boxes[cluster, column])
+                    boxes[cluster, column] = np.minimum(target, ceiling)
+                else:
+                    start = boxes[cluster, column - 2]
+                    floor = start + np.minimum(self.min_size, boxes[cluster, column] - start)
+                    boxes[cluster, column] = np.maximum(target, floor)
+
+    def _shrink_floor(self, size: float) -> float:
+        """Menor tamanho aceito ao encolher um visual: min_size (um visual já menor não encolhe)"""
+        return min(self.min_size, size)
+
+    def _normalize_gutters(self, boxes, gutter):
+        index = UniformGridIndex(boxes)
+        for axis, i, j, gap in self._gutters(boxes, index):
+            if gap == gutter or abs(gap - gutter) > max(self.gutter_tolerance, gutter):
+                continue
+            lo = 0 if axis == 'x' else 1
+            # Move a borda inicial do vizinho mantendo a borda final
+            new_start = boxes[i, lo + 2] + gutter
+            if boxes[j, lo + 2] - new_start >= self._shrink_floor(boxes[j, lo + 2] - boxes[j, lo]):
+                boxes[j, lo] = new_start
+
+    def _separate(self, boxes, first, second, lo, gap, limit, recede: bool = True) -> bool:
+        """Afasta dois visuais no eixo lo deixando gap entre eles; False se não couber"""
+        new_start = boxes[first, lo + 2] + gap
+        size = boxes[second, lo + 2] - boxes[second, lo]
+        first_size = boxes[first, lo + 2] - boxes[first, lo]
+        first_end = boxes[second, lo] - gap
+        if boxes[second, lo + 2] - new_start >= self._shrink_floor(size):
+            boxes[second, lo] = new_start
+        elif first_end - boxes[first, lo] >= self._shrink_floor(first_size):
+            # O segundo não pode encolher (ex.: encostado no fim do canvas): encolhe o primeiro
+            boxes[first, lo + 2] = first_end
+        elif new_start + size <= limit:
+            boxes[second, lo] = new_start
+            boxes[second, lo + 2] = new_start + size
+        elif recede and first_end - first_size >= 0:
+            # O segundo não cabe mais adiante: o primeiro recua
+            boxes[first, lo] = first_end - first_size
+            boxes[first, lo + 2] = first_end
+        else:
+            return False
+        return True
+
+    def _resolve_overlaps(self, boxes, gutter, canvas: Tuple[int, int] = (1280, 720), passes: int = 20):
+        for _ in range(passes):
+            changed = False
+            for i, j in self._overlap_pairs(boxes):
+                a, b = boxes[i], boxes[j]
+                dx = min(a[2], b[2]) - max(a[0], b[0])
+                dy = min(a[3], b[3]) - max(a[1], b[1])
+                if dx <= 0 or dy <= 0:
+                    continue
+
+                # No eixo de menor sobreposição, o visual que começa depois cede espaço;
+                # sem espaço para o gutter, os dois ao menos encostam
+                lo = 0 if dx <= dy else 1
+                first, second = (i, j) if (a[lo], a[1 - lo]) <= (b[lo], b[1 - lo]) else (j, i)
+                if self._separate(boxes, first, second, lo, gutter, canvas[lo], recede=False) \
+                        or self._separate(boxes, first, second, lo, 0, canvas[lo]):
+                    changed = True
+            if not changed:
+                break
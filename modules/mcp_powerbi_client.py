@@ -2,51 +2,35 @@
 MCP Power BI Client - Cliente para integração com Analysis Services via pythonnet
 """
 from typing import Dict, List, Any, Optional
+import copy
 import json
+import logging
+from .as_backend import AnalysisServicesBackend, create_backend
+from . import tracing
+
+
+logger = logging.getLogger(__name__)
 
 
 class MCPPowerBIClient:
     """Cliente MCP para operações Power BI via Analysis Services"""
     
-    def __init__(self):
+    def __init__(self, backend: Optional[AnalysisServicesBackend] = None):
+        """
+        Args:
+            backend: Backend do Analysis Services (padrão: ADOMD.NET via pythonnet,
+                     ou o definido em PBI_BACKEND)
+        """
+        self.backend = backend or create_backend()
         self.connection = None
         self.connection_string = None
         self._adomd_loaded = False
         self._load_adomd()
         
     def _load_adomd(self):
-        """Carrega biblioteca ADOMD.NET via pythonnet"""
-        try:
-            import clr
-            import sys
-            import os
-            
-            # Adicionar diretórios conhecidos das DLLs ao PATH
-            dll_paths = [
-                r"C:\Program Files\Microsoft.NET\ADOMD.NET\160",
-                r"C:\Program Files (x86)\Microsoft SQL Server Management Studio 20\Common7\IDE",
-                r"C:\Program Files\Microsoft SQL Server\160\DTS\Binn",
-                r"C:\Program Files\Microsoft SQL Server\160\SDK\Assemblies",
-            ]
-            
-            for dll_path in dll_paths:
-                if os.path.exists(dll_path) and dll_path not in sys.path:
-                    sys.path.append(dll_path)
-                    os.environ['PATH'] = dll_path + os.pathsep + os.environ.get('PATH', '')
-            
-            # Tentar adicionar referências para Microsoft.AnalysisServices.AdomdClient
-            try:
-                clr.AddReference("Microsoft.AnalysisServices.AdomdClient")
-                self._adomd_loaded = True
-                print("✅ Microsoft.AnalysisServices.AdomdClient carregado")
-            except Exception as e:
-                print(f"⚠️ ADOMD Client não disponível: {e}")
-                print("💡 Para executar queries DAX, instale SQL Server Management Studio ou Analysis Services Client")
-                self._adomd_loaded = False
-                
-        except ImportError:
-            print("⚠️ pythonnet não disponível")
-            self._adomd_loaded = False
+        """Carrega as bibliotecas do backend (ADOMD.NET via pythonnet por padrão)"""
+        self._adomd_loaded = self.backend.load()
+
     def connect(self, connection_string: str) -> bool:
         """
         Conecta ao Analysis Services
@@ -62,12 +46,8 @@ class MCPPowerBIClient:
             return False
             
         try:
-            import clr
-            from Microsoft.AnalysisServices.AdomdClient import AdomdConnection
-            
             self.connection_string = connection_string
-            self.connection = AdomdConnection(connection_string)
-            self.connection.Open()
+            self.connection = self.backend.open_connection(connection_string)
             
             print("✅ Conectado ao Analysis Services via ADOMD.NET")
             return True
@@ -77,6 +57,19 @@ class MCPPowerBIClient:
             self.connection = None
             return False
     
+    def open_dedicated(self) -> Optional['MCPPowerBIClient']:
+        """
+        Cliente com conexão própria ao mesmo modelo (ex.: job em outra thread)
+
+        A conexão ADOMD não é thread-safe: um job em segundo plano não divide
+        a conexão da sessão com a interface. Feche com disconnect().
+        """
+        if not self.connection or not self._adomd_loaded:
+            return None
+        client = copy.copy(self)
+        client.connection = None
+        return client if client.connect(self.connection_string) else None
+
     def disconnect(self) -> bool:
         """Desconecta do Analysis Services"""
         if self.connection:
@@ -104,11 +97,16 @@ class MCPPowerBIClient:
         if not self.connection:
             return {'rows': [], 'columns': [], 'error': 'Não conectado'}
         
+        with tracing.span('dax.query', max_rows=max_rows):
+            return self._read_dax(query, max_rows)
+    
+    def _read_dax(self, query: str, max_rows: int) -> Dict[str, Any]:
+        # Com tracing ligado, soma o tamanho das células decodificadas (UTF-8 dos
+        # textos, 8 bytes por número) durante a própria leitura
+        measure = tracing.is_enabled()
+        size = 0
         try:
-            from Microsoft.AnalysisServices.AdomdClient import AdomdCommand
-            
-            command = AdomdCommand(query, self.connection)
-            reader = command.ExecuteReader()
+            reader = self.backend.execute_reader(self.connection, query)
             
             # Obter nomes das colunas
             columns = []
@@ -126,6 +124,8 @@ class MCPPowerBIClient:
                         # Converter tipos .NET para Python
                         if value is not None:
                             value = str(value) if not isinstance(value, (int, float, bool)) else value
+                            if measure:
+                                size += len(value.encode('utf-8')) if isinstance(value, str) else 8
                         row_dict[col_name] = value
                     except:
                         row_dict[col_name] = None
@@ -133,6 +133,8 @@ class MCPPowerBIClient:
                 row_count += 1
             
             reader.Close()
+            tracing.count('rows', len(rows))
+            tracing.count('bytes', size)
             
             return {
                 'success': True,
@@ -142,7 +144,7 @@ class MCPPowerBIClient:
             }
             
         except Exception as e:
-            print(f"❌ Erro ao executar DAX: {e}")
+            logger.error("Erro ao executar DAX: %s", e)
             return {
                 'success': False,
                 'rows': [],
@@ -235,6 +237,286 @@ class MCPPowerBIClient:
             }
         }
     
+    def create_measures_batch(self, measures: List[Dict[str, Any]], atomic: bool = True,
+                              validate: bool = True, refresh: bool = True) -> Dict[str, Any]:
+        """
+        Cria várias medidas DAX em uma única transação TMSL
+
+        Todas as medidas são enviadas em um único comando `sequence` com
+        operações `createOrReplace`, seguido de um único `refresh` do modelo.
+
+        Args:
+            measures: Lista de definições {name, table, expression,
+                      description?, format?, display_folder?}
+            atomic: Se True, nenhuma medida é criada caso alguma falhe
+            validate: Se deve validar as expressões DAX no servidor antes
+            refresh: Se deve recalcular o modelo ao final do lote
+
+        Returns:
+            Resultado do lote com status individual de cada medida
+        """
+        results = [
+            {
+                'name': measure.get('name'),
+                'table': measure.get('table'),
+                'success': False,
+                'error': self._check_measure_definition(measure)
+            }
+            for measure in measures
+        ]
+
+        # Nomes duplicados no mesmo lote sobrescreveriam uns aos outros
+        seen = set()
+        for result in results:
+            key = (result['table'], result['name'])
+            if result['error'] is None and key in seen:
+                result['error'] = 'Medida duplicada no lote'
+            seen.add(key)
+
+        if not self.connection or not self._adomd_loaded:
+            for result in results:
+                result['error'] = result['error'] or 'Não conectado ao Analysis Services'
+            return self._summarize_measure_batch(results, atomic, committed=False)
+
+        if validate:
+            pending = [i for i, r in enumerate(results) if r['error'] is None]
+            errors = self._validate_measures([measures[i] for i in pending])
+            for i, error in zip(pending, errors):
+                results[i]['error'] = error
+
+        valid = [i for i, r in enumerate(results) if r['error'] is None]
+
+        if not valid or (atomic and len(valid) < len(results)):
+            # Tudo ou nada: nenhuma operação é enviada ao servidor
+            for i in valid:
+                results[i]['error'] = 'Não aplicada (lote atômico abortado)'
+            return self._summarize_measure_batch(results, atomic, committed=False)
+
+        database = self.connection.Database
+        operations = [self._build_measure_operation(database, measures[i]) for i in valid]
+
+        try:
+            self._execute_tmsl(self._build_sequence(database, operations, refresh))
+            for i in valid:
+                results[i]['success'] = True
+        except Exception as e:
+            if atomic:
+                # A sequence é transacional: o servidor desfaz todas as operações
+                for i in valid:
+                    results[i]['error'] = f'Lote revertido: {e}'
+                return self._summarize_measure_batch(results, atomic, committed=False)
+
+            # Modo não atômico: reenvia individualmente para isolar as falhas
+            for i, operation in zip(valid, operations):
+                try:
+                    self._execute_tmsl(operation)
+                    results[i]['success'] = True
+                except Exception as op_error:
+                    results[i]['error'] = str(op_error)
+
+            if refresh and any(results[i]['success'] for i in valid):
+                try:
+                    self._execute_tmsl(self._build_sequence(database, [], refresh))
+                except Exception as refresh_error:
+                    logger.warning("Erro ao recalcular modelo: %s", refresh_error)
+
+        return self._summarize_measure_batch(results, atomic, committed=True)
+
+    def _check_measure_definition(self, measure: Dict[str, Any]) -> Optional[str]:
+        """Validação local (sem servidor) de uma definição de medida"""
+        if not measure.get('name') or not str(measure['name']).strip():
+            return 'Nome da medida não informado'
+        if not measure.get('table'):
+            return 'Tabela de destino não informada'
+
+        expression = (measure.get('expression') or '').strip()
+        if not expression:
+            return 'Expressão DAX vazia'
+
+        # Balanceamento de delimitadores fora de strings
+        depth = {'(': 0, '[': 0}
+        closing = {')': '(', ']': '['}
+        in_string = False
+        for char in expression:
+            if char == '"':
+                in_string = not in_string
+            elif in_string:
+                continue
+            elif char in depth:
+                depth[char] += 1
+            elif char in closing:
+                depth[closing[char]] -= 1
+                if depth[closing[char]] < 0:
+                    return f"Delimitador '{char}' sem abertura correspondente"
+
+        if in_string:
+            return 'String não terminada na expressão'
+        if any(depth.values()):
+            return 'Parênteses ou colchetes não balanceados'
+
+        return None
+
+    def _validate_measures(self, measures: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Valida várias medidas no servidor em uma única query
+
+        As medidas são declaradas juntas com DEFINE MEASURE, de modo que
+        medidas do lote podem referenciar umas às outras. Se a query do lote
+        falhar, o lote é dividido ao meio recursivamente (as metades aprovadas
+        continuam definidas nas queries seguintes): com k medidas inválidas em
+        n, são O(k log n) queries. As rejeitadas são revalidadas enquanto
+        alguma nova passar, de modo que uma medida que depende de outra do lote
+        só é rejeitada se a dependência também for.
+        """
+        errors: List[Optional[str]] = [None] * len(measures)
+        context: List[Dict[str, Any]] = []
+        pending = list(range(len(measures)))
+        while pending:
+            rejected = self._bisect_validation(measures, pending, context, errors)
+            if len(rejected) == len(pending):
+                break
+            pending = rejected
+        return errors
+
+    def _bisect_validation(self, measures: List[Dict[str, Any]], group: List[int],
+                           context: List[Dict[str, Any]], errors: List[Optional[str]]) -> List[int]:
+        """Valida o grupo junto com as já aprovadas (context); retorna os índices rejeitados"""
+        result = self.execute_dax_query(
+            self._build_validation_query(context + [measures[i] for i in group]), max_rows=1
+        )
+        if result.get('success'):
+            context.extend(measures[i] for i in group)
+            for i in group:
+                errors[i] = None
+            return []
+
+        if len(group) == 1:
+            errors[group[0]] = result.get('error', 'Expressão inválida')
+            return group
+
+        middle = len(group) // 2
+        return (self._bisect_validation(measures, group[:middle], context, errors)
+                + self._bisect_validation(measures, group[middle:], context, errors))
+
+    def _build_validation_query(self, measures: List[Dict[str, Any]]) -> str:
+        """Monta query DEFINE MEASURE ... EVALUATE ROW(...) para validação"""
+        definitions = []
+        columns = []
+        for i, measure in enumerate(measures):
+            reference = f"{self._quote_table(measure['table'])}{self._quote_name(measure['name'])}"
+            definitions.append(f"    MEASURE {reference} = {measure['expression']}")
+            columns.append(f'"m{i}", {reference}')
+
+        return "DEFINE\n" + "\n".join(definitions) + "\nEVALUATE\nROW(" + ", ".join(columns) + ")"
+
+    def _build_measure_operation(self, database: str, measure: Dict[str, Any]) -> Dict[str, Any]:
+        """Monta a operação TMSL createOrReplace de uma medida"""
+        definition = {
+            'name': measure['name'],
+            'expression': measure['expression']
+        }
+
+        format_string = measure.get('format') or measure.get('formatString')
+        if format_string:
+            definition['formatString'] = format_string
+        if measure.get('description'):
+            definition['description'] = measure['description']
+        if measure.get('display_folder'):
+            definition['displayFolder'] = measure['display_folder']
+
+        return {
+            "createOrReplace": {
+                "object": {
+                    "database": database,
+                    "table": measure['table'],
+                    "measure": measure['name']
+                },
+                "measure": definition
+            }
+        }
+
+    def _build_sequence(self, database: str, operations: List[Dict[str, Any]],
+                        refresh: bool = True) -> Dict[str, Any]:
+        """Agrupa operações TMSL em uma única sequence transacional"""
+        operations = list(operations)
+        if refresh:
+            operations.append({
+                "refresh": {
+                    "type": "calculate",
+                    "objects": [{"database": database}]
+                }
+            })
+
+        return {"sequence": {"operations": operations}}
+
+    def execute_tmsl(self, tmsl_script: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Executa um script TMSL (createOrReplace, delete, alter, sequence...)
+
+        Args:
+            tmsl_script: Script TMSL como dicionário
+
+        Returns:
+            Resultado da operação
+        """
+        if not self.connection or not self._adomd_loaded:
+            return {
+                'success': False,
+                'message': 'Não conectado ao Analysis Services'
+            }
+
+        try:
+            self._execute_tmsl(tmsl_script)
+            return {
+                'success': True,
+                'message': 'Script TMSL executado com sucesso'
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Erro ao executar TMSL: {str(e)}',
+                'error': str(e)
+            }
+
+    def _execute_tmsl(self, tmsl_script: Dict[str, Any]) -> None:
+        """Executa um script TMSL na conexão ativa"""
+        self.backend.execute_command(self.connection, json.dumps(tmsl_script))
+
+    def _summarize_measure_batch(self, results: List[Dict[str, Any]], atomic: bool,
+                                 committed: bool) -> Dict[str, Any]:
+        """Consolida o resultado de um lote de medidas"""
+        created = sum(1 for r in results if r['success'])
+        failed = len(results) - created
+
+        if not results:
+            message = 'Nenhuma medida informada'
+        elif failed == 0:
+            message = f'{created} medida(s) criada(s) em uma única transação'
+        elif committed:
+            message = f'{created} medida(s) criada(s), {failed} com erro'
+        else:
+            message = f'Nenhuma medida criada ({failed} com erro)'
+
+        return {
+            'success': bool(results) and failed == 0,
+            'message': message,
+            'atomic': atomic,
+            'total': len(results),
+            'created': created,
+            'failed': failed,
+            'results': results
+        }
+
+    @staticmethod
+    def _quote_table(name: str) -> str:
+        """Referência DAX para nome de tabela ('Tabela')"""
+        return "'" + str(name).replace("'", "''") + "'"
+
+    @staticmethod
+    def _quote_name(name: str) -> str:
+        """Referência DAX para nome de coluna/medida ([Nome])"""
+        return "[" + str(name).replace("]", "]]") + "]"
+
     def apply_theme(self, theme_json: Dict[str, Any]) -> Dict[str, Any]:
         """
         Aplica tema de cores ao modelo
@@ -295,8 +577,6 @@ class MCPPowerBIClient:
             }
         
         try:
-            from Microsoft.AnalysisServices.AdomdClient import AdomdCommand
-            
             # Criar script TMSL para aplicar tema
             # Temas são aplicados através de annotations no modelo
             tmsl_script = {
@@ -317,8 +597,7 @@ class MCPPowerBIClient:
                 }
             }
             
-            command = AdomdCommand(json.dumps(tmsl_script), self.connection)
-            command.Execute()
+            self._execute_tmsl(tmsl_script)
             
             return {
                 'success': True,
@@ -347,30 +626,8 @@ class MCPPowerBIClient:
             }
         
         try:
-            import clr
-            import sys
-            import os
-            
-            # Adicionar diretórios conhecidos das DLLs ao PATH
-            dll_paths = [
-                r"C:\Program Files\Microsoft.NET\ADOMD.NET\160",
-                r"C:\Program Files (x86)\Microsoft SQL Server Management Studio 20\Common7\IDE",
-                r"C:\Program Files\Microsoft SQL Server\160\DTS\Binn",
-                r"C:\Program Files\Microsoft SQL Server\160\SDK\Assemblies",
-            ]
-            
-            for dll_path in dll_paths:
-                if os.path.exists(dll_path) and dll_path not in sys.path:
-                    sys.path.append(dll_path)
-                    os.environ['PATH'] = dll_path + os.pathsep + os.environ.get('PATH', '')
-            
-            # Carregar TOM
-            clr.AddReference("Microsoft.AnalysisServices.Tabular")
-            from Microsoft.AnalysisServices.Tabular import Server
-            
             # Conectar via TOM
-            server = Server()
-            server.Connect(self.connection_string)
+            server = self.backend.open_server(self.connection_string)
             
             if server.Databases.Count == 0:
                 server.Disconnect()
@@ -438,8 +695,6 @@ class MCPPowerBIClient:
             }
         
         try:
-            from Microsoft.AnalysisServices.AdomdClient import AdomdCommand
-            
             tmsl_script = {
                 "createOrReplace": {
                     "object": {
@@ -460,8 +715,7 @@ class MCPPowerBIClient:
                 }
             }
             
-            command = AdomdCommand(json.dumps(tmsl_script), self.connection)
-            command.Execute()
+            self._execute_tmsl(tmsl_script)
             
             return {
                 'success': True,
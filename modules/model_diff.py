@@ -0,0 +1,454 @@
+"""
+Diff de Modelo - Compara uma especificação desejada com a estrutura do modelo
+e gera apenas as alterações necessárias em um único script TMSL
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple
+
+
+@dataclass
+class ModelChange:
+    """Alteração individual no modelo"""
+    object_type: str  # measure, relationship, annotation
+    action: str  # create, update, delete
+    key: str
+    definition: Dict[str, Any]
+    changed_fields: List[str] = field(default_factory=list)
+
+
+class ModelDiffEngine:
+    """
+    Calcula o conjunto mínimo de alterações entre uma especificação de modelo
+    e a estrutura atual (no formato retornado por get_model_structure)
+
+    Especificação aceita:
+        {
+            'measures': [{table, name, expression?, format?, description?, display_folder?}],
+            'relationships': [{from_table, from_column, to_table, to_column,
+                               cardinality?, cross_filter?, is_active?, name?}],
+            'annotations': {nome: valor}
+        }
+
+    Campos omitidos em uma medida não são comparados, o que permite especificações
+    parciais (ex: alterar apenas o formato de medidas existentes). Se a estrutura
+    não traz 'annotations' (leitura via DAX, sem TOM), as anotações atuais são
+    desconhecidas: não são comparadas nem enviadas, pois o alter do modelo
+    substituiria as existentes; os nomes ficam em skipped_annotations.
+
+    Medidas existentes são atualizadas com alter contendo só as propriedades
+    alteradas: as que o diff não lê (isHidden, dataCategory, KPIs, anotações,
+    formatStringDefinition) e as que a leitura via DAX não traz (formato,
+    descrição) ficam intactas. Especificações parciais de medidas que não
+    existem no modelo ficam em skipped_measures.
+    """
+
+    MEASURE_FIELDS = {
+        'expression': 'expression',
+        'format': 'formatString',
+        'description': 'description',
+        'display_folder': 'displayFolder'
+    }
+
+    CARDINALITIES = {
+        'manytoone': ('many', 'one'),
+        'onetomany': ('one', 'many'),
+        'onetoone': ('one', 'one'),
+        'manytomany': ('many', 'many')
+    }
+
+    CROSS_FILTERS = {
+        'singledirection': 'oneDirection',
+        'onedirection': 'oneDirection',
+        'bothdirections': 'bothDirections',
+        'automatic': 'automatic'
+    }
+
+    def __init__(self, structure: Dict[str, Any]):
+        """
+        Args:
+            structure: Estrutura atual do modelo (get_model_structure ou modelo em memória)
+        """
+        self.structure = structure if structure is not None else {}
+        self._reindex()
+
+    def _reindex(self):
+        """Reconstrói os índices a partir da estrutura"""
+        self._measures = self._index_measures(self.structure)
+        self._relationships = self._index_relationships(self.structure)
+        self.annotations_known = self.structure.get('annotations') is not None
+        self._annotations = dict(self.structure.get('annotations') or {})
+        self.skipped_annotations: List[str] = []
+        self.skipped_measures: List[str] = []
+
+    def diff(self, spec: Dict[str, Any], prune: bool = False) -> List[ModelChange]:
+        """
+        Compara a especificação com a estrutura atual
+
+        Args:
+            spec: Especificação desejada do modelo
+            prune: Se True, remove medidas e relacionamentos ausentes da especificação
+
+        Returns:
+            Lista de alterações (vazia se o modelo já está no estado desejado)
+        """
+        changes = []
+        changes.extend(self._diff_measures(spec.get('measures', []), prune))
+        changes.extend(self._diff_relationships(spec.get('relationships', []), prune))
+        changes.extend(self._diff_annotations(spec.get('annotations', {})))
+        return changes
+
+    def _diff_measures(self, measures: List[Dict[str, Any]], prune: bool) -> List[ModelChange]:
+        """Compara medidas por (tabela, nome)"""
+        changes = []
+        wanted = set()
+        self.skipped_measures = []
+
+        for measure in measures:
+            name = measure.get('name')
+            current = self._find_measure(measure.get('table'), name)
+            table = measure.get('table') or (current or {}).get('table')
+            wanted.add((table, name))
+
+            desired = {
+                prop: measure[key]
+                for key, prop in self.MEASURE_FIELDS.items()
+                if measure.get(key) is not None
+            }
+
+            if current is None:
+                if 'expression' not in desired:
+                    # Especificação parcial de uma medida que não existe
+                    self.skipped_measures.append(f"{table}[{name}]" if table else name)
+                    continue
+                changes.append(ModelChange(
+                    'measure', 'create', f"{table}[{name}]",
+                    {'table': table, 'name': name, **desired},
+                    sorted(desired)
+                ))
+                continue
+
+            changed = [
+                prop for prop, value in desired.items()
+                if self._normalize_value(prop, value) != self._normalize_value(prop, current.get(prop))
+            ]
+            if changed:
+                # Só as propriedades alteradas: o alter preserva as demais
+                changes.append(ModelChange(
+                    'measure', 'update', f"{table}[{name}]",
+                    {'table': table, 'name': name, **{prop: desired[prop] for prop in changed}},
+                    changed
+                ))
+
+        if prune:
+            for (table, name), current in self._measures.items():
+                if (table, name) not in wanted:
+                    changes.append(ModelChange(
+                        'measure', 'delete', f"{table}[{name}]",
+                        {'table': table, 'name': name}
+                    ))
+
+        return changes
+
+    def _diff_relationships(self, relationships: List[Dict[str, Any]], prune: bool) -> List[ModelChange]:
+        """Compara relacionamentos pelas colunas de origem e destino"""
+        changes = []
+        wanted = set()
+
+        for rel in relationships:
+            key = (rel['from_table'], rel['from_column'], rel['to_table'], rel['to_column'])
+            wanted.add(key)
+            desired = self._relationship_definition(rel)
+            current = self._relationships.get(key)
+
+            if current is None:
+                changes.append(ModelChange(
+                    'relationship', 'create', self._relationship_label(key), desired,
+                    ['fromCardinality', 'toCardinality', 'crossFilteringBehavior', 'isActive']
+                ))
+                continue
+
+            changed = [
+                prop for prop in ('fromCardinality', 'toCardinality', 'crossFilteringBehavior', 'isActive')
+                if current.get(prop) is not None and current[prop] != desired[prop]
+            ]
+            if changed:
+                # Mantém o nome existente para substituir o mesmo objeto
+                desired['name'] = current.get('name') or desired['name']
+                changes.append(ModelChange(
+                    'relationship', 'update', self._relationship_label(key), desired, changed
+                ))
+
+        if prune:
+            for key, current in self._relationships.items():
+                if key not in wanted and current.get('name'):
+                    changes.append(ModelChange(
+                        'relationship', 'delete', self._relationship_label(key),
+                        {'name': current['name']}
+                    ))
+
+        return changes
+
+    def _diff_annotations(self, annotations: Dict[str, Any]) -> List[ModelChange]:
+        """Compara anotações do modelo por nome"""
+        changes = []
+        if not self.annotations_known:
+            self.skipped_annotations = list(annotations)
+            return changes
+
+        for name, value in annotations.items():
+            value = value if isinstance(value, str) else json.dumps(value, sort_keys=True)
+            current = self._annotations.get(name)
+
+            if current == value:
+                continue
+            changes.append(ModelChange(
+                'annotation', 'create' if current is None else 'update', name,
+                {'name': name, 'value': value}, ['value']
+            ))
+
+        return changes
+
+    def to_tmsl(self, changes: List[ModelChange], database: str,
+                refresh: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Gera um único script TMSL com as alterações
+
+        Args:
+            changes: Alterações calculadas por diff()
+            database: Nome do database de destino
+            refresh: Se deve recalcular o modelo após alterar medidas/relacionamentos
+
+        Returns:
+            Script TMSL (sequence) ou None se não houver alterações
+        """
+        if not changes:
+            return None
+
+        operations = []
+        annotations = dict(self._annotations)
+
+        for change in changes:
+            if change.object_type == 'measure':
+                path = {'database': database, 'table': change.definition['table'], 'measure': change.definition['name']}
+                measure = {k: v for k, v in change.definition.items() if k != 'table'}
+                if change.action == 'delete':
+                    operations.append({'delete': {'object': path}})
+                elif change.action == 'update':
+                    operations.append({'alter': {'object': path, 'measure': measure}})
+                else:
+                    operations.append({'createOrReplace': {'object': path, 'measure': measure}})
+
+            elif change.object_type == 'relationship':
+                path = {'database': database, 'relationship': change.definition['name']}
+                if change.action == 'delete':
+                    operations.append({'delete': {'object': path}})
+                else:
+                    operations.append({'createOrReplace': {'object': path, 'relationship': change.definition}})
+
+            elif change.object_type == 'annotation':
+                annotations[change.key] = change.definition['value']
+
+        if self.annotations_known and any(c.object_type == 'annotation' for c in changes):
+            # Envia o conjunto completo para não descartar anotações existentes
+            operations.append({
+                'alter': {
+                    'object': {'database': database},
+                    'model': {
+                        'name': 'Model',
+                        'annotations': [{'name': k, 'value': v} for k, v in annotations.items()]
+                    }
+                }
+            })
+
+        if refresh and any(c.object_type != 'annotation' for c in changes):
+            operations.append({
+                'refresh': {
+                    'type': 'calculate',
+                    'objects': [{'database': database}]
+                }
+            })
+
+        if not operations:
+            return None
+        return {'sequence': {'operations': operations}}
+
+    def apply(self, changes: List[ModelChange]) -> Dict[str, Any]:
+        """
+        Aplica as alterações à estrutura em memória (mesmo formato de get_model_structure)
+
+        Mantém o cache local coerente após um deploy, sem recarregar o modelo.
+
+        Returns:
+            Estrutura atualizada
+        """
+        structure = self.structure
+        measures = structure.setdefault('measures', [])
+        relationships = structure.setdefault('relationships', [])
+        annotations = structure.get('annotations')
+
+        for change in changes:
+            if change.object_type == 'measure':
+                table, name = change.definition['table'], change.definition['name']
+                if change.action == 'update':
+                    self._update_measure_entry(measures, table, name, change.definition)
+                    continue
+                measures[:] = [
+                    m for m in measures
+                    if not (self._measure_table(m) == table and self._measure_name(m) == name)
+                ]
+                if change.action != 'delete':
+                    measures.append({
+                        'MeasureName': name,
+                        'TableName': table,
+                        'Expression': change.definition.get('expression'),
+                        'FormatString': change.definition.get('formatString'),
+                        'Description': change.definition.get('description'),
+                        'DisplayFolder': change.definition.get('displayFolder')
+                    })
+
+            elif change.object_type == 'relationship':
+                name = change.definition['name']
+                relationships[:] = [r for r in relationships if r.get('name') != name]
+                if change.action != 'delete':
+                    definition = change.definition
+                    relationships.append({
+                        'name': name,
+                        'fromTable': definition['fromTable'],
+                        'fromColumn': definition['fromColumn'],
+                        'toTable': definition['toTable'],
+                        'toColumn': definition['toColumn'],
+                        'cardinality': f"{definition['fromCardinality']}:{definition['toCardinality']}",
+                        'crossFilteringBehavior': definition['crossFilteringBehavior'],
+                        'isActive': definition['isActive']
+                    })
+
+            elif change.object_type == 'annotation' and annotations is not None:
+                annotations[change.key] = change.definition['value']
+
+        # Reindexa para que novos diffs considerem o estado atualizado
+        self._reindex()
+        return structure
+
+    @staticmethod
+    def summarize(changes: List[ModelChange]) -> Dict[str, Any]:
+        """Resumo das alterações por tipo e ação"""
+        summary = {'total': len(changes), 'by_type': {}, 'changes': []}
+
+        for change in changes:
+            by_action = summary['by_type'].setdefault(change.object_type, {})
+            by_action[change.action] = by_action.get(change.action, 0) + 1
+            summary['changes'].append({
+                'type': change.object_type,
+                'action': change.action,
+                'key': change.key,
+                'fields': change.changed_fields
+            })
+
+        return summary
+
+    def _update_measure_entry(self, measures: List[Dict[str, Any]], table: str, name: str,
+                              definition: Dict[str, Any]):
+        """Atualiza só as propriedades alteradas da medida, mantendo as demais chaves"""
+        for measure in measures:
+            if self._measure_table(measure) == table and self._measure_name(measure) == name:
+                for prop in self.MEASURE_FIELDS.values():
+                    if prop in definition:
+                        key = prop if prop in measure else prop[0].upper() + prop[1:]
+                        measure[key] = definition[prop]
+                return
+
+    def _find_measure(self, table: Optional[str], name: str) -> Optional[Dict[str, Any]]:
+        """Localiza medida atual; sem tabela, procura pelo nome em todo o modelo"""
+        if table:
+            return self._measures.get((table, name))
+
+        for (_, measure_name), measure in self._measures.items():
+            if measure_name == name:
+                return measure
+        return None
+
+    def _index_measures(self, structure: Dict[str, Any]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Indexa medidas da estrutura por (tabela, nome)"""
+        index = {}
+        for measure in structure.get('measures', []):
+            table, name = self._measure_table(measure), self._measure_name(measure)
+            index[(table, name)] = {
+                'table': table,
+                'expression': measure.get('Expression') or measure.get('expression'),
+                'formatString': measure.get('FormatString') or measure.get('formatString'),
+                'description': measure.get('Description') or measure.get('description'),
+                'displayFolder': measure.get('DisplayFolder') or measure.get('displayFolder')
+            }
+        return index
+
+    def _index_relationships(self, structure: Dict[str, Any]) -> Dict[Tuple, Dict[str, Any]]:
+        """Indexa relacionamentos da estrutura pelas colunas envolvidas"""
+        index = {}
+        for rel in structure.get('relationships', []):
+            key = (rel.get('fromTable'), rel.get('fromColumn'), rel.get('toTable'), rel.get('toColumn'))
+
+            from_card, to_card = None, None
+            if rel.get('cardinality') and ':' in str(rel['cardinality']):
+                from_card, to_card = [c.strip().lower() for c in str(rel['cardinality']).split(':', 1)]
+
+            cross_filter = rel.get('crossFilteringBehavior')
+            index[key] = {
+                'name': rel.get('name'),
+                'fromCardinality': from_card,
+                'toCardinality': to_card,
+                'crossFilteringBehavior': self.CROSS_FILTERS.get(str(cross_filter).lower()) if cross_filter else None,
+                'isActive': rel.get('isActive')
+            }
+        return index
+
+    def _relationship_definition(self, rel: Dict[str, Any]) -> Dict[str, Any]:
+        """Converte relacionamento da especificação para definição TMSL"""
+        from_card, to_card = self.CARDINALITIES.get(
+            str(rel.get('cardinality', 'ManyToOne')).lower(), ('many', 'one')
+        )
+        cross_filter = self.CROSS_FILTERS.get(
+            str(rel.get('cross_filter', 'SingleDirection')).lower(), 'oneDirection'
+        )
+
+        return {
+            'name': rel.get('name') or f"{rel['from_table']}_{rel['to_table']}",
+            'fromTable': rel['from_table'],
+            'fromColumn': rel['from_column'],
+            'toTable': rel['to_table'],
+            'toColumn': rel['to_column'],
+            'fromCardinality': from_card,
+            'toCardinality': to_card,
+            'crossFilteringBehavior': cross_filter,
+            'isActive': rel.get('is_active', True)
+        }
+
+    @staticmethod
+    def _relationship_label(key: Tuple) -> str:
+        return f"{key[0]}[{key[1]}] -> {key[2]}[{key[3]}]"
+
+    @staticmethod
+    def _measure_table(measure: Dict[str, Any]) -> Optional[str]:
+        return measure.get('TableName') or measure.get('table')
+
+    @staticmethod
+    def _measure_name(measure: Dict[str, Any]) -> Optional[str]:
+        return measure.get('MeasureName') or measure.get('name')
+
+    @staticmethod
+    def _normalize_value(prop: str, value: Any) -> Any:
+        """Normaliza valores para comparação (espaços em expressões DAX)"""
+        if value is None:
+            return None
+        if prop != 'expression':
+            return str(value)
+
+        # Espaços só são significativos dentro de strings e referências
+        # ('Tabela', [Coluna]); fora delas são colapsados e removidos ao
+        # redor de parênteses e operadores
+        parts = re.split(r'''("(?:[^"]|"")*"|'(?:[^']|'')*'|\[(?:[^\]]|\]\])*\])''', str(value))
+        return ''.join(
+            part if i % 2 else re.sub(r'\s*([(),+\-*/=<>&|^])\s*', r'\1', ' '.join(part.split()))
+            for i, part in enumerate(parts)
+        )
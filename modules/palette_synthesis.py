@@ -0,0 +1,176 @@
+"""
+Síntese de Paletas Categóricas - N cores maximamente distinguíveis a partir da cardinalidade
+
+Amostra um conjunto de candidatos dentro do gamut sRGB com luminosidade e croma
+limitados (em OKLCH) e escolhe as cores por farthest-point sampling em OKLab:
+cada nova cor é o candidato mais distante de todas as já escolhidas. As
+primeiras cores são as mais distintas entre si, então cortar a paleta em
+qualquer tamanho continua bom.
+
+Os candidatos e as paletas ficam em cache por (N, restrições, semente); mesmo
+sem cache, N=100 roda em poucos milissegundos.
+"""
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+import numpy as np
+# numpy só carrega numpy.random no primeiro acesso (~15 ms): paga no import, não na primeira paleta
+import numpy.random  # noqa: F401
+
+from . import color_engine
+
+
+CATEGORY_TYPES = ('category', 'low_cardinality_category')
+
+DEFAULT_LIGHTNESS = (0.45, 0.85)
+DEFAULT_CHROMA = (0.06, 0.20)
+POOL_SIZE = 4096
+
+
+@lru_cache(maxsize=32)
+def _candidate_pool(lightness: Tuple[float, float], chroma: Tuple[float, float],
+                    seed: int, size: int) -> np.ndarray:
+    """Candidatos (P, 3) em OKLab, dentro do gamut sRGB e das restrições (somente leitura)"""
+    rng = np.random.default_rng(seed)
+    samples = size * 2
+    L = rng.uniform(lightness[0], lightness[1], samples)
+    # Raiz do uniforme: densidade uniforme por área no plano a/b
+    C = np.sqrt(rng.uniform(chroma[0] ** 2, chroma[1] ** 2, samples))
+    H = rng.uniform(0, 360, samples)
+    oklch = np.stack([L, C, H], axis=-1)
+
+    oklab = color_engine.oklch_to_oklab(oklch)
+    inside = color_engine.in_gamut(color_engine.oklab_to_srgb(oklab))
+    pool = oklab[inside][:size]
+    pool.setflags(write=False)
+    return pool
+
+
+def farthest_point_sampling(points: np.ndarray, count: int,
+                            fixed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, float]:
+    """
+    Escolhe `count` índices de `points` (P, d) maximizando a menor distância
+
+    Args:
+        fixed: Pontos já escolhidos (ex.: cores da marca) dos quais manter distância
+
+    Returns:
+        (índices na ordem de escolha, menor distância entre as escolhidas)
+    """
+    count = min(count, len(points))
+    chosen = np.empty(count, dtype=np.int64)
+    if count == 0:
+        return chosen, 0.0
+
+    if fixed is not None and len(fixed):
+        nearest = np.min(np.linalg.norm(points[:, None, :] - fixed[None, :, :], axis=-1), axis=1)
+        first = int(np.argmax(nearest))
+    else:
+        # Sem cores fixas: começa pelo candidato mais distante do centro (maior croma/contraste)
+        nearest = np.full(len(points), np.inf)
+        first = int(np.argmax(np.linalg.norm(points - points.mean(axis=0), axis=1)))
+
+    chosen[0] = first
+    # Eixos contíguos e distâncias ao quadrado em buffers reaproveitados: cada
+    # passo é só subtração/multiplicação in-place sobre P floats
+    axes = [np.ascontiguousarray(points[:, k]) for k in range(points.shape[1])]
+    nearest = np.minimum(nearest ** 2, np.sum((points - points[first]) ** 2, axis=1))
+    distance = np.empty(len(points))
+    buffer = np.empty(len(points))
+    spread = np.inf
+    for step in range(1, count):
+        index = int(np.argmax(nearest))
+        spread = min(spread, float(nearest[index]))
+        chosen[step] = index
+        # Atualização incremental: só a distância até a última escolhida
+        np.subtract(axes[0], axes[0][index], out=distance)
+        np.multiply(distance, distance, out=distance)
+        for axis in axes[1:]:
+            np.subtract(axis, axis[index], out=buffer)
+            np.multiply(buffer, buffer, out=buffer)
+            np.add(distance, buffer, out=distance)
+        np.minimum(nearest, distance, out=nearest)
+    spread = float(np.sqrt(spread))
+
+    if fixed is not None and len(fixed):
+        spread = min(spread, float(np.min(np.linalg.norm(points[chosen][:, None] - fixed[None], axis=-1))))
+    return chosen, (spread if np.isfinite(spread) else 0.0)
+
+
+@lru_cache(maxsize=256)
+def _synthesize(count: int, lightness: Tuple[float, float], chroma: Tuple[float, float],
+                seed: int, fixed: Tuple[str, ...]) -> Tuple[Tuple[str, ...], float]:
+    pool = _candidate_pool(lightness, chroma, seed, POOL_SIZE)
+    fixed_lab = color_engine.srgb_to_oklab(color_engine.to_srgb(list(fixed))) if fixed else None
+    indices, spread = farthest_point_sampling(pool, count - len(fixed), fixed_lab)
+    colors = color_engine.srgb_to_hex(color_engine.oklab_to_srgb(pool[indices])) if len(indices) else []
+    return fixed + tuple(colors), round(spread, 4)
+
+
+def synthesize_palette(count: int, lightness: Tuple[float, float] = DEFAULT_LIGHTNESS,
+                       chroma: Tuple[float, float] = DEFAULT_CHROMA, seed: int = 0,
+                       fixed: Sequence[str] = ()) -> List[str]:
+    """
+    Gera N cores categóricas maximamente distinguíveis
+
+    Args:
+        count: Número de cores (ValueError se passar dos candidatos do POOL_SIZE)
+        lightness: Faixa de luminosidade OKLCH (0-1); limita contraste com o fundo
+        chroma: Faixa de croma OKLCH; evita cinzas e cores saturadas demais
+        seed: Semente da amostragem de candidatos
+        fixed: Cores HEX da marca que abrem a paleta (as demais se afastam delas)
+
+    Returns:
+        Lista de cores HEX (em cache: mesma entrada, mesma paleta)
+    """
+    colors, _ = synthesize_palette_with_spread(count, lightness, chroma, seed, fixed)
+    return colors
+
+
+def synthesize_palette_with_spread(count: int, lightness: Tuple[float, float] = DEFAULT_LIGHTNESS,
+                                   chroma: Tuple[float, float] = DEFAULT_CHROMA, seed: int = 0,
+                                   fixed: Sequence[str] = ()) -> Tuple[List[str], float]:
+    """Como synthesize_palette, devolvendo também a menor distância OKLab entre as cores"""
+    count = max(count, 0)
+    # '#rrggbb', 'RRGGBB' e '#RRGGBB' são a mesma cor (e a mesma chave de cache)
+    fixed = tuple(color_engine.rgb_to_hex(color_engine.hex_to_rgb(list(fixed)[:count]))) if count and fixed else ()
+    available = len(_candidate_pool(tuple(lightness), tuple(chroma), seed, POOL_SIZE))
+    if count - len(fixed) > available:
+        raise ValueError(f"{count} cores excedem os {available} candidatos da síntese (POOL_SIZE={POOL_SIZE})")
+    colors, spread = _synthesize(count, tuple(lightness), tuple(chroma), seed, fixed)
+    return list(colors), spread
+
+
+def palettes_for_columns(column_analysis: Dict[str, Dict[str, Any]], max_colors: int = 100,
+                         lightness: Tuple[float, float] = DEFAULT_LIGHTNESS,
+                         chroma: Tuple[float, float] = DEFAULT_CHROMA, seed: int = 0,
+                         fixed: Sequence[str] = ()) -> Dict[str, Dict[str, Any]]:
+    """
+    Paleta dimensionada pela cardinalidade de cada coluna categórica do DataAnalyzer
+
+    Colunas com mais níveis que max_colors recebem max_colors cores e um aviso
+    (agrupar em "Outros" ou usar outro visual costuma ser melhor).
+
+    Returns:
+        {coluna: {colors, levels, min_distance, truncated}}
+    """
+    palettes = {}
+    for column, info in column_analysis.items():
+        if info.get('detected_type') not in CATEGORY_TYPES:
+            continue
+        levels = int(info.get('unique_count', 0))
+        count = min(levels, max_colors)
+        colors, spread = synthesize_palette_with_spread(count, lightness, chroma, seed, fixed)
+        palettes[column] = {
+            'colors': colors,
+            'levels': levels,
+            'min_distance': spread,
+            'truncated': levels > max_colors
+        }
+    return palettes
+
+
+def clear_cache():
+    """Limpa os caches de candidatos e paletas"""
+    _candidate_pool.cache_clear()
+    _synthesize.cache_clear()
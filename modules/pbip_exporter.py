@@ -0,0 +1,633 @@
+"""
+Exportador de Projeto Power BI (PBIP/PBIR) - Esqueleto do relatório a partir do layout e da análise
+
+Gera a pasta de um Power BI Project no formato de relatório PBIR:
+
+    <Projeto>.pbip
+    <Projeto>.Report/definition.pbir
+    <Projeto>.Report/definition/{version.json, report.json}
+    <Projeto>.Report/definition/pages/pages.json
+    <Projeto>.Report/definition/pages/<página>/page.json
+    <Projeto>.Report/definition/pages/<página>/visuals/<visual>/visual.json
+    <Projeto>.Report/StaticResources/RegisteredResources/<tema>.json
+    <Projeto>.SemanticModel/{definition.pbism, model.bim}
+
+Cada visual do LayoutEngine vira um visual container na mesma posição, ligado
+às colunas de suggested_visuals do DataAnalyzer; o tema compilado vai embutido.
+Os arquivos são gravados em streaming (página a página) num diretório
+temporário, validados e só então promovidos para o destino, então projetos de
+dezenas de páginas não ficam inteiros em memória nem pela metade no disco.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+
+SCHEMA_BASE = 'https://developer.microsoft.com/json-schemas/fabric'
+SCHEMAS = {
+    'pbip': f'{SCHEMA_BASE}/pbip/pbipProperties/1.0.0/schema.json',
+    'pbir': f'{SCHEMA_BASE}/item/report/definitionProperties/1.0.0/schema.json',
+    'version': f'{SCHEMA_BASE}/item/report/definition/versionMetadata/1.0.0/schema.json',
+    'report': f'{SCHEMA_BASE}/item/report/definition/report/1.0.0/schema.json',
+    'pages': f'{SCHEMA_BASE}/item/report/definition/pagesMetadata/1.0.0/schema.json',
+    'page': f'{SCHEMA_BASE}/item/report/definition/page/1.0.0/schema.json',
+    'visual': f'{SCHEMA_BASE}/item/report/definition/visualContainer/1.0.0/schema.json',
+}
+
+REPORT_VERSION = '5.55'
+BASE_THEME = 'CY24SU10'
+
+# Marca do exportador na raiz do projeto: lista as entradas que ele gerou
+MARKER = '.pbip-exporter.json'
+
+# Tipo de sugestão do DataAnalyzer -> visualType do Power BI
+SUGGESTION_VISUALS = {
+    'line_chart': 'lineChart',
+    'bar_chart': 'clusteredBarChart',
+    'histogram': 'clusteredColumnChart',
+    'scatter_plot': 'scatterChart',
+    'kpi_card': 'card',
+    'donut_chart': 'donutChart',
+    'heatmap': 'pivotTable',
+    'table': 'tableEx',
+    'map': 'map',
+    'slicer': 'slicer',
+}
+
+# Tipo de slot do LayoutEngine -> (categoria do slot, visualType sem dados)
+SLOT_KINDS = {
+    'card': ('metric', 'card'), 'kpi': ('metric', 'card'), 'metrics': ('metric', 'card'),
+    'chart': ('chart', 'clusteredColumnChart'), 'hero': ('chart', 'clusteredColumnChart'),
+    'detail': ('chart', 'clusteredColumnChart'), 'container': ('chart', 'clusteredColumnChart'),
+    'matrix': ('chart', 'pivotTable'), 'table': ('chart', 'tableEx'), 'map': ('chart', 'map'),
+    'slicer': ('slicer', 'slicer'), 'filter': ('slicer', 'slicer'), 'text': ('text', 'textbox'),
+}
+
+VISUAL_TYPES = frozenset(SUGGESTION_VISUALS.values()) | {kind for _, kind in SLOT_KINDS.values()}
+
+# Roles que só aceitam números (eixos do scatterChart), mesmo sem agregação
+NUMERIC_ROLES = frozenset({'X', 'Y', 'Size'})
+
+# QueryAggregateFunction do modelo semântico
+AGGREGATIONS = {'Sum': 0, 'Avg': 1, 'DistinctCount': 2, 'Min': 3, 'Max': 4, 'Count': 5}
+
+# Tipo detectado pelo DataAnalyzer -> dataType do TMSL
+DATA_TYPES = {
+    'date': 'dateTime', 'metric': 'double', 'currency': 'decimal', 'percentage': 'double',
+    'integer': 'int64', 'boolean': 'boolean'
+}
+
+_NAME = re.compile(r'^[\w-]{1,50}$')
+
+
+def _object_name(*parts: Any) -> str:
+    """Nome estável (20 hex) para páginas e visuais: o mesmo projeto gera os mesmos nomes"""
+    return hashlib.blake2b('/'.join(map(str, parts)).encode('utf-8'), digest_size=10).hexdigest()
+
+
+def _dumps(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _field(table: str, column: str, aggregation: Optional[str] = None) -> Dict[str, Any]:
+    """Projeção de uma coluna (ou de uma agregação dela) numa role do visual"""
+    column_ref = {'Column': {'Expression': {'SourceRef': {'Entity': table}}, 'Property': column}}
+    if not aggregation:
+        return {'field': column_ref, 'queryRef': f'{table}.{column}', 'nativeQueryRef': column}
+    return {
+        'field': {'Aggregation': {'Expression': column_ref, 'Function': AGGREGATIONS[aggregation]}},
+        'queryRef': f'{aggregation}({table}.{column})',
+        'nativeQueryRef': f'{aggregation} of {column}'
+    }
+
+
+def suggestion_roles(suggestion: Dict[str, Any]) -> Dict[str, List[Tuple[str, Optional[str]]]]:
+    """Roles do visual ({role: [(coluna, agregação)]}) a partir das colunas de uma sugestão"""
+    kind = suggestion.get('type')
+    columns = suggestion.get('columns', {})
+
+    def as_list(value):
+        return value if isinstance(value, list) else [value] if value else []
+
+    if kind == 'line_chart':
+        return {'Category': [(columns.get('x'), None)], 'Y': [(y, 'Sum') for y in as_list(columns.get('y'))]}
+    if kind in ('bar_chart', 'donut_chart'):
+        return {'Category': [(columns.get('category'), None)], 'Y': [(columns.get('value'), 'Sum')]}
+    if kind == 'histogram':
+        return {'Category': [(columns.get('value'), None)], 'Y': [(columns.get('value'), 'Count')]}
+    if kind == 'scatter_plot':
+        # Category é o campo Details do scatterChart: um ponto por valor. Sem ele,
+        # X e Y vão sem agregação (um ponto por combinação), não Sum num ponto só
+        details = columns.get('details') or columns.get('category')
+        if details:
+            return {'Category': [(details, None)],
+                    'X': [(columns.get('x'), 'Sum')], 'Y': [(columns.get('y'), 'Sum')]}
+        return {'X': [(columns.get('x'), None)], 'Y': [(columns.get('y'), None)]}
+    if kind == 'heatmap':
+        return {'Values': [(metric, 'Sum') for metric in as_list(columns.get('metrics'))]}
+    if kind == 'slicer':
+        return {'Values': [(columns.get('column') or columns.get('category'), None)]}
+    return {}
+
+
+def bind_visuals(layout: Dict[str, Any], suggestions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Associa cada visual do layout a uma sugestão do DataAnalyzer
+
+    Layouts do LayoutOptimizer usam ids '<tipo>_<n>' e 'kpi_<n>_<m>' (m-ésima
+    métrica da n-ésima sugestão) e são ligados diretamente à sugestão de origem.
+    Nos templates, os cards 'kpi_<n>' recebem a n-ésima métrica e os demais slots
+    são preenchidos em ordem de prioridade (cards recebem as métricas de kpi_card, gráficos as demais
+    sugestões, segmentações a primeira coluna categórica ou de data).
+
+    Returns:
+        [{visual, visual_type, roles, title}] na ordem do layout
+    """
+    metrics, metric_slots = [], {}
+    for index, suggestion in enumerate(suggestions):
+        if suggestion.get('type') == 'kpi_card':
+            for position, metric in enumerate(suggestion.get('columns', {}).get('metrics', [])):
+                metric_slots[(index, position)] = len(metrics)
+                metrics.append(metric)
+    charts = [suggestion for suggestion in suggestions if suggestion.get('type') != 'kpi_card']
+    # Segmentação: primeira coluna categórica; sem ela, o eixo de data da série temporal
+    slicer_column = next(
+        (suggestion['columns'].get('category') for suggestion in charts
+         if suggestion.get('type') in ('bar_chart', 'donut_chart') and suggestion.get('columns', {}).get('category')),
+        next((suggestion['columns'].get('x') for suggestion in charts
+              if suggestion.get('type') == 'line_chart' and suggestion.get('columns')), None)
+    )
+
+    used_charts, used_metrics = set(), set()
+    bindings = []
+    # 1ª passada: ids gerados a partir das sugestões
+    for visual in layout.get('visuals', []):
+        visual_id = str(visual.get('id', ''))
+        card = re.match(r'^kpi_(\d+)_(\d+)$', visual_id)
+        match = None if card else re.match(r'^(.+)_(\d+)$', visual_id)
+        binding = None
+        if card:
+            number = metric_slots.get((int(card.group(1)) - 1, int(card.group(2)) - 1))
+            if number is not None and visual.get('type') in ('card', 'kpi', 'metrics'):
+                binding = {'visual_type': 'card', 'roles': {'Values': [(metrics[number], 'Sum')]},
+                           'title': metrics[number]}
+                used_metrics.add(number)
+        elif match:
+            kind, number = match.group(1), int(match.group(2)) - 1
+            if kind == 'kpi' and number < len(metrics) and visual.get('type') in ('card', 'kpi', 'metrics'):
+                binding = {'visual_type': 'card', 'roles': {'Values': [(metrics[number], 'Sum')]},
+                           'title': metrics[number]}
+                used_metrics.add(number)
+            elif 0 <= number < len(suggestions) and suggestions[number].get('type') == kind:
+                suggestion = suggestions[number]
+                binding = {'visual_type': SUGGESTION_VISUALS.get(kind, 'clusteredColumnChart'),
+                           'roles': suggestion_roles(suggestion), 'title': suggestion.get('title')}
+                used_charts.add(id(suggestion))
+        bindings.append(binding)
+
+    # 2ª passada: slots de template, em ordem
+    free_metrics = iter([metric for index, metric in enumerate(metrics) if index not in used_metrics])
+    free_charts = iter([suggestion for suggestion in charts if id(suggestion) not in used_charts])
+    results = []
+    for visual, binding in zip(layout.get('visuals', []), bindings):
+        if binding is None:
+            slot, default_type = SLOT_KINDS.get(visual.get('type'), ('chart', 'clusteredColumnChart'))
+            binding = {'visual_type': default_type, 'roles': {}, 'title': visual.get('suggested_visual')}
+            if slot == 'metric':
+                metric = next(free_metrics, None)
+                if metric:
+                    binding.update(roles={'Values': [(metric, 'Sum')]}, title=metric)
+            elif slot == 'chart':
+                suggestion = next(free_charts, None)
+                if suggestion:
+                    binding = {'visual_type': SUGGESTION_VISUALS.get(suggestion['type'], default_type),
+                               'roles': suggestion_roles(suggestion), 'title': suggestion.get('title')}
+            elif slot == 'slicer' and slicer_column:
+                binding['roles'] = {'Values': [(slicer_column, None)]}
+        # Remove projeções sem coluna (sugestões incompletas)
+        binding['roles'] = {role: [item for item in fields if item[0]]
+                            for role, fields in binding['roles'].items() if any(item[0] for item in fields)}
+        results.append(dict(binding, visual=visual))
+    return results
+
+
+class PBIPExporter:
+    """
+    Escreve esqueletos de Power BI Project (PBIP com relatório PBIR)
+
+    Exemplo:
+        analysis = DataAnalyzer().analyze_dataframe(df)
+        layout = LayoutEngine().optimize_for_suggestions(analysis['suggested_visuals'])
+        result = PBIPExporter().export('Vendas', [{'name': 'Visão Geral', 'layout': layout}],
+                                       'export/Vendas', suggestions=analysis['suggested_visuals'],
+                                       column_analysis=analysis['column_analysis'], palette=palette)
+    """
+
+    def __init__(self, exporter=None, table_name: str = 'Dados'):
+        """
+        Args:
+            exporter: PowerBIExporter para compilar o tema (padrão: novo)
+            table_name: Nome da tabela do modelo semântico a que os visuais se ligam
+        """
+        if exporter is None:
+            from .powerbi_exporter import PowerBIExporter
+            exporter = PowerBIExporter()
+        self.exporter = exporter
+        self.table_name = table_name
+
+    # ------------------------------------------------------------ exportação
+
+    def export(self, project_name: str, pages: List[Dict[str, Any]], output_dir: str,
+               suggestions: Optional[List[Dict[str, Any]]] = None,
+               column_analysis: Optional[Dict[str, Dict[str, Any]]] = None,
+               palette: Optional[Dict[str, Any]] = None,
+               typography: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Gera o projeto em output_dir (substituído por inteiro ao final, se vazio ou gerado antes por aqui)
+
+        Args:
+            project_name: Nome do projeto (.pbip, .Report, .SemanticModel)
+            pages: [{name, layout, suggestions?}] — uma página por layout
+            suggestions: Sugestões usadas pelas páginas que não trazem as suas
+            column_analysis: analysis['column_analysis'] (tipos das colunas do modelo)
+            palette: Paleta do tema embutido (sem ela, fica o tema base)
+
+        Returns:
+            Dict com success, project_dir, pbip, pages, visuals, bound_visuals,
+            files, validation, elapsed_ms e message (ou error)
+        """
+        start = time.perf_counter()
+        if not re.match(r'^[^\\/:*?"<>|]+$', project_name or ''):
+            return {'success': False, 'error': f"Nome de projeto inválido: {project_name!r}",
+                    'message': "❌ Nome de projeto inválido"}
+
+        output_dir = os.path.abspath(output_dir)
+        if not self._replaceable(output_dir):
+            return {'success': False, 'error': f"{output_dir} existe e não é um projeto gerado pelo exportador",
+                    'message': "❌ O destino já existe e não é um projeto gerado aqui: escolha outra pasta"}
+
+        from .bundle_builder import default_mode
+
+        parent = os.path.dirname(output_dir)
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f'.{os.path.basename(output_dir)}.', dir=parent)
+
+        try:
+            stats = {'files': 0, 'pages': 0, 'visuals': 0, 'bound_visuals': 0}
+            for relative_path, data in self._iter_files(project_name, pages, suggestions or [],
+                                                        column_analysis or {}, palette, typography, stats):
+                path = os.path.join(staging, relative_path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(data)
+                stats['files'] += 1
+
+            validation = self.validate(staging)
+            if not validation['success']:
+                shutil.rmtree(staging, ignore_errors=True)
+                return {'success': False, 'validation': validation, 'error': validation['errors'][0],
+                        'message': f"❌ Projeto inválido: {len(validation['errors'])} erro(s)"}
+
+            entries = sorted(os.listdir(staging))
+            with open(os.path.join(staging, MARKER), 'wb') as f:
+                f.write(_dumps({'project': project_name, 'entries': entries}))
+            # mkdtemp cria 0700: o projeto fica com as permissões de um mkdir comum
+            os.chmod(staging, default_mode(directory=True))
+            self._promote(staging, output_dir)
+        except Exception as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            return {'success': False, 'error': str(e), 'message': f"❌ Erro ao gerar projeto: {e}"}
+
+        elapsed = (time.perf_counter() - start) * 1000
+        return {
+            'success': True,
+            'project_dir': output_dir,
+            'pbip': os.path.join(output_dir, f'{project_name}.pbip'),
+            **stats,
+            'validation': validation,
+            'elapsed_ms': round(elapsed, 1),
+            'message': (f"✅ Projeto '{project_name}': {stats['pages']} página(s), {stats['visuals']} visual(is) "
+                        f"({stats['bound_visuals']} ligados a dados) em {elapsed:.0f} ms")
+        }
+
+    def export_analysis(self, project_name: str, analysis: Dict[str, Any], layout: Dict[str, Any],
+                        output_dir: str, palette: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Projeto de uma página a partir do resultado do DataAnalyzer e de um layout"""
+        return self.export(project_name, [{'name': layout.get('template', 'Página 1'), 'layout': layout}],
+                           output_dir, suggestions=analysis.get('suggested_visuals', []),
+                           column_analysis=analysis.get('column_analysis', {}), palette=palette)
+
+    @staticmethod
+    def _replaceable(output_dir: str) -> bool:
+        """
+        Só substitui destino inexistente, vazio ou gerado antes por este exportador
+
+        Um projeto gerado traz MARKER com as entradas da raiz; qualquer outra
+        entrada (ex.: .git, anotações) torna a pasta alheia e ela é recusada.
+        """
+        if not os.path.lexists(output_dir):
+            return True
+        if not os.path.isdir(output_dir) or os.path.islink(output_dir):
+            return False
+        names = set(os.listdir(output_dir))
+        if not names:
+            return True
+        try:
+            with open(os.path.join(output_dir, MARKER), 'r', encoding='utf-8') as f:
+                marker = json.load(f)
+            project = marker['project']
+            entries = set(marker['entries'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        expected = {f'{project}.pbip', f'{project}.Report', f'{project}.SemanticModel'}
+        return expected <= entries <= expected | {'.gitignore'} and names == entries | {MARKER}
+
+    @staticmethod
+    def _promote(staging: str, output_dir: str):
+        """Troca o destino pelo diretório montado (renomeações no mesmo sistema de arquivos)"""
+        previous = None
+        if os.path.exists(output_dir):
+            previous = f"{output_dir}.old-{os.getpid()}-{int(time.time() * 1000)}"
+            os.replace(output_dir, previous)
+        os.replace(staging, output_dir)
+        if previous:
+            shutil.rmtree(previous, ignore_errors=True)
+
+    # ------------------------------------------------------------ geração
+
+    def _iter_files(self, project_name: str, pages: List[Dict[str, Any]], suggestions: List[Dict[str, Any]],
+                    column_analysis: Dict[str, Dict[str, Any]], palette: Optional[Dict[str, Any]],
+                    typography: Optional[Dict[str, Any]], stats: Dict[str, int]) -> Iterator[Tuple[str, bytes]]:
+        """(caminho relativo, bytes) de cada arquivo, página a página"""
+        report_dir = f'{project_name}.Report'
+        model_dir = f'{project_name}.SemanticModel'
+        definition = f'{report_dir}/definition'
+
+        yield f'{project_name}.pbip', _dumps({
+            '$schema': SCHEMAS['pbip'], 'version': '1.0',
+            'artifacts': [{'report': {'path': report_dir}}],
+            'settings': {'enableAutoRecovery': True}
+        })
+        yield '.gitignore', b'**/.pbi/localSettings.json\n**/.pbi/cache.abf\n'
+        yield f'{report_dir}/definition.pbir', _dumps({
+            '$schema': SCHEMAS['pbir'], 'version': '4.0',
+            'datasetReference': {'byPath': {'path': f'../{model_dir}'}}
+        })
+        yield f'{definition}/version.json', _dumps({'$schema': SCHEMAS['version'], 'version': '2.0.0'})
+
+        report = {
+            '$schema': SCHEMAS['report'],
+            'themeCollection': {'baseTheme': {'name': BASE_THEME, 'reportVersionAtImport': REPORT_VERSION,
+                                              'type': 'SharedResources'}},
+            'settings': {'useStylableVisualContainerHeader': True, 'defaultDrillFilterOtherVisuals': True}
+        }
+        if palette:
+            compiled = self.exporter.compile_theme(palette, typography=typography)
+            theme_file = re.sub(r'[^\w.-]+', '_', compiled['theme']['name']) + '.json'
+            report['themeCollection']['customTheme'] = {
+                'name': theme_file, 'reportVersionAtImport': REPORT_VERSION, 'type': 'RegisteredResources'
+            }
+            report['resourcePackages'] = [{
+                'name': 'RegisteredResources', 'type': 'RegisteredResources',
+                'items': [{'name': theme_file, 'path': theme_file, 'type': 'CustomTheme'}]
+            }]
+            yield f'{report_dir}/StaticResources/RegisteredResources/{theme_file}', compiled['pretty']
+        yield f'{definition}/report.json', _dumps(report)
+
+        # Páginas em streaming: cada visual é gravado assim que montado
+        columns: Dict[str, Optional[str]] = {}
+        page_names = []
+        for index, page in enumerate(pages):
+            page_name = _object_name(project_name, 'page', index)
+            page_names.append(page_name)
+            layout = page['layout']
+            canvas = layout.get('canvas', {})
+            page_dir = f'{definition}/pages/{page_name}'
+            yield f'{page_dir}/page.json', _dumps({
+                '$schema': SCHEMAS['page'], 'name': page_name,
+                'displayName': page.get('name') or f'Página {index + 1}',
+                'displayOption': 'FitToPage',
+                'height': canvas.get('height', 720), 'width': canvas.get('width', 1280)
+            })
+            stats['pages'] += 1
+
+            for order, binding in enumerate(bind_visuals(layout, page.get('suggestions', suggestions))):
+                visual_name = _object_name(project_name, page_name, binding['visual'].get('id'), order)
+                yield f'{page_dir}/visuals/{visual_name}/visual.json', _dumps(
+                    self._visual_container(visual_name, binding, order)
+                )
+                stats['visuals'] += 1
+                if binding['roles']:
+                    stats['bound_visuals'] += 1
+                for role, fields in binding['roles'].items():
+                    for column, aggregation in fields:
+                        # Coluna agregada (Sum/Avg) ou eixo numérico é numérica; as demais ficam com o tipo detectado
+                        if role in NUMERIC_ROLES:
+                            aggregation = aggregation or 'Sum'
+                        if column not in columns or aggregation in ('Sum', 'Avg'):
+                            columns[column] = aggregation
+
+        yield f'{definition}/pages/pages.json', _dumps({
+            '$schema': SCHEMAS['pages'], 'pageOrder': page_names,
+            'activePageName': page_names[0] if page_names else None
+        })
+
+        yield f'{model_dir}/definition.pbism', _dumps({'version': '4.0', 'settings': {}})
+        yield f'{model_dir}/model.bim', _dumps(self._semantic_model(columns, column_analysis))
+
+    def _visual_container(self, name: str, binding: Dict[str, Any], order: int) -> Dict[str, Any]:
+        position = binding['visual']['position']
+        visual: Dict[str, Any] = {'visualType': binding['visual_type']}
+
+        if binding['visual_type'] == 'textbox':
+            visual['objects'] = {'general': [{'properties': {'paragraphs': [
+                {'textRuns': [{'value': binding.get('title') or ''}]}
+            ]}}]}
+        else:
+            if binding['roles']:
+                visual['query'] = {'queryState': {
+                    role: {'projections': [_field(self.table_name, column, aggregation)
+                                           for column, aggregation in fields]}
+                    for role, fields in binding['roles'].items()
+                }}
+            visual['drillFilterOtherVisuals'] = True
+            if binding.get('title'):
+                visual['visualContainerObjects'] = {'title': [{'properties': {
+                    'show': {'expr': {'Literal': {'Value': 'true'}}},
+                    'text': {'expr': {'Literal': {'Value': "'" + str(binding['title']).replace("'", "''") + "'"}}}
+                }}]}
+
+        return {
+            '$schema': SCHEMAS['visual'],
+            'name': name,
+            'position': {
+                'x': position['x'], 'y': position['y'], 'z': position.get('z_index', 0) * 1000 + order,
+                'height': position['height'], 'width': position['width'], 'tabOrder': order
+            },
+            'visual': visual
+        }
+
+    def _semantic_model(self, columns: Dict[str, Optional[str]],
+                        column_analysis: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Modelo TMSL com uma tabela importada de CSV e as colunas usadas pelos visuais"""
+        model_columns = []
+        for column in sorted(columns):
+            detected = column_analysis.get(column, {}).get('detected_type')
+            data_type = DATA_TYPES.get(detected) or ('double' if columns[column] in ('Sum', 'Avg') else 'string')
+            model_columns.append({
+                'name': column, 'dataType': data_type, 'sourceColumn': column,
+                'summarizeBy': 'sum' if data_type in ('double', 'decimal', 'int64') else 'none'
+            })
+
+        m_types = {'dateTime': 'type datetime', 'double': 'type number', 'decimal': 'Currency.Type',
+                   'int64': 'Int64.Type', 'boolean': 'type logical', 'string': 'type text'}
+        type_pairs = ', '.join('{"%s", %s}' % (column['name'].replace('"', '""'), m_types[column['dataType']])
+                               for column in model_columns)
+        expression = [
+            'let',
+            '    Fonte = Csv.Document(File.Contents(CaminhoDados), [Delimiter = ",", Encoding = 65001]),',
+            '    Cabecalhos = Table.PromoteHeaders(Fonte, [PromoteAllScalars = true]),',
+            f'    Tipos = Table.TransformColumnTypes(Cabecalhos, {{{type_pairs}}})',
+            'in',
+            '    Tipos'
+        ]
+        return {
+            'compatibilityLevel': 1567,
+            'model': {
+                'culture': 'pt-BR',
+                'defaultPowerBIDataSourceVersion': 'powerBI_V3',
+                'expressions': [{
+                    'name': 'CaminhoDados', 'kind': 'm',
+                    'expression': '"dados.csv" meta [IsParameterQuery = true, Type = "Text", IsParameterQueryRequired = true]'
+                }],
+                'tables': [{
+                    'name': self.table_name,
+                    'columns': model_columns,
+                    'partitions': [{'name': self.table_name, 'mode': 'import',
+                                    'source': {'type': 'm', 'expression': expression}}]
+                }]
+            }
+        }
+
+    # ------------------------------------------------------------ validação
+
+    def validate(self, project_dir: str) -> Dict[str, Any]:
+        """
+        Valida um projeto gerado (no disco)
+
+        Verifica: JSON legível em todos os arquivos, .pbip -> .Report -> modelo,
+        pages.json x pastas de páginas, nomes de páginas/visuais, visualType
+        conhecido, visuais dentro da página e colunas ligadas existentes no modelo.
+
+        Returns:
+            Dict com success, errors, warnings, pages e visuals
+        """
+        errors: List[str] = []
+        warnings: List[str] = []
+
+        def load(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                errors.append(f"{os.path.relpath(path, project_dir)}: {e}")
+                return None
+
+        pbip_files = [name for name in os.listdir(project_dir) if name.endswith('.pbip')]
+        if len(pbip_files) != 1:
+            return {'success': False, 'errors': [f"Esperado 1 arquivo .pbip, encontrado(s) {len(pbip_files)}"],
+                    'warnings': [], 'pages': 0, 'visuals': 0}
+
+        pbip = load(os.path.join(project_dir, pbip_files[0])) or {}
+        report_dirs = [artifact['report']['path'] for artifact in pbip.get('artifacts', []) if 'report' in artifact]
+        if not report_dirs:
+            errors.append(f"{pbip_files[0]}: nenhum relatório em artifacts")
+            return {'success': False, 'errors': errors, 'warnings': warnings, 'pages': 0, 'visuals': 0}
+        report_dir = os.path.join(project_dir, report_dirs[0])
+
+        pbir = load(os.path.join(report_dir, 'definition.pbir')) or {}
+        model_ref = pbir.get('datasetReference', {}).get('byPath', {}).get('path')
+        model_columns: Optional[set] = None
+        if model_ref:
+            model = load(os.path.join(report_dir, model_ref, 'model.bim'))
+            if model:
+                model_columns = {(table['name'], column['name'])
+                                 for table in model.get('model', {}).get('tables', [])
+                                 for column in table.get('columns', [])}
+        else:
+            warnings.append("definition.pbir: sem datasetReference.byPath (modelo não verificado)")
+
+        definition = os.path.join(report_dir, 'definition')
+        report = load(os.path.join(definition, 'report.json')) or {}
+        for package in report.get('resourcePackages', []):
+            for item in package.get('items', []):
+                resource = os.path.join(report_dir, 'StaticResources', package['name'], item['path'])
+                if not os.path.exists(resource):
+                    errors.append(f"report.json: recurso ausente {package['name']}/{item['path']}")
+
+        pages_dir = os.path.join(definition, 'pages')
+        page_order = (load(os.path.join(pages_dir, 'pages.json')) or {}).get('pageOrder', [])
+        folders = sorted(name for name in os.listdir(pages_dir) if os.path.isdir(os.path.join(pages_dir, name))) \
+            if os.path.isdir(pages_dir) else []
+        if sorted(page_order) != folders:
+            errors.append(f"pages.json: pageOrder {len(page_order)} página(s), {len(folders)} pasta(s)")
+
+        visual_count = 0
+        for page_name in folders:
+            page = load(os.path.join(pages_dir, page_name, 'page.json')) or {}
+            if page.get('name') != page_name or not _NAME.match(page_name):
+                errors.append(f"{page_name}/page.json: nome '{page.get('name')}' inválido ou diferente da pasta")
+            width, height = page.get('width', 0), page.get('height', 0)
+
+            visuals_dir = os.path.join(pages_dir, page_name, 'visuals')
+            for visual_name in (os.listdir(visuals_dir) if os.path.isdir(visuals_dir) else []):
+                container = load(os.path.join(visuals_dir, visual_name, 'visual.json'))
+                if container is None:
+                    continue
+                visual_count += 1
+                where = f"{page_name}/{visual_name}"
+                if container.get('name') != visual_name or not _NAME.match(visual_name):
+                    errors.append(f"{where}: nome inválido ou diferente da pasta")
+
+                pos = container.get('position', {})
+                if pos.get('width', 0) <= 0 or pos.get('height', 0) <= 0:
+                    errors.append(f"{where}: tamanho inválido {pos.get('width')}x{pos.get('height')}")
+                elif pos.get('x', 0) < 0 or pos.get('y', 0) < 0 or \
+                        pos['x'] + pos['width'] > width or pos['y'] + pos['height'] > height:
+                    warnings.append(f"{where}: visual fora da página ({width}x{height})")
+
+                visual = container.get('visual', {})
+                if visual.get('visualType') not in VISUAL_TYPES:
+                    warnings.append(f"{where}: visualType desconhecido '{visual.get('visualType')}'")
+                if model_columns is None:
+                    continue
+                for role, state in visual.get('query', {}).get('queryState', {}).items():
+                    for projection in state.get('projections', []):
+                        field = projection.get('field', {})
+                        column = field.get('Column') or field.get('Aggregation', {}).get('Expression', {}).get('Column', {})
+                        key = (column.get('Expression', {}).get('SourceRef', {}).get('Entity'), column.get('Property'))
+                        if key not in model_columns:
+                            errors.append(f"{where}: {role} usa coluna inexistente no modelo {key[0]}[{key[1]}]")
+
+        return {'success': not errors, 'errors': errors, 'warnings': warnings,
+                'pages': len(folders), 'visuals': visual_count}
+
+    @staticmethod
+    def zip_project(project_dir: str) -> bytes:
+        """Zip determinístico da pasta do projeto (ex.: st.download_button)"""
+        from .bundle_builder import deterministic_zip
+
+        artifacts = {}
+        for root, _, names in os.walk(project_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                if name == MARKER and root == project_dir:
+                    continue
+                with open(path, 'rb') as f:
+                    artifacts[os.path.relpath(path, project_dir).replace(os.sep, '/')] = f.read()
+        return deterministic_zip(artifacts)
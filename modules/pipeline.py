@@ -0,0 +1,323 @@
+"""
+Pipeline em Lote - Análise, paleta, layout e exportação sem interface
+
+Encadeia DataAnalyzer → ColorGenerator → LayoutEngine → PowerBIExporter para
+cada dataset (CSV, Excel ou Parquet) e grava um diretório de saída por
+dataset. Vários arquivos são processados em paralelo por processos (cada
+processo monta o pipeline uma vez); a falha de um arquivo não interrompe os
+demais e fica registrada no summary.json do lote. Usado pela CLI (modules/cli.py).
+
+Exemplo:
+    pipeline = DashboardPipeline(PipelineConfig(palette='corporate_blue'))
+    resultado = pipeline.run('dados/vendas.csv', 'saida/vendas')
+    lote = run_batch(['dados/'], 'saida', workers=8)
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Iterable, Optional, Tuple
+
+from . import tracing
+
+
+DATASET_PATTERNS = ('*.csv', '*.xlsx', '*.xls', '*.parquet')
+OUTPUTS = ('bundle', 'pbip', 'script', 'analysis')
+
+
+@dataclass
+class PipelineConfig:
+    """Parâmetros do pipeline (iguais para todos os datasets do lote)"""
+    palette: str = 'auto'                # 'auto', nome de preset ou cor base '#RRGGBB'
+    scheme: str = 'analogous'            # esquema usado com cor base
+    colors: int = 5                      # número de cores geradas a partir da cor base
+    template: Optional[str] = None       # template de layout (None = só as sugestões)
+    visual_count: Optional[int] = None   # visuais do template quando optimize=False
+    optimize: bool = True                # posiciona as sugestões por simulated annealing
+    time_budget_ms: float = 500
+    seed: int = 0
+    outputs: Tuple[str, ...] = ('bundle', 'analysis')
+    zip: bool = True                     # zip determinístico do pacote de tema
+
+
+def load_dataset(path: str):
+    """Lê CSV, Excel ou Parquet em um DataFrame"""
+    import pandas as pd
+
+    suffix = Path(path).suffix.lower()
+    if suffix == '.csv':
+        return pd.read_csv(path)
+    if suffix in ('.xlsx', '.xls'):
+        return pd.read_excel(path)
+    if suffix == '.parquet':
+        return pd.read_parquet(path)
+    raise ValueError(f"Formato não suportado: {suffix or path}")
+
+
+def discover_datasets(inputs: Iterable[str], patterns: Iterable[str] = DATASET_PATTERNS,
+                      recursive: bool = False) -> List[str]:
+    """
+    Arquivos de dados a processar: arquivos informados + os encontrados nos diretórios
+
+    Returns:
+        Caminhos sem repetição, na ordem (diretórios em ordem alfabética)
+    """
+    found, seen = [], set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            candidates = sorted(
+                candidate for pattern in patterns
+                for candidate in (path.rglob(pattern) if recursive else path.glob(pattern))
+                if candidate.is_file()
+            )
+        elif path.is_file():
+            candidates = [path]
+        else:
+            raise FileNotFoundError(f"Entrada não encontrada: {item}")
+        for candidate in candidates:
+            key = str(candidate.resolve())
+            if key not in seen:
+                seen.add(key)
+                found.append(str(candidate))
+    return found
+
+
+def output_names(paths: List[str]) -> Dict[str, str]:
+    """Nome do diretório de saída de cada dataset (stem; com extensão se houver colisão)"""
+    stems: Dict[str, int] = {}
+    for path in paths:
+        stems[Path(path).stem] = stems.get(Path(path).stem, 0) + 1
+    names, used = {}, set()
+    for path in paths:
+        candidate = Path(path)
+        name = candidate.stem if stems[candidate.stem] == 1 else f"{candidate.stem}_{candidate.suffix.lstrip('.')}"
+        base, counter = name, 2
+        while name in used:
+            name, counter = f"{base}_{counter}", counter + 1
+        used.add(name)
+        names[path] = name
+    return names
+
+
+def to_json(value: Any, indent: Optional[int] = 2) -> str:
+    """JSON de resultados com tipos NumPy/pandas (escalares viram nativos, o resto str)"""
+    def default(item):
+        if hasattr(item, 'item'):
+            try:
+                return item.item()
+            except (ValueError, TypeError):
+                pass
+        if isinstance(item, (set, frozenset, tuple)):
+            return list(item)
+        return str(item)
+    return json.dumps(value, indent=indent, ensure_ascii=False, default=default)
+
+
+class DashboardPipeline:
+    """
+    Pipeline de um dataset: análise → paleta → layout → exportação
+
+    Os motores são construídos uma vez e reaproveitados entre datasets.
+    """
+
+    def __init__(self, config: Optional[PipelineConfig] = None):
+        from .data_analyzer import DataAnalyzer
+        from .color_generator import ColorGenerator
+        from .layout_engine import LayoutEngine
+        from .powerbi_exporter import PowerBIExporter
+
+        self.config = config or PipelineConfig()
+        unknown = set(self.config.outputs) - set(OUTPUTS)
+        if unknown:
+            raise ValueError(f"Saídas desconhecidas: {', '.join(sorted(unknown))} (use {', '.join(OUTPUTS)})")
+        self.analyzer = DataAnalyzer()
+        self.color_gen = ColorGenerator()
+        self.layout_engine = LayoutEngine()
+        self.exporter = PowerBIExporter()
+
+    def analyze(self, df) -> Dict[str, Any]:
+        return self.analyzer.analyze_dataframe(df)
+
+    def palette(self, analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Paleta conforme config.palette
+
+        'auto' escolhe pelo conteúdo: dados com colunas monetárias recebem a
+        paleta financeira, os demais a moderna.
+        """
+        choice = self.config.palette
+        if choice.startswith('#'):
+            return self.color_gen.generate_from_base_color(choice, self.config.scheme, self.config.colors)
+        if choice != 'auto':
+            if choice not in self.color_gen.list_presets():
+                raise ValueError(f"Paleta desconhecida: {choice}")
+            return self.color_gen.get_preset_palette(choice)
+        semantic = {info.get('detected_type') for info in (analysis or {}).get('column_analysis', {}).values()}
+        if 'currency' in semantic:
+            return self.color_gen.suggest_palette_for_data('financial', 'professional')
+        return self.color_gen.suggest_palette_for_data('tech', 'modern')
+
+    def layout(self, analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Layout otimizado para as sugestões da análise ou o template configurado"""
+        config = self.config
+        suggestions = (analysis or {}).get('suggested_visuals') or []
+        if config.optimize and suggestions:
+            return self.layout_engine.optimize_for_suggestions(
+                suggestions, config.template, time_budget_ms=config.time_budget_ms, seed=config.seed
+            )
+        return self.layout_engine.generate_layout(config.template or 'executive_summary', config.visual_count)
+
+    def export(self, name: str, analysis: Dict[str, Any], palette: Dict[str, Any], layout: Dict[str, Any],
+               output_dir: str, data_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Grava as saídas configuradas em output_dir
+
+        Returns:
+            {saída: caminho(s)} para bundle, pbip, script e analysis
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        files: Dict[str, Any] = {}
+        outputs = self.config.outputs
+        if 'analysis' in outputs:
+            path = os.path.join(output_dir, 'analysis.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(to_json({'analysis': analysis, 'palette': palette, 'layout': layout}))
+            files['analysis'] = path
+        if 'bundle' in outputs:
+            zip_path = os.path.join(output_dir, f"{name}_tema.zip") if self.config.zip else None
+            files['bundle'] = self.exporter.create_theme_bundle(
+                palette, layout, os.path.join(output_dir, 'bundle'), zip_path=zip_path
+            )
+        if 'pbip' in outputs:
+            project = self.exporter.create_pbip_project(name, analysis, layout, palette,
+                                                        os.path.join(output_dir, 'pbip'))
+            if not project.get('success'):
+                raise RuntimeError(project.get('message', 'Falha ao gerar o projeto PBIP'))
+            files['pbip'] = project['pbip']
+        if 'script' in outputs:
+            path = os.path.join(output_dir, 'analise_exploratoria.py')
+            script = self.exporter.generate_python_script(analysis, palette,
+                                                          data_path=os.path.abspath(data_path or 'dados.parquet'))
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(script)
+            files['script'] = path
+        return files
+
+    @tracing.traced('pipeline.run')
+    def run(self, path: str, output_dir: str, name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Processa um dataset de ponta a ponta
+
+        Returns:
+            Dict com success, dataset, name, output_dir, rows, columns, visuals,
+            palette, files, timings (ms por etapa) e error (se falhou)
+        """
+        name = name or Path(path).stem
+        result: Dict[str, Any] = {'success': False, 'dataset': path, 'name': name, 'output_dir': output_dir,
+                                  'files': {}, 'timings': {}}
+        timings = result['timings']
+        start = time.perf_counter()
+
+        def stage(label: str, fn: Callable[[], Any]) -> Any:
+            stage_start = time.perf_counter()
+            with tracing.span(f'pipeline.{label}', dataset=name):
+                value = fn()
+            timings[f'{label}_ms'] = round((time.perf_counter() - stage_start) * 1000, 2)
+            return value
+
+        try:
+            df = stage('load', lambda: load_dataset(path))
+            analysis = stage('analyze', lambda: self.analyze(df))
+            if 'error' in analysis:
+                raise ValueError(analysis['error'])
+            palette = stage('palette', lambda: self.palette(analysis))
+            layout = stage('layout', lambda: self.layout(analysis))
+            result['files'] = stage('export', lambda: self.export(name, analysis, palette, layout, output_dir, path))
+            result.update(success=True, rows=analysis['rows'], columns=analysis['columns'],
+                          visuals=len(layout.get('visuals', [])), palette=palette.get('name'))
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+        timings['total_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+
+# Pipeline de cada processo do pool (montado uma vez pelo initializer)
+_worker_pipeline: Optional[DashboardPipeline] = None
+
+
+def _init_worker(config: PipelineConfig):
+    global _worker_pipeline
+    _worker_pipeline = DashboardPipeline(config)
+
+
+def _run_in_worker(path: str, output_dir: str, name: str) -> Dict[str, Any]:
+    return _worker_pipeline.run(path, output_dir, name)
+
+
+def run_batch(inputs: Iterable[str], output_root: str, config: Optional[PipelineConfig] = None,
+              workers: Optional[int] = None, recursive: bool = False,
+              on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Processa todos os datasets das entradas, um diretório de saída por dataset
+
+    Args:
+        inputs: Arquivos e/ou diretórios
+        output_root: Diretório raiz da saída (recebe também summary.json)
+        config: Parâmetros do pipeline
+        workers: Processos em paralelo (padrão: os.cpu_count(); 1 = no próprio processo)
+        recursive: Procura datasets nos subdiretórios
+        on_result: Chamado com o resultado de cada dataset assim que ele termina
+
+    Returns:
+        Dict com success, message, datasets, succeeded, failed, elapsed_ms,
+        summary (caminho do summary.json) e results (na ordem das entradas)
+    """
+    config = config or PipelineConfig()
+    paths = discover_datasets(inputs, recursive=recursive)
+    names = output_names(paths)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths) or 1))
+    os.makedirs(output_root, exist_ok=True)
+    start = time.perf_counter()
+
+    results: Dict[str, Dict[str, Any]] = {}
+    if workers == 1:
+        pipeline = DashboardPipeline(config)
+        for path in paths:
+            results[path] = pipeline.run(path, os.path.join(output_root, names[path]), names[path])
+            if on_result:
+                on_result(results[path])
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config,)) as pool:
+            futures = {pool.submit(_run_in_worker, path, os.path.join(output_root, names[path]), names[path]): path
+                       for path in paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    results[path] = future.result()
+                except Exception as e:  # processo do pool morreu (ex.: falta de memória)
+                    results[path] = {'success': False, 'dataset': path, 'name': names[path],
+                                     'error': f"{type(e).__name__}: {e}", 'files': {}, 'timings': {}}
+                if on_result:
+                    on_result(results[path])
+
+    ordered = [results[path] for path in paths]
+    succeeded = sum(1 for result in ordered if result['success'])
+    summary = {
+        'success': succeeded == len(ordered),
+        'message': f'{succeeded}/{len(ordered)} dataset(s) processado(s) com {workers} processo(s)',
+        'datasets': len(ordered),
+        'succeeded': succeeded,
+        'failed': len(ordered) - succeeded,
+        'workers': workers,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 2),
+        'config': asdict(config),
+        'results': ordered
+    }
+    summary_path = os.path.join(output_root, 'summary.json')
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        f.write(to_json(summary))
+    summary['summary'] = summary_path
+    return summary
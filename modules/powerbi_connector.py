@@ -1,23 +1,35 @@
 """
 Power BI Connector - Integração com Power BI Desktop via MCP
 """
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Callable, Optional
 import json
+import logging
 import subprocess
 import re
-import socket
+from .as_backend import AnalysisServicesBackend
 from .mcp_powerbi_client import MCPPowerBIClient
+from .model_diff import ModelDiffEngine
+from . import tracing
+
+
+logger = logging.getLogger(__name__)
 
 
 class PowerBIConnector:
     """Conecta e interage com Power BI Desktop usando powerbi-modeling-mcp"""
     
-    def __init__(self):
+    def __init__(self, backend: Optional[AnalysisServicesBackend] = None):
+        """
+        Args:
+            backend: Backend do Analysis Services (padrão: ADOMD.NET via pythonnet).
+                     Use FakeAnalysisServicesBackend para testes sem Power BI Desktop.
+        """
         self.connections = []
         self.active_connection = None
         self.model_info = None
         self.connection_name = None
-        self.mcp_client = MCPPowerBIClient()
+        self.mcp_client = MCPPowerBIClient(backend)
+        self.backend = self.mcp_client.backend
     
     def is_connected(self) -> bool:
         """Verifica se está conectado a uma instância do Power BI"""
@@ -41,6 +53,12 @@ class PowerBIConnector:
             Lista de instâncias disponíveis (porta, nome do arquivo)
         """
         try:
+            # Backends locais informam suas próprias instâncias
+            instances = self.backend.list_instances()
+            if instances is not None:
+                self.connections = instances
+                return instances
+            
             instances = []
             process_ids = []
             
@@ -225,6 +243,7 @@ class PowerBIConnector:
         print("💡 Abra o arquivo no Power BI Desktop primeiro")
         return False
     
+    @tracing.traced('connector.get_model_structure')
     def get_model_structure(self) -> Dict[str, Any]:
         """
         Obtém a estrutura completa do modelo Power BI
@@ -545,14 +564,7 @@ class PowerBIConnector:
     
     def _is_port_open(self, host: str, port: int) -> bool:
         """Verifica se uma porta está aberta"""
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(0.5)
-            result = sock.connect_ex((host, port))
-            sock.close()
-            return result == 0
-        except:
-            return False
+        return self.backend.is_port_open(host, port)
     
     def _get_database_name(self, port: int) -> str:
         """
@@ -565,29 +577,8 @@ class PowerBIConnector:
             Nome do database ou None
         """
         try:
-            import clr
-            import sys
-            import os
-            
-            # Adicionar caminhos das DLLs
-            dll_paths = [
-                r"C:\Program Files\Microsoft.NET\ADOMD.NET\160",
-                r"C:\Program Files (x86)\Microsoft SQL Server Management Studio 20\Common7\IDE",
-                r"C:\Program Files\Microsoft SQL Server\160\DTS\Binn",
-            ]
-            
-            for dll_path in dll_paths:
-                if os.path.exists(dll_path) and dll_path not in sys.path:
-                    sys.path.append(dll_path)
-                    os.environ['PATH'] = dll_path + os.pathsep + os.environ.get('PATH', '')
-            
-            # Carregar TOM
-            clr.AddReference("Microsoft.AnalysisServices.Tabular")
-            from Microsoft.AnalysisServices.Tabular import Server
-            
             # Conectar sem especificar database
-            server = Server()
-            server.Connect(f"DataSource=localhost:{port}")
+            server = self.backend.open_server(f"DataSource=localhost:{port}")
             
             # Obter primeiro database
             if server.Databases.Count > 0:
@@ -602,6 +593,7 @@ class PowerBIConnector:
             print(f"⚠️ Erro ao obter database name: {e}")
             return None
     
+    @tracing.traced('tom.load_structure')
     def _get_structure_via_tom(self) -> Dict[str, Any]:
         """
         Obtém estrutura do modelo via TOM (Tabular Object Model)
@@ -611,35 +603,13 @@ class PowerBIConnector:
             return {}
         
         try:
-            import clr
-            import sys
-            import os
-            
-            # Adicionar diretórios conhecidos das DLLs ao PATH
-            dll_paths = [
-                r"C:\Program Files\Microsoft.NET\ADOMD.NET\160",
-                r"C:\Program Files (x86)\Microsoft SQL Server Management Studio 20\Common7\IDE",
-                r"C:\Program Files\Microsoft SQL Server\160\DTS\Binn",
-                r"C:\Program Files\Microsoft SQL Server\160\SDK\Assemblies",
-            ]
-            
-            for dll_path in dll_paths:
-                if os.path.exists(dll_path) and dll_path not in sys.path:
-                    sys.path.append(dll_path)
-                    os.environ['PATH'] = dll_path + os.pathsep + os.environ.get('PATH', '')
-            
-            # Tentar carregar Microsoft.AnalysisServices.Tabular
+            # Tentar conectar via TOM (Microsoft.AnalysisServices.Tabular)
             try:
-                clr.AddReference("Microsoft.AnalysisServices.Tabular")
-                from Microsoft.AnalysisServices.Tabular import Server
+                conn_string = self.active_connection['connection_string']
+                server = self.backend.open_server(conn_string)
                 
                 print("✅ TOM (Tabular Object Model) carregado")
                 
-                # Conectar via TOM
-                server = Server()
-                conn_string = self.active_connection['connection_string']
-                server.Connect(conn_string)
-                
                 # Obter database
                 if server.Databases.Count == 0:
                     print("⚠️ Nenhum database encontrado")
@@ -680,7 +650,10 @@ class PowerBIConnector:
                         structure['measures'].append({
                             'MeasureName': measure.Name,
                             'TableName': table.Name,
-                            'Expression': measure.Expression
+                            'Expression': measure.Expression,
+                            'FormatString': measure.FormatString,
+                            'Description': measure.Description,
+                            'DisplayFolder': measure.DisplayFolder
                         })
                     
                     structure['tables'].append(table_info)
@@ -688,19 +661,30 @@ class PowerBIConnector:
                 # Iterar relacionamentos
                 for rel in model.Relationships:
                     structure['relationships'].append({
+                        'name': rel.Name,
                         'fromTable': rel.FromTable.Name,
                         'fromColumn': rel.FromColumn.Name,
                         'toTable': rel.ToTable.Name,
                         'toColumn': rel.ToColumn.Name,
-                        'cardinality': str(rel.FromCardinality) + ':' + str(rel.ToCardinality)
+                        'cardinality': str(rel.FromCardinality) + ':' + str(rel.ToCardinality),
+                        'crossFilteringBehavior': str(rel.CrossFilteringBehavior),
+                        'isActive': rel.IsActive
                     })
                 
+                # Anotações do modelo (usadas pelo deploy incremental)
+                structure['annotations'] = {
+                    annotation.Name: annotation.Value for annotation in model.Annotations
+                }
+                
                 server.Disconnect()
+                self.model_info = structure
                 
                 print(f"✅ Estrutura obtida via TOM:")
                 print(f"   📊 Tabelas: {len(structure['tables'])}")
                 print(f"   📏 Medidas: {len(structure['measures'])}")
                 print(f"   🔗 Relacionamentos: {len(structure['relationships'])}")
+                tracing.count('tables', len(structure['tables']))
+                tracing.count('measures', len(structure['measures']))
                 
                 return structure
                 
@@ -734,7 +718,102 @@ class PowerBIConnector:
             }
         
         return self.mcp_client.create_measure(table_name, measure_name, expression)
-    
+
+    def create_measures_batch(self, measures: List[Dict[str, Any]], atomic: bool = True,
+                              validate: bool = True, refresh: bool = True) -> Dict[str, Any]:
+        """
+        Cria várias medidas DAX em uma única transação via MCP
+
+        Args:
+            measures: Lista de definições {name, table, expression, description?, format?}
+            atomic: Se True, nenhuma medida é criada caso alguma falhe
+            validate: Se deve validar as expressões antes de enviar
+            refresh: Se deve recalcular o modelo ao final do lote
+
+        Returns:
+            Resultado do lote com status de cada medida
+        """
+        if not self.active_connection or not self.active_connection.get('mcp_enabled'):
+            return {
+                'success': False,
+                'message': 'MCP não disponível ou desconectado',
+                'results': []
+            }
+
+        result = self.mcp_client.create_measures_batch(measures, atomic, validate, refresh)
+
+        # Estrutura em cache não reflete mais as medidas do modelo
+        if result.get('created'):
+            self.model_info = None
+
+        return result
+
+    def deploy_model_spec(self, spec: Dict[str, Any], prune: bool = False,
+                          dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Aplica uma especificação de modelo de forma incremental
+
+        Compara a especificação com a estrutura em cache e envia apenas as
+        alterações, em um único script TMSL. Reaplicar a mesma especificação
+        não gera nenhuma escrita.
+
+        Args:
+            spec: Especificação {measures, relationships, annotations}
+            prune: Remove medidas/relacionamentos ausentes da especificação
+            dry_run: Apenas calcula as alterações, sem enviar ao modelo
+
+        Returns:
+            Resultado com resumo das alterações e número de escritas
+        """
+        if not self.active_connection or not self.active_connection.get('mcp_enabled'):
+            return {
+                'success': False,
+                'message': 'MCP não disponível ou desconectado',
+                'writes': 0
+            }
+
+        structure = self.model_info if self.model_info is not None else self.get_model_structure()
+        engine = ModelDiffEngine(structure)
+        changes = engine.diff(spec, prune=prune)
+        summary = engine.summarize(changes)
+        summary['skipped_annotations'] = engine.skipped_annotations
+        summary['skipped_measures'] = engine.skipped_measures
+        if engine.skipped_annotations:
+            logger.warning("Anotações não verificáveis sem TOM, ignoradas: %s", ', '.join(engine.skipped_annotations))
+
+        if not changes:
+            return {
+                'success': True,
+                'message': 'Modelo já está atualizado - nenhuma alteração necessária',
+                'writes': 0,
+                'summary': summary
+            }
+
+        tmsl_script = engine.to_tmsl(changes, self.mcp_client.connection.Database)
+
+        if dry_run:
+            return {
+                'success': True,
+                'message': f'{len(changes)} alteração(ões) pendente(s)',
+                'writes': 0,
+                'summary': summary,
+                'tmsl': tmsl_script
+            }
+
+        result = self.mcp_client.execute_tmsl(tmsl_script)
+        if not result.get('success'):
+            return {**result, 'writes': 0, 'summary': summary}
+
+        # Mantém o cache coerente sem recarregar o modelo
+        self.model_info = engine.apply(changes)
+
+        return {
+            'success': True,
+            'message': f'{len(changes)} alteração(ões) aplicada(s) em uma única transação',
+            'writes': 1,
+            'summary': summary
+        }
+
     def apply_theme(self, theme_json: Dict[str, Any]) -> Dict[str, Any]:
         """
         Aplica tema de cores ao modelo via MCP
@@ -851,3 +930,56 @@ class PowerBIConnector:
             }
         
         return self.mcp_client.analyze_measure_performance(measure_name, iterations)
+    
+    def benchmark_measures(self, measure_names: List[str], iterations: int = 5,
+                           progress: Optional[Callable[[float, str], None]] = None) -> Dict[str, Any]:
+        """
+        Mede a performance de várias medidas e as ordena da mais lenta para a mais rápida
+        
+        Args:
+            measure_names: Nomes das medidas
+            iterations: Execuções por medida
+            progress: Opcional, chamado como progress(fração, mensagem) antes de cada medida
+            
+        Returns:
+            Dict com success, message, ranking (medidas medidas, mais lentas primeiro) e failed
+        """
+        if not self.active_connection or not self.active_connection.get('mcp_enabled'):
+            return {
+                'success': False,
+                'message': 'Não conectado',
+                'ranking': [],
+                'failed': []
+            }
+        
+        # Conexão própria: roda numa thread do JobQueue enquanto a interface usa a da sessão
+        client = self.mcp_client.open_dedicated()
+        if client is None:
+            return {
+                'success': False,
+                'message': 'Não foi possível abrir uma conexão para a medição',
+                'ranking': [],
+                'failed': []
+            }
+        
+        ranking, failed = [], []
+        try:
+            for position, measure_name in enumerate(measure_names):
+                if progress:
+                    progress(position / len(measure_names),
+                             f"Medida {position + 1}/{len(measure_names)}: {measure_name}")
+                result = client.analyze_measure_performance(measure_name, iterations)
+                if result.get('success'):
+                    ranking.append({'measure': measure_name, **result})
+                else:
+                    failed.append({'measure': measure_name, 'message': result.get('message')})
+        finally:
+            client.disconnect()
+        
+        ranking.sort(key=lambda item: item.get('avg_time_ms', 0), reverse=True)
+        return {
+            'success': bool(ranking),
+            'message': f'{len(ranking)} medida(s) analisada(s), {len(failed)} com erro',
+            'ranking': ranking,
+            'failed': failed
+        }
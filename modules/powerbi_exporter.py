@@ -2,15 +2,25 @@
 Exportador para Power BI - Gera arquivos de tema JSON e scripts
 """
 import json
+import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+from .content_cache import ContentCache, default_cache, thaw
+from .theme_compiler import ThemeCompiler
+from . import tracing
+
+
+logger = logging.getLogger(__name__)
+
 
 class PowerBIExporter:
     """Exporta configurações para o Power BI"""
     
-    def __init__(self):
+    def __init__(self, cache: ContentCache = None):
         self.export_history = []
+        self.cache = cache if cache is not None else default_cache()
+        self.compiler: Optional[ThemeCompiler] = None  # schema carregado na primeira compilação
     
     def export_theme(self, palette: Dict[str, Any], name: str = None) -> str:
         """
@@ -23,76 +33,46 @@ class PowerBIExporter:
         Returns:
             JSON do tema formatado
         """
-        if not name:
-            name = palette.get("name", "Custom Theme")
-        
-        # Estrutura de tema do Power BI
-        theme = {
-            "name": name,
-            "dataColors": palette.get("colors", []),
-            "background": palette.get("background", "#FFFFFF"),
-            "foreground": palette.get("foreground", "#000000"),
-            "tableAccent": palette.get("primary", palette.get("colors", ["#1E88E5"])[0])
-        }
-        
-        # Cores adicionais para visuais específicos
-        if "primary" in palette:
-            theme["primary"] = palette["primary"]
-        if "secondary" in palette:
-            theme["secondary"] = palette["secondary"]
-        if "accent" in palette:
-            theme["accent"] = palette["accent"]
-        
-        # Configurações avançadas de tema
-        theme["visualStyles"] = {
-            "*": {
-                "*": {
-                    "background": [
-                        {
-                            "color": {"solid": {"color": palette.get("background", "#FFFFFF")}},
-                            "transparency": 0
-                        }
-                    ],
-                    "border": [
-                        {
-                            "color": {"solid": {"color": palette.get("primary", "#E0E0E0")}},
-                            "show": False
-                        }
-                    ]
-                }
-            },
-            "page": {
-                "*": {
-                    "background": [
-                        {
-                            "color": {"solid": {"color": palette.get("background", "#FFFFFF")}},
-                            "transparency": 0
-                        }
-                    ]
-                }
-            }
-        }
+        return self.export_theme_bytes(palette, name).decode('utf-8')
+    
+    def export_theme_bytes(self, palette: Dict[str, Any], name: str = None, minify: bool = False,
+                           typography: Optional[Dict[str, Any]] = None) -> bytes:
+        """
+        Tema JSON serializado (UTF-8), legível ou minificado para produção
         
-        # Estilo de texto
-        theme["textClasses"] = {
-            "title": {
-                "fontSize": 16,
-                "fontFace": "Segoe UI",
-                "color": palette.get("foreground", "#000000")
-            },
-            "header": {
-                "fontSize": 14,
-                "fontFace": "Segoe UI Semibold",
-                "color": palette.get("foreground", "#000000")
-            },
-            "label": {
-                "fontSize": 11,
-                "fontFace": "Segoe UI",
-                "color": palette.get("foreground", "#777777")
-            }
-        }
+        Paleta, nome e tipografia iguais devolvem os mesmos bytes sem recompilar
+        nem re-serializar o tema (pronto para st.download_button ou disco).
+        """
+        # bytes são imutáveis: lidos direto da entrada em cache, sem cópia
+        return self._cached_theme(palette, name, typography)['minified' if minify else 'pretty']
+    
+    def compile_theme(self, palette: Dict[str, Any], name: str = None,
+                      typography: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Compila o tema completo (visualStyles por tipo de visual) e valida contra o schema
         
-        return json.dumps(theme, indent=2)
+        Returns:
+            Resultado do ThemeCompiler.build (success, theme, pretty, minified, errors,
+            message); cópia da entrada em cache, pode ser alterada pelo chamador
+        """
+        return thaw(self._cached_theme(palette, name, typography))
+    
+    @tracing.traced('export.compile_theme')
+    def _cached_theme(self, palette: Dict[str, Any], name: str = None,
+                      typography: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return self.cache.get_or_compute(
+            'theme_build', lambda: self._build_theme(palette, name, typography),
+            palette, name, typography
+        )
+    
+    def _build_theme(self, palette: Dict[str, Any], name: str = None,
+                     typography: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if self.compiler is None:
+            self.compiler = ThemeCompiler()
+        result = self.compiler.build(palette, typography, name)
+        if not result['success']:
+            logger.warning("%s: %s", result['message'], '; '.join(result['errors'][:3]))
+        return result
     
     def export_dax_measures(self, measures: List[Dict[str, str]]) -> str:
         """
@@ -208,79 +188,26 @@ class PowerBIExporter:
         
         return config
     
-    def generate_python_script(self, analysis: Dict[str, Any], palette: Dict[str, Any]) -> str:
+    @tracing.traced('export.python_script')
+    def generate_python_script(self, analysis: Dict[str, Any], palette: Dict[str, Any],
+                               data_path: str = 'dados.parquet') -> str:
         """
         Gera script Python para análise exploratória
         
+        O script carrega só as colunas usadas com tipos enxutos e pré-agrega
+        cada visual sugerido (ver ScriptGenerator), então continua rápido com
+        milhões de linhas.
+        
         Args:
             analysis: Análise de dados
             palette: Paleta de cores
+            data_path: Caminho padrão dos dados (Parquet, CSV ou Excel)
         
         Returns:
             Script Python
         """
-        script = """
-# Script de Análise Exploratória
-# Gerado automaticamente pelo Power BI Assistant
-
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-
-# Configuração de cores
-COLORS = {colors}
-
-# Carregue seus dados aqui
-# df = pd.read_csv('seu_arquivo.csv')
-# ou
-# df = pd.read_excel('seu_arquivo.xlsx')
-
-# Análise de dados básica
-print("Resumo dos dados:")
-print(df.info())
-print("\\nEstatísticas descritivas:")
-print(df.describe())
-
-# Visualizações sugeridas
-{visualizations}
-
-# Salvar dashboard
-# fig.write_html('dashboard.html')
-"""
-        
-        # Formata cores
-        colors_str = json.dumps(palette.get("colors", []), indent=4)
-        
-        # Gera código de visualizações
-        viz_code = ""
-        for i, visual in enumerate(analysis.get("suggested_visuals", [])[:5], 1):
-            viz_type = visual.get("type", "bar_chart")
-            columns = visual.get("columns", {})
-            title = visual.get("title", f"Visual {i}")
-            
-            if viz_type == "line_chart" and "x" in columns and "y" in columns:
-                viz_code += f"""
-# {title}
-fig{i} = px.line(df, 
-                x='{columns["x"]}', 
-                y={columns["y"]},
-                title='{title}',
-                color_discrete_sequence=COLORS)
-fig{i}.show()
-"""
-            
-            elif viz_type == "bar_chart" and "category" in columns and "value" in columns:
-                viz_code += f"""
-# {title}
-fig{i} = px.bar(df, 
-               x='{columns["category"]}', 
-               y='{columns["value"]}',
-               title='{title}',
-               color_discrete_sequence=COLORS)
-fig{i}.show()
-"""
-        
-        return script.format(colors=colors_str, visualizations=viz_code)
+        from .script_generator import ScriptGenerator
+        return ScriptGenerator().generate(analysis, palette, data_path=data_path)
     
     def export_to_file(self, content: str, filename: str, file_type: str = "json") -> str:
         """
@@ -308,42 +235,68 @@ fig{i}.show()
         
         return filename
     
+    @tracing.traced('export.theme_bundle')
     def create_theme_bundle(self, palette: Dict[str, Any], layout: Dict[str, Any], 
-                           output_dir: str = "powerbi_export") -> Dict[str, str]:
+                           output_dir: str = "powerbi_export", zip_path: str = None) -> Dict[str, str]:
         """
         Cria um pacote completo de exportação
         
+        Os arquivos são renderizados em memória e gravados atomicamente
+        (temporário + rename); artefatos iguais aos do manifest.json não são
+        regravados. Veja BundleBuilder para o modo em lote.
+        
         Args:
             palette: Paleta de cores
             layout: Layout do dashboard
             output_dir: Diretório de saída
+            zip_path: Se informado, grava também um zip determinístico do pacote
         
         Returns:
             Dicionário com paths dos arquivos criados
         """
-        import os
+        from .bundle_builder import BundleBuilder
         
-        # Cria diretório se não existir
-        os.makedirs(output_dir, exist_ok=True)
+        result = BundleBuilder(self).build(palette, layout, output_dir, zip_path=zip_path)
+        if not result['success']:
+            raise OSError(result['message'])
+        
+        files = dict(result['files'])
+        if zip_path:
+            files["zip"] = zip_path
+        return files
+    
+    @tracing.traced('export.pbip_project')
+    def create_pbip_project(self, project_name: str, analysis: Dict[str, Any], layout: Dict[str, Any],
+                            palette: Dict[str, Any] = None, output_dir: str = "powerbi_project") -> Dict[str, Any]:
+        """
+        Gera um Power BI Project (PBIP/PBIR) com os visuais do layout ligados às colunas da análise
         
-        files = {}
+        Args:
+            project_name: Nome do projeto
+            analysis: Resultado do DataAnalyzer (suggested_visuals e column_analysis)
+            layout: Layout do dashboard (uma página)
+            palette: Paleta do tema embutido
+            output_dir: Diretório do projeto (substituído por inteiro)
         
-        # Exporta tema
-        theme_json = self.export_theme(palette)
-        theme_file = os.path.join(output_dir, "theme.json")
-        with open(theme_file, 'w', encoding='utf-8') as f:
-            f.write(theme_json)
-        files["theme"] = theme_file
+        Returns:
+            Resultado do PBIPExporter.export
+        """
+        from .pbip_exporter import PBIPExporter
         
-        # Exporta guia de layout
-        layout_guide = self.generate_layout_guide(layout)
-        layout_file = os.path.join(output_dir, "layout_guide.md")
-        with open(layout_file, 'w', encoding='utf-8') as f:
-            f.write(layout_guide)
-        files["layout"] = layout_file
+        return PBIPExporter(self).export_analysis(project_name, analysis, layout, output_dir, palette)
+    
+    def render_readme(self, palette: Dict[str, Any], theme_version: str = None) -> str:
+        """
+        README do pacote de exportação
         
-        # Cria README
-        readme = f"""
+        Args:
+            palette: Paleta de cores
+            theme_version: Identificador do conteúdo do tema (ex.: hash); sem ele
+                o README leva a data de geração
+        """
+        footer = (f"Versão do tema: {theme_version}" if theme_version
+                  else f"Gerado em: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        return f"""
 # Power BI Dashboard Theme
 
 Pacote de tema e layout gerado automaticamente.
@@ -351,6 +304,7 @@ Pacote de tema e layout gerado automaticamente.
 ## Arquivos Incluídos
 
 - `theme.json`: Tema de cores para importar no Power BI
+- `theme.min.json`: Mesmo tema minificado (produção)
 - `layout_guide.md`: Guia de posicionamento dos visuais
 
 ## Como Usar
@@ -373,12 +327,5 @@ Pacote de tema e layout gerado automaticamente.
 {json.dumps(palette.get("colors", []), indent=2)}
 
 ---
-Gerado em: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+{footer}
 """
-        
-        readme_file = os.path.join(output_dir, "README.md")
-        with open(readme_file, 'w', encoding='utf-8') as f:
-            f.write(readme)
-        files["readme"] = readme_file
-        
-        return files
@@ -0,0 +1,318 @@
+"""
+Armazenamento de Resultados - Grade paginada com ordenação e filtro no servidor
+
+O resultado de uma query DAX fica num DataFrame colunar no servidor (uma
+coluna por vez a partir das linhas, texto repetitivo como category) e o
+navegador recebe só a página visível. Ordenar calcula a permutação da coluna
+inteira uma vez; filtros viram máscaras vetorizadas; a combinação
+(ordenação, filtros) é memoizada como vetor de posições, então trocar de página
+custa um take de page_size linhas. CSV e Parquet são gerados só quando pedidos,
+em blocos, num arquivo temporário.
+"""
+import os
+import tempfile
+import weakref
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+FILTER_OPERATORS = ('==', '!=', '>', '>=', '<', '<=', 'contains', 'in')
+
+# Colunas de texto com até esta fração de valores distintos viram category
+CATEGORY_RATIO = 0.5
+
+EXPORT_CHUNK_ROWS = 100_000
+
+
+def _remove_exports(exports: Dict[Tuple, str]):
+    for path in exports.values():
+        if os.path.exists(path):
+            os.remove(path)
+    exports.clear()
+
+
+def columnar_frame(rows: List[Dict[str, Any]], columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    DataFrame colunar a partir de linhas (dicts), montado coluna a coluna
+
+    Mais rápido e mais enxuto que pd.DataFrame(rows): cada coluna é extraída
+    numa compreensão de lista e textos repetitivos viram category.
+    """
+    if columns is None:
+        columns = list(rows[0]) if rows else []
+    data = {}
+    for column in columns:
+        values = [row.get(column) for row in rows]
+        series = pd.Series(values, name=column)
+        if len(series) and (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+            distinct = series.nunique(dropna=True)
+            if distinct <= len(series) * CATEGORY_RATIO:
+                series = series.astype('category')
+        data[column] = series
+    return pd.DataFrame(data, columns=columns)
+
+
+def _coerce(series: pd.Series, value: Any) -> Any:
+    """Converte o valor digitado no filtro para o tipo da coluna"""
+    if isinstance(value, (list, tuple, set)):
+        return [_coerce(series, item) for item in value]
+    if not isinstance(value, str):
+        return value
+    if pd.api.types.is_bool_dtype(series):
+        return value.strip().lower() in ('1', 'true', 'sim', 'verdadeiro')
+    if pd.api.types.is_numeric_dtype(series):
+        return float(value.replace(',', '.'))
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return pd.Timestamp(value)
+    return value
+
+
+class ResultStore:
+    """
+    Resultado tabular no servidor com páginas, ordenação e filtros
+
+    Exemplo:
+        store = ResultStore.from_result(connector.execute_dax_query(query, max_rows=1_000_000))
+        page = store.page(0, page_size=100, sort_by='[Total]', ascending=False,
+                          filters=[{'column': 'Produto[Categoria]', 'op': 'contains', 'value': 'bike'}])
+        page['rows']  # DataFrame só com as linhas visíveis
+    """
+
+    def __init__(self, frame: pd.DataFrame, max_views: int = 16):
+        """
+        Args:
+            frame: Resultado completo (o índice é descartado)
+            max_views: Combinações (ordenação, filtros) memoizadas
+        """
+        self.frame = frame.reset_index(drop=True)
+        self.max_views = max_views
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._masks: OrderedDict = OrderedDict()
+        self._views: OrderedDict = OrderedDict()
+        self._exports: Dict[Tuple, str] = {}
+        # Os temporários somem junto com o store (ex.: sessão descartada), mesmo sem close()
+        self._finalizer = weakref.finalize(self, _remove_exports, self._exports)
+
+    @classmethod
+    def from_result(cls, result: Dict[str, Any], **kwargs) -> 'ResultStore':
+        """Store a partir do retorno de execute_dax_query ({rows, columns})"""
+        return cls(columnar_frame(result.get('rows', []), result.get('columns') or None), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.frame.columns)
+
+    def memory_bytes(self) -> int:
+        """Memória do DataFrame e das permutações/visões memoizadas"""
+        total = int(self.frame.memory_usage(index=False, deep=False).sum())
+        total += sum(order.nbytes for order in self._orders.values())
+        total += sum(mask.nbytes for mask in self._masks.values())
+        total += sum(view.nbytes for view in self._views.values() if view is not None)
+        return total
+
+    # ------------------------------------------------------------------ visões
+
+    def view(self, sort_by: Optional[str] = None, ascending: bool = True,
+             filters: Optional[List[Dict[str, Any]]] = None) -> Optional[np.ndarray]:
+        """
+        Posições das linhas visíveis, na ordem de exibição
+
+        Returns:
+            Vetor de posições, ou None quando não há ordenação nem filtro (todas, na ordem original)
+        """
+        key = self._view_key(sort_by, ascending, filters)
+        if key in self._views:
+            self._views.move_to_end(key)
+            return self._views[key]
+
+        mask = self._mask(key[2])
+        if sort_by is not None:
+            order = self._order(sort_by, ascending)
+            positions = order if mask is None else order[mask[order]]
+        else:
+            positions = None if mask is None else np.flatnonzero(mask)
+
+        self._views[key] = positions
+        while len(self._views) > self.max_views:
+            self._views.popitem(last=False)
+        return positions
+
+    def page(self, number: int = 0, page_size: int = 100, sort_by: Optional[str] = None,
+             ascending: bool = True, filters: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Uma página da visão (ordenação + filtros)
+
+        Returns:
+            Dict com rows (DataFrame da página), page, page_count, page_size, start,
+            end, total_rows (após filtros) e source_rows
+        """
+        positions = self.view(sort_by, ascending, filters)
+        total = len(self.frame) if positions is None else len(positions)
+        page_size = max(int(page_size), 1)
+        page_count = max(-(-total // page_size), 1)
+        number = min(max(int(number), 0), page_count - 1)
+        start, end = number * page_size, min((number + 1) * page_size, total)
+
+        if positions is None:
+            rows = self.frame.iloc[start:end]
+        else:
+            rows = self.frame.take(positions[start:end])
+        return {
+            'rows': rows,
+            'page': number,
+            'page_count': page_count,
+            'page_size': page_size,
+            'start': start,
+            'end': end,
+            'total_rows': total,
+            'source_rows': len(self.frame)
+        }
+
+    def _order(self, column: str, ascending: bool) -> np.ndarray:
+        """Permutação que ordena a coluna inteira (estável, nulos no fim), calculada uma vez"""
+        key = (column, bool(ascending))
+        if key not in self._orders:
+            series = self.frame[column]
+            self._orders[key] = series.sort_values(ascending=ascending, kind='stable',
+                                                   na_position='last').index.to_numpy()
+        return self._orders[key]
+
+    def _mask(self, filters: Tuple) -> Optional[np.ndarray]:
+        """Máscara booleana da combinação de filtros (cada filtro memoizado à parte)"""
+        mask = None
+        for condition in filters:
+            if condition not in self._masks:
+                self._masks[condition] = self._condition_mask(*condition)
+                while len(self._masks) > self.max_views:
+                    self._masks.popitem(last=False)
+            else:
+                self._masks.move_to_end(condition)
+            current = self._masks[condition]
+            mask = current if mask is None else mask & current
+        return mask
+
+    def _condition_mask(self, column: str, op: str, value: Any) -> np.ndarray:
+        series = self.frame[column]
+        if op == 'contains':
+            text = str(value).lower()
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Testa só as categorias e propaga pelos códigos
+                hits = series.cat.categories.astype(str).str.lower().str.contains(text, regex=False)
+                return np.isin(series.cat.codes.to_numpy(), np.flatnonzero(hits))
+            return series.astype(str).str.lower().str.contains(text, regex=False).to_numpy(dtype=bool)
+
+        value = _coerce(series, value)
+        if op == 'in':
+            return series.isin(value if isinstance(value, list) else [value]).to_numpy(dtype=bool)
+        comparisons = {
+            '==': series.__eq__, '!=': series.__ne__, '>': series.__gt__,
+            '>=': series.__ge__, '<': series.__lt__, '<=': series.__le__
+        }
+        result = comparisons[op](value)
+        return result.fillna(False).to_numpy(dtype=bool) if result.dtype != bool else result.to_numpy()
+
+    def _view_key(self, sort_by: Optional[str], ascending: bool,
+                  filters: Optional[List[Dict[str, Any]]]) -> Tuple:
+        if sort_by is not None and sort_by not in self.frame.columns:
+            raise KeyError(f"Coluna desconhecida: {sort_by}")
+        conditions = []
+        for condition in filters or []:
+            column, op, value = condition['column'], condition.get('op', '=='), condition.get('value')
+            if column not in self.frame.columns:
+                raise KeyError(f"Coluna desconhecida: {column}")
+            if op not in FILTER_OPERATORS:
+                raise ValueError(f"Operador de filtro inválido: {op}")
+            if value is None or value == '':
+                continue
+            conditions.append((column, op, tuple(value) if isinstance(value, (list, set)) else value))
+        return (sort_by, bool(ascending) if sort_by is not None else True, tuple(sorted(conditions, key=repr)))
+
+    # ------------------------------------------------------------------ exportação
+
+    def iter_csv(self, sort_by: Optional[str] = None, ascending: bool = True,
+                 filters: Optional[List[Dict[str, Any]]] = None, chunk_rows: int = EXPORT_CHUNK_ROWS):
+        """CSV da visão em blocos de bytes (cabeçalho no primeiro bloco)"""
+        positions = self.view(sort_by, ascending, filters)
+        total = len(self.frame) if positions is None else len(positions)
+        for start in range(0, max(total, 1), chunk_rows):
+            if positions is None:
+                chunk = self.frame.iloc[start:start + chunk_rows]
+            else:
+                chunk = self.frame.take(positions[start:start + chunk_rows])
+            yield chunk.to_csv(index=False, header=start == 0).encode('utf-8')
+
+    def export(self, fmt: str = 'csv', sort_by: Optional[str] = None, ascending: bool = True,
+               filters: Optional[List[Dict[str, Any]]] = None, directory: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Grava a visão num arquivo temporário, em blocos (reaproveitado enquanto a visão não muda)
+
+        Args:
+            fmt: 'csv' ou 'parquet' (requer pyarrow)
+
+        Returns:
+            Dict com success, path, rows e size (ou success=False e error)
+        """
+        fmt = fmt.lower()
+        if fmt not in ('csv', 'parquet'):
+            return {'success': False, 'error': f"Formato não suportado: {fmt}"}
+
+        key = (fmt,) + self._view_key(sort_by, ascending, filters)
+        cached = self._exports.get(key)
+        if cached and os.path.exists(cached):
+            return {'success': True, 'path': cached, 'rows': self._view_rows(key),
+                    'size': os.path.getsize(cached)}
+
+        if fmt == 'parquet':
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                return {
+                    'success': False,
+                    'error': "Biblioteca pyarrow não instalada. Execute: pip install pyarrow"
+                }
+
+        fd, path = tempfile.mkstemp(prefix='dax_result_', suffix=f'.{fmt}', dir=directory)
+        writer = None
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                if fmt == 'csv':
+                    for block in self.iter_csv(sort_by, ascending, filters):
+                        handle.write(block)
+                else:
+                    positions = self.view(sort_by, ascending, filters)
+                    total = len(self.frame) if positions is None else len(positions)
+                    for start in range(0, max(total, 1), EXPORT_CHUNK_ROWS):
+                        chunk = (self.frame.iloc[start:start + EXPORT_CHUNK_ROWS] if positions is None
+                                 else self.frame.take(positions[start:start + EXPORT_CHUNK_ROWS]))
+                        table = pa.Table.from_pandas(chunk, preserve_index=False)
+                        if writer is None:
+                            writer = pq.ParquetWriter(handle, table.schema)
+                        writer.write_table(table.cast(writer.schema))
+                    if writer is not None:
+                        writer.close()
+                        writer = None
+        except Exception as e:
+            if writer is not None:
+                writer.close()
+            os.remove(path)
+            return {'success': False, 'error': str(e)}
+
+        self._exports[key] = path
+        return {'success': True, 'path': path, 'rows': self._view_rows(key), 'size': os.path.getsize(path)}
+
+    def close(self):
+        """Remove os arquivos exportados"""
+        _remove_exports(self._exports)
+
+    def _view_rows(self, key: Tuple) -> int:
+        sort_by, ascending, conditions = key[1:]
+        filters = [{'column': column, 'op': op, 'value': value} for column, op, value in conditions]
+        positions = self.view(sort_by, ascending, filters)
+        return len(self.frame) if positions is None else len(positions)
@@ -0,0 +1,417 @@
+"""
+Gerador de Scripts de Análise - Código Python eficiente em memória para os visuais sugeridos
+
+O script gerado carrega só as colunas usadas pelos visuais (usecols / columns do
+Parquet) com tipos enxutos derivados da análise (category, float32, inteiros
+reduzidos pela faixa min/max, datas já convertidas) e pré-agrega cada visual
+antes de plotar, para que o Plotly receba poucos milhares de pontos mesmo com
+milhões de linhas:
+
+    line_chart    agregação por data + MinMaxLTTB (min-max por faixa, depois LTTB)
+    bar_chart     groupby da categoria, top N + "Outros"
+    donut_chart   groupby da categoria
+    histogram     contagens por faixa (np.histogram)
+    scatter_plot  Scattergl até MAX_SCATTER_POINTS, acima disso densidade 2D
+    kpi_card      uma agregação por métrica
+    heatmap       matriz de correlação
+
+Séries e dispersões usam traços WebGL (Scattergl). As funções de redução
+(MinMaxLTTB, ranking, valores finitos) são copiadas do código-fonte do
+chart_pipeline, a mesma implementação da prévia no app.
+"""
+import inspect
+import json
+import re
+from typing import Dict, List, Any, Optional, Tuple
+
+from . import chart_pipeline
+from .chart_pipeline import as_list, default_aggregation
+
+
+# Limites padrão do script gerado (viram constantes editáveis no topo do script)
+DEFAULT_LIMITS = {
+    'MAX_POINTS': 5000,
+    'MAX_SCATTER_POINTS': 20000,
+    'HIST_BINS': 50,
+    'DENSITY_BINS': 200,
+    'TOP_N': 20
+}
+
+CATEGORY_TYPES = ('category', 'low_cardinality_category')
+
+# Faixas dos inteiros com sinal, do menor para o maior
+_INT_RANGES = [('int8', 2 ** 7), ('int16', 2 ** 15), ('int32', 2 ** 31), ('int64', 2 ** 63)]
+
+
+def column_dtype(info: Dict[str, Any]) -> Optional[str]:
+    """
+    Dtype enxuto para uma coluna a partir da análise do DataAnalyzer
+
+    Returns:
+        Nome do dtype pandas, 'datetime' para colunas de data ou None (mantém o inferido)
+    """
+    detected = info.get('detected_type')
+    dtype = str(info.get('dtype', ''))
+
+    if detected == 'date' or dtype.startswith('datetime'):
+        return 'datetime'
+    if dtype == 'bool':
+        return 'bool'
+    if detected in CATEGORY_TYPES:
+        return 'category'
+    if dtype.startswith(('int', 'uint', 'Int', 'UInt')):
+        low, high = info.get('min'), info.get('max')
+        if low is None or high is None:
+            return None
+        for name, limit in _INT_RANGES:
+            if -limit <= low and high < limit:
+                # Com nulos, o inteiro nullable evita a promoção para float64
+                return name.capitalize() if info.get('null_count') else name
+        return None
+    if detected == 'currency':
+        return 'float64'  # somas de valores monetários perdem centavos em float32
+    if detected in ('metric', 'percentage') or dtype.startswith('float'):
+        return 'float32'
+    return None
+
+
+_HEADER = '''# Script de Análise Exploratória
+# Gerado automaticamente pelo Power BI Assistant
+#
+# Carrega só as colunas usadas, com tipos enxutos, e pré-agrega cada visual
+# (MinMaxLTTB, faixas, densidade) antes de plotar com traços WebGL.
+#
+# Uso: python {script_name} [caminho_dos_dados.parquet|.csv|.xlsx]
+
+{imports}
+
+# Configuração de cores
+COLORS = {colors}
+
+# Dados: Parquet é o formato mais rápido (colunar, tipos preservados)
+DATA_PATH = {data_path!r}
+COLUMNS = {columns}
+DTYPES = {dtypes}
+DATE_COLUMNS = {date_columns}
+
+# Limites de pontos por visual
+{limits}
+
+
+def carregar_dados(caminho=DATA_PATH):
+    """Lê só COLUMNS, já com DTYPES e DATE_COLUMNS aplicados"""
+    extensao = caminho.rsplit('.', 1)[-1].lower()
+    if extensao in ('parquet', 'pq'):
+        df = pd.read_parquet(caminho, columns=COLUMNS)
+    elif extensao in ('xlsx', 'xls'):
+        df = pd.read_excel(caminho, usecols=COLUMNS)
+    else:
+        dtypes = {{coluna: tipo for coluna, tipo in DTYPES.items() if coluna not in DATE_COLUMNS}}
+        return pd.read_csv(caminho, usecols=COLUMNS, dtype=dtypes, parse_dates=DATE_COLUMNS)
+    return otimizar_tipos(df)
+
+
+def otimizar_tipos(df):
+    """Converte para DTYPES e DATE_COLUMNS só as colunas que ainda não estão no tipo certo"""
+    for coluna in DATE_COLUMNS:
+        if coluna in df and not pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            df[coluna] = pd.to_datetime(df[coluna], errors='coerce')
+    pendentes = {{coluna: tipo for coluna, tipo in DTYPES.items()
+                 if coluna in df and coluna not in DATE_COLUMNS and str(df[coluna].dtype) != tipo}}
+    return df.astype(pendentes) if pendentes else df
+
+
+def resumo(df):
+    """Resumo em uma passada (sem percentis, que exigem ordenar cada coluna)"""
+    memoria = df.memory_usage(deep=False).sum() / 1024 ** 2
+    print(f"Resumo dos dados: {{len(df):,}} linhas, {{df.shape[1]}} colunas, {{memoria:.1f}} MB")
+    print(df.dtypes.to_string())
+    numericas = df.select_dtypes('number')
+    if not numericas.empty:
+        print("\\nEstatísticas descritivas:")
+        print(numericas.agg(['count', 'mean', 'std', 'min', 'max']).T.to_string())
+'''
+
+
+def _source(*functions) -> str:
+    return ''.join('\n\n' + inspect.getsource(function) for function in functions)
+
+
+# Helpers do script: código-fonte das funções do chart_pipeline (uma implementação só)
+_HELPERS = {
+    'downsample': (f'\n\nMINMAX_RATIO = {chart_pipeline.MINMAX_RATIO}\n'
+                   + _source(chart_pipeline.minmax_indices, chart_pipeline.lttb_indices,
+                             chart_pipeline.downsample_indices, chart_pipeline.axis_keys)),
+    'numeric': _source(chart_pipeline.finite_values),
+    'ranking': _source(chart_pipeline.ranking),
+}
+
+# Tipo de sugestão -> helpers de que o código do visual depende
+_REQUIRES = {
+    'line_chart': ['downsample'],
+    'bar_chart': ['ranking'],
+    'donut_chart': ['ranking'],
+    'histogram': ['numeric'],
+}
+
+_FOOTER = '''
+
+FIGURAS = [{figures}]
+
+
+def figuras(df):
+    """Todas as figuras sugeridas, na ordem de prioridade"""
+    return [gerar(df) for gerar in FIGURAS]
+
+
+if __name__ == '__main__':
+    df = carregar_dados(sys.argv[1] if len(sys.argv) > 1 else DATA_PATH)
+    resumo(df)
+    for fig in figuras(df):
+        fig.show()
+
+    # Salvar dashboard
+    # with open('dashboard.html', 'w', encoding='utf-8') as arquivo:
+    #     for fig in figuras(df):
+    #         arquivo.write(fig.to_html(full_html=False, include_plotlyjs='cdn'))
+'''
+
+
+class ScriptGenerator:
+    """
+    Gera scripts de análise exploratória que escalam para milhões de linhas
+
+    Exemplo:
+        generator = ScriptGenerator()
+        script = generator.generate(analysis, palette, data_path='vendas.parquet')
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            limits: Sobrescreve DEFAULT_LIMITS (MAX_POINTS, MAX_SCATTER_POINTS, HIST_BINS,
+                DENSITY_BINS, TOP_N)
+        """
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+
+    def generate(self, analysis: Dict[str, Any], palette: Dict[str, Any],
+                 data_path: str = 'dados.parquet', script_name: str = 'analise_exploratoria.py') -> str:
+        """
+        Gera o script completo
+
+        Args:
+            analysis: Resultado de DataAnalyzer.analyze_dataframe
+            palette: Paleta de cores
+            data_path: Caminho padrão dos dados (Parquet, CSV ou Excel)
+            script_name: Nome do arquivo, usado na linha de uso do cabeçalho
+
+        Returns:
+            Código-fonte Python
+        """
+        column_analysis = analysis.get('column_analysis', {})
+        suggestions = analysis.get('suggested_visuals', [])
+
+        functions, names, helpers = [], [], []
+        for index, suggestion in enumerate(suggestions, 1):
+            code = self.visual_code(index, suggestion, column_analysis)
+            if code is None:
+                continue
+            functions.append(code)
+            names.append(f'figura_{index}')
+            for helper in _REQUIRES.get(suggestion.get('type'), []):
+                if helper not in helpers:
+                    helpers.append(helper)
+
+        columns = self.used_columns(suggestions, column_analysis)
+        dtypes, date_columns = self.dtype_map(column_analysis, columns)
+        limits = '\n'.join(f'{name} = {value}' for name, value in self.limits.items())
+
+        body = ''.join(_HELPERS[helper] for helper in ('downsample', 'numeric', 'ranking') if helper in helpers)
+        body += ''.join(functions)
+        body += _FOOTER.format(figures=', '.join(names))
+
+        script = _HEADER.format(
+            script_name=script_name,
+            imports=self._imports(body),
+            colors=json.dumps(palette.get('colors', []), indent=4),
+            data_path=data_path,
+            columns=self._literal(columns),
+            dtypes=self._literal(dtypes),
+            date_columns=self._literal(date_columns),
+            limits=limits
+        )
+        return script + body
+
+    @staticmethod
+    def _imports(body: str) -> str:
+        """Importações do script: numpy, plotly e warnings só se os visuais gerados os usam"""
+        lines = ['import sys']
+        if re.search(r'\bwarnings\.', body):
+            lines.append('import warnings')
+        lines.append('')
+        if re.search(r'\bnp\.', body):
+            lines.append('import numpy as np')
+        lines.append('import pandas as pd')
+        if re.search(r'\bgo\.', body):
+            lines.append('import plotly.graph_objects as go')
+        return '\n'.join(lines)
+
+    def used_columns(self, suggestions: List[Dict[str, Any]],
+                     column_analysis: Dict[str, Any]) -> Optional[List[str]]:
+        """Colunas referenciadas pelos visuais, na ordem da análise (None = todas)"""
+        used = set()
+        for suggestion in suggestions:
+            for role, value in suggestion.get('columns', {}).items():
+                # Details do scatter só existe no relatório PBIP; o script não o lê
+                if role != 'details':
+                    used.update(as_list(value))
+        if not used:
+            return None
+        ordered = [column for column in column_analysis if column in used]
+        return ordered + sorted(used - set(ordered))
+
+    def dtype_map(self, column_analysis: Dict[str, Any],
+                  columns: Optional[List[str]] = None) -> Tuple[Dict[str, str], List[str]]:
+        """DTYPES e DATE_COLUMNS do script para as colunas carregadas"""
+        dtypes, dates = {}, []
+        for column, info in column_analysis.items():
+            if columns is not None and column not in columns:
+                continue
+            dtype = column_dtype(info)
+            if dtype == 'datetime':
+                dates.append(column)
+            elif dtype:
+                dtypes[column] = dtype
+        return dtypes, dates
+
+    def visual_code(self, index: int, suggestion: Dict[str, Any],
+                    column_analysis: Dict[str, Any]) -> Optional[str]:
+        """Função figura_<index>(df) do visual, ou None se faltarem colunas"""
+        kind = suggestion.get('type')
+        columns = suggestion.get('columns', {})
+        title = suggestion.get('title', f'Visual {index}')
+        builder = getattr(self, f'_code_{kind}', None)
+        if builder is None:
+            return None
+        body = builder(columns, title, column_analysis)
+        if body is None:
+            return None
+        return f'\n\ndef figura_{index}(df):\n    """{self._docstring(title)}"""\n{body}'
+
+    # ------------------------------------------------------------------ visuais
+
+    def _code_line_chart(self, columns, title, column_analysis):
+        x, ys = columns.get('x'), as_list(columns.get('y'))
+        if not x or not ys:
+            return None
+        sums = [y for y in ys if default_aggregation(column_analysis, y) == 'sum']
+        means = [y for y in ys if y not in sums]
+        aggregation = {**{y: 'sum' for y in sums}, **{y: 'mean' for y in means}}
+        return f'''    # Uma linha por data (agregada) e no máximo MAX_POINTS pontos por série (MinMaxLTTB)
+    serie = df.groupby(axis_keys(df[{x!r}]), observed=True, sort=True).agg({aggregation!r})
+    fig = go.Figure()
+    for posicao, coluna in enumerate({ys!r}):
+        pontos = serie[coluna].dropna()
+        x, y = pontos.index.to_numpy(), pontos.to_numpy(dtype='float64')
+        indices = downsample_indices(x, y, MAX_POINTS)
+        fig.add_trace(go.Scattergl(x=x[indices], y=y[indices], mode='lines', name=coluna,
+                                   line=dict(color=COLORS[posicao % len(COLORS)])))
+    fig.update_layout(title={title!r})
+    return fig
+'''
+
+    def _code_bar_chart(self, columns, title, column_analysis):
+        category, value = columns.get('category'), columns.get('value')
+        if not category or not value:
+            return None
+        aggregation = default_aggregation(column_analysis, value)
+        return f'''    totais = ranking(df, {category!r}, {value!r}, {aggregation!r}, TOP_N)
+    fig = go.Figure(go.Bar(x=totais.index.astype(str), y=totais.to_numpy(), marker_color=COLORS[0]))
+    fig.update_layout(title={title!r}, xaxis_title={category!r}, yaxis_title={value!r})
+    return fig
+'''
+
+    def _code_donut_chart(self, columns, title, column_analysis):
+        category, value = columns.get('category'), columns.get('value')
+        if not category or not value:
+            return None
+        return f'''    totais = ranking(df, {category!r}, {value!r}, 'sum', TOP_N)
+    fig = go.Figure(go.Pie(labels=totais.index.astype(str), values=totais.to_numpy(), hole=0.5,
+                           marker=dict(colors=COLORS)))
+    fig.update_layout(title={title!r})
+    return fig
+'''
+
+    def _code_histogram(self, columns, title, column_analysis):
+        value = columns.get('value')
+        if not value:
+            return None
+        return f'''    # Contagens por faixa calculadas aqui: o Plotly recebe HIST_BINS barras, não as linhas
+    contagens, bordas = np.histogram(finite_values(df[{value!r}]), bins=HIST_BINS)
+    fig = go.Figure(go.Bar(x=(bordas[:-1] + bordas[1:]) / 2, y=contagens, width=np.diff(bordas),
+                           marker_color=COLORS[0]))
+    fig.update_layout(title={title!r}, xaxis_title={value!r}, yaxis_title='Frequência', bargap=0)
+    return fig
+'''
+
+    def _code_scatter_plot(self, columns, title, column_analysis):
+        x, y = columns.get('x'), columns.get('y')
+        if not x or not y:
+            return None
+        return f'''    pares = df[[{x!r}, {y!r}]].dropna()
+    if len(pares) <= MAX_SCATTER_POINTS:
+        fig = go.Figure(go.Scattergl(x=pares[{x!r}].to_numpy(), y=pares[{y!r}].to_numpy(),
+                                     mode='markers', marker=dict(color=COLORS[0], size=5, opacity=0.6)))
+        fig.update_layout(title={title!r}, xaxis_title={x!r}, yaxis_title={y!r})
+        return fig
+    # Muitos pontos: densidade em grade DENSITY_BINS x DENSITY_BINS
+    contagens, bordas_x, bordas_y = np.histogram2d(
+        pares[{x!r}].to_numpy(dtype='float64'), pares[{y!r}].to_numpy(dtype='float64'), bins=DENSITY_BINS)
+    fig = go.Figure(go.Heatmap(x=(bordas_x[:-1] + bordas_x[1:]) / 2, y=(bordas_y[:-1] + bordas_y[1:]) / 2,
+                               z=np.where(contagens.T > 0, contagens.T, np.nan),
+                               colorscale=[[0, '#FFFFFF'], [1, COLORS[0]]], colorbar=dict(title='Pontos')))
+    fig.update_layout(title={title + ' (densidade)'!r}, xaxis_title={x!r}, yaxis_title={y!r})
+    return fig
+'''
+
+    def _code_kpi_card(self, columns, title, column_analysis):
+        metrics = as_list(columns.get('metrics'))
+        if not metrics:
+            return None
+        aggregation = {metric: default_aggregation(column_analysis, metric) for metric in metrics}
+        return f'''    fig = go.Figure()
+    for posicao, (coluna, agregacao) in enumerate({aggregation!r}.items()):
+        fig.add_trace(go.Indicator(mode='number', value=float(df[coluna].agg(agregacao)),
+                                   title=dict(text=coluna), number=dict(font=dict(color=COLORS[posicao % len(COLORS)])),
+                                   domain=dict(row=0, column=posicao)))
+    fig.update_layout(title={title!r}, grid=dict(rows=1, columns={len(metrics)}))
+    return fig
+'''
+
+    def _code_heatmap(self, columns, title, column_analysis):
+        metrics = as_list(columns.get('metrics'))
+        if len(metrics) < 2:
+            return None
+        return f'''    correlacao = df[{metrics!r}].corr()
+    fig = go.Figure(go.Heatmap(z=correlacao.to_numpy(), x=correlacao.columns, y=correlacao.index,
+                               zmin=-1, zmax=1, colorscale=[[0, COLORS[-1]], [0.5, '#FFFFFF'], [1, COLORS[0]]],
+                               text=correlacao.round(2).to_numpy(), texttemplate='%{{text}}'))
+    fig.update_layout(title={title!r})
+    return fig
+'''
+
+    # ------------------------------------------------------------------ auxiliares
+
+    @staticmethod
+    def _literal(value: Any) -> str:
+        """Literal Python legível (listas/dicts curtos numa linha, longos um item por linha)"""
+        text = repr(value)
+        if len(text) <= 80 or not isinstance(value, (list, dict)):
+            return text
+        if isinstance(value, list):
+            return '[\n' + ''.join(f'    {item!r},\n' for item in value) + ']'
+        return '{\n' + ''.join(f'    {key!r}: {item!r},\n' for key, item in value.items()) + '}'
+
+    @staticmethod
+    def _docstring(title: str) -> str:
+        return str(title).replace('\\', '\\\\').replace('"""', '\\"\\"\\"')
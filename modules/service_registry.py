@@ -0,0 +1,325 @@
+"""
+Registro de Serviços - Importação e construção preguiçosas com medição do tempo de import
+
+Cada subsistema do app (analisador, gerador de cores, IA, exportadores...) é
+registrado como "módulo:Classe" e só é importado e construído no primeiro
+acesso, então abrir a página de paletas não importa pandas, openai ou o
+conector do Power BI. Cada carga é medida por um ImportProfiler, que registra
+o tempo de cada import novo (cumulativo e próprio, como python -X importtime),
+e o relatório mostra de onde vem o custo da inicialização.
+"""
+import builtins
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+from typing import Dict, List, Any, Callable, Optional, Union
+
+
+class ImportProfiler:
+    """
+    Mede os imports executados dentro do bloco (tempo cumulativo e próprio por módulo)
+
+    Só imports de módulos ainda não carregados são registrados; o gancho em
+    builtins.__import__ existe apenas enquanto algum bloco está ativo.
+
+    Exemplo:
+        profiler = ImportProfiler()
+        with profiler:
+            import pandas
+        print(profiler.format(top=10))
+    """
+
+    _hook_lock = threading.Lock()
+    _active = 0
+    _original_import = None
+    _profilers: List['ImportProfiler'] = []
+
+    def __init__(self):
+        self.records: Dict[str, Dict[str, float]] = {}
+        self._local = threading.local()
+
+    def __enter__(self) -> 'ImportProfiler':
+        with ImportProfiler._hook_lock:
+            if ImportProfiler._active == 0:
+                ImportProfiler._original_import = builtins.__import__
+                builtins.__import__ = ImportProfiler._timed_import
+            ImportProfiler._active += 1
+            ImportProfiler._profilers.append(self)
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
+        return self
+
+    def __exit__(self, *exc):
+        self._local.depth -= 1
+        with ImportProfiler._hook_lock:
+            ImportProfiler._profilers.remove(self)
+            ImportProfiler._active -= 1
+            if ImportProfiler._active == 0:
+                builtins.__import__ = ImportProfiler._original_import
+                ImportProfiler._original_import = None
+        return False
+
+    def timed(self, name: str, load: Callable[[], Any]) -> Any:
+        """Executa load() registrando-o como import de name (ex.: importlib.import_module)"""
+        with self:
+            return self._measure(name, load)
+
+    @staticmethod
+    def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+        original = ImportProfiler._original_import
+        absolute = name
+        if level:
+            try:
+                absolute = importlib.util.resolve_name('.' * level + name, (globals or {}).get('__package__'))
+            except (ImportError, ValueError):
+                return original(name, globals, locals, fromlist, level)
+        if absolute in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+        owners = [profiler for profiler in ImportProfiler._profilers
+                  if getattr(profiler._local, 'depth', 0) > 0]
+        if not owners:
+            return original(name, globals, locals, fromlist, level)
+        return owners[-1]._measure(absolute, lambda: original(name, globals, locals, fromlist, level))
+
+    def _measure(self, name: str, load: Callable[[], Any]) -> Any:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)  # tempo acumulado dos imports filhos
+        start = time.perf_counter()
+        try:
+            return load()
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            record = self.records.setdefault(name, {'cumulative_ms': 0.0, 'self_ms': 0.0, 'depth': len(stack)})
+            record['cumulative_ms'] += elapsed * 1000
+            record['self_ms'] += max(elapsed - children, 0.0) * 1000
+
+    def top_level_ms(self) -> float:
+        """Soma do tempo cumulativo dos imports de primeiro nível (sem contar filhos duas vezes)"""
+        return sum(record['cumulative_ms'] for record in self.records.values() if record['depth'] == 0)
+
+    def report(self, top: Optional[int] = None, sort_by: str = 'self_ms') -> List[Dict[str, Any]]:
+        """Imports medidos, do mais caro para o mais barato"""
+        rows = [{'module': name, 'cumulative_ms': round(record['cumulative_ms'], 2),
+                 'self_ms': round(record['self_ms'], 2), 'depth': record['depth']}
+                for name, record in self.records.items()]
+        rows.sort(key=lambda row: row[sort_by], reverse=True)
+        return rows[:top] if top else rows
+
+    def format(self, top: Optional[int] = 20) -> str:
+        """Tabela no estilo de python -X importtime (self | cumulativo | módulo)"""
+        return self.format_rows(self.report(top))
+
+    @staticmethod
+    def format_rows(rows: List[Dict[str, Any]]) -> str:
+        lines = ['import time:   self [ms] | cumulative | imported package']
+        for row in rows:
+            lines.append(f"import time: {row['self_ms']:>9.2f} | {row['cumulative_ms']:>10.2f} | "
+                         f"{row['module']}")
+        return '\n'.join(lines)
+
+
+class LazyModule:
+    """
+    Módulo importado no primeiro acesso a um atributo (ex.: pd = registry.module('pandas'))
+    """
+
+    def __init__(self, name: str, loader: Callable[[str], Any]):
+        self.__dict__['_name'] = name
+        self.__dict__['_loader'] = loader
+        self.__dict__['_module'] = None
+
+    def __getattr__(self, attribute: str) -> Any:
+        module = self.__dict__['_module']
+        if module is None:
+            module = self.__dict__['_module'] = self.__dict__['_loader'](self.__dict__['_name'])
+        return getattr(module, attribute)
+
+    def __repr__(self) -> str:
+        state = 'carregado' if self.__dict__['_module'] is not None else 'não carregado'
+        return f"<LazyModule {self.__dict__['_name']} ({state})>"
+
+
+class ServiceRegistry:
+    """
+    Serviços construídos sob demanda, com acesso no estilo dict
+
+    Exemplo:
+        registry = ServiceRegistry()
+        registry.register('analyzer', 'modules.data_analyzer:DataAnalyzer')
+        registry.register('ai', 'modules.ai_assistant:AIAssistant', provider='openai')
+        registry['analyzer'].analyze_dataframe(df)   # importa e constrói aqui
+        registry.report()                             # tempos de import/construção
+
+    Com parent, o registro vira um escopo (ex.: por sessão): serviços com
+    estado são registrados nele e os demais nomes caem no registro pai,
+    compartilhado pelo processo.
+    """
+
+    def __init__(self, parent: Optional['ServiceRegistry'] = None):
+        self.parent = parent
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._targets: Dict[str, str] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.timings: Dict[str, Dict[str, Any]] = {}
+        self.lazy_modules: Dict[str, float] = {}
+        self.profiler = ImportProfiler()
+
+    def register(self, name: str, target: Union[str, Callable[..., Any]], *args, **kwargs) -> 'ServiceRegistry':
+        """
+        Registra um serviço sem importá-lo
+
+        Args:
+            name: Nome do serviço (chave de acesso)
+            target: 'pacote.modulo:Classe' (importado no primeiro acesso) ou fábrica chamável
+            *args, **kwargs: Argumentos da construção
+        """
+        if isinstance(target, str):
+            module_name, _, attribute = target.partition(':')
+
+            def factory():
+                module = self._import(module_name)
+                return getattr(module, attribute)(*args, **kwargs) if attribute else module
+        else:
+            def factory():
+                return target(*args, **kwargs)
+
+        with self._lock:
+            self._factories[name] = factory
+            self._targets[name] = target if isinstance(target, str) else getattr(target, '__name__', repr(target))
+            self._locks.setdefault(name, threading.Lock())
+            self._instances.pop(name, None)
+        return self
+
+    def module(self, name: str) -> LazyModule:
+        """Proxy de módulo importado (e medido) no primeiro uso"""
+        def load(module_name):
+            imports_before = self.profiler.top_level_ms()
+            module = self._import(module_name)
+            self.lazy_modules[module_name] = round(self.profiler.top_level_ms() - imports_before, 2)
+            return module
+        return LazyModule(name, load)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        if name in self._instances:
+            return self._instances[name]
+        if name not in self._factories:
+            return self.parent.get(name, default) if self.parent is not None else default
+        with self._locks[name]:
+            if name not in self._instances:
+                self._instances[name] = self._build(name)
+        return self._instances[name]
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self:
+            raise KeyError(name)
+        return self.get(name)
+
+    def __setitem__(self, name: str, instance: Any):
+        """Instância pronta (sem fábrica), ex.: conector já conectado"""
+        with self._lock:
+            self._instances[name] = instance
+
+    def __contains__(self, name: str) -> bool:
+        if name in self._instances or name in self._factories:
+            return True
+        return self.parent is not None and name in self.parent
+
+    def is_loaded(self, name: str) -> bool:
+        if name in self._instances:
+            return True
+        return name not in self._factories and self.parent is not None and self.parent.is_loaded(name)
+
+    def is_local(self, name: str) -> bool:
+        """Serviço deste escopo (e não herdado do registro pai)"""
+        return name in self._instances or name in self._factories
+
+    def names(self) -> List[str]:
+        local = set(self._factories) | set(self._instances)
+        inherited = set(self.parent.names()) if self.parent is not None else set()
+        return sorted(local | inherited)
+
+    def report(self, top_imports: int = 10) -> Dict[str, Any]:
+        """
+        Tempos de inicialização
+
+        Returns:
+            Dict com services (nome -> target, scope, loaded, import_ms, init_ms,
+            modules), lazy_modules (módulo -> ms), total_ms, loaded, pending e
+            imports (os top_imports mais caros, por tempo próprio); com parent,
+            os serviços herdados vêm com scope 'compartilhado'
+        """
+        inherited = self.parent.report(top_imports) if self.parent is not None else None
+        services = {}
+        for name in self.names():
+            if not self.is_local(name):
+                services[name] = {**inherited['services'][name], 'scope': 'compartilhado'}
+                continue
+            timing = self.timings.get(name, {})
+            services[name] = {
+                'target': self._targets.get(name, 'instância'),
+                'scope': 'sessão' if self.parent is not None else 'compartilhado',
+                'loaded': name in self._instances,
+                'import_ms': timing.get('import_ms', 0.0),
+                'init_ms': timing.get('init_ms', 0.0),
+                'modules': timing.get('modules', 0)
+            }
+        lazy_modules = {**(inherited['lazy_modules'] if inherited else {}), **self.lazy_modules}
+        imports = self.profiler.report(top_imports)
+        if inherited:
+            imports = sorted(imports + inherited['imports'], key=lambda row: row['self_ms'], reverse=True)
+        total = sum(service['import_ms'] + service['init_ms'] for service in services.values())
+        total += sum(lazy_modules.values())
+        return {
+            'services': services,
+            'lazy_modules': lazy_modules,
+            'total_ms': round(total, 2),
+            'loaded': [name for name, service in services.items() if service['loaded']],
+            'pending': [name for name, service in services.items() if not service['loaded']],
+            'imports': imports[:top_imports] if top_imports else imports
+        }
+
+    def format_report(self, top_imports: int = 10) -> str:
+        report = self.report(top_imports)
+        lines = [f"⏱️ Serviços: {len(report['loaded'])} carregado(s), {len(report['pending'])} pendente(s), "
+                 f"{report['total_ms']:.1f} ms"]
+        for name, service in report['services'].items():
+            scope = '' if self.parent is None else f"[{service['scope']}] "
+            if service['loaded']:
+                lines.append(f"  {name:<14} {scope}import {service['import_ms']:>8.1f} ms  "
+                             f"init {service['init_ms']:>8.1f} ms  ({service['modules']} módulo(s) novos)")
+            else:
+                lines.append(f"  {name:<14} {scope}(não carregado)")
+        for module_name, elapsed in report['lazy_modules'].items():
+            lines.append(f"  {module_name:<14} import {elapsed:>8.1f} ms  (módulo)")
+        lines.append('')
+        lines.append(ImportProfiler.format_rows(report['imports']))
+        return '\n'.join(lines)
+
+    def _import(self, module_name: str) -> Any:
+        if module_name in sys.modules:
+            return sys.modules[module_name]
+        return self.profiler.timed(module_name, lambda: importlib.import_module(module_name))
+
+    def _build(self, name: str) -> Any:
+        # Tudo que a fábrica importar (inclusive imports dentro de __init__) fica no profiler
+        modules_before = len(sys.modules)
+        imports_before = self.profiler.top_level_ms()
+        start = time.perf_counter()
+        with self.profiler:
+            instance = self._factories[name]()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        import_ms = min(self.profiler.top_level_ms() - imports_before, elapsed_ms)
+        self.timings[name] = {
+            'import_ms': round(import_ms, 2),
+            'init_ms': round(elapsed_ms - import_ms, 2),
+            'modules': len(sys.modules) - modules_before
+        }
+        return instance
@@ -0,0 +1,375 @@
+"""
+Armazém Compartilhado - Valores somente leitura entre sessões, com contagem de referências
+
+Num deploy multiusuário do Streamlit cada sessão relia e re-analisava os
+mesmos datasets. Aqui cada valor caro (DataFrame de um upload, análise,
+metadados do modelo) é carregado uma vez por processo e entregue às sessões
+como visão somente leitura. Cada sessão segura referências pelo seu
+SessionHandle; quando a sessão termina (o handle é coletado) as referências
+são liberadas. Valores sem referências ficam em LRU e são despejados quando
+o processo passa do limite de bytes; valores referenciados nunca são
+despejados enquanto alguma sessão os usa.
+
+DataFrames são entregues como cópias rasas: com pandas < 3 a primeira visão de
+um DataFrame liga o copy-on-write do processo (enable_copy_on_write), senão a
+alteração de uma sessão chegaria às outras. Ligar só aí evita importar o pandas
+na inicialização do app.
+"""
+import sys
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from typing import Dict, List, Any, Callable, Hashable, Iterable, Optional, Tuple
+
+from .content_cache import thaw
+from . import tracing
+
+
+_MISSING = object()
+
+
+def estimate_bytes(value: Any, _seen: Optional[set] = None, _depth: int = 0) -> int:
+    """
+    Estimativa da memória ocupada por um valor (DataFrames, arrays, contêineres)
+
+    DataFrames contam memory_usage(deep=True), arrays nbytes e objetos com
+    memory_bytes() (ex.: ResultStore) o próprio relatório; contêineres são
+    percorridos até uma profundidade limitada, sem contar duas vezes o
+    mesmo objeto.
+    """
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    memory_usage = getattr(value, 'memory_usage', None)
+    if callable(memory_usage):
+        try:
+            usage = memory_usage(deep=True)
+            return int(usage.sum() if hasattr(usage, 'sum') else usage)
+        except (TypeError, ValueError):
+            pass
+    nbytes = getattr(value, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes
+    memory_bytes = getattr(value, 'memory_bytes', None)
+    if callable(memory_bytes):
+        try:
+            return int(memory_bytes())
+        except Exception:
+            pass
+
+    size = sys.getsizeof(value, 64)
+    if _depth >= 6:
+        return size
+    if isinstance(value, dict):
+        size += sum(estimate_bytes(key, seen, _depth + 1) + estimate_bytes(item, seen, _depth + 1)
+                    for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_bytes(item, seen, _depth + 1) for item in value)
+    return size
+
+
+def read_only_view(value: Any) -> Any:
+    """
+    Visão do valor compartilhado que a sessão pode alterar sem afetar as outras
+
+    DataFrames viram cópias rasas (copy-on-write, ligado aqui se preciso: só o
+    que for alterado é copiado), dicts/listas têm os contêineres copiados e as
+    folhas compartilhadas.
+    """
+    if hasattr(value, 'columns') and callable(getattr(value, 'copy', None)):
+        enable_copy_on_write()
+        return value.copy(deep=False)
+    return thaw(value)
+
+
+def enable_copy_on_write():
+    """
+    Liga o copy-on-write do pandas 2.x (padrão, e único modo, a partir do 3.0)
+
+    Opção global do pandas, para o processo inteiro: read_only_view chama antes
+    de entregar cada visão de DataFrame (o pandas já está carregado nesse ponto).
+    Sem ela, alterar um valor numa cópia rasa altera o DataFrame de todas as sessões.
+    """
+    import pandas as pd
+    if int(pd.__version__.split('.')[0]) < 3 and not pd.options.mode.copy_on_write:
+        pd.options.mode.copy_on_write = True
+
+
+def format_bytes(size: float) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.2f} GB"
+
+
+class SessionHandle:
+    """
+    Identidade de uma sessão perante o SharedStore
+
+    Guardado no estado da sessão; quando a sessão é descartada o handle é
+    coletado e todas as referências dela são liberadas (ou via close()).
+    """
+
+    def __init__(self, store: 'SharedStore'):
+        self.id = uuid.uuid4().hex[:12]
+        self.opened_at = time.time()
+        self._finalizer = weakref.finalize(self, store.release_holder, self.id)
+
+    def close(self):
+        self._finalizer()
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def __repr__(self) -> str:
+        return f"<SessionHandle {self.id}{' (fechado)' if self.closed else ''}>"
+
+
+class SharedStore:
+    """
+    Cache de processo para valores somente leitura, com referências por sessão
+
+    Exemplo:
+        store = SharedStore(max_bytes=512 * 1024 * 1024)
+        session = store.open_session()
+        df = store.acquire(('dataset', digest), lambda: pd.read_csv(buffer), session)
+        ...
+        session.close()   # ou implícito quando a sessão é coletada
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024, max_entries: int = 256):
+        """
+        Args:
+            max_bytes: Orçamento de memória; só entradas sem referências são despejadas
+            max_entries: Máximo de entradas (mesma regra de despejo)
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()   # chave -> valor, em ordem LRU
+        self._sizes: Dict[Hashable, int] = {}
+        self._holders: Dict[Hashable, set] = {}       # chave -> ids de sessão
+        self._held: Dict[str, set] = {}               # id de sessão -> chaves
+        self._loading: Dict[Hashable, threading.Lock] = {}
+        self._sessions: 'weakref.WeakSet[SessionHandle]' = weakref.WeakSet()
+        self._lock = threading.RLock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_ms = 0.0
+
+    def open_session(self) -> SessionHandle:
+        handle = SessionHandle(self)
+        with self._lock:
+            self._sessions.add(handle)
+        return handle
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def acquire(self, key: Hashable, loader: Callable[[], Any], session: Optional[SessionHandle] = None,
+                view: bool = True) -> Any:
+        """
+        Valor da chave (carregado uma vez por processo), referenciado pela sessão
+
+        Args:
+            key: Chave do valor (ex.: ('dataset', digest))
+            loader: Carrega o valor na primeira vez
+            session: Sessão que passa a segurar a referência (None = sem referência)
+            view: Se True, devolve read_only_view(valor); se False, o próprio objeto compartilhado
+        """
+        value = self._lookup(key, session)
+        if value is _MISSING:
+            # Uma carga por chave: sessões concorrentes esperam a primeira
+            with self._lock:
+                loading = self._loading.setdefault(key, threading.Lock())
+            try:
+                with loading:
+                    value = self._lookup(key, session)
+                    if value is _MISSING:
+                        start = time.perf_counter()
+                        value = loader()
+                        elapsed = (time.perf_counter() - start) * 1000
+                        self._insert(key, value, estimate_bytes(value), session, elapsed)
+            finally:
+                # Também quando o loader falha: a próxima aquisição tenta carregar de novo
+                with self._lock:
+                    self._loading.pop(key, None)
+        return read_only_view(value) if view else value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Valor compartilhado sem criar referência (não conta como acerto)"""
+        with self._lock:
+            return self._entries.get(key, default)
+
+    def release(self, key: Hashable, session: SessionHandle):
+        with self._lock:
+            self._drop_reference(key, session.id)
+            self._evict()
+
+    def release_holder(self, holder: str) -> int:
+        """Libera todas as referências de uma sessão; retorna quantas eram"""
+        with self._lock:
+            keys = list(self._held.get(holder, ()))
+            for key in keys:
+                self._drop_reference(key, holder)
+            self._held.pop(holder, None)
+            self._evict()
+        return len(keys)
+
+    def invalidate(self, match: Callable[[Hashable], bool]) -> int:
+        """
+        Remove as entradas cujas chaves satisfazem match (ex.: metadados de um modelo alterado)
+
+        Sessões que ainda usam o valor antigo continuam com a sua visão; a
+        próxima aquisição recarrega.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if match(key)]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def session_keys(self, session: SessionHandle) -> List[Hashable]:
+        with self._lock:
+            return list(self._held.get(session.id, ()))
+
+    def session_usage(self, session: SessionHandle) -> Dict[str, Any]:
+        """
+        Memória compartilhada referenciada pela sessão
+
+        Returns:
+            Dict com entries, shared_bytes (soma dos valores referenciados) e
+            attributed_bytes (cada valor dividido pelo número de sessões que o usam)
+        """
+        with self._lock:
+            keys = self._held.get(session.id, ())
+            shared = sum(self._sizes.get(key, 0) for key in keys)
+            attributed = sum(self._sizes.get(key, 0) / max(len(self._holders.get(key, ())), 1) for key in keys)
+        return {'entries': len(keys), 'shared_bytes': shared, 'attributed_bytes': int(attributed)}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pinned = [key for key in self._entries if self._holders.get(key)]
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'pinned_entries': len(pinned),
+                'pinned_bytes': sum(self._sizes[key] for key in pinned),
+                'sessions': sum(1 for handle in list(self._sessions) if not handle.closed),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+                'load_ms': round(self.load_ms, 2)
+            }
+
+    def clear(self):
+        """Remove todas as entradas (as referências das sessões são descartadas junto)"""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._holders.clear()
+            self._held.clear()
+            self.bytes = 0
+
+    def _lookup(self, key: Hashable, session: Optional[SessionHandle]) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            tracing.count('shared_hits')
+            if session is not None:
+                self._add_reference(key, session.id)
+            return self._entries[key]
+
+    def _insert(self, key: Hashable, value: Any, size: int, session: Optional[SessionHandle], elapsed_ms: float):
+        with self._lock:
+            self.misses += 1
+            tracing.count('shared_misses')
+            self.load_ms += elapsed_ms
+            if key in self._entries:
+                self.bytes -= self._sizes[key]
+            self._entries[key] = value
+            self._sizes[key] = size
+            self.bytes += size
+            if session is not None:
+                self._add_reference(key, session.id)
+            self._evict()
+
+    def _add_reference(self, key: Hashable, holder: str):
+        self._holders.setdefault(key, set()).add(holder)
+        self._held.setdefault(holder, set()).add(key)
+
+    def _drop_reference(self, key: Hashable, holder: str):
+        holders = self._holders.get(key)
+        if holders is not None:
+            holders.discard(holder)
+        held = self._held.get(holder)
+        if held is not None:
+            held.discard(key)
+
+    def _remove(self, key: Hashable):
+        self._entries.pop(key, None)
+        self.bytes -= self._sizes.pop(key, 0)
+        for holder in self._holders.pop(key, ()):
+            self._held.get(holder, set()).discard(key)
+
+    def _evict(self):
+        # Percorre em ordem LRU; entradas referenciadas são puladas
+        if len(self._entries) <= self.max_entries and self.bytes <= self.max_bytes:
+            return
+        for key in [key for key in self._entries if not self._holders.get(key)]:
+            if len(self._entries) <= self.max_entries and self.bytes <= self.max_bytes:
+                break
+            self._remove(key)
+            self.evictions += 1
+
+
+def session_memory(state: Iterable[Tuple[str, Any]], store: Optional[SharedStore] = None,
+                   session: Optional[SessionHandle] = None, top: int = 5) -> Dict[str, Any]:
+    """
+    Memória de uma sessão: estado privado + parte dos valores compartilhados
+
+    Args:
+        state: Pares (chave, valor) do estado da sessão (ex.: st.session_state.items())
+        store: SharedStore do processo
+        session: Handle da sessão no store
+        top: Quantas chaves mais pesadas listar
+
+    Returns:
+        Dict com private_bytes, largest [(chave, bytes)], shared_bytes,
+        attributed_bytes e total_bytes (privado + atribuído)
+    """
+    seen: set = set()
+    sizes = []
+    for key, value in state:
+        if isinstance(value, (SessionHandle, SharedStore)):
+            continue
+        sizes.append((str(key), estimate_bytes(value, seen)))
+    sizes.sort(key=lambda item: item[1], reverse=True)
+    private = sum(size for _, size in sizes)
+
+    usage = {'entries': 0, 'shared_bytes': 0, 'attributed_bytes': 0}
+    if store is not None and session is not None:
+        usage = store.session_usage(session)
+    return {
+        'private_bytes': private,
+        'largest': sizes[:top],
+        'shared_entries': usage['entries'],
+        'shared_bytes': usage['shared_bytes'],
+        'attributed_bytes': usage['attributed_bytes'],
+        'total_bytes': private + usage['attributed_bytes']
+    }
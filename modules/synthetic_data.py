@@ -0,0 +1,397 @@
+"""
+Gerador de Dados Sintéticos - Datasets e modelos reprodutíveis para testes de escala
+
+Gera tabelas fato/dimensão (esquema estrela) com número de linhas, colunas,
+cardinalidade, nulos, intervalo de datas e duplicatas controlados, além dos
+metadados de modelo equivalentes (mesmo formato do PowerBIConnector), para que
+DataAnalyzer, LayoutEngine, exportador e backend fake sejam medidos sobre a
+mesma curva de escala.
+"""
+import os
+import zlib
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Any, Optional, Iterator, Union
+
+import numpy as np
+import pandas as pd
+
+
+# Passos padrão da curva de escala (1k a 100M linhas)
+SCALE_STEPS = [1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000]
+
+NUMERIC_NAMES = ['Amount', 'Quantity', 'Cost', 'Discount', 'Margin', 'Weight']
+CATEGORICAL_NAMES = ['Channel', 'Status', 'Region', 'Segment', 'Priority', 'Source']
+DATE_NAMES = ['OrderDate', 'ShipDate', 'DueDate', 'InvoiceDate']
+
+
+@dataclass
+class DimensionSpec:
+    """Tabela dimensão do esquema estrela"""
+    name: str
+    rows: int
+    attributes: int = 2
+    cardinality: int = 10
+
+
+@dataclass
+class DatasetSpec:
+    """Características do dataset sintético"""
+    rows: int = 10_000
+    fact_name: str = 'Sales'
+    numeric_columns: int = 3
+    categorical_columns: int = 2
+    date_columns: int = 1
+    cardinality: Union[int, Dict[str, int]] = 20
+    null_rate: float = 0.0
+    duplicate_ratio: float = 0.0
+    date_start: str = '2020-01-01'
+    date_end: str = '2024-12-31'
+    dimensions: List[DimensionSpec] = field(default_factory=lambda: [
+        DimensionSpec('Product', 500, attributes=2, cardinality=12),
+        DimensionSpec('Customer', 5_000, attributes=2, cardinality=8),
+    ])
+    date_dimension: bool = True
+    seed: int = 42
+    chunk_size: int = 1_000_000
+
+    def scaled(self, rows: int) -> 'DatasetSpec':
+        """Mesma especificação com outro número de linhas"""
+        return replace(self, rows=rows)
+
+
+def benchmark_specs(sizes: Optional[List[int]] = None, **overrides) -> List[DatasetSpec]:
+    """
+    Especificações ao longo da curva de escala
+
+    Args:
+        sizes: Números de linhas (padrão: SCALE_STEPS)
+        **overrides: Campos de DatasetSpec a sobrescrever
+
+    Returns:
+        Lista de especificações, uma por tamanho
+    """
+    base = DatasetSpec(**overrides)
+    return [base.scaled(rows) for rows in (sizes or SCALE_STEPS)]
+
+
+def _column_names(base: List[str], count: int, prefix: str) -> List[str]:
+    names = base[:count]
+    names += [f'{prefix}{i}' for i in range(len(names) + 1, count + 1)]
+    return names
+
+
+class SyntheticDataGenerator:
+    """Gera tabelas e metadados de modelo a partir de um DatasetSpec"""
+
+    def __init__(self, spec: Optional[DatasetSpec] = None):
+        self.spec = spec or DatasetSpec()
+        self.numeric = _column_names(NUMERIC_NAMES, self.spec.numeric_columns, 'Metric')
+        self.categorical = _column_names(CATEGORICAL_NAMES, self.spec.categorical_columns, 'Category')
+        self.dates = _column_names(DATE_NAMES, self.spec.date_columns, 'Date')
+        self._date_start = np.datetime64(pd.Timestamp(self.spec.date_start).date(), 'D')
+        self._date_days = max(
+            int((pd.Timestamp(self.spec.date_end) - pd.Timestamp(self.spec.date_start)).days) + 1, 1
+        )
+
+    def _cardinality(self, column: str) -> int:
+        cardinality = self.spec.cardinality
+        if isinstance(cardinality, dict):
+            return max(int(cardinality.get(column, 20)), 1)
+        return max(int(cardinality), 1)
+
+    # -- tabela fato ----------------------------------------------------------
+
+    def iter_fact_chunks(self, rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        Gera a tabela fato em blocos de até spec.chunk_size linhas
+
+        Cada bloco usa uma semente derivada de (seed, índice do bloco), então o
+        resultado é reprodutível e a memória fica limitada ao tamanho do bloco.
+        """
+        total = self.spec.rows if rows is None else rows
+        chunk_size = max(self.spec.chunk_size, 1)
+
+        for index, start in enumerate(range(0, total, chunk_size)):
+            yield self._fact_chunk(min(chunk_size, total - start), index)
+
+    def generate_fact(self, rows: Optional[int] = None) -> pd.DataFrame:
+        """Tabela fato completa em memória"""
+        chunks = list(self.iter_fact_chunks(rows))
+        if not chunks:
+            return self._fact_chunk(0, 0)
+        if len(chunks) == 1:
+            return chunks[0]
+        return pd.concat(chunks, ignore_index=True)
+
+    def _fact_chunk(self, rows: int, index: int) -> pd.DataFrame:
+        spec = self.spec
+        rng = np.random.default_rng([spec.seed, index])
+        columns: Dict[str, np.ndarray] = {}
+
+        for dimension in spec.dimensions:
+            columns[f'{dimension.name}Key'] = rng.integers(1, dimension.rows + 1, rows)
+
+        for i, name in enumerate(self.dates):
+            offsets = rng.integers(0, self._date_days, rows)
+            columns[name] = (self._date_start + offsets.astype('timedelta64[D]')).astype('datetime64[ns]')
+
+        for name in self.categorical:
+            labels = np.array([f'{name} {k}' for k in range(1, self._cardinality(name) + 1)], dtype=object)
+            columns[name] = labels[rng.integers(0, len(labels), rows)]
+
+        for i, name in enumerate(self.numeric):
+            if i % 3 == 1:
+                values = rng.integers(1, 50, rows).astype(np.float64 if spec.null_rate else np.int64)
+            elif i % 3 == 2:
+                values = np.round(rng.normal(100, 25, rows), 2)
+            else:
+                values = np.round(rng.lognormal(4, 1, rows), 2)
+            columns[name] = values
+
+        if spec.null_rate > 0 and rows:
+            for name in self.numeric + self.categorical + self.dates:
+                mask = rng.random(rows) < spec.null_rate
+                values = columns[name]
+                if values.dtype.kind == 'M':
+                    values[mask] = np.datetime64('NaT')
+                elif values.dtype.kind == 'f':
+                    values[mask] = np.nan
+                else:
+                    values[mask] = None
+
+        duplicates = int(rows * spec.duplicate_ratio)
+        if duplicates and rows > 1:
+            # Linhas de destino recebem cópias exatas de linhas sorteadas entre
+            # as que não são destino (uma origem sobrescrita não geraria duplicata)
+            targets = rng.choice(rows, size=min(duplicates, rows - 1), replace=False)
+            keep = np.ones(rows, dtype=bool)
+            keep[targets] = False
+            originals = np.flatnonzero(keep)
+            sources = originals[rng.integers(0, len(originals), len(targets))]
+            for values in columns.values():
+                values[targets] = values[sources]
+
+        return pd.DataFrame(columns)
+
+    # -- dimensões ------------------------------------------------------------
+
+    def generate_dimension(self, dimension: DimensionSpec) -> pd.DataFrame:
+        """Tabela dimensão com chave substituta e atributos categóricos"""
+        name_seed = zlib.crc32(dimension.name.encode('utf-8'))
+        rng = np.random.default_rng([self.spec.seed, 1_000_003, name_seed, dimension.rows])
+        keys = np.arange(1, dimension.rows + 1)
+        frame = {
+            f'{dimension.name}Key': keys,
+            dimension.name: np.array([f'{dimension.name} {k}' for k in keys], dtype=object)
+        }
+        for i in range(1, dimension.attributes + 1):
+            labels = np.array([f'Grupo {k}' for k in range(1, dimension.cardinality + 1)], dtype=object)
+            frame[f'{dimension.name}Attribute{i}'] = labels[rng.integers(0, len(labels), dimension.rows)]
+        return pd.DataFrame(frame)
+
+    def generate_date_dimension(self) -> pd.DataFrame:
+        """Tabela calendário cobrindo o intervalo de datas do spec"""
+        dates = pd.date_range(self.spec.date_start, periods=self._date_days, freq='D')
+        return pd.DataFrame({
+            'Date': dates,
+            'Year': dates.year,
+            'Quarter': dates.quarter,
+            'Month': dates.month,
+            'MonthName': dates.strftime('%b'),
+            'Weekday': dates.dayofweek
+        })
+
+    def generate_tables(self) -> Dict[str, pd.DataFrame]:
+        """Todas as tabelas do esquema estrela em memória (fato primeiro)"""
+        tables = {self.spec.fact_name: self.generate_fact()}
+        for dimension in self.spec.dimensions:
+            tables[dimension.name] = self.generate_dimension(dimension)
+        if self.spec.date_dimension and self.dates:
+            tables['Date'] = self.generate_date_dimension()
+        return tables
+
+    # -- disco ----------------------------------------------------------------
+
+    def write(self, output_dir: str, fmt: str = 'csv') -> Dict[str, Any]:
+        """
+        Grava as tabelas em disco (fato em blocos, sem carregar tudo em memória)
+
+        Args:
+            output_dir: Diretório de saída
+            fmt: 'csv' ou 'parquet' (requer pyarrow)
+
+        Returns:
+            Dict com success, files (tabela -> caminho) e rows
+        """
+        fmt = fmt.lower()
+        if fmt not in ('csv', 'parquet'):
+            return {'success': False, 'error': f"Formato não suportado: {fmt}"}
+
+        if fmt == 'parquet':
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                return {
+                    'success': False,
+                    'error': "Biblioteca pyarrow não instalada. Execute: pip install pyarrow"
+                }
+
+        os.makedirs(output_dir, exist_ok=True)
+        files = {}
+        rows = {}
+
+        fact_path = os.path.join(output_dir, f'{self.spec.fact_name}.{fmt}')
+        rows[self.spec.fact_name] = 0
+        writer = None
+        try:
+            for index, chunk in enumerate(self.iter_fact_chunks()):
+                if fmt == 'csv':
+                    chunk.to_csv(fact_path, mode='w' if index == 0 else 'a',
+                                 header=index == 0, index=False, date_format='%Y-%m-%d')
+                else:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(fact_path, table.schema)
+                    writer.write_table(table.cast(writer.schema))
+                rows[self.spec.fact_name] += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        files[self.spec.fact_name] = fact_path
+
+        dimensions = {d.name: self.generate_dimension(d) for d in self.spec.dimensions}
+        if self.spec.date_dimension and self.dates:
+            dimensions['Date'] = self.generate_date_dimension()
+
+        for name, frame in dimensions.items():
+            path = os.path.join(output_dir, f'{name}.{fmt}')
+            if fmt == 'csv':
+                frame.to_csv(path, index=False, date_format='%Y-%m-%d')
+            else:
+                frame.to_parquet(path, index=False)
+            files[name] = path
+            rows[name] = len(frame)
+
+        return {'success': True, 'files': files, 'rows': rows, 'format': fmt}
+
+    # -- metadados do modelo --------------------------------------------------
+
+    def _table_columns(self) -> Dict[str, Dict[str, str]]:
+        """Tabela -> {coluna: DataType do TOM}"""
+        fact = {f'{d.name}Key': 'Int64' for d in self.spec.dimensions}
+        fact.update({name: 'DateTime' for name in self.dates})
+        fact.update({name: 'String' for name in self.categorical})
+        fact.update({
+            name: 'Int64' if i % 3 == 1 and not self.spec.null_rate else 'Double'
+            for i, name in enumerate(self.numeric)
+        })
+
+        tables = {self.spec.fact_name: fact}
+        for d in self.spec.dimensions:
+            columns = {f'{d.name}Key': 'Int64', d.name: 'String'}
+            columns.update({f'{d.name}Attribute{i}': 'String' for i in range(1, d.attributes + 1)})
+            tables[d.name] = columns
+        if self.spec.date_dimension and self.dates:
+            tables['Date'] = {'Date': 'DateTime', 'Year': 'Int64', 'Quarter': 'Int64',
+                              'Month': 'Int64', 'MonthName': 'String', 'Weekday': 'Int64'}
+        return tables
+
+    def _measures(self) -> List[Dict[str, str]]:
+        fact = self.spec.fact_name
+        measures = [{
+            'MeasureName': f'Total {name}',
+            'TableName': fact,
+            'Expression': f"SUM('{fact}'[{name}])",
+            'FormatString': '#,##0.00'
+        } for name in self.numeric]
+        measures.append({
+            'MeasureName': 'Row Count',
+            'TableName': fact,
+            'Expression': f"COUNTROWS('{fact}')",
+            'FormatString': '#,##0'
+        })
+        return measures
+
+    def _relationships(self) -> List[Dict[str, Any]]:
+        fact = self.spec.fact_name
+        pairs = [(f'{d.name}Key', d.name, f'{d.name}Key') for d in self.spec.dimensions]
+        if self.spec.date_dimension and self.dates:
+            pairs.append((self.dates[0], 'Date', 'Date'))
+        return [{
+            'name': f'{fact}_{to_table}',
+            'fromTable': fact,
+            'fromColumn': from_column,
+            'toTable': to_table,
+            'toColumn': to_column,
+            'cardinality': 'Many:One',
+            'crossFilteringBehavior': 'OneDirection',
+            'isActive': True
+        } for from_column, to_table, to_column in pairs]
+
+    def model_structure(self) -> Dict[str, Any]:
+        """Metadados do modelo no formato de PowerBIConnector.get_model_structure()"""
+        return {
+            'tables': [{
+                'name': table,
+                'type': 'Table',
+                'hidden': False,
+                'row_count': self.spec.rows if table == self.spec.fact_name else None,
+                'columns': [
+                    {'ColumnName': column, 'DataType': data_type, 'IsHidden': column.endswith('Key')}
+                    for column, data_type in columns.items()
+                ]
+            } for table, columns in self._table_columns().items()],
+            'measures': self._measures(),
+            'relationships': self._relationships(),
+            'annotations': {}
+        }
+
+    def to_fake_model(self):
+        """
+        Modelo equivalente para o FakeAnalysisServicesBackend
+
+        Os dados são gerados sob demanda na primeira query; use tamanhos que
+        caibam em memória.
+        """
+        from .fake_as_backend import (
+            FakeModel, FakeTable, FakeMeasure, FakeRelationship
+        )
+
+        def factory(name):
+            def build():
+                if name == self.spec.fact_name:
+                    frame = self.generate_fact()
+                elif name == 'Date':
+                    frame = self.generate_date_dimension()
+                else:
+                    frame = self.generate_dimension(next(d for d in self.spec.dimensions if d.name == name))
+                data = {}
+                for column in frame.columns:
+                    series = frame[column]
+                    if pd.api.types.is_datetime64_any_dtype(series):
+                        values = [None if pd.isna(v) else v.to_pydatetime() for v in series]
+                    else:
+                        values = series.astype(object).where(series.notna(), None).tolist()
+                    data[column] = values
+                return data
+            return build
+
+        model = FakeModel()
+        for table, columns in self._table_columns().items():
+            model.Tables.append(FakeTable(table, columns, factory(table)))
+
+        for measure in self._measures():
+            model.Tables[measure['TableName']].Measures.append(FakeMeasure(
+                measure['MeasureName'], measure['Expression'], measure['FormatString']
+            ))
+
+        for rel in self._relationships():
+            from_table = model.Tables[rel['fromTable']]
+            to_table = model.Tables[rel['toTable']]
+            model.Relationships.append(FakeRelationship(
+                rel['name'], from_table, from_table.Columns[rel['fromColumn']],
+                to_table, to_table.Columns[rel['toColumn']]
+            ))
+
+        return model
@@ -3,6 +3,10 @@ Aplicador de Temas - Aplica temas diretamente no Power BI via MCP
 """
 from typing import Dict, List, Any, Optional
 import json
+import logging
+
+
+logger = logging.getLogger(__name__)
 
 
 class ThemeApplier:
@@ -15,10 +19,18 @@ class ThemeApplier:
         """
         self.connector = powerbi_connector
     
+    # Anotações do modelo onde o tema é persistido
+    PALETTE_ANNOTATION = 'PBI_ThemePalette'
+    METADATA_ANNOTATION = 'PBI_ThemeMetadata'
+    
     def apply_theme(self, theme_config: Dict, apply_to_visuals: bool = True) -> Dict[str, Any]:
         """
         Aplica um tema completo ao modelo Power BI.
         
+        O tema é convertido em uma especificação de modelo e aplicado de forma
+        incremental: apenas anotações e formatos que mudaram são enviados, em
+        um único script TMSL. Reaplicar o mesmo tema não gera escritas.
+        
         Args:
             theme_config: Configuração do tema (cores, fontes, etc)
             apply_to_visuals: Se deve aplicar cores aos visuais existentes
@@ -35,23 +47,54 @@ class ThemeApplier:
         results = {
             'success': True,
             'applied': [],
-            'errors': []
+            'errors': [],
+            'warnings': [],
+            'writes': 0
         }
         
         try:
-            # 1. Aplicar paleta de cores global (via annotations no modelo)
+            spec = self.build_theme_spec(theme_config)
+            deploy = self.connector.deploy_model_spec(spec)
+            
+            if not deploy.get('success'):
+                results['success'] = False
+                results['errors'].append(deploy.get('message', 'Erro ao aplicar tema'))
+                return results
+            
+            results['writes'] = deploy.get('writes', 0)
+            changed = deploy.get('summary', {}).get('changes', [])
+            skipped = deploy.get('summary', {}).get('skipped_annotations', [])
+            unresolved = deploy.get('summary', {}).get('skipped_measures', [])
+            
+            # 1. Paleta de cores global (anotação no modelo)
             if 'colors' in theme_config:
-                color_result = self._apply_color_palette(theme_config['colors'])
-                results['applied'].append(color_result)
+                results['applied'].append(self._section_status(
+                    'color_palette', changed,
+                    lambda c: c['type'] == 'annotation' and c['key'] == self.PALETTE_ANNOTATION,
+                    skipped=self.PALETTE_ANNOTATION in skipped
+                ))
             
-            # 2. Configurar formatação de medidas
+            # 2. Formatação de medidas
             if 'measure_formats' in theme_config:
-                format_result = self._apply_measure_formats(theme_config['measure_formats'])
-                results['applied'].append(format_result)
+                status = self._section_status(
+                    'measure_formats', changed,
+                    lambda c: c['type'] == 'measure',
+                    skipped=bool(unresolved)
+                )
+                if unresolved:
+                    # Medidas sem tabela resolvida no modelo não recebem o formato
+                    status['unresolved'] = unresolved
+                    results['warnings'].append(
+                        f"Medida(s) não encontrada(s) no modelo: {', '.join(unresolved)}"
+                    )
+                results['applied'].append(status)
             
-            # 3. Adicionar anotações de tema
-            annotation_result = self._add_theme_annotations(theme_config)
-            results['applied'].append(annotation_result)
+            # 3. Anotações de tema
+            results['applied'].append(self._section_status(
+                'theme_annotations', changed,
+                lambda c: c['type'] == 'annotation' and c['key'] == self.METADATA_ANNOTATION,
+                skipped=self.METADATA_ANNOTATION in skipped
+            ))
             
             return results
             
@@ -60,92 +103,76 @@ class ThemeApplier:
             results['errors'].append(str(e))
             return results
     
-    def _apply_color_palette(self, colors: Dict) -> Dict:
-        """Aplica paleta de cores como anotações no modelo"""
-        try:
-            # Converte paleta de cores em formato JSON para anotação
-            palette_json = json.dumps({
-                'primary': colors.get('primary', []),
-                'accent': colors.get('accent', []),
-                'background': colors.get('background', '#FFFFFF'),
-                'foreground': colors.get('foreground', '#000000')
-            })
-            
-            # Adiciona anotação ao modelo via DAX
-            # Nota: Isso requer permissões de escrita no modelo
-            annotation_query = f"""
-            -- Adiciona paleta de cores como anotação
-            -- (Implementação via TMSL será necessária)
-            """
-            
-            return {
-                'type': 'color_palette',
-                'status': 'applied',
-                'colors_count': len(colors.get('primary', [])) + len(colors.get('accent', []))
-            }
+    def preview_theme_changes(self, theme_config: Dict) -> Dict[str, Any]:
+        """
+        Calcula as alterações que apply_theme enviaria, sem modificar o modelo.
+        
+        Args:
+            theme_config: Configuração do tema
             
-        except Exception as e:
+        Returns:
+            Resumo das alterações pendentes e script TMSL
+        """
+        if not self.connector.is_connected():
             return {
-                'type': 'color_palette',
-                'status': 'error',
-                'error': str(e)
+                'success': False,
+                'error': 'Não conectado ao Power BI'
             }
+        
+        return self.connector.deploy_model_spec(self.build_theme_spec(theme_config), dry_run=True)
     
-    def _apply_measure_formats(self, formats: Dict[str, str]) -> Dict:
-        """Aplica formatação às medidas especificadas"""
-        try:
-            applied_count = 0
-            errors = []
-            
-            for measure_name, format_string in formats.items():
-                try:
-                    # Atualiza formato da medida via TMSL
-                    # (Implementação real requer access ao batch_operations do MCP)
-                    applied_count += 1
-                except Exception as e:
-                    errors.append(f"{measure_name}: {str(e)}")
-            
-            return {
-                'type': 'measure_formats',
-                'status': 'applied',
-                'applied_count': applied_count,
-                'errors': errors
-            }
+    def build_theme_spec(self, theme_config: Dict) -> Dict[str, Any]:
+        """
+        Converte a configuração do tema em especificação de modelo
+        (formato aceito por ModelDiffEngine)
+        
+        Args:
+            theme_config: Configuração do tema
             
-        except Exception as e:
-            return {
-                'type': 'measure_formats',
-                'status': 'error',
-                'error': str(e)
-            }
+        Returns:
+            Especificação {measures, annotations}
+        """
+        spec = {'measures': [], 'annotations': {}}
+        
+        if 'colors' in theme_config:
+            spec['annotations'][self.PALETTE_ANNOTATION] = self._color_palette_value(theme_config['colors'])
+        
+        # Apenas o formato é comparado - expressões existentes são preservadas
+        for measure_name, format_string in theme_config.get('measure_formats', {}).items():
+            spec['measures'].append({'name': measure_name, 'format': format_string})
+        
+        spec['annotations'][self.METADATA_ANNOTATION] = self._theme_metadata_value(theme_config)
+        
+        return spec
     
-    def _add_theme_annotations(self, theme_config: Dict) -> Dict:
-        """Adiciona anotações de tema ao modelo"""
-        try:
-            # Metadata do tema
-            theme_metadata = {
-                'theme_name': theme_config.get('name', 'Custom Theme'),
-                'theme_version': theme_config.get('version', '1.0'),
-                'applied_date': theme_config.get('applied_date', 'unknown'),
-                'colors': theme_config.get('colors', {}),
-                'layout': theme_config.get('layout', {})
-            }
-            
-            # Converte em anotação
-            # (Requer implementação via batch_object_translation_operations)
-            
-            return {
-                'type': 'theme_annotations',
-                'status': 'applied',
-                'metadata': theme_metadata
-            }
-            
-        except Exception as e:
-            return {
-                'type': 'theme_annotations',
-                'status': 'error',
-                'error': str(e)
-            }
+    def _color_palette_value(self, colors: Dict) -> str:
+        """Serializa a paleta de cores para anotação"""
+        return json.dumps({
+            'primary': colors.get('primary', []),
+            'accent': colors.get('accent', []),
+            'background': colors.get('background', '#FFFFFF'),
+            'foreground': colors.get('foreground', '#000000')
+        }, sort_keys=True)
+    
+    def _theme_metadata_value(self, theme_config: Dict) -> str:
+        """Serializa os metadados do tema para anotação"""
+        return json.dumps({
+            'theme_name': theme_config.get('name', 'Custom Theme'),
+            'theme_version': theme_config.get('version', '1.0'),
+            'applied_date': theme_config.get('applied_date', 'unknown'),
+            'colors': theme_config.get('colors', {}),
+            'layout': theme_config.get('layout', {})
+        }, sort_keys=True)
+    
+    def _section_status(self, section: str, changes: List[Dict], matches, skipped: bool = False) -> Dict:
+        """Status de uma seção do tema a partir das alterações aplicadas"""
+        count = sum(1 for change in changes if matches(change))
+        
+        return {
+            'type': section,
+            'status': 'applied' if count else ('skipped' if skipped else 'unchanged'),
+            'changes': count
+        }
     
     def export_current_theme(self) -> Optional[Dict]:
         """
@@ -175,14 +202,22 @@ class ThemeApplier:
             return None
     
     def _extract_colors_from_model(self, structure: Dict) -> Dict:
-        """Extrai cores do modelo atual"""
-        # Implementação simplificada - retorna estrutura base
-        return {
+        """Extrai cores do modelo atual (anotação de paleta gravada por apply_theme)"""
+        colors = {
             'primary': [],
             'accent': [],
             'background': '#FFFFFF',
             'foreground': '#000000'
         }
+        
+        stored = structure.get('annotations', {}).get(self.PALETTE_ANNOTATION)
+        if stored:
+            try:
+                colors.update(json.loads(stored))
+            except (TypeError, ValueError):
+                logger.warning("Anotação de paleta inválida no modelo")
+        
+        return colors
     
     def _extract_measure_formats(self, structure: Dict) -> Dict[str, str]:
         """Extrai formatos das medidas"""
@@ -196,13 +231,22 @@ class ThemeApplier:
         
         return formats
     
-    def apply_accessibility_fixes(self) -> Dict[str, Any]:
+    def apply_accessibility_fixes(self, level: str = 'AA', timeout_ms: float = 500,
+                                  dry_run: bool = False) -> Dict[str, Any]:
         """
         Aplica correções de acessibilidade ao modelo.
         
-        - Valida contraste de cores
-        - Adiciona textos alternativos
-        - Configura navegação por teclado
+        - Valida o contraste da paleta do tema contra o fundo e do texto (WCAG)
+        - Separa cores confundíveis para protanopia/deuteranopia/tritanopia
+        - Grava a paleta corrigida (mais próxima das cores originais) na anotação do tema
+        
+        Textos alternativos e ordem de tabulação ficam no layout do relatório,
+        que não é acessível via TOM; são apenas listados como avisos.
+        
+        Args:
+            level: Nível WCAG ('AA' ou 'AAA')
+            timeout_ms: Tempo máximo da busca pela paleta acessível
+            dry_run: Apenas calcula a correção, sem gravar no modelo
         
         Returns:
             Resultado das correções aplicadas
@@ -216,24 +260,65 @@ class ThemeApplier:
         fixes = {
             'success': True,
             'applied_fixes': [],
-            'warnings': []
+            'warnings': [
+                'Textos alternativos e ordem de tabulação exigem edição do relatório no Power BI Desktop'
+            ]
         }
         
         try:
-            # 1. Verificar contraste de cores
-            # (Requer análise do tema atual)
+            from .accessibility import AccessibilityChecker
+            
+            colors = self._extract_colors_from_model(self.connector.get_model_structure())
+            primary = self._as_list(colors.get('primary'))
+            accent = self._as_list(colors.get('accent'))
+            palette = primary + accent
             
-            # 2. Adicionar textos alternativos faltantes
-            # (Requer acesso aos visuais - não disponível via DAX)
+            if not palette:
+                fixes['applied_fixes'].append({
+                    'type': 'contrast_validation',
+                    'status': 'skipped',
+                    'message': 'Nenhuma paleta de tema no modelo (aplique um tema primeiro)'
+                })
+                return fixes
             
-            # 3. Configurar ordem de tabulação
-            # (Configuração de acessibilidade)
+            search = AccessibilityChecker().find_accessible_palette(
+                palette, colors.get('background', '#FFFFFF'), colors.get('foreground'),
+                level=level, timeout_ms=timeout_ms
+            )
+            fixes['palette'] = search
+            
+            if not search['changes']:
+                status = 'passed'
+            elif dry_run:
+                status = 'pending'
+            else:
+                fixed_colors = dict(colors)
+                fixed_colors['primary'] = search['palette'][:len(primary)]
+                fixed_colors['accent'] = search['palette'][len(primary):]
+                if search.get('foreground'):
+                    fixed_colors['foreground'] = search['foreground']
+                
+                deploy = self.connector.deploy_model_spec({
+                    'annotations': {self.PALETTE_ANNOTATION: self._color_palette_value(fixed_colors)}
+                })
+                if not deploy.get('success'):
+                    fixes['success'] = False
+                    fixes['errors'] = [deploy.get('message', 'Erro ao gravar paleta corrigida')]
+                    return fixes
+                status = 'fixed'
             
             fixes['applied_fixes'].append({
                 'type': 'contrast_validation',
-                'status': 'checked',
-                'message': 'Validação de contraste executada'
+                'status': status,
+                'changes': len(search['changes']),
+                'message': search['message']
             })
+            if search['confusions']:
+                fixes['warnings'].append(
+                    f"{len(search['confusions'])} par(es) de cores ainda confundíveis para daltônicos"
+                )
+            if search['timed_out']:
+                fixes['warnings'].append('Busca interrompida pelo limite de tempo - resultado parcial')
             
             return fixes
             
@@ -242,6 +327,12 @@ class ThemeApplier:
             fixes['errors'] = [str(e)]
             return fixes
     
+    @staticmethod
+    def _as_list(colors) -> List[str]:
+        if not colors:
+            return []
+        return [colors] if isinstance(colors, str) else list(colors)
+    
     def batch_update_visuals(self, visual_configs: List[Dict]) -> Dict[str, Any]:
         """
         Atualiza múltiplos visuais em lote.
@@ -271,9 +362,7 @@ class ThemeApplier:
         """
         return [
             'apply_theme',
+            'preview_theme_changes',
             'export_current_theme',
-            'apply_accessibility_fixes',
-            '_apply_color_palette',
-            '_apply_measure_formats',
-            '_add_theme_annotations'
+            'apply_accessibility_fixes'
         ]
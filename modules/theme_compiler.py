@@ -0,0 +1,383 @@
+"""
+Compilador de Temas do Power BI - visualStyles completos por tipo de visual, validação e minificação
+
+A partir de uma paleta e de uma especificação tipográfica, gera o tema completo:
+cores estruturais derivadas (fundos neutros, bordas, grades, linhas alternadas),
+textClasses e visualStyles por tipo de visual (cartões, tabelas, matrizes,
+segmentações, gráficos). O resultado é validado (jsonschema, draft-07) contra
+o schema de temas empacotado em modules/schemas/reportThemeSchema.json e
+serializado em duas versões: legível (objetos indentados, um cartão por linha)
+e minificada para produção.
+
+O schema empacotado deve ser o reportThemeSchema oficial
+(microsoft/powerbi-desktop-samples) na versão OFFICIAL_SCHEMA_VERSION, gravado
+por fetch_official_schema() ou python -m modules.cli theme-schema e versionado
+junto com o código; o "$id" do arquivo diz de onde ele veio.
+
+As cores derivadas de um lote de paletas são calculadas numa única operação
+NumPy, então compilar 100 temas de marca em sequência leva poucos milissegundos
+por tema.
+"""
+import json
+import os
+import re
+import urllib.request
+from typing import Dict, List, Any, Optional, Sequence
+
+import jsonschema
+import numpy as np
+
+from . import color_engine
+
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'schemas', 'reportThemeSchema.json')
+
+# Schema oficial de temas, fixado pela versão do Power BI Desktop que o publicou
+OFFICIAL_SCHEMA_VERSION = '2.126'
+OFFICIAL_SCHEMA_URL = ('https://raw.githubusercontent.com/microsoft/powerbi-desktop-samples/main/'
+                       'Report%20Theme%20JSON%20Schema/reportThemeSchema-{version}.json')
+
+DEFAULT_TYPOGRAPHY = {
+    'font_family': 'Segoe UI',
+    'heading_family': 'Segoe UI Semibold',
+    'callout_size': 28,
+    'title_size': 16,
+    'header_size': 14,
+    'label_size': 11
+}
+
+# Cores de status usadas quando a paleta não define as suas (mesmas dos templates)
+DEFAULT_STATUS = {'good': '#4CAF50', 'neutral': '#FFC107', 'bad': '#F44336'}
+
+# Gráficos cartesianos (eixos + legenda + rótulos) e circulares (legenda + rótulos)
+AXIS_CHARTS = (
+    'clusteredColumnChart', 'clusteredBarChart', 'stackedColumnChart', 'stackedBarChart',
+    'lineChart', 'areaChart', 'stackedAreaChart', 'lineClusteredColumnComboChart',
+    'scatterChart', 'waterfallChart', 'ribbonChart'
+)
+RADIAL_CHARTS = ('pieChart', 'donutChart', 'funnel', 'treemap')
+
+# Cores derivadas: (nome, origem, destino, fração da mistura em sRGB)
+_DERIVED = (
+    ('foregroundNeutralSecondary', 'background', 'foreground', 0.70),
+    ('foregroundNeutralTertiary', 'background', 'foreground', 0.45),
+    ('backgroundLight', 'background', 'foreground', 0.03),
+    ('backgroundNeutral', 'background', 'foreground', 0.08),
+    ('border', 'background', 'foreground', 0.15),
+    ('grid', 'background', 'foreground', 0.10),
+    ('null', 'background', 'foreground', 0.25),
+    ('alternateRow', 'background', 'primary', 0.06),
+    ('center', 'background', 'primary', 0.50),
+    ('minimum', 'background', 'primary', 0.15),
+    ('visitedHyperlink', 'primary', 'foreground', 0.35),
+)
+
+
+_HEX_COLOR = re.compile(r'^#([0-9A-F]{6}|[0-9A-F]{8})$')
+
+
+def _hex(color: Any, default: Any = None) -> Any:
+    """'#abc', 'abc' ou '#aabbcc' -> '#AABBCC'; não-texto vira default (ou segue para o schema apontar)"""
+    if not isinstance(color, str):
+        return color if default is None else default
+    digits = color.strip().lstrip('#').upper()
+    if len(digits) in (3, 4):
+        digits = ''.join(digit * 2 for digit in digits)
+    return '#' + digits
+
+
+def _mixable(color: Any, default: str) -> str:
+    """A cor, se for HEX válido, senão default (só para o cálculo das derivadas)"""
+    return color if isinstance(color, str) and _HEX_COLOR.match(color) else default
+
+
+def _fill(color: str) -> Dict[str, Any]:
+    return {'solid': {'color': color}}
+
+
+def _pretty(value: Any, indent: str = '') -> str:
+    """
+    JSON legível: objetos indentados, listas (dataColors, cartões) numa linha só
+
+    O json.dumps(indent=2) cai no encoder em Python puro; aqui só os níveis de
+    objeto são montados em Python e o conteúdo de cada lista sai do encoder em C.
+    """
+    if not isinstance(value, dict) or not value:
+        return json.dumps(value, separators=(', ', ': '))
+    inner = indent + '  '
+    items = [f'{inner}{json.dumps(key)}: {_pretty(item, inner)}' for key, item in value.items()]
+    return '{\n' + ',\n'.join(items) + '\n' + indent + '}'
+
+
+def fetch_official_schema(version: str = OFFICIAL_SCHEMA_VERSION, path: str = SCHEMA_PATH,
+                          timeout: float = 30) -> str:
+    """
+    Baixa o reportThemeSchema oficial da versão indicada para modules/schemas
+
+    Substitui o schema empacotado; o arquivo deve ser versionado junto com o
+    código (a validação não acessa a rede).
+
+    Returns:
+        Caminho do arquivo gravado
+    """
+    with urllib.request.urlopen(OFFICIAL_SCHEMA_URL.format(version=version), timeout=timeout) as response:
+        schema = json.load(response)  # falha aqui se a URL não devolver JSON: nada é gravado
+    jsonschema.Draft7Validator.check_schema(schema)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(schema, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def _format_error(error: jsonschema.ValidationError) -> str:
+    """Erro do jsonschema -> 'caminho: mensagem' ($.visualStyles.card.*.labels[0]: ...)"""
+    path = ''.join(f'[{part}]' if isinstance(part, int) else f'.{part}' for part in error.absolute_path)
+    return f"${path}: {error.message}"
+
+
+class ThemeCompiler:
+    """
+    Compila paletas em temas completos do Power BI
+
+    Exemplo:
+        compiler = ThemeCompiler()
+        result = compiler.build(palette, typography={'font_family': 'Segoe UI'})
+        if result['success']:
+            open('theme.json', 'wb').write(result['pretty'])
+            open('theme.min.json', 'wb').write(result['minified'])
+    """
+
+    def __init__(self, schema_path: str = SCHEMA_PATH):
+        with open(schema_path, 'r', encoding='utf-8') as f:
+            self.schema = json.load(f)
+        self.validator = jsonschema.Draft7Validator(self.schema)
+
+    def compile(self, palette: Dict[str, Any], typography: Optional[Dict[str, Any]] = None,
+                name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Tema completo (dict) para uma paleta
+
+        Args:
+            palette: Paleta com colors, background, foreground e opcionalmente
+                primary/secondary/accent e good/neutral/bad
+            typography: Sobrescreve chaves de DEFAULT_TYPOGRAPHY (ou palette['typography'])
+            name: Nome do tema (padrão: palette['name'])
+        """
+        return self.compile_many([palette], typography, [name])[0]
+
+    def compile_many(self, palettes: Sequence[Dict[str, Any]], typography: Optional[Dict[str, Any]] = None,
+                     names: Optional[Sequence[Optional[str]]] = None) -> List[Dict[str, Any]]:
+        """Compila várias paletas; as cores derivadas saem de uma única operação vetorizada"""
+        if not palettes:
+            return []
+        names = list(names) if names is not None else [None] * len(palettes)
+        tokens = self._derive_tokens(palettes)
+        return [
+            self._assemble(palette, token, self._typography(palette, typography), name)
+            for palette, token, name in zip(palettes, tokens, names)
+        ]
+
+    def validate(self, theme: Dict[str, Any]) -> List[str]:
+        """Erros de schema do tema no formato 'caminho: mensagem' (vazia se válido)"""
+        errors = sorted(self.validator.iter_errors(theme), key=lambda error: list(map(str, error.absolute_path)))
+        return [_format_error(error) for error in errors]
+
+    @staticmethod
+    def serialize(theme: Dict[str, Any], minify: bool = False) -> bytes:
+        """JSON do tema em UTF-8: legível (objetos indentados) ou minificado"""
+        if minify:
+            return json.dumps(theme, separators=(',', ':')).encode('utf-8')
+        return _pretty(theme).encode('utf-8')
+
+    def build(self, palette: Dict[str, Any], typography: Optional[Dict[str, Any]] = None,
+              name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Compila, valida e serializa um tema
+
+        Returns:
+            Dict com success, theme, pretty, minified, errors e message
+        """
+        return self.build_batch([palette], typography, [name])[0]
+
+    def build_batch(self, palettes: Sequence[Dict[str, Any]], typography: Optional[Dict[str, Any]] = None,
+                    names: Optional[Sequence[Optional[str]]] = None) -> List[Dict[str, Any]]:
+        """Como build, para um lote de paletas (ex.: temas de todas as marcas)"""
+        results = []
+        for theme in self.compile_many(palettes, typography, names):
+            errors = self.validate(theme)
+            results.append({
+                'success': not errors,
+                'theme': theme,
+                'pretty': self.serialize(theme),
+                'minified': self.serialize(theme, minify=True),
+                'errors': errors,
+                'message': (f"Tema '{theme['name']}' válido" if not errors
+                            else f"Tema '{theme['name']}' com {len(errors)} erro(s) de schema")
+            })
+        return results
+
+    @staticmethod
+    def _typography(palette: Dict[str, Any], typography: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        spec = dict(DEFAULT_TYPOGRAPHY)
+        spec.update(palette.get('typography') or {})
+        spec.update(typography or {})
+        return spec
+
+    @staticmethod
+    def _derive_tokens(palettes: Sequence[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Cores estruturais de cada paleta, misturadas em sRGB num único lote"""
+        defaults = {'background': '#FFFFFF', 'foreground': '#000000', 'primary': '#1E88E5'}
+        bases = []
+        for palette in palettes:
+            colors = palette.get('colors') or [defaults['primary']]
+            primary = palette.get('primary')
+            bases.append({
+                'background': _hex(palette.get('background'), defaults['background']),
+                'foreground': _hex(palette.get('foreground'), defaults['foreground']),
+                # Paletas do modelo (theme_applier) guardam listas em 'primary'
+                'primary': _hex(primary if isinstance(primary, str) else colors[0]),
+            })
+
+        roles = ('background', 'foreground', 'primary')
+        # HEX inválido não derruba o lote: as derivadas usam o padrão e o schema aponta a cor
+        srgb = color_engine.to_srgb([_mixable(base[role], defaults[role])
+                                     for base in bases for role in roles]).reshape(len(bases), 3, 3)
+        source = srgb[:, [roles.index(item[1]) for item in _DERIVED]]
+        target = srgb[:, [roles.index(item[2]) for item in _DERIVED]]
+        weights = np.array([item[3] for item in _DERIVED])[None, :, None]
+        mixed = color_engine.srgb_to_hex((source + (target - source) * weights).reshape(-1, 3))
+
+        # Texto do cabeçalho de tabela: branco ou o foreground, o que contrastar mais com a primária
+        white = np.ones(3)
+        on_primary = (color_engine.contrast_ratio(srgb[:, 2], white)
+                      >= color_engine.contrast_ratio(srgb[:, 2], srgb[:, 1]))
+
+        tokens = []
+        width = len(_DERIVED)
+        for index, base in enumerate(bases):
+            token = {role: base[role] for role in roles}
+            token.update(zip((item[0] for item in _DERIVED), mixed[index * width:(index + 1) * width]))
+            token['onPrimary'] = '#FFFFFF' if on_primary[index] else token['foreground']
+            tokens.append(token)
+        return tokens
+
+    def _assemble(self, palette: Dict[str, Any], token: Dict[str, str],
+                  type_spec: Dict[str, Any], name: Optional[str]) -> Dict[str, Any]:
+        colors = [_hex(color) for color in (palette.get('colors') or [token['primary']])]
+        status = {key: _hex(palette.get(key), default) for key, default in DEFAULT_STATUS.items()}
+        accent = palette.get('accent')
+
+        theme = {
+            'name': name or palette.get('name', 'Custom Theme'),
+            'dataColors': colors,
+            'background': token['background'],
+            'backgroundLight': token['backgroundLight'],
+            'backgroundNeutral': token['backgroundNeutral'],
+            'foreground': token['foreground'],
+            'foregroundNeutralSecondary': token['foregroundNeutralSecondary'],
+            'foregroundNeutralTertiary': token['foregroundNeutralTertiary'],
+            'tableAccent': token['primary'],
+            'hyperlink': _hex(accent) if isinstance(accent, str) else token['primary'],
+            'visitedHyperlink': token['visitedHyperlink'],
+            **status,
+            'maximum': token['primary'],
+            'center': token['center'],
+            'minimum': token['minimum'],
+            'null': token['null'],
+            'textClasses': self._text_classes(token, type_spec),
+            'visualStyles': self._visual_styles(token, status, type_spec)
+        }
+        return theme
+
+    @staticmethod
+    def _text_classes(token: Dict[str, str], type_spec: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'callout': {'fontSize': type_spec['callout_size'], 'fontFace': type_spec['heading_family'],
+                        'color': token['foreground']},
+            'title': {'fontSize': type_spec['title_size'], 'fontFace': type_spec['heading_family'],
+                      'color': token['foreground']},
+            'header': {'fontSize': type_spec['header_size'], 'fontFace': type_spec['heading_family'],
+                       'color': token['foreground']},
+            'label': {'fontSize': type_spec['label_size'], 'fontFace': type_spec['font_family'],
+                      'color': token['foregroundNeutralSecondary']}
+        }
+
+    @staticmethod
+    def _visual_styles(token: Dict[str, str], status: Dict[str, str],
+                       type_spec: Dict[str, Any]) -> Dict[str, Any]:
+        family, heading = type_spec['font_family'], type_spec['heading_family']
+        label_size, header_size = type_spec['label_size'], type_spec['header_size']
+        fg, fg2 = _fill(token['foreground']), _fill(token['foregroundNeutralSecondary'])
+        bg, primary = _fill(token['background']), _fill(token['primary'])
+        border, grid = _fill(token['border']), _fill(token['grid'])
+
+        # Cartões compartilhados entre os gráficos (o json.dumps repete o conteúdo)
+        text = {'fontSize': label_size, 'fontFamily': family}
+        legend = [{'show': True, 'position': 'Top', 'labelColor': fg2, **text}]
+        labels = [{'color': fg2, **text}]
+        category_axis = [{'show': True, 'labelColor': fg2, 'titleColor': fg2, **text}]
+        value_axis = [{'show': True, 'labelColor': fg2, 'titleColor': fg2, 'gridlineShow': True,
+                       'gridlineColor': grid, **text}]
+
+        styles = {
+            '*': {'*': {
+                'background': [{'show': True, 'color': bg, 'transparency': 0}],
+                'border': [{'show': False, 'color': border, 'radius': 4}],
+                'title': [{'show': True, 'fontColor': fg, 'fontSize': header_size, 'fontFamily': heading}],
+                'visualHeader': [{'show': True, 'foreground': fg2, 'border': border, 'background': bg}],
+                'dropShadow': [{'show': False}]
+            }},
+            'page': {'*': {
+                'background': [{'color': bg, 'transparency': 0}],
+                'outspace': [{'color': _fill(token['backgroundNeutral']), 'transparency': 0}]
+            }},
+            'card': {'*': {
+                'labels': [{'color': fg, 'fontSize': type_spec['callout_size'], 'fontFamily': heading}],
+                'categoryLabels': [{'show': True, 'color': fg2, **text}]
+            }},
+            'multiRowCard': {'*': {
+                'dataLabels': [{'color': fg, 'fontSize': header_size, 'fontFamily': heading}],
+                'categoryLabels': [{'color': fg2, **text}],
+                'cardTitle': [{'color': primary, 'fontSize': header_size, 'fontFamily': heading}],
+                'card': [{'barShow': True, 'barColor': primary, 'outlineColor': border}]
+            }},
+            'kpi': {'*': {
+                'indicator': [{'fontSize': type_spec['callout_size'], 'fontFamily': heading}],
+                'status': [{'goodColor': _fill(status['good']), 'neutralColor': _fill(status['neutral']),
+                            'badColor': _fill(status['bad'])}]
+            }},
+            'gauge': {'*': {
+                'dataPoint': [{'fill': primary, 'target': fg}],
+                'calloutValue': [{'color': fg, 'fontFamily': heading}]
+            }},
+            'slicer': {'*': {
+                'header': [{'show': True, 'fontColor': fg, 'fontFamily': heading, 'textSize': header_size}],
+                'items': [{'fontColor': fg2, 'background': bg, 'outlineColor': border,
+                           'fontFamily': family, 'textSize': label_size}],
+                'slider': [{'color': primary}]
+            }}
+        }
+
+        table = {
+            'grid': [{'gridVertical': False, 'gridHorizontal': True, 'gridHorizontalColor': grid,
+                      'outlineColor': border, 'rowPadding': 4, 'textSize': label_size}],
+            'columnHeaders': [{'fontColor': _fill(token['onPrimary']), 'backColor': primary,
+                               'fontFamily': heading, 'fontSize': label_size}],
+            'values': [{'fontColorPrimary': fg, 'backColorPrimary': bg, 'fontColorSecondary': fg,
+                        'backColorSecondary': _fill(token['alternateRow']), 'fontFamily': family,
+                        'fontSize': label_size}],
+            'total': [{'fontColor': fg, 'backColor': _fill(token['backgroundNeutral']), 'fontFamily': heading}]
+        }
+        styles['tableEx'] = {'*': table}
+        styles['pivotTable'] = {'*': {
+            **table,
+            'rowHeaders': [{'fontColor': fg, 'backColor': bg, 'fontFamily': heading, 'fontSize': label_size}],
+            'columnTotal': table['total'],
+            'rowTotal': table['total']
+        }}
+
+        for visual in AXIS_CHARTS:
+            styles[visual] = {'*': {'categoryAxis': category_axis, 'valueAxis': value_axis,
+                                    'legend': legend, 'labels': labels}}
+        for visual in RADIAL_CHARTS:
+            styles[visual] = {'*': {'legend': legend, 'labels': labels}}
+        return styles
@@ -0,0 +1,298 @@
+"""
+Tracing - Spans aninhados com timers em nanossegundos, contadores e exportação
+
+Instrumentação dos caminhos quentes (análise, DAX, TOM, layout, exportação):
+
+    from modules import tracing
+
+    @tracing.traced('layout.generate')
+    def generate_layout(...): ...
+
+    with tracing.span('dax.query', max_rows=max_rows) as sp:
+        ...
+        sp.count('rows', len(rows))
+
+Desligado (padrão), span() devolve um objeto nulo compartilhado e traced()
+chama a função direto após um teste de flag: o custo é de uma chamada. Liga
+com tracing.enable() ou AVI_TRACE=1. Cada thread tem sua pilha de spans; os
+spans raiz vão para um buffer limitado e podem ser exportados em JSON
+(árvore) ou no formato Trace Event do Chrome (chrome://tracing, Perfetto).
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Any, Callable, Optional
+
+
+class Span:
+    """Trecho medido: nome, atributos, contadores e filhos"""
+
+    __slots__ = ('name', 'attrs', 'counters', 'children', 'start_ns', 'end_ns', 'thread_id', '_tracer', '_parent')
+
+    def __init__(self, tracer: 'Tracer', name: str, attrs: Dict[str, Any]):
+        self._tracer = tracer
+        self._parent = None
+        self.name = name
+        self.attrs = attrs
+        self.counters: Dict[str, float] = {}
+        self.children: List['Span'] = []
+        self.start_ns = 0
+        self.end_ns = 0
+        self.thread_id = 0
+
+    def __enter__(self) -> 'Span':
+        self._tracer._push(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self._tracer._pop(self)
+        return False
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+    def count(self, name: str, value: float = 1):
+        """Soma value ao contador do span (ex.: rows, bytes, cache_hits)"""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        children_ns = sum(child.duration_ns for child in self.children)
+        return {
+            'name': self.name,
+            'start_ns': self.start_ns,
+            'duration_ms': round(self.duration_ns / 1e6, 4),
+            'self_ms': round((self.duration_ns - children_ns) / 1e6, 4),
+            'thread_id': self.thread_id,
+            'attrs': self.attrs,
+            'counters': self.counters,
+            'children': [child.to_dict() for child in self.children]
+        }
+
+
+class _NullSpan:
+    """Span usado com o tracing desligado: tudo é no-op"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def count(self, name: str, value: float = 1):
+        pass
+
+    def set(self, **attrs):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Coletor de spans (um por processo, ver funções do módulo)
+
+    Args:
+        enabled: Estado inicial
+        max_roots: Spans raiz mantidos (os mais antigos são descartados)
+    """
+
+    def __init__(self, enabled: bool = False, max_roots: int = 10_000):
+        self.enabled = enabled
+        self.roots: deque = deque(maxlen=max_roots)
+        self.counters: Dict[str, float] = {}
+        self.epoch_ns = time.perf_counter_ns()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **attrs):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, attrs)
+
+    def traced(self, name: Optional[str] = None, **attrs) -> Callable:
+        """Decorator: cada chamada da função vira um span (nome padrão: módulo.função)"""
+        def decorator(fn: Callable) -> Callable:
+            span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with Span(self, span_name, dict(attrs)):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def current(self):
+        """Span ativo nesta thread (ou o span nulo)"""
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else NULL_SPAN
+
+    def count(self, name: str, value: float = 1):
+        """Soma ao contador do span ativo e ao total do processo"""
+        if not self.enabled:
+            return
+        self.current().count(name, value)
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.roots.clear()
+            self.counters.clear()
+            self.epoch_ns = time.perf_counter_ns()
+
+    def _push(self, span: Span):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        span.thread_id = threading.get_ident()
+        span._parent = stack[-1] if stack else None
+        stack.append(span)
+
+    def _pop(self, span: Span):
+        stack = self._local.stack
+        if stack and stack[-1] is span:
+            stack.pop()
+        parent = span._parent
+        span._parent = None
+        if parent is not None:
+            parent.children.append(span)
+        else:
+            with self._lock:
+                self.roots.append(span)
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self.roots)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Árvores de spans + contadores do processo"""
+        return {
+            'epoch_ns': self.epoch_ns,
+            'counters': dict(self.counters),
+            'spans': [span.to_dict() for span in self.spans()]
+        }
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Agregado por nome de span, do maior tempo total para o menor
+
+        Returns:
+            Lista de {name, calls, total_ms, self_ms, mean_ms, max_ms, counters}
+        """
+        totals: Dict[str, Dict[str, Any]] = {}
+        pending = list(self.spans())
+        while pending:
+            span = pending.pop()
+            pending.extend(span.children)
+            entry = totals.setdefault(span.name, {'name': span.name, 'calls': 0, 'total_ns': 0, 'self_ns': 0,
+                                                  'max_ns': 0, 'counters': {}})
+            entry['calls'] += 1
+            entry['total_ns'] += span.duration_ns
+            entry['self_ns'] += span.duration_ns - sum(child.duration_ns for child in span.children)
+            entry['max_ns'] = max(entry['max_ns'], span.duration_ns)
+            for key, value in span.counters.items():
+                entry['counters'][key] = entry['counters'].get(key, 0) + value
+        rows = [{
+            'name': entry['name'],
+            'calls': entry['calls'],
+            'total_ms': round(entry['total_ns'] / 1e6, 3),
+            'self_ms': round(entry['self_ns'] / 1e6, 3),
+            'mean_ms': round(entry['total_ns'] / entry['calls'] / 1e6, 3),
+            'max_ms': round(entry['max_ns'] / 1e6, 3),
+            'counters': entry['counters']
+        } for entry in totals.values()]
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows
+
+    def format_summary(self, top: int = 20) -> str:
+        lines = [f"{'span':<40} {'chamadas':>8} {'total ms':>10} {'próprio ms':>10} {'máx ms':>9}  contadores"]
+        for row in self.summary()[:top]:
+            counters = ', '.join(f"{key}={value:,.0f}" for key, value in row['counters'].items())
+            lines.append(f"{row['name']:<40} {row['calls']:>8} {row['total_ms']:>10.2f} {row['self_ms']:>10.2f} "
+                         f"{row['max_ms']:>9.2f}  {counters}")
+        return '\n'.join(lines)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        Formato Trace Event (eventos 'X' completos, em µs desde o reset)
+
+        Contadores de cada span vão em args; os totais do processo viram um
+        evento 'C' no fim do trace.
+        """
+        pid = os.getpid()
+        events = []
+        end_us = 0.0
+        pending = list(self.spans())
+        while pending:
+            span = pending.pop()
+            pending.extend(span.children)
+            ts = (span.start_ns - self.epoch_ns) / 1000
+            dur = span.duration_ns / 1000
+            end_us = max(end_us, ts + dur)
+            events.append({
+                'name': span.name, 'ph': 'X', 'ts': round(ts, 3), 'dur': round(dur, 3),
+                'pid': pid, 'tid': span.thread_id, 'cat': span.name.split('.', 1)[0],
+                'args': {**{key: _jsonable(value) for key, value in span.attrs.items()}, **span.counters}
+            })
+        events.sort(key=lambda event: event['ts'])
+        if self.counters:
+            events.append({'name': 'contadores', 'ph': 'C', 'ts': round(end_us, 3), 'pid': pid,
+                           'args': dict(self.counters)})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_json(self, path: str) -> str:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, default=_jsonable)
+        return path
+
+    def export_chrome_trace(self, path: str) -> str:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+        return path
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+# Tracer do processo e atalhos usados pelos módulos
+tracer = Tracer(enabled=os.getenv('AVI_TRACE', '').lower() in ('1', 'true', 'yes'))
+span = tracer.span
+traced = tracer.traced
+count = tracer.count
+current = tracer.current
+enable = tracer.enable
+disable = tracer.disable
+reset = tracer.reset
+summary = tracer.summary
+format_summary = tracer.format_summary
+export_json = tracer.export_json
+export_chrome_trace = tracer.export_chrome_trace
+
+
+def is_enabled() -> bool:
+    return tracer.enabled